@@ -15,6 +15,7 @@ DROP INDEX IF EXISTS public.idx_meta_accounts_owner_id;
 DROP INDEX IF EXISTS public.idx_meta_accounts_phone_number;
 DROP INDEX IF EXISTS public.idx_meta_accounts_business_account_id;
 DROP INDEX IF EXISTS public.idx_meta_phone_numbers_gin;
+DROP INDEX IF EXISTS public.idx_meta_accounts_normalized_phone_numbers;
 
 -- Drop do trigger
 DO $$
@@ -27,6 +28,10 @@ END $$;
 -- Drop da function (só se não for usada por outras tabelas)
 DROP FUNCTION IF EXISTS public.update_updated_at_column();
 
+-- Drop das functions de normalização de telefone (a segunda usa a primeira)
+DROP FUNCTION IF EXISTS public.meta_account_normalized_phone_numbers(TEXT, JSONB);
+DROP FUNCTION IF EXISTS public.normalize_phone_number(TEXT);
+
 
 -- Re-enable foreign key checks
 SET session_replication_role = 'origin';
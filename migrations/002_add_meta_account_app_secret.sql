@@ -0,0 +1,4 @@
+-- App secret da Meta App que assina os webhooks (X-Hub-Signature-256)
+ALTER TABLE meta_accounts ADD COLUMN IF NOT EXISTS app_secret VARCHAR(255);
+
+COMMENT ON COLUMN meta_accounts.app_secret IS 'App secret usado para validar a assinatura dos webhooks; NULL usa META_APP_SECRET';
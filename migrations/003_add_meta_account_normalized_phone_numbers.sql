@@ -0,0 +1,38 @@
+-- Números de telefone normalizados (E.164) para resolver o owner em uma única consulta.
+-- Mesmas regras de src/core/utils/phone.py: só dígitos, sem prefixo internacional "00",
+-- código do país obrigatório (não começa com 0), 7 a 15 dígitos; senão NULL.
+CREATE OR REPLACE FUNCTION normalize_phone_number(value TEXT)
+RETURNS TEXT AS $$
+    SELECT CASE
+        WHEN length(digits) BETWEEN 7 AND 15 AND left(digits, 1) <> '0' THEN '+' || digits
+    END
+    FROM (
+        SELECT CASE
+            WHEN btrim(value) LIKE '+%' THEN regexp_replace(value, '[^0-9]', '', 'g')
+            ELSE regexp_replace(regexp_replace(value, '[^0-9]', '', 'g'), '^00', '')
+        END AS digits
+    ) AS cleaned
+$$ LANGUAGE sql IMMUTABLE;
+
+-- phone_number e cada entrada de phone_numbers, normalizados e sem repetição
+CREATE OR REPLACE FUNCTION meta_account_normalized_phone_numbers(phone_number TEXT, phone_numbers JSONB)
+RETURNS TEXT[] AS $$
+    SELECT COALESCE(array_agg(DISTINCT number) FILTER (WHERE number IS NOT NULL), '{}')
+    FROM (
+        SELECT normalize_phone_number(phone_number) AS number
+        UNION ALL
+        SELECT normalize_phone_number(entry)
+        FROM jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(phone_numbers) = 'array' THEN phone_numbers ELSE '[]'::jsonb END
+        ) AS elements(entry)
+    ) AS numbers
+$$ LANGUAGE sql IMMUTABLE;
+
+ALTER TABLE meta_accounts ADD COLUMN IF NOT EXISTS normalized_phone_numbers TEXT[]
+    GENERATED ALWAYS AS (meta_account_normalized_phone_numbers(phone_number, phone_numbers)) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_meta_accounts_normalized_phone_numbers
+    ON meta_accounts USING gin(normalized_phone_numbers);
+
+COMMENT ON COLUMN meta_accounts.normalized_phone_numbers IS 'phone_number e phone_numbers em E.164 (mantido pelo banco)';
+COMMENT ON INDEX idx_meta_accounts_normalized_phone_numbers IS 'Índice para busca do owner por qualquer variante do número';
@@ -0,0 +1,106 @@
+"""
+Shared helpers for benchmark scripts: statistics, RSS, result files and
+regression comparison.
+"""
+
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+RESULTS_DIR = ROOT_DIR / "bench_results"
+
+
+def summarize(values: Iterable[float]) -> Dict[str, float]:
+    """Return count/mean/p50/p95/p99/max for a set of latencies (ms)."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+    def pct(p: float) -> float:
+        index = min(len(ordered) - 1, int(round(p / 100.0 * (len(ordered) - 1))))
+        return round(ordered[index], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": pct(50),
+        "p95": pct(95),
+        "p99": pct(99),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def rss_mb(pid: Optional[int] = None) -> Optional[float]:
+    """Current resident set size in MB for `pid` (default: this process)."""
+    status = Path(f"/proc/{pid or 'self'}/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return round(int(line.split()[1]) / 1024.0, 2)
+    if pid is None:
+        # ru_maxrss is KB on Linux, bytes on macOS; it is a peak, not current
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0), 2)
+    return None
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT_DIR, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict[str, Any]:
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def save_results(name: str, data: Dict[str, Any], output: Optional[str] = None) -> Path:
+    """Write benchmark results as JSON and return the file path."""
+    if output:
+        path = Path(output)
+    else:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_DIR / f"{name}_{time.strftime('%Y%m%d%H%M%S')}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False))
+    return path
+
+
+def _flatten(data: Any, prefix: str = "") -> Dict[str, float]:
+    flat: Dict[str, float] = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(_flatten(value, f"{prefix}{key}."))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix.rstrip(".")] = float(data)
+    return flat
+
+
+def compare(current: Dict[str, Any], baseline_path: str, keys: Iterable[str] = ("results",)) -> None:
+    """Print numeric deltas between `current` and a saved baseline result."""
+    baseline = json.loads(Path(baseline_path).read_text())
+    print(f"\nComparison against {baseline_path}")
+    print(f"{'metric':<48} {'baseline':>12} {'current':>12} {'delta':>9}")
+    for key in keys:
+        old = _flatten(baseline.get(key, {}), f"{key}.")
+        new = _flatten(current.get(key, {}), f"{key}.")
+        for metric in sorted(set(old) & set(new)):
+            before, after = old[metric], new[metric]
+            delta = ((after - before) / before * 100.0) if before else 0.0
+            print(f"{metric:<48} {before:>12.3f} {after:>12.3f} {delta:>+8.1f}%")
@@ -0,0 +1,65 @@
+"""
+Per-request DI provider resolution overhead.
+
+Measures how long it takes to resolve the providers the webhook route
+resolves on every request, using the app's real container.
+
+Example:
+    python -m scripts.benchmarks.di_resolution --iterations 20000
+"""
+
+import argparse
+import os
+import time
+from typing import Any, Dict
+
+from scripts.benchmarks.common import compare, environment_info, save_results
+from scripts.standins.environment import app_environment
+
+# The container never talks to the backends while resolving, but settings
+# must point somewhere valid for the Supabase client to be constructed.
+os.environ.update(app_environment("http://127.0.0.1:9", "http://127.0.0.1:9"))
+
+
+def measure(provider, iterations: int) -> Dict[str, Any]:
+    provider()  # first resolution builds singletons; keep it out of the timing
+    started = time.perf_counter_ns()
+    for _ in range(iterations):
+        provider()
+    elapsed = time.perf_counter_ns() - started
+    return {"iterations": iterations, "ns_per_resolution": round(elapsed / iterations, 1)}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="DI provider resolution benchmark")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    from src.core.di.container import Container
+
+    container = Container()
+    results = {
+        name: measure(getattr(container.meta, name), args.iterations)
+        for name in (
+            "meta_webhook_service",
+            "meta_service",
+            "meta_account_service",
+            "meta_webhook_owner_resolver",
+            "meta_account_repository",
+        )
+    }
+
+    report = {"benchmark": "di_resolution", "environment": environment_info(), "results": results}
+    path = save_results("di_resolution", report, args.output)
+    for name, result in results.items():
+        print(f"{name:<32} {result['ns_per_resolution']:>12.1f} ns/resolution")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Cold start profile.
+
+Reports, for fresh interpreters:
+- wall-clock time to `import src.main`
+- the slowest modules from `python -X importtime` (cumulative and self time)
+- whether heavy SDKs that should be deferred were imported anyway
+- time to run the lifespan startup and serve the first webhook, with and
+  without connection prewarming, against the local stand-ins
+
+Examples:
+    python -m scripts.benchmarks.import_profile --runs 10 --top 25
+    python -m scripts.benchmarks.import_profile --compare bench_results/import_profile_X.json
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from typing import Any, Dict, List
+
+from scripts.benchmarks.common import ROOT_DIR, compare, environment_info, save_results, summarize
+from scripts.standins.environment import app_environment, start_standins
+from scripts.standins.settings import StandinSettings
+
+# Imported lazily by the app; seeing them at import time is a regression
+DEFERRED_MODULES = ("supabase", "postgrest", "httpx", "requests", "uvicorn")
+
+# Runs in a fresh interpreter: import, lifespan startup, first webhook
+STARTUP_SNIPPET = """
+import asyncio, contextlib, json, os, sys, time
+started = time.perf_counter()
+from src.main import app
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    from scripts.benchmarks.payloads import PayloadFactory
+
+    payload = PayloadFactory(seed=0).make("text")
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        async with app.router.lifespan_context(app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                response = await client.post("/webhook", json=payload)
+            first = time.perf_counter()
+    return ready, first, response.status_code
+
+ready, first, status = asyncio.run(main())
+print(json.dumps({
+    "import_ms": (imported - started) * 1000.0,
+    "startup_ms": (ready - imported) * 1000.0,
+    "first_request_ms": (first - ready) * 1000.0,
+    "time_to_first_response_ms": (first - started) * 1000.0,
+    "first_status": status,
+}), file=sys.__stdout__)
+"""
+
+
+def _env(extra: Dict[str, str] = None) -> Dict[str, str]:
+    return {**os.environ, **(extra or {}), "PYTHONPATH": str(ROOT_DIR)}
+
+
+def parse_importtime(stderr: str) -> List[Dict[str, Any]]:
+    """Parse `-X importtime` output into {module, self_us, cumulative_us} rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, module = line[len("import time:"):].split("|")
+        rows.append({
+            "module": module.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+        })
+    return rows
+
+
+def profile_imports(module: str, runs: int, top: int, env: Dict[str, str]) -> Dict[str, Any]:
+    wall_ms: List[float] = []
+    rows: List[Dict[str, Any]] = []
+    snippet = (
+        "import time; _t = time.perf_counter(); "
+        f"import {module}; "
+        "print((time.perf_counter() - _t) * 1000.0)"
+    )
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", snippet],
+            cwd=tempfile.gettempdir(),
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        wall_ms.append(float(completed.stdout.strip().splitlines()[-1]))
+        rows = parse_importtime(completed.stderr)
+
+    imported = {row["module"] for row in rows}
+    return {
+        "import_ms": summarize(wall_ms),
+        "modules_imported": len(rows),
+        "deferred_modules_imported": sorted(m for m in DEFERRED_MODULES if m in imported),
+        "top_cumulative": sorted(rows, key=lambda r: r["cumulative_us"], reverse=True)[:top],
+        "top_self": sorted(rows, key=lambda r: r["self_us"], reverse=True)[:top],
+    }
+
+
+def profile_startup(runs: int, prewarm: bool, env: Dict[str, str]) -> Dict[str, Any]:
+    samples: List[Dict[str, float]] = []
+    for _ in range(runs):
+        completed = subprocess.run(
+            [sys.executable, "-c", STARTUP_SNIPPET],
+            cwd=tempfile.mkdtemp(prefix="import-profile-"),
+            env={**env, "API_PREWARM_CONNECTIONS": str(prewarm).lower()},
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        samples.append(json.loads(completed.stdout.strip().splitlines()[-1]))
+    return {
+        key: summarize(sample[key] for sample in samples)
+        for key in ("import_ms", "startup_ms", "first_request_ms", "time_to_first_response_ms")
+    } | {"first_status": sorted({sample["first_status"] for sample in samples})}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Cold start / import-time profile")
+    parser.add_argument("--module", default="src.main", help="Module whose import is profiled")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement")
+    parser.add_argument("--top", type=int, default=20, help="Slowest modules to report")
+    parser.add_argument("--db-latency-ms", type=float, help="Injected Supabase latency for the startup runs")
+    parser.add_argument("--graph-latency-ms", type=float, help="Injected Graph API latency for the startup runs")
+    parser.add_argument("--skip-startup", action="store_true", help="Only profile imports")
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    overrides = {"db_latency_ms": args.db_latency_ms, "graph_latency_ms": args.graph_latency_ms}
+    standins = StandinSettings(**{k: v for k, v in overrides.items() if v is not None})
+    graph, postgrest = start_standins(standins, ephemeral_ports=True)
+    env = _env(app_environment(graph.url, postgrest.url))
+
+    try:
+        imports = profile_imports(args.module, args.runs, args.top, env)
+        results: Dict[str, Any] = {"import_ms": imports["import_ms"]}
+        if not args.skip_startup:
+            results["startup_prewarm"] = profile_startup(args.runs, True, env)
+            results["startup_lazy"] = profile_startup(args.runs, False, env)
+    finally:
+        graph.stop()
+        postgrest.stop()
+
+    report = {
+        "benchmark": "import_profile",
+        "environment": environment_info(),
+        "config": {"module": args.module, "runs": args.runs},
+        "results": results,
+        "imports": {k: v for k, v in imports.items() if k != "import_ms"},
+    }
+    path = save_results("import_profile", report, args.output)
+
+    print(f"import {args.module}: p50 {imports['import_ms']['p50']:.1f} ms "
+          f"({imports['modules_imported']} modules)")
+    if imports["deferred_modules_imported"]:
+        print(f"  deferred modules imported eagerly: {', '.join(imports['deferred_modules_imported'])}")
+    print(f"\n{'cumulative [ms]':>16} {'self [ms]':>10}  module")
+    for row in imports["top_cumulative"]:
+        print(f"{row['cumulative_us'] / 1000:>16.1f} {row['self_us'] / 1000:>10.1f}  {row['module']}")
+    for key in ("startup_prewarm", "startup_lazy"):
+        if key in results:
+            startup = results[key]
+            print(
+                f"\n{key}: startup p50 {startup['startup_ms']['p50']:.1f} ms, "
+                f"first request p50 {startup['first_request_ms']['p50']:.1f} ms, "
+                f"time to first response p50 {startup['time_to_first_response_ms']['p50']:.1f} ms"
+            )
+    print(f"\nResults saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
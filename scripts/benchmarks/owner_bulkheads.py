@@ -0,0 +1,122 @@
+"""
+Tenant latency under skewed load: shared capacity vs per-owner bulkheads.
+
+One "viral" owner offers more work than the whole capacity can serve while
+a few quiet owners keep their usual rate. Jobs are simulated (a sleep of
+random length, like a Graph API or database call) and arrive open-loop.
+Compares a single FIFO semaphore (what every owner shared before) with
+`OwnerBulkheads`, reporting per-class latency (queue wait included) and
+rejections.
+
+Example:
+    python -m scripts.benchmarks.owner_bulkheads --seconds 10 --viral-rate 600 --quiet-owners 5
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List
+
+from scripts.benchmarks.common import compare, environment_info, save_results, summarize
+from src.core.concurrency.bulkhead import BulkheadRejected, OwnerBulkheads
+from src.core.observability.metrics import MetricsRegistry
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Per-owner bulkhead benchmark")
+    parser.add_argument("--seconds", type=float, default=10.0, help="Duration of the offered load")
+    parser.add_argument("--capacity", type=int, default=64, help="Jobs in flight across owners")
+    parser.add_argument("--owner-concurrency", type=int, default=16, help="Jobs in flight per owner (bulkheads)")
+    parser.add_argument("--owner-queue", type=int, default=256, help="Queued jobs per owner (bulkheads)")
+    parser.add_argument("--service-ms", type=float, default=50.0, help="Mean job duration")
+    parser.add_argument("--viral-rate", type=float, default=2000.0, help="Jobs per second of the viral owner")
+    parser.add_argument("--quiet-owners", type=int, default=5)
+    parser.add_argument("--quiet-rate", type=float, default=20.0, help="Jobs per second of each quiet owner")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+async def offer(
+    args: argparse.Namespace, run: Callable[[str, Callable[[], Awaitable[None]]], Awaitable[None]]
+) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    latencies: Dict[str, List[float]] = {"viral": [], "quiet": []}
+    rejected = {"viral": 0, "quiet": 0}
+    # (owner, rate): arrivals are evenly spaced per owner
+    owners = [("viral", args.viral_rate)] + [(f"quiet-{i}", args.quiet_rate) for i in range(args.quiet_owners)]
+    services = [rng.expovariate(1000.0 / args.service_ms) for _ in range(4096)]
+
+    async def job(owner_id: str, service: float) -> None:
+        klass = "viral" if owner_id == "viral" else "quiet"
+        started = time.perf_counter()
+        try:
+            await run(owner_id, lambda: asyncio.sleep(service))
+        except BulkheadRejected:
+            rejected[klass] += 1
+            return
+        latencies[klass].append((time.perf_counter() - started) * 1000.0)
+
+    tasks = []
+    sent = {owner_id: 0 for owner_id, _ in owners}
+    started = time.perf_counter()
+    while (elapsed := time.perf_counter() - started) < args.seconds:
+        for owner_id, rate in owners:
+            while sent[owner_id] < int(elapsed * rate) + 1:
+                service = services[sum(sent.values()) % len(services)]
+                tasks.append(asyncio.create_task(job(owner_id, service)))
+                sent[owner_id] += 1
+        await asyncio.sleep(0.002)
+    await asyncio.gather(*tasks)
+    return {
+        klass: {"latency_ms": summarize(values), "rejected": rejected[klass]} for klass, values in latencies.items()
+    }
+
+
+async def shared(args: argparse.Namespace) -> Dict[str, Any]:
+    semaphore = asyncio.Semaphore(args.capacity)
+
+    async def run(owner_id: str, fn: Callable[[], Awaitable[None]]) -> None:
+        async with semaphore:
+            await fn()
+
+    return await offer(args, run)
+
+
+async def bulkheads(args: argparse.Namespace) -> Dict[str, Any]:
+    limiter = OwnerBulkheads(
+        capacity=args.capacity,
+        owner_concurrency=args.owner_concurrency,
+        owner_queue=args.owner_queue,
+        registry=MetricsRegistry(),
+    )
+    return await offer(args, limiter.run)
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    results = {"shared": asyncio.run(shared(args)), "bulkheads": asyncio.run(bulkheads(args))}
+    report = {
+        "benchmark": "owner_bulkheads",
+        "environment": environment_info(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    path = save_results("owner_bulkheads", report, args.output)
+    for variant, result in results.items():
+        for klass, stats in result.items():
+            latency = stats["latency_ms"]
+            print(
+                f"{variant:<10} {klass:<6} p50={latency['p50']:>9.1f}ms p99={latency['p99']:>9.1f}ms "
+                f"done={latency['count']:>6} rejected={stats['rejected']:>6}"
+            )
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
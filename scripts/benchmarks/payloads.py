@@ -0,0 +1,188 @@
+"""
+Realistic webhook payload mixes for benchmarks.
+
+Every payload is derived from `build_payload()` in
+`scripts/meta/send_test_webhook.py`, so the shape stays aligned with what the
+app expects; only the message section is varied per kind.
+"""
+
+import copy
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from scripts.meta.send_test_webhook import build_payload
+
+# Kind -> relative weight
+DEFAULT_MIX: Dict[str, int] = {
+    "text": 50,
+    "reaction": 10,
+    "image": 8,
+    "audio": 8,
+    "video": 4,
+    "status": 15,
+    "batch": 5,
+}
+
+MEDIA_MIME_TYPES = {
+    "image": "image/jpeg",
+    "audio": "audio/ogg; codecs=opus",
+    "video": "video/mp4",
+}
+
+STATUSES = ("sent", "delivered", "read")
+
+
+def parse_mix(spec: Optional[str]) -> Dict[str, int]:
+    """Parse a mix spec like `text=60,status=30,image=10`."""
+    if not spec:
+        return dict(DEFAULT_MIX)
+    mix: Dict[str, int] = {}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in DEFAULT_MIX:
+            raise ValueError(f"Unknown payload kind: {kind} (expected one of {', '.join(DEFAULT_MIX)})")
+        mix[kind] = int(weight or 1)
+    return mix
+
+
+class PayloadFactory:
+    """Builds webhook payloads of a given kind with varied users and ids."""
+
+    def __init__(self, seed: int = 0, users: int = 1000):
+        self._random = random.Random(seed)
+        self._template = build_payload()
+        self._users = [f"55119{n:08d}" for n in range(users)]
+        self._sequence = 0
+
+    def _next_id(self, prefix: str) -> str:
+        self._sequence += 1
+        return f"{prefix}.BENCH{self._sequence:012d}"
+
+    def _user(self) -> str:
+        return self._random.choice(self._users)
+
+    def _message_entry(self, kind: str) -> dict:
+        payload = copy.deepcopy(self._template)
+        entry = payload["entry"][0]
+        value = entry["changes"][0]["value"]
+        wa_id = self._user()
+        value["contacts"][0]["wa_id"] = wa_id
+        value["contacts"][0]["profile"]["name"] = f"Bench {wa_id[-4:]}"
+
+        message = value["messages"][0]
+        message["from"] = wa_id
+        message["id"] = self._next_id("wamid")
+        message["timestamp"] = str(int(time.time()))
+        message["type"] = kind
+        message["text"] = None
+
+        if kind == "text":
+            message["text"] = {"body": f"Mensagem de benchmark {self._sequence}"}
+        elif kind == "reaction":
+            message["reaction"] = {"message_id": self._next_id("wamid"), "emoji": "❤️"}
+        elif kind in MEDIA_MIME_TYPES:
+            media = {
+                "mime_type": MEDIA_MIME_TYPES[kind],
+                "sha256": f"{self._random.getrandbits(256):064x}",
+                "id": self._next_id("media"),
+            }
+            if kind == "audio":
+                media["voice"] = True
+            else:
+                media["caption"] = f"{kind} caption {self._sequence}"
+            message[kind] = media
+        return entry
+
+    def make(self, kind: str) -> dict:
+        """Build one payload of the given kind."""
+        if kind == "status":
+            payload = copy.deepcopy(self._template)
+            value = payload["entry"][0]["changes"][0]["value"]
+            value["contacts"] = None
+            value["messages"] = None
+            value["statuses"] = [
+                {
+                    "id": self._next_id("wamid"),
+                    "status": self._random.choice(STATUSES),
+                    "timestamp": str(int(time.time())),
+                    "recipient_id": self._user(),
+                }
+            ]
+            return payload
+
+        if kind == "batch":
+            payload = copy.deepcopy(self._template)
+            payload["entry"] = [
+                self._message_entry(self._random.choice(("text", "reaction")))
+                for _ in range(self._random.randint(2, 4))
+            ]
+            return payload
+
+        payload = copy.deepcopy(self._template)
+        payload["entry"] = [self._message_entry(kind)]
+        return payload
+
+    def stream(self, mix: Dict[str, int], count: int) -> Iterator[Tuple[str, dict]]:
+        """Yield `count` (kind, payload) pairs drawn from the weighted mix."""
+        kinds: List[str] = list(mix)
+        weights = [mix[k] for k in kinds]
+        for _ in range(count):
+            kind = self._random.choices(kinds, weights=weights)[0]
+            yield kind, self.make(kind)
+
+
+def payload_kind(payload: dict) -> str:
+    """Kind of a real payload, using the same names as the synthetic mix."""
+    entries = payload.get("entry") or []
+    if len(entries) > 1:
+        return "batch"
+    try:
+        value = entries[0]["changes"][0]["value"]
+    except (IndexError, KeyError, TypeError):
+        return "unknown"
+    messages = value.get("messages") or []
+    if messages:
+        return messages[0].get("type") or "unknown"
+    return "status" if value.get("statuses") else "unknown"
+
+
+def journal_stream(
+    directory: str, select: str = "all", retarget: bool = True, limit: Optional[int] = None
+) -> List[Tuple[str, dict]]:
+    """
+    (kind, payload) pairs replayed from an event journal.
+
+    Args:
+        directory: Journal directory (see `src.core.journal.event_journal`)
+        select: "all" or "failed" events
+        retarget: Point every entry at the configured business account and
+                  phone number so recorded traffic resolves against the
+                  stand-ins
+        limit: Maximum number of events
+    """
+    import json
+
+    from src.core.config.settings import settings
+    from src.core.journal.event_journal import load_events
+
+    pairs: List[Tuple[str, dict]] = []
+    for event in load_events(directory):
+        if select == "failed" and not event.failed:
+            continue
+        try:
+            payload = json.loads(event.data)
+        except ValueError:
+            continue
+        if retarget:
+            for entry in payload.get("entry") or []:
+                entry["id"] = settings.meta.business_account_id
+                for change in entry.get("changes") or []:
+                    metadata = (change.get("value") or {}).get("metadata") or {}
+                    metadata["display_phone_number"] = settings.meta.phone_number
+                    metadata["phone_number_id"] = settings.meta.phone_number_id
+        pairs.append((payload_kind(payload), payload))
+        if limit is not None and len(pairs) >= limit:
+            break
+    return pairs
@@ -0,0 +1,142 @@
+"""
+Request build cost of `query_dynamic`: former operator ladder vs the query DSL.
+
+Builds the same PostgREST requests with the former `if/elif` ladder and
+with `build_query()`, checks both produce the same query string, and
+reports the build time per query, next to the bare `select()` every
+request pays. Nothing is sent: the client points at an unused address.
+
+Example:
+    python -m scripts.benchmarks.query_compile --queries 20000
+"""
+
+import argparse
+import time
+from typing import Any, Callable, Dict, List
+
+from supabase import create_client
+
+from scripts.benchmarks.common import compare, environment_info, save_results
+from src.core.database.query import build_query
+
+SUPABASE_URL = "http://127.0.0.1:9"
+SUPABASE_KEY = "benchmark.supabase.key"
+
+
+def legacy_build(client, select_columns: List[str], filters: List[Dict[str, Any]]):
+    """The former `query_dynamic` body, up to `execute()`."""
+    select_str = "*"
+    if select_columns and select_columns != ["*"]:
+        select_str = ", ".join(select_columns)
+    query = client.table("conversations").select(select_str)
+    for f in filters:
+        column = f.get("column")
+        operator = f.get("operator", "eq")
+        value = f.get("value")
+        if not column:
+            continue
+        if operator == "eq":
+            query = query.eq(column, value)
+        elif operator == "gt":
+            query = query.gt(column, value)
+        elif operator == "lt":
+            query = query.lt(column, value)
+        elif operator == "gte":
+            query = query.gte(column, value)
+        elif operator == "lte":
+            query = query.lte(column, value)
+        elif operator == "ne":
+            query = query.neq(column, value)
+        elif operator == "ct" or operator == "ilike":
+            query = query.ilike(column, f"%{value}%")
+        elif operator == "in":
+            query = query.in_(column, value)
+        elif operator == "is":
+            query = query.is_(column, value)
+        elif operator == "is_null":
+            query = query.is_(column, "null")
+    return query
+
+
+def dsl_build(client, select_columns: List[str], filters: List[Dict[str, Any]]):
+    select_str = ", ".join(select_columns) if select_columns and select_columns != ["*"] else "*"
+    return build_query(client.table("conversations").select(select_str), filters)
+
+
+def specs(count: int) -> List[Dict[str, Any]]:
+    """Requests of a few recurring shapes with varying values."""
+    shapes = [
+        lambda i: [{"column": "owner_id", "operator": "eq", "value": f"01J{i:023d}"}],
+        lambda i: [
+            {"column": "owner_id", "operator": "eq", "value": f"01J{i:023d}"},
+            {"column": "status", "operator": "in", "value": ["open", "pending"]},
+            {"column": "updated_at", "operator": "gte", "value": f"2026-01-{i % 28 + 1:02d}"},
+        ],
+        lambda i: [
+            {"column": "owner_id", "operator": "eq", "value": f"01J{i:023d}"},
+            {"column": "contact_name", "operator": "ct", "value": f"ana{i % 50}"},
+            {"column": "archived_at", "operator": "is_null"},
+            {"column": "unread", "operator": "gt", "value": i % 5},
+        ],
+    ]
+    return [
+        {"select": ["id", "status", "updated_at"] if i % 2 else ["*"], "filters": shapes[i % len(shapes)](i)}
+        for i in range(count)
+    ]
+
+
+def measure(fn: Callable[[], Any], count: int, rounds: int) -> float:
+    """Best of `rounds`, in ns per query."""
+    fn()  # warm-up
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        fn()
+        best = min(best, time.perf_counter_ns() - started)
+    return round(best / count, 1)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="query_dynamic build benchmark")
+    parser.add_argument("--queries", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions (best is kept)")
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    client = create_client(SUPABASE_URL, SUPABASE_KEY)
+    requests = specs(args.queries)
+    for spec in requests[:100]:
+        legacy = legacy_build(client, spec["select"], spec["filters"])
+        dsl = dsl_build(client, spec["select"], spec["filters"])
+        if str(legacy.params) != str(dsl.params):
+            raise RuntimeError(f"Query differs: {legacy.params} != {dsl.params}")
+
+    results = {
+        "legacy": measure(
+            lambda: [legacy_build(client, s["select"], s["filters"]) for s in requests], args.queries, args.rounds
+        ),
+        "dsl": measure(lambda: [dsl_build(client, s["select"], s["filters"]) for s in requests], args.queries, args.rounds),
+        "select_only": measure(
+            lambda: [client.table("conversations").select("*") for _ in requests], args.queries, args.rounds
+        ),
+    }
+
+    report = {
+        "benchmark": "query_compile",
+        "environment": environment_info(),
+        "queries": args.queries,
+        "results": {"ns_per_query": results},
+    }
+    path = save_results("query_compile", report, args.output)
+    legacy = results["legacy"]
+    for name, ns in results.items():
+        print(f"{name:<20} {ns:>9.1f} ns/query ({legacy / ns:>4.2f}x)")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Dashboard-style count polling against the PostgREST stand-in.
+
+Several pollers repeatedly count rows of a table (a few filter sets) while
+a writer inserts now and then. Compares the former request (every row
+fetched with `count=exact`) with the repository's count-only request,
+uncached and with the count cache, reporting call latency, requests
+reaching the database and response bytes.
+
+Example:
+    python -m scripts.benchmarks.repository_count --rows 5000 --seconds 5 --pollers 8
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List
+
+import httpx
+from supabase import create_client
+
+from scripts.benchmarks.common import compare, environment_info, save_results, summarize
+from scripts.standins.environment import STANDIN_SUPABASE_KEY
+from scripts.standins.postgrest import PostgrestStandinConfig, create_postgrest_app
+from scripts.standins.server import StandinServer
+from src.core.database.supabase_async_repository import SupabaseAsyncRepository
+
+FILTER_SETS = [None, {"status": "open"}, {"status": "closed"}, {"channel": "whatsapp"}]
+
+
+class Row(dict):
+    def __init__(self, **fields: Any):
+        super().__init__(fields)
+
+
+class LegacyCountRepository(SupabaseAsyncRepository[Row]):
+    """The former `count`: every matching row is sent along with the count."""
+
+    async def count(self, filters=None, mode=None, max_age=None) -> int:
+        query = self.client.table(self.table_name).select("*", count="exact")
+        for column, value in (filters or {}).items():
+            query = query.eq(column, value)
+        return query.execute().count or 0
+
+
+def table_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "status": "open" if i % 3 else "closed",
+            "channel": "whatsapp" if i % 2 else "instagram",
+            "body": "x" * 120,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def poll(repository: SupabaseAsyncRepository, args: argparse.Namespace, max_age) -> Dict[str, Any]:
+    latencies: List[float] = []
+    stop_at = time.perf_counter() + args.seconds
+
+    async def poller(index: int) -> None:
+        turn = index
+        while time.perf_counter() < stop_at:
+            started = time.perf_counter()
+            await repository.count(FILTER_SETS[turn % len(FILTER_SETS)], max_age=max_age)
+            latencies.append((time.perf_counter() - started) * 1000.0)
+            turn += 1
+            await asyncio.sleep(args.interval_ms / 1000.0)
+
+    async def writer() -> None:
+        next_id = args.rows + 1
+        while time.perf_counter() < stop_at:
+            await asyncio.sleep(args.write_interval_ms / 1000.0)
+            await repository.create({"id": next_id, "status": "open", "channel": "whatsapp", "body": ""})
+            next_id += 1
+
+    await asyncio.gather(writer(), *(poller(i) for i in range(args.pollers)))
+    return {"latency_ms": summarize(latencies)}
+
+
+def run_variant(args: argparse.Namespace, variant: str) -> Dict[str, Any]:
+    app = create_postgrest_app(
+        PostgrestStandinConfig(latency_ms=args.db_latency_ms, tables={"conversations": table_rows(args.rows)})
+    )
+    server = StandinServer(app, host="127.0.0.1", port=0).start()
+    received = {"bytes": 0}
+
+    def count_bytes(response: httpx.Response) -> None:
+        response.read()
+        received["bytes"] += len(response.content)
+
+    try:
+        client = create_client(server.url, STANDIN_SUPABASE_KEY)
+        client.postgrest.session.event_hooks["response"].append(count_bytes)
+        repository_class = LegacyCountRepository if variant == "legacy" else SupabaseAsyncRepository
+        repository = repository_class(client, "conversations", Row, validates_ulid=False)
+        result = asyncio.run(poll(repository, args, 0 if variant == "count_only" else None))
+    finally:
+        server.stop()
+    result["db_requests"] = app.state.counters["requests"]
+    result["response_kb"] = round(received["bytes"] / 1024, 1)
+    if repository.count_cache is not None:
+        result["cache"] = repository.count_cache.stats()
+    return result
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Repository count polling benchmark")
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--pollers", type=int, default=8)
+    parser.add_argument("--interval-ms", type=float, default=50.0, help="Pause between a poller's counts")
+    parser.add_argument("--write-interval-ms", type=float, default=1000.0, help="Pause between inserts")
+    parser.add_argument("--db-latency-ms", type=float, default=2.0)
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    results = {variant: run_variant(args, variant) for variant in ("legacy", "count_only", "cached")}
+    report = {
+        "benchmark": "repository_count",
+        "environment": environment_info(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    path = save_results("repository_count", report, args.output)
+    for variant, result in results.items():
+        latency = result["latency_ms"]
+        print(
+            f"{variant:<11} p50={latency['p50']:>8.2f}ms p99={latency['p99']:>8.2f}ms "
+            f"counts={latency['count']:>6} db_requests={result['db_requests']:>6} "
+            f"response={result['response_kb']:>10.1f} KB"
+        )
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
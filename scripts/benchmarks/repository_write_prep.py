@@ -0,0 +1,146 @@
+"""
+Per-row write preparation cost of SupabaseAsyncRepository.
+
+Compares the former per-write loops (ULID check by lowercased key name,
+dict copy for `exclude_on_create`, `hasattr(value, "isoformat")` per field)
+with the per-model `WritePlan`, for single rows and for a batch prepared
+at once (`create_many`). Nothing is sent anywhere: only the work done
+before the request is measured.
+
+Example:
+    python -m scripts.benchmarks.repository_write_prep --rows 20000
+"""
+
+import argparse
+import datetime
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from scripts.benchmarks.common import compare, environment_info, save_results
+from src.core.database.write_plan import WritePlan
+from src.core.utils.custom_ulid import is_valid_ulid, monotonic_ulid
+from src.modules.channels.meta.models.meta_account import MetaAccount
+
+
+class Conversation(BaseModel):
+    """Row with several ULID and timestamp columns."""
+
+    id: Optional[str] = None
+    owner_id: str
+    contact_id: str
+    channel: str
+    status: str = "open"
+    last_message_id: Optional[str] = None
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    updated_at: datetime.datetime = Field(default_factory=datetime.datetime.now)
+    metadata: Dict[str, Any] = Field(default_factory=dict)
+
+
+# Former implementation (create path)
+
+def legacy_serialize(data: Dict[str, Any]) -> Dict[str, Any]:
+    serialized = {}
+    for key, value in data.items():
+        if hasattr(value, "isoformat"):
+            serialized[key] = value.isoformat()
+        else:
+            serialized[key] = value
+    return serialized
+
+
+def legacy_prepare(data: Dict[str, Any], exclude_on_create: List[str]) -> Dict[str, Any]:
+    for key, value in data.items():
+        if isinstance(value, str) and len(value) == 26:
+            if "id" in key.lower() and not is_valid_ulid(value):
+                raise ValueError(f"Invalid ULID format for {key}: {value}")
+    if exclude_on_create:
+        for col in exclude_on_create:
+            if col in data:
+                data = {**data}
+                data.pop(col, None)
+    return legacy_serialize(data)
+
+
+def account_row() -> Dict[str, Any]:
+    return {
+        "id": None,
+        "meta_business_account_id": "102290129340398",
+        "phone_number_id": "106540352242922",
+        "phone_number": "+15550001111",
+        "phone_numbers": ["+15550001111"],
+        "system_user_access_token": "EAAG" + "x" * 120,
+        "webhook_verification_token": "verify-token",
+        "owner_id": monotonic_ulid(),
+        "app_secret": None,
+    }
+
+
+def conversation_row() -> Dict[str, Any]:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    return {
+        "id": None,
+        "owner_id": monotonic_ulid(),
+        "contact_id": monotonic_ulid(),
+        "channel": "whatsapp",
+        "status": "open",
+        "last_message_id": monotonic_ulid(),
+        "created_at": now,
+        "updated_at": now,
+        "metadata": {"source": "webhook"},
+    }
+
+
+def measure(fn: Callable[[], Any], count: int, rounds: int) -> float:
+    """Best of `rounds`, in ns per row."""
+    fn()  # warm-up
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        fn()
+        best = min(best, time.perf_counter_ns() - started)
+    return round(best / count, 1)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Repository write preparation benchmark")
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions (best is kept)")
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    exclude = ["id"]
+    cases = {"meta_account": (MetaAccount, account_row), "conversation": (Conversation, conversation_row)}
+    results: Dict[str, Dict[str, float]] = {}
+    for case, (model_class, make_row) in cases.items():
+        rows = [make_row() for _ in range(args.rows)]
+        plan = WritePlan.for_model(model_class, True, exclude)
+        if [plan.prepare(row) for row in rows[:100]] != [legacy_prepare(row, exclude) for row in rows[:100]]:
+            raise RuntimeError(f"{case}: plan output differs from the former implementation")
+        results[case] = {
+            "legacy": measure(lambda: [legacy_prepare(row, exclude) for row in rows], args.rows, args.rounds),
+            "plan": measure(lambda: [plan.prepare(row) for row in rows], args.rows, args.rounds),
+            "plan_batch": measure(lambda: plan.prepare_many(rows), args.rows, args.rounds),
+        }
+
+    report = {
+        "benchmark": "repository_write_prep",
+        "environment": environment_info(),
+        "rows": args.rows,
+        "results": {"ns_per_row": results},
+    }
+    path = save_results("repository_write_prep", report, args.output)
+    for case, variants in results.items():
+        legacy = variants["legacy"]
+        line = "  ".join(f"{name}={ns:>8.1f} ns ({legacy / ns:>4.2f}x)" for name, ns in variants.items())
+        print(f"{case:<13} {line}")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
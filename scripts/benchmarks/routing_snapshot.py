@@ -0,0 +1,217 @@
+"""
+Owner resolution of a freshly started worker: routing snapshot vs database.
+
+Serves N Meta accounts from the PostgREST stand-in and resolves a stream of
+webhooks (random accounts, by phone number and business account id) the
+way a worker does right after a deploy: once with an empty account cache
+(every first lookup goes to the database), once with the routing snapshot
+mapped. Also reports what building and opening the snapshot costs, and
+how long the event loop stalled while the snapshot was being built. The
+stand-in runs in its own process so its work does not count as stalls.
+
+Example:
+    python -m scripts.benchmarks.routing_snapshot --accounts 20000 --webhooks 2000 --db-latency-ms 3
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import httpx
+from supabase import create_client
+
+from scripts.benchmarks.common import compare, environment_info, save_results, summarize
+from scripts.standins.environment import STANDIN_SUPABASE_KEY, normalized_phone_numbers
+from scripts.standins.postgrest import PostgrestStandinConfig, create_postgrest_app
+from scripts.standins.server import StandinServer
+from src.core.cache.ttl_cache import TTLCache
+from src.core.observability.metrics import MetricsRegistry
+from src.modules.channels.meta.repositories.impl.supabase_meta_account_repository import (
+    SupabaseMetaAccountRepository,
+)
+from src.modules.channels.meta.services.meta_account_service import MetaAccountService
+from src.modules.channels.meta.services.routing_snapshot import RoutingSnapshot, RoutingTable
+
+
+def account_rows(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            "id": i,
+            "meta_business_account_id": f"{100000000000000 + i}",
+            "phone_number_id": f"{200000000000000 + i}",
+            "phone_number": f"+5511{900000000 + i}",
+            "phone_numbers": [f"+5511{900000000 + i}", f"+5521{900000000 + i}"],
+            "system_user_access_token": "EAAG" + "x" * 120,
+            "webhook_verification_token": "verify-token",
+            "owner_id": f"01J{i:023d}",
+            "app_secret": None,
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+async def resolve_all(service: MetaAccountService, webhooks: List[Dict[str, str]]) -> Dict[str, Any]:
+    latencies: List[float] = []
+    for webhook in webhooks:
+        started = time.perf_counter()
+        owner_id = await service.resolve_owner_id(webhook["phone_number"], webhook["business_account_id"])
+        latencies.append((time.perf_counter() - started) * 1000.0)
+        if owner_id != webhook["owner_id"]:
+            raise RuntimeError(f"Wrong owner for {webhook}: {owner_id}")
+    return {"latency_ms": summarize(latencies), "total_s": round(sum(latencies) / 1000.0, 3)}
+
+
+async def loop_stalls(done: asyncio.Event, interval: float = 0.005) -> Dict[str, float]:
+    """Longest and total delay (ms) of a periodic timer until `done` is set."""
+    worst = total = 0.0
+    while not done.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        late = time.perf_counter() - started - interval
+        worst = max(worst, late)
+        total += late
+    return {"max_loop_stall_ms": round(worst * 1000.0, 1), "loop_stalled_ms": round(total * 1000.0, 1)}
+
+
+def serve_standin(args: argparse.Namespace, connection) -> None:
+    """Child process: serve the accounts until told to stop."""
+    app = create_postgrest_app(
+        PostgrestStandinConfig(
+            latency_ms=args.db_latency_ms,
+            tables={"meta_accounts": account_rows(args.accounts)},
+            generated_columns={"meta_accounts": {"normalized_phone_numbers": normalized_phone_numbers}},
+        )
+    )
+    server = StandinServer(app, host="127.0.0.1", port=0).start()
+    connection.send(server.url)
+    connection.recv()
+    server.stop()
+
+
+class RequestCounter:
+    """Requests served by the stand-in process so far."""
+
+    def __init__(self, url: str):
+        self.url = url
+
+    def __getitem__(self, name: str) -> int:
+        return httpx.get(f"{self.url}/_standin/stats").json()[name]
+
+
+async def run(args: argparse.Namespace, url: str, counters: RequestCounter, path: str) -> Dict[str, Any]:
+    client = create_client(url, STANDIN_SUPABASE_KEY)
+    repo = SupabaseMetaAccountRepository(client)
+    rng = random.Random(args.seed)
+    rows = account_rows(args.accounts)
+    webhooks = []
+    for _ in range(args.webhooks):
+        row = rng.choice(rows)
+        webhooks.append(
+            {
+                "phone_number": rng.choice(row["phone_numbers"]),
+                "business_account_id": row["meta_business_account_id"],
+                "owner_id": row["owner_id"],
+            }
+        )
+    registry = MetricsRegistry()
+
+    def cold_cache() -> TTLCache:
+        return TTLCache("bench", ttl=300.0, max_entries=100000, registry=registry)
+
+    results: Dict[str, Any] = {}
+    before = counters["requests"]
+    results["database"] = await resolve_all(MetaAccountService(repo, cache=cold_cache()), webhooks)
+    results["database"]["db_requests"] = counters["requests"] - before
+
+    table = RoutingTable(repo, path, page_size=args.page_size, registry=registry)
+    before = counters["requests"]
+    built = asyncio.Event()
+    probe = asyncio.create_task(loop_stalls(built))
+    await asyncio.sleep(0)  # let the probe start its first timer
+    started = time.perf_counter()
+    await table.build()
+    built.set()
+    results["build"] = {
+        "ms": round((time.perf_counter() - started) * 1000.0, 1),
+        **(await probe),
+        "db_requests": counters["requests"] - before,
+        "file_kb": round(os.path.getsize(path) / 1024, 1),
+    }
+    await table.stop()
+
+    # A new worker: map the file built by another one
+    started = time.perf_counter()
+    table = RoutingTable(repo, path, registry=registry)
+    table.load()
+    results["open_ms"] = round((time.perf_counter() - started) * 1000.0, 3)
+
+    before = counters["requests"]
+    service = MetaAccountService(repo, cache=cold_cache(), routing=table)
+    results["snapshot"] = await resolve_all(service, webhooks)
+    results["snapshot"]["db_requests"] = counters["requests"] - before
+
+    snapshot = RoutingSnapshot(path)
+    keys = [f"phone:{w['phone_number']}" for w in webhooks]
+    started = time.perf_counter_ns()
+    for key in keys:
+        snapshot.lookup(key)
+    results["lookup_ns"] = round((time.perf_counter_ns() - started) / len(keys), 1)
+    snapshot.close()
+    table.snapshot.close()
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Routing snapshot benchmark")
+    parser.add_argument("--accounts", type=int, default=20000)
+    parser.add_argument("--webhooks", type=int, default=2000, help="Webhooks resolved after the start")
+    parser.add_argument("--page-size", type=int, default=1000)
+    parser.add_argument("--db-latency-ms", type=float, default=3.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    connection, child_connection = multiprocessing.Pipe()
+    standin = multiprocessing.Process(target=serve_standin, args=(args, child_connection), daemon=True)
+    standin.start()
+    try:
+        url = connection.recv()
+        with tempfile.TemporaryDirectory() as directory:
+            results = asyncio.run(run(args, url, RequestCounter(url), os.path.join(directory, "routing.bin")))
+    finally:
+        connection.send("stop")
+        standin.join(timeout=10)
+
+    report = {
+        "benchmark": "routing_snapshot",
+        "environment": environment_info(),
+        "parameters": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results,
+    }
+    path = save_results("routing_snapshot", report, args.output)
+    for variant in ("database", "snapshot"):
+        latency = results[variant]["latency_ms"]
+        print(
+            f"{variant:<9} p50={latency['p50']:>8.3f}ms p99={latency['p99']:>8.3f}ms "
+            f"total={results[variant]['total_s']:>7.3f}s db_requests={results[variant]['db_requests']:>6}"
+        )
+    build = results["build"]
+    print(
+        f"build {build['ms']} ms ({build['db_requests']} requests, {build['file_kb']} KB, "
+        f"loop stalled {build['loop_stalled_ms']} ms, longest {build['max_loop_stall_ms']} ms), "
+        f"open {results['open_ms']} ms, lookup {results['lookup_ns']} ns"
+    )
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
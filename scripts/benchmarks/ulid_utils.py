@@ -0,0 +1,157 @@
+"""
+ULID toolkit microbenchmark.
+
+Compares the table-based validation and timestamp decoding of
+`src.core.utils.custom_ulid` with the former implementation (regex
+validation, timestamp parsed through a python-ulid object), per value and
+in batches, plus the repository's per-field id check and id generation.
+
+Example:
+    python -m scripts.benchmarks.ulid_utils --values 10000 --rounds 5
+"""
+
+import argparse
+import re
+import time
+from typing import Any, Callable, Dict, List
+
+from ulid import ULID
+
+from scripts.benchmarks.common import compare, environment_info, save_results
+from src.core.utils.custom_ulid import (
+    generate_ulid,
+    is_valid_ulid,
+    monotonic_ulid,
+    timestamps_many,
+    ulid_to_unix_ms,
+    validate_many,
+)
+
+# Former implementation
+ULID_PATTERN = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$", re.IGNORECASE)
+
+
+def legacy_is_valid_ulid(ulid: str) -> bool:
+    if not isinstance(ulid, str):
+        return False
+    if len(ulid) != 26:
+        return False
+    return ULID_PATTERN.match(ulid) is not None
+
+
+def legacy_ulid_to_unix_ms(ulid: str) -> int:
+    if not legacy_is_valid_ulid(ulid):
+        raise ValueError(f"Invalid ULID format: {ulid}")
+    return int(ULID.from_str(ulid).timestamp * 1000)
+
+
+def legacy_validate_fields(data: Dict[str, Any]) -> None:
+    for key, value in data.items():
+        if isinstance(value, str) and len(value) == 26:
+            if "id" in key.lower() and not legacy_is_valid_ulid(value):
+                raise ValueError(f"Invalid ULID format for {key}: {value}")
+
+
+def validate_fields(data: Dict[str, Any]) -> None:
+    for key, value in data.items():
+        if isinstance(value, str) and len(value) == 26 and "id" in key.lower():
+            if not is_valid_ulid(value):
+                raise ValueError(f"Invalid ULID format for {key}: {value}")
+
+
+def per_value(fn: Callable[[str], Any]) -> Callable[[List[str]], Any]:
+    def run(values: List[str]) -> None:
+        for value in values:
+            fn(value)
+
+    return run
+
+
+def per_record(fn: Callable[[Dict[str, Any]], None]) -> Callable[[List[Dict[str, Any]]], Any]:
+    def run(records: List[Dict[str, Any]]) -> None:
+        for record in records:
+            fn(record)
+
+    return run
+
+
+def generate(fn: Callable[[], str]) -> Callable[[List[str]], Any]:
+    def run(values: List[str]) -> None:
+        for _ in values:
+            fn()
+
+    return run
+
+
+def measure(fn: Callable[[Any], Any], values: Any, count: int, rounds: int) -> float:
+    """Best of `rounds`, in ns per value."""
+    fn(values)  # warm-up
+    best = float("inf")
+    for _ in range(rounds):
+        started = time.perf_counter_ns()
+        fn(values)
+        best = min(best, time.perf_counter_ns() - started)
+    return round(best / count, 1)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="ULID toolkit microbenchmark")
+    parser.add_argument("--values", type=int, default=10000, help="ULIDs per measurement")
+    parser.add_argument("--rounds", type=int, default=5, help="Repetitions (best is kept)")
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    values = [generate_ulid() for _ in range(args.values)]
+    if [legacy_ulid_to_unix_ms(v) for v in values] != timestamps_many(values):
+        raise RuntimeError("Timestamps differ from the former implementation")
+    # A typical insert: a few id columns, one of them a ULID
+    records = [
+        {"id": None, "owner_id": value, "phone_number_id": "123456789012345", "name": "x" * 26, "status": "active"}
+        for value in values
+    ]
+
+    cases = {
+        "validate": {
+            "legacy": (per_value(legacy_is_valid_ulid), values),
+            "table": (per_value(is_valid_ulid), values),
+            "batch": (validate_many, values),
+        },
+        "timestamp": {
+            "legacy": (per_value(legacy_ulid_to_unix_ms), values),
+            "table": (per_value(ulid_to_unix_ms), values),
+            "batch": (timestamps_many, values),
+        },
+        "record_fields": {
+            "legacy": (per_record(legacy_validate_fields), records),
+            "table": (per_record(validate_fields), records),
+        },
+        "generate": {
+            "python_ulid": (generate(generate_ulid), values),
+            "monotonic": (generate(monotonic_ulid), values),
+        },
+    }
+    results = {
+        case: {name: measure(fn, data, args.values, args.rounds) for name, (fn, data) in variants.items()}
+        for case, variants in cases.items()
+    }
+
+    report = {
+        "benchmark": "ulid_utils",
+        "environment": environment_info(),
+        "values": args.values,
+        "results": {"ns_per_value": results},
+    }
+    path = save_results("ulid_utils", report, args.output)
+    for case, variants in results.items():
+        reference = next(iter(variants.values()))
+        line = "  ".join(f"{name}={ns:>8.1f} ns ({reference / ns:>4.1f}x)" for name, ns in variants.items())
+        print(f"{case:<14} {line}")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
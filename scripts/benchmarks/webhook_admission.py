@@ -0,0 +1,198 @@
+"""
+Webhook admission control under a downstream slowdown.
+
+Open-loop load (a fixed arrival rate, like Meta delivering webhooks, rather
+than clients waiting for each other) against the in-process app, in three
+phases: normal, slowdown (the Graph API stand-in becomes slower) and
+recovery. Reports per phase how many webhooks were answered or shed per
+priority, the latency of the answered ones, the peak number of requests in
+flight and the limit chosen by the admission limiter.
+
+Run it with `API_ADMISSION_CONTROL=false` for the unprotected baseline.
+
+Examples:
+    python -m scripts.benchmarks.webhook_admission --rate 300 --phase-seconds 10
+    API_ADMISSION_ALGORITHM=gradient python -m scripts.benchmarks.webhook_admission --slow-graph-latency-ms 1500
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from scripts.benchmarks.common import compare, environment_info, rss_mb, save_results, summarize
+from scripts.standins.environment import STANDIN_APP_SECRET, app_environment, start_standins
+from scripts.standins.settings import StandinSettings
+
+PHASES = ("normal", "slowdown", "recovery")
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Webhook admission control load test")
+    parser.add_argument("--rate", type=float, default=300.0, help="Offered webhooks per second")
+    parser.add_argument("--phase-seconds", type=float, default=8.0, help="Duration of each phase")
+    parser.add_argument("--mix", default="text=40,image=20,audio=10,status=30", help="Payload mix")
+    parser.add_argument("--graph-latency-ms", type=float, default=50.0, help="Graph API latency (normal phases)")
+    parser.add_argument("--slow-graph-latency-ms", type=float, default=1000.0, help="Graph API latency (slowdown)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+async def offer(
+    client: httpx.AsyncClient, bodies: List[Tuple[str, bytes, Dict[str, str]]], rate: float, seconds: float
+) -> Tuple[List[Tuple[str, int, float]], int]:
+    """Send `rate` requests per second for `seconds` without waiting for answers."""
+    samples: List[Tuple[str, int, float]] = []
+    in_flight = peak = 0
+
+    async def send(kind: str, body: bytes, headers: Dict[str, str]) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        started = time.perf_counter()
+        try:
+            status = (await client.post("/webhook", content=body, headers=headers)).status_code
+        except httpx.HTTPError:
+            status = 0
+        finally:
+            in_flight -= 1
+        samples.append((kind, status, (time.perf_counter() - started) * 1000.0))
+
+    tasks = []
+    started = time.perf_counter()
+    sent = 0
+    while (elapsed := time.perf_counter() - started) < seconds:
+        due = int(elapsed * rate) + 1
+        while sent < due:
+            kind, body, headers = bodies[sent % len(bodies)]
+            tasks.append(asyncio.create_task(send(kind, body, headers)))
+            sent += 1
+        await asyncio.sleep(0.002)
+    await asyncio.gather(*tasks)
+    return samples, peak
+
+
+def phase_report(samples: List[Tuple[str, int, float]], peak: int, limits: List[int]) -> Dict[str, Any]:
+    by_class: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+    answered = []
+    for kind, status, latency in samples:
+        klass = "status" if kind == "status" else "message"
+        by_class[klass]["offered"] += 1
+        by_class[klass]["ok" if status == 200 else "shed" if status == 503 else "error"] += 1
+        if status == 200:
+            answered.append(latency)
+    return {
+        "offered": len(samples),
+        "peak_in_flight": peak,
+        "limit": {"min": min(limits), "max": max(limits)} if limits else None,
+        "answered_latency_ms": summarize(answered),
+        "by_class": {klass: dict(counts) for klass, counts in sorted(by_class.items())},
+    }
+
+
+async def run(args, graph, bodies) -> Dict[str, Any]:
+    # Imported after the stand-in environment is in place (settings resolve at import)
+    from src.core.observability.metrics import metrics
+    from src.main import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    results: Dict[str, Any] = {}
+    workdir = tempfile.mkdtemp(prefix="webhook-admission-")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)  # save_media writes files to the working directory
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120.0) as client:
+                    rss_before = rss_mb()
+                    for phase in PHASES:
+                        slow = phase == "slowdown"
+                        graph.app.state.config.latency_ms = args.slow_graph_latency_ms if slow else args.graph_latency_ms
+                        limits: List[int] = []
+
+                        async def watch():
+                            while True:
+                                limiter = metrics.snapshot()["collectors"].get("webhook.admission")
+                                if limiter:
+                                    limits.append(limiter["limit"])
+                                await asyncio.sleep(0.25)
+
+                        watcher = asyncio.create_task(watch())
+                        samples, peak = await offer(client, bodies, args.rate, args.phase_seconds)
+                        watcher.cancel()
+                        results[phase] = phase_report(samples, peak, limits)
+                    results["rss_mb"] = {"before": rss_before, "after": rss_mb()}
+                    results["limiter"] = metrics.snapshot()["collectors"].get("webhook.admission")
+    finally:
+        os.chdir(previous_cwd)
+    return results
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+    graph, postgrest = start_standins(
+        StandinSettings(graph_latency_ms=args.graph_latency_ms), ephemeral_ports=True
+    )
+    os.environ.update(app_environment(graph.url, postgrest.url))
+
+    from scripts.benchmarks.payloads import PayloadFactory, parse_mix
+    from src.modules.channels.meta.services.webhook.signature import SIGNATURE_HEADER, sign
+
+    bodies = []
+    for kind, payload in PayloadFactory(seed=args.seed).stream(parse_mix(args.mix), 5000):
+        body = json.dumps(payload).encode()
+        bodies.append(
+            (kind, body, {"Content-Type": "application/json", SIGNATURE_HEADER: sign(body, STANDIN_APP_SECRET)})
+        )
+
+    try:
+        results = asyncio.run(run(args, graph, bodies))
+    finally:
+        graph.stop()
+        postgrest.stop()
+
+    report = {
+        "benchmark": "webhook_admission",
+        "environment": environment_info(),
+        "parameters": {
+            "rate": args.rate,
+            "phase_seconds": args.phase_seconds,
+            "mix": args.mix,
+            "graph_latency_ms": args.graph_latency_ms,
+            "slow_graph_latency_ms": args.slow_graph_latency_ms,
+            "admission_control": os.environ.get("API_ADMISSION_CONTROL", "true"),
+            "admission_algorithm": os.environ.get("API_ADMISSION_ALGORITHM", "default"),
+        },
+        "results": results,
+    }
+    path = save_results("webhook_admission", report, args.output)
+    for phase in PHASES:
+        result = results[phase]
+        latency = result["answered_latency_ms"]
+        classes = " ".join(
+            f"{klass}: {counts.get('ok', 0)} ok/{counts.get('shed', 0)} shed" for klass, counts in result["by_class"].items()
+        )
+        print(
+            f"{phase:<9} p50={latency['p50']:>8.1f}ms p99={latency['p99']:>8.1f}ms "
+            f"peak_in_flight={result['peak_in_flight']:>5} limit={result['limit']} | {classes}"
+        )
+    print(f"rss_mb={results['rss_mb']}")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
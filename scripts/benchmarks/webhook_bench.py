@@ -0,0 +1,246 @@
+"""
+Webhook pipeline load test.
+
+Drives `POST /webhook` with a realistic payload mix, either in-process
+through the ASGI app or over HTTP against a spawned uvicorn server. Supabase
+and the Graph API are replaced by local stand-in servers with injectable
+latency, so the run is reproducible and fully offline.
+
+Examples:
+    python -m scripts.benchmarks.webhook_bench --mode inprocess --requests 2000 --concurrency 32
+    python -m scripts.benchmarks.webhook_bench --mode http --graph-latency-ms 80 --db-latency-ms 15
+    python -m scripts.benchmarks.webhook_bench --compare bench_results/webhook_inprocess_X.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+import httpx
+
+from scripts.benchmarks.common import ROOT_DIR, compare, environment_info, rss_mb, save_results, summarize
+from scripts.standins.environment import app_environment, start_standins
+from scripts.standins.settings import StandinSettings
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Webhook pipeline load test")
+    parser.add_argument("--mode", choices=("inprocess", "http"), default="inprocess")
+    parser.add_argument("--url", help="Target base URL in http mode (default: spawn a local server)")
+    parser.add_argument("--requests", type=int, default=1000, help="Number of webhook requests")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent in-flight requests")
+    parser.add_argument("--warmup", type=int, default=50, help="Warm-up requests excluded from stats")
+    parser.add_argument("--mix", help="Payload mix, e.g. text=60,status=30,image=10 (default: realistic mix)")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for payload generation")
+    parser.add_argument("--journal", help="Replay payloads recorded in this event journal instead of synthetic ones")
+    parser.add_argument("--graph-latency-ms", type=float, help="Injected Graph API latency (default: STANDIN_GRAPH_LATENCY_MS)")
+    parser.add_argument("--graph-error-rate", type=float, help="Fraction of Graph API calls failing with 500")
+    parser.add_argument("--graph-throttle-rate", type=float, help="Fraction of Graph API calls throttled with 429")
+    parser.add_argument("--media-size-bytes", type=int, help="Size of media downloaded from the Graph stand-in")
+    parser.add_argument("--db-latency-ms", type=float, help="Injected Supabase latency (default: STANDIN_DB_LATENCY_MS)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the spawned server in http mode")
+    parser.add_argument("--output", help="Result JSON path (default: bench_results/webhook_<mode>_<ts>.json)")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    return parser.parse_args(argv)
+
+
+async def drive(
+    client: httpx.AsyncClient,
+    payloads: List[Tuple[str, dict]],
+    concurrency: int,
+) -> Tuple[List[Tuple[str, float, int]], float]:
+    """Send every payload with at most `concurrency` requests in flight."""
+    from src.modules.channels.meta.services.webhook.signature import SIGNATURE_HEADER, parse_secrets, sign
+
+    # Signed like Meta does when the target verifies signatures
+    secrets = parse_secrets(os.environ.get("META_APP_SECRET"))
+    samples: List[Tuple[str, float, int]] = []
+    iterator = iter(payloads)
+
+    async def worker():
+        for kind, payload in iterator:
+            started = time.perf_counter()
+            body = json.dumps(payload).encode()
+            headers = {"Content-Type": "application/json"}
+            if secrets:
+                headers[SIGNATURE_HEADER] = sign(body, secrets[0])
+            try:
+                response = await client.post("/webhook", content=body, headers=headers)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            samples.append((kind, (time.perf_counter() - started) * 1000.0, status))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return samples, time.perf_counter() - started
+
+
+def build_report(args, samples, elapsed, rss: Dict[str, Any]) -> Dict[str, Any]:
+    standins: StandinSettings = args.standins
+    by_kind: Dict[str, List[float]] = defaultdict(list)
+    for kind, latency, _ in samples:
+        by_kind[kind].append(latency)
+    statuses = Counter(status for _, _, status in samples)
+    errors = sum(count for status, count in statuses.items() if status != 200)
+
+    return {
+        "benchmark": "webhook",
+        "environment": environment_info(),
+        "config": {
+            "mode": args.mode,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "mix": args.mix or "default",
+            "journal": args.journal,
+            "seed": args.seed,
+            "graph_latency_ms": standins.graph_latency_ms,
+            "graph_error_rate": standins.graph_error_rate,
+            "graph_throttle_rate": standins.graph_throttle_rate,
+            "media_size_bytes": standins.graph_media_size_bytes,
+            "db_latency_ms": standins.db_latency_ms,
+        },
+        "results": {
+            "latency_ms": summarize(latency for _, latency, _ in samples),
+            "throughput_rps": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+            "elapsed_s": round(elapsed, 3),
+            "errors": errors,
+            "rss_mb": rss,
+            "per_kind": {kind: summarize(values) for kind, values in sorted(by_kind.items())},
+        },
+        "status_codes": {str(k): v for k, v in sorted(statuses.items())},
+    }
+
+
+async def run_inprocess(args, payloads, warmup) -> Dict[str, Any]:
+    # Import only after the stand-in environment is in place: settings are
+    # resolved at import time.
+    from src.main import app
+
+    logging.getLogger().setLevel(logging.WARNING)
+    workdir = tempfile.mkdtemp(prefix="webhook-bench-")
+    previous_cwd = os.getcwd()
+    os.chdir(workdir)  # save_media writes files to the working directory
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+                    rss_before = rss_mb()
+                    await drive(client, warmup, args.concurrency)
+                    samples, elapsed = await drive(client, payloads, args.concurrency)
+                    rss_after = rss_mb()
+    finally:
+        os.chdir(previous_cwd)
+    return build_report(args, samples, elapsed, {"before": rss_before, "after": rss_after})
+
+
+async def run_http(args, payloads, warmup, env: Dict[str, str]) -> Dict[str, Any]:
+    process = None
+    base_url = args.url
+    if not base_url:
+        base_url = f"http://127.0.0.1:{args.port}"
+        process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main:app", "--port", str(args.port), "--log-level", "warning"],
+            cwd=tempfile.mkdtemp(prefix="webhook-bench-"),
+            env={**os.environ, **env, "PYTHONPATH": str(ROOT_DIR)},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    try:
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/health")).status_code == 200:
+                        break
+                except httpx.HTTPError:
+                    pass
+                if time.monotonic() > deadline:
+                    raise RuntimeError(f"Server at {base_url} did not become healthy")
+                await asyncio.sleep(0.2)
+
+            pid = process.pid if process else None
+            rss_before = rss_mb(pid) if pid else None
+            await drive(client, warmup, args.concurrency)
+            samples, elapsed = await drive(client, payloads, args.concurrency)
+            rss_after = rss_mb(pid) if pid else None
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+    return build_report(args, samples, elapsed, {"before": rss_before, "after": rss_after})
+
+
+def main(argv=None) -> None:
+    args = parse_args(argv)
+
+    overrides = {
+        "graph_latency_ms": args.graph_latency_ms,
+        "graph_error_rate": args.graph_error_rate,
+        "graph_throttle_rate": args.graph_throttle_rate,
+        "graph_media_size_bytes": args.media_size_bytes,
+        "db_latency_ms": args.db_latency_ms,
+    }
+    args.standins = StandinSettings(**{k: v for k, v in overrides.items() if v is not None})
+    graph, postgrest = start_standins(args.standins, ephemeral_ports=True)
+    env = app_environment(graph.url, postgrest.url)
+    os.environ.update(env)
+
+    # Payload generation reads settings, so it happens after the env update
+    from scripts.benchmarks.payloads import PayloadFactory, journal_stream, parse_mix
+
+    factory = PayloadFactory(seed=args.seed)
+    mix = parse_mix(args.mix)
+    warmup = list(factory.stream(mix, args.warmup))
+    if args.journal:
+        # Recorded traffic, cycled if the journal is shorter than --requests
+        recorded = journal_stream(args.journal)
+        if not recorded:
+            raise SystemExit(f"No events found in journal {args.journal}")
+        payloads = [recorded[i % len(recorded)] for i in range(args.requests)]
+    else:
+        payloads = list(factory.stream(mix, args.requests))
+
+    try:
+        if args.mode == "inprocess":
+            report = asyncio.run(run_inprocess(args, payloads, warmup))
+        else:
+            report = asyncio.run(run_http(args, payloads, warmup, env))
+    finally:
+        graph.stop()
+        postgrest.stop()
+
+    report["backends"] = {
+        "graph_api": dict(graph.app.state.counters),
+        "postgrest": dict(postgrest.app.state.counters),
+    }
+
+    path = save_results(f"webhook_{args.mode}", report, args.output)
+    results = report["results"]
+    latency = results["latency_ms"]
+    print(
+        f"{args.mode}: {latency['count']} requests, c={args.concurrency} | "
+        f"p50={latency['p50']}ms p95={latency['p95']}ms p99={latency['p99']}ms | "
+        f"{results['throughput_rps']} req/s | errors={results['errors']} | rss={results['rss_mb']}"
+    )
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Per-request framework overhead of the inbound webhook route.
+
+Compares the single-pass v1 route against the two shapes it replaced, all
+mounted on one FastAPI app and called directly through ASGI (no network,
+no HTTP client):
+
+- chained:     five chained `Depends` re-walking `payload.entry[0].changes[0]`
+               plus a `Provide` marker (the former `/webhooks/inbound`)
+- typed:       FastAPI body model plus two `Provide` markers (the former
+               `POST /webhook` in `src/main.py`)
+- single_pass: the v1 route (raw body, one validation, no dependencies),
+               which also verifies the request signature
+
+The webhook service is replaced by a no-op so only routing, body parsing
+and dependency resolution are measured.
+
+Example:
+    python -m scripts.benchmarks.webhook_routing --iterations 5000
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import time
+from typing import Annotated, Any, Dict, List, Optional, Tuple
+
+from scripts.benchmarks.common import compare, environment_info, save_results, summarize
+from scripts.standins.environment import STANDIN_APP_SECRET, app_environment
+
+# Nothing talks to the backends here, but settings must point somewhere valid
+os.environ.update(app_environment("http://127.0.0.1:9", "http://127.0.0.1:9"))
+
+from dependency_injector import providers  # noqa: E402
+from dependency_injector.wiring import Provide, inject  # noqa: E402
+from fastapi import Depends, FastAPI, Request  # noqa: E402
+
+from scripts.benchmarks.payloads import PayloadFactory  # noqa: E402
+
+from src.core.di.container import Container  # noqa: E402
+from src.core.journal.event_journal import EventJournal  # noqa: E402
+from src.modules.channels.meta.api.router import router as meta_router  # noqa: E402
+from src.modules.channels.meta.dtos.inbound import Audio, Contact, Image, Message, Payload, User  # noqa: E402
+from src.modules.channels.meta.services.webhook.signature import SIGNATURE_HEADER, sign  # noqa: E402
+
+ROUTES = {
+    "chained": "/legacy/chained",
+    "typed": "/legacy/typed",
+    "single_pass": "/channels/meta/v1/webhook",
+}
+
+
+class NoopWebhookService:
+    async def handle_webhook(self, payload: Payload, event_id: Optional[str] = None) -> bool:
+        return True
+
+
+# Former `api/dependencies.py` chain
+
+async def parse_payload(request: Request) -> Payload:
+    return Payload(**(await request.json()))
+
+
+async def parse_contact(payload: Annotated[Payload, Depends(parse_payload)]) -> Optional[Contact]:
+    contacts = payload.entry[0].changes[0].value.contacts
+    return contacts[0] if contacts else None
+
+
+async def parse_message(payload: Annotated[Payload, Depends(parse_payload)]) -> Optional[Message]:
+    messages = payload.entry[0].changes[0].value.messages
+    return messages[0] if messages else None
+
+
+async def get_current_user(contact: Annotated[Optional[Contact], Depends(parse_contact)]) -> Optional[User]:
+    return User(profile_name=contact.profile.name, phone=contact.wa_id) if contact else None
+
+
+async def parse_audio_file(message: Annotated[Optional[Message], Depends(parse_message)]) -> Optional[Audio]:
+    return message.audio if message and message.type == "audio" else None
+
+
+async def parse_image_file(message: Annotated[Optional[Message], Depends(parse_message)]) -> Optional[Image]:
+    return message.image if message and message.type == "image" else None
+
+
+async def message_extractor(
+        message: Annotated[Optional[Message], Depends(parse_message)],
+        audio: Annotated[Optional[Audio], Depends(parse_audio_file)],
+) -> Optional[str]:
+    if audio:
+        return ""
+    return message.text.body if message and message.text else None
+
+
+def build_app(container: Container) -> FastAPI:
+    app = FastAPI()
+    setattr(app, "container", container)
+    app.include_router(meta_router)
+
+    @app.post(ROUTES["chained"])
+    @inject
+    async def chained(
+            payload: Payload = Depends(parse_payload),
+            user: Optional[User] = Depends(get_current_user),
+            user_message: Optional[str] = Depends(message_extractor),
+            image: Optional[Image] = Depends(parse_image_file),
+            message: Optional[Message] = Depends(parse_message),
+            service: NoopWebhookService = Depends(Provide[Container.meta.meta_webhook_service]),
+    ):
+        await service.handle_webhook(payload)
+        return {"status": "ok"}
+
+    @app.post(ROUTES["typed"])
+    @inject
+    async def typed(
+            request: Request,
+            payload: Payload,
+            service: Annotated[NoopWebhookService, Depends(Provide[Container.meta.meta_webhook_service])],
+            journal: Annotated[Optional[EventJournal], Depends(Provide[Container.core.event_journal])],
+    ):
+        await service.handle_webhook(payload)
+        return {"status": "ok"}
+
+    container.wire(modules=[__name__])
+    return app
+
+
+async def call(app: FastAPI, path: str, body: bytes, headers: Optional[List[Tuple[bytes, bytes]]] = None) -> int:
+    """One POST straight through the ASGI interface; returns the status code."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            *(headers or ()),
+        ],
+        "client": ("127.0.0.1", 1),
+        "server": ("127.0.0.1", 80),
+        "app": app,
+    }
+    sent = False
+    status = 0
+
+    async def receive() -> Dict[str, Any]:
+        nonlocal sent
+        if sent:
+            return {"type": "http.disconnect"}
+        sent = True
+        return {"type": "http.request", "body": body, "more_body": False}
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+def signed(body: bytes) -> List[Tuple[bytes, bytes]]:
+    return [(SIGNATURE_HEADER.encode(), sign(body, STANDIN_APP_SECRET).encode())]
+
+
+async def measure(app: FastAPI, bodies: List[bytes], iterations: int, rounds: int) -> Dict[str, Any]:
+    latencies: Dict[str, List[float]] = {name: [] for name in ROUTES}
+    headers = [signed(body) for body in bodies]
+    for name, path in ROUTES.items():
+        status = await call(app, path, bodies[0], headers[0])
+        if status != 200:
+            raise RuntimeError(f"{name}: {path} answered {status}")
+    # Interleave the variants so drift (GC, CPU frequency) hits all of them alike
+    per_round = max(1, iterations // rounds)
+    for _ in range(rounds):
+        for name, path in ROUTES.items():
+            for index in range(per_round):
+                started = time.perf_counter_ns()
+                await call(app, path, bodies[index % len(bodies)], headers[index % len(bodies)])
+                latencies[name].append((time.perf_counter_ns() - started) / 1000.0)
+    return {name: summarize(values) for name, values in latencies.items()}
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Webhook route overhead benchmark")
+    parser.add_argument("--iterations", type=int, default=5000, help="Requests per variant")
+    parser.add_argument("--rounds", type=int, default=5, help="Interleaved rounds")
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    container = Container()
+    container.meta.meta_webhook_service.override(providers.Object(NoopWebhookService()))
+    container.core.event_journal.override(providers.Object(None))
+    app = build_app(container)
+
+    factory = PayloadFactory(seed=0)
+    bodies = [json.dumps(factory.make(kind)).encode() for kind in ("text", "status", "image", "audio", "reaction")]
+    results = asyncio.run(measure(app, bodies, args.iterations, args.rounds))
+
+    baseline = results["single_pass"]["mean"]
+    saved = {name: round(result["mean"] - baseline, 2) for name, result in results.items() if name != "single_pass"}
+    report = {
+        "benchmark": "webhook_routing",
+        "environment": environment_info(),
+        "results": {"us_per_request": results, "us_saved_per_request": saved},
+    }
+    path = save_results("webhook_routing", report, args.output)
+    for name, result in results.items():
+        print(f"{name:<12} mean={result['mean']:>8.1f} us  p50={result['p50']:>8.1f} us  p99={result['p99']:>8.1f} us")
+    for name, delta in saved.items():
+        print(f"single_pass saves {delta:.1f} us/request vs {name}")
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
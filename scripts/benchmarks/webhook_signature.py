@@ -0,0 +1,135 @@
+"""
+Cost of rejecting forged webhooks.
+
+Floods the v1 inbound route (called directly through ASGI, webhook service
+replaced by a no-op) with forged requests of each kind and compares their
+per-request cost and throughput with correctly signed requests, which go
+on to JSON parsing and validation. Also reports the raw HMAC-SHA256 cost
+per body size.
+
+Example:
+    python -m scripts.benchmarks.webhook_signature --requests 20000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import hmac
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from scripts.benchmarks.common import compare, environment_info, save_results, summarize
+from scripts.standins.environment import STANDIN_APP_SECRET, app_environment
+
+os.environ.update(app_environment("http://127.0.0.1:9", "http://127.0.0.1:9"))
+
+from dependency_injector import providers  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+
+from scripts.benchmarks.payloads import PayloadFactory  # noqa: E402
+from scripts.benchmarks.webhook_routing import NoopWebhookService, call  # noqa: E402
+from src.core.di.container import Container  # noqa: E402
+from src.core.observability.metrics import metrics  # noqa: E402
+from src.modules.channels.meta.api.router import router as meta_router  # noqa: E402
+from src.modules.channels.meta.services.webhook.signature import SIGNATURE_HEADER, sign  # noqa: E402
+
+PATH = "/channels/meta/v1/webhook"
+HEADER = SIGNATURE_HEADER.encode()
+
+
+def variants(body: bytes) -> Dict[str, Tuple[int, Optional[List[Tuple[bytes, bytes]]]]]:
+    """Expected status and signature headers of each request kind."""
+    return {
+        "forged_missing": (401, None),
+        "forged_malformed": (401, [(HEADER, b"sha1=0123456789abcdef")]),
+        "forged_mismatch": (401, [(HEADER, sign(body, "not-the-app-secret").encode())]),
+        "valid": (200, [(HEADER, sign(body, STANDIN_APP_SECRET).encode())]),
+    }
+
+
+async def flood(
+    app: FastAPI, body: bytes, headers, expected: int, requests: int, concurrency: int
+) -> Dict[str, Any]:
+    latencies: List[float] = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            started = time.perf_counter_ns()
+            status = await call(app, PATH, body, headers)
+            latencies.append((time.perf_counter_ns() - started) / 1000.0)
+            if status != expected:
+                raise RuntimeError(f"Expected {expected}, got {status}")
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {"us_per_request": summarize(latencies), "throughput_rps": round(requests / elapsed, 1)}
+
+
+def hmac_cost(sizes: List[int], iterations: int) -> Dict[str, float]:
+    key = STANDIN_APP_SECRET.encode()
+    results = {}
+    for size in sizes:
+        body = os.urandom(size)
+        started = time.perf_counter_ns()
+        for _ in range(iterations):
+            hmac.compare_digest(hmac.digest(key, body, "sha256"), b"\0" * 32)
+        results[f"{size}_bytes_us"] = round((time.perf_counter_ns() - started) / iterations / 1000.0, 3)
+    return results
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Forged webhook rejection benchmark")
+    parser.add_argument("--requests", type=int, default=20000, help="Requests per variant")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--output", help="Result JSON path")
+    parser.add_argument("--compare", help="Baseline result JSON to compare against")
+    args = parser.parse_args(argv)
+
+    container = Container()
+    container.meta.meta_webhook_service.override(providers.Object(NoopWebhookService()))
+    container.core.event_journal.override(providers.Object(None))
+    app = FastAPI()
+    setattr(app, "container", container)
+    app.include_router(meta_router)
+
+    body = json.dumps(PayloadFactory(seed=0).make("text")).encode()
+
+    async def run() -> Dict[str, Any]:
+        results = {}
+        for name, (expected, headers) in variants(body).items():
+            await flood(app, body, headers, expected, min(200, args.requests), args.concurrency)  # warm-up
+            results[name] = await flood(app, body, headers, expected, args.requests, args.concurrency)
+        return results
+
+    results = asyncio.run(run())
+    results["hmac_sha256"] = hmac_cost([1024, 16 * 1024, 256 * 1024], 2000)
+    results["rejections"] = metrics.snapshot()["collectors"].get("webhook_signature") or (
+        container.meta.webhook_signature_verifier().stats()
+    )
+
+    report = {
+        "benchmark": "webhook_signature",
+        "environment": environment_info(),
+        "body_bytes": len(body),
+        "results": results,
+    }
+    path = save_results("webhook_signature", report, args.output)
+    for name in variants(body):
+        result = results[name]
+        print(
+            f"{name:<17} mean={result['us_per_request']['mean']:>8.1f} us  "
+            f"p99={result['us_per_request']['p99']:>8.1f} us  {result['throughput_rps']:>9.1f} req/s"
+        )
+    print("hmac_sha256      ", results["hmac_sha256"])
+    print("rejections       ", results["rejections"])
+    print(f"Results saved to {path}")
+
+    if args.compare:
+        compare(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,90 +1,270 @@
-import os
+"""
+Incremental database migrations.
+
+Applies the pending `NNN_name.sql` files of `migrations/`, in order, each
+in its own transaction together with its row in the `schema_migrations`
+ledger (version, name, SHA-256 checksum, applied_at, execution_ms):
+
+- files already in the ledger are skipped; one whose checksum changed
+  since it was applied stops the run (edit schema by adding a file)
+- a session advisory lock serializes concurrent runs: a deploy that waited
+  re-reads the ledger and finds nothing left to apply
+- nothing pending: one ledger read, no lock, no writes
+- `000_drop_database.sql` is never part of the plan; `--reset` runs it,
+  clears the ledger and applies everything again
+
+Examples:
+    python -m scripts.database.migrate                 # apply pending
+    python -m scripts.database.migrate --dry-run       # show the plan
+    python -m scripts.database.migrate --baseline 002  # adopt a database migrated before the ledger
+    python -m scripts.database.migrate migrations/003_add_meta_account_normalized_phone_numbers.sql
+"""
+
 import argparse
+import hashlib
+import os
+import re
+import sys
+import time
 from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional
 
 import psycopg2
 from dotenv import load_dotenv
 
 load_dotenv()
 
+MIGRATIONS_DIR = Path("migrations")
+RESET_MIGRATION = "000_drop_database.sql"
+LEDGER_TABLE = "schema_migrations"
+# pg_advisory_lock key shared by every runner (any constant bigint works)
+ADVISORY_LOCK_KEY = 0x6D69677261746531
+
+_FILE_NAME = re.compile(r"^(\d+)_(.+)\.sql$")
+
+
+class MigrationError(Exception):
+    pass
+
+
+class Migration(NamedTuple):
+    version: str
+    name: str
+    path: Path
+    checksum: str
+
+
+class AppliedMigration(NamedTuple):
+    version: str
+    name: str
+    checksum: str
+
+
+def read_migration(path: Path) -> Migration:
+    match = _FILE_NAME.match(path.name)
+    if not match:
+        raise MigrationError(f"{path.name}: migration files are named NNN_description.sql")
+    checksum = hashlib.sha256(path.read_bytes()).hexdigest()
+    return Migration(match.group(1), match.group(2), path, checksum)
+
+
+def discover(target: Path) -> List[Migration]:
+    """Migrations of a directory (reset script excluded), or the single given file."""
+    if target.is_file():
+        if target.name == RESET_MIGRATION:
+            raise MigrationError(f"{RESET_MIGRATION} is not a migration; use --reset")
+        return [read_migration(target)]
+    migrations = [read_migration(path) for path in sorted(target.glob("*.sql")) if path.name != RESET_MIGRATION]
+    seen: Dict[str, Path] = {}
+    for migration in migrations:
+        if migration.version in seen:
+            raise MigrationError(
+                f"Version {migration.version} used by {seen[migration.version].name} and {migration.path.name}"
+            )
+        seen[migration.version] = migration.path
+    return migrations
+
+
+def ensure_ledger(cursor) -> None:
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {LEDGER_TABLE} (
+            version TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            checksum TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+            execution_ms DOUBLE PRECISION
+        )
+        """
+    )
+
+
+def read_ledger(cursor) -> Dict[str, AppliedMigration]:
+    cursor.execute("SELECT to_regclass(%s) IS NOT NULL", (LEDGER_TABLE,))
+    if not cursor.fetchone()[0]:
+        return {}
+    cursor.execute(f"SELECT version, name, checksum FROM {LEDGER_TABLE}")
+    return {row[0]: AppliedMigration(*row) for row in cursor.fetchall()}
+
+
+def plan(migrations: List[Migration], applied: Dict[str, AppliedMigration]) -> List[Migration]:
+    """
+    Migrations still to apply.
+
+    Raises:
+        MigrationError: An applied migration's file changed since it ran
+    """
+    changed = [m for m in migrations if m.version in applied and applied[m.version].checksum != m.checksum]
+    if changed:
+        names = ", ".join(m.path.name for m in changed)
+        raise MigrationError(f"Applied migration(s) changed since they ran: {names}. Add a new migration instead.")
+    return [m for m in migrations if m.version not in applied]
+
+
+def record(cursor, migration: Migration, execution_ms: Optional[float]) -> None:
+    cursor.execute(
+        f"INSERT INTO {LEDGER_TABLE} (version, name, checksum, execution_ms) VALUES (%s, %s, %s, %s)",
+        (migration.version, migration.name, migration.checksum, execution_ms),
+    )
+
+
+def apply(conn, migration: Migration) -> float:
+    """Run one migration and its ledger row in a single transaction. Returns the time taken (ms)."""
+    started = time.perf_counter()
+    try:
+        with conn.cursor() as cursor:
+            cursor.execute(migration.path.read_text())
+            execution_ms = (time.perf_counter() - started) * 1000.0
+            record(cursor, migration, round(execution_ms, 1))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    return execution_ms
+
+
+def reset(conn, migrations_dir: Path) -> None:
+    """Drop the schema (`000_drop_database.sql`) and empty the ledger."""
+    with conn.cursor() as cursor:
+        cursor.execute((migrations_dir / RESET_MIGRATION).read_text())
+        cursor.execute(f"DROP TABLE IF EXISTS {LEDGER_TABLE}")
+    conn.commit()
+
+
+def run_migrations(
+    path_arg: Optional[str] = None,
+    dry_run: bool = False,
+    baseline: Optional[int] = None,
+    reset_first: bool = False,
+    lock_timeout_s: float = 60.0,
+) -> int:
+    started = time.perf_counter()
+    target = Path(path_arg) if path_arg else MIGRATIONS_DIR
+    if not target.exists():
+        print(f"Error: Path {target} does not exist.")
+        return 1
+    migrations_dir = target.parent if target.is_file() else target
+    try:
+        migrations = discover(target)
+    except MigrationError as e:
+        print(f"Error: {e}")
+        return 1
 
-def run_migrations(path_arg=None, dry_run=False):
     database_url = os.getenv("DATABASE_URL")
-    
-    # Connect to DB only if needed or to verify connection? 
-    # Let's verify connection even in dry-run to ensure env is correct
     try:
         conn = psycopg2.connect(database_url)
-        cursor = conn.cursor()
     except Exception as e:
         print(f"Error connecting to database: {e}")
-        return
+        return 1
 
-    # Determine target path
-    # If path_arg is provided, use it. Otherwise default to "migrations" directory
-    target_path = Path(path_arg) if path_arg else Path("migrations")
+    try:
+        with conn.cursor() as cursor:
+            applied = {} if reset_first else read_ledger(cursor)
+        conn.rollback()
+        pending = plan(migrations, applied)
 
-    if not target_path.exists():
-        print(f"Error: Path {target_path} does not exist.")
-        cursor.close()
-        conn.close()
-        return
-
-    sql_files = []
-    
-    if target_path.is_file():
-        # Case 1: Specific file
-        if target_path.suffix != '.sql':
-            print(f"Warning: File {target_path} does not appear to be a SQL file.")
-        sql_files = [target_path]
-        print(f"Running specific migration: {target_path.name}...")
-        
-    elif target_path.is_dir():
-        # Case 2: Directory
-        # Get all .sql files sorted by name
-        sql_files = sorted(target_path.glob("*.sql"))
-        print(f"Running all migrations from {target_path}...")
-        
-        if not sql_files:
-            print(f"No .sql files found in {target_path}")
-            cursor.close()
-            conn.close()
-            return
-
-    if dry_run:
-        print("\n--- DRY RUN MODE: No changes will be applied ---\n")
-
-    for sql_file in sql_files:
         if dry_run:
-            print(f"[DRY-RUN] Would execute: {sql_file.name}")
-            continue
+            print("--- DRY RUN: no changes will be applied ---")
+            if reset_first:
+                print(f"[DRY-RUN] Would run {RESET_MIGRATION} and clear {LEDGER_TABLE}")
+            for migration in migrations:
+                if migration in pending:
+                    action = "baseline" if baseline is not None and int(migration.version) <= baseline else "apply"
+                    print(f"  {action:<9} {migration.path.name}  {migration.checksum[:12]}")
+                else:
+                    print(f"  applied   {migration.path.name}")
+            print(f"{len(pending)} pending, {len(migrations) - len(pending)} applied")
+            return 0
+
+        if not pending and not reset_first:
+            elapsed_ms = (time.perf_counter() - started) * 1000.0
+            print(f"Database is up to date ({len(migrations)} migrations, {elapsed_ms:.1f} ms)")
+            return 0
 
-        print(f"Running {sql_file.name}...")
+        with conn.cursor() as cursor:
+            cursor.execute("SET lock_timeout = %s", (f"{int(lock_timeout_s * 1000)}ms",))
+            cursor.execute("SELECT pg_advisory_lock(%s)", (ADVISORY_LOCK_KEY,))
+            cursor.execute("SET lock_timeout = DEFAULT")
+        conn.commit()
         try:
-            with open(sql_file, "r") as f:
-                sql = f.read()
-                cursor.execute(sql)
+            if reset_first:
+                print(f"Running {RESET_MIGRATION}...")
+                reset(conn, migrations_dir)
+            with conn.cursor() as cursor:
+                ensure_ledger(cursor)
             conn.commit()
-            print(f"✓ {sql_file.name} executed successfully")
-        except Exception as e:
+            # Another runner may have applied some while we waited for the lock
+            with conn.cursor() as cursor:
+                pending = plan(migrations, read_ledger(cursor))
             conn.rollback()
-            print(f"✗ Error executing {sql_file.name}: {e}")
-            # Stop on error? Usually yes for migrations.
-            break
 
-    cursor.close()
-    conn.close()
-    
-    if dry_run:
-        print("\n--- DRY RUN COMPLETED ---")
-    else:
-        print("Migration(s) completed!")
+            for migration in pending:
+                if baseline is not None and int(migration.version) <= baseline:
+                    with conn.cursor() as cursor:
+                        record(cursor, migration, None)
+                    conn.commit()
+                    print(f"- {migration.path.name} marked as applied (baseline)")
+                    continue
+                print(f"Running {migration.path.name}...")
+                try:
+                    execution_ms = apply(conn, migration)
+                except Exception as e:
+                    print(f"✗ Error executing {migration.path.name}: {e}")
+                    return 1
+                print(f"✓ {migration.path.name} executed successfully ({execution_ms:.1f} ms)")
+        finally:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_unlock(%s)", (ADVISORY_LOCK_KEY,))
+            conn.commit()
+    except MigrationError as e:
+        print(f"Error: {e}")
+        return 1
+    except psycopg2.errors.LockNotAvailable:
+        print(f"Error: another migration run held the lock for more than {lock_timeout_s:g}s")
+        return 1
+    finally:
+        conn.close()
+
+    print(f"Migration(s) completed in {(time.perf_counter() - started) * 1000.0:.1f} ms!")
+    return 0
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run database migrations")
     parser.add_argument("path", nargs="?", help="Specific migration file path or directory to run (optional)")
-    parser.add_argument("--dry-run", action="store_true", help="Simulate migration execution without applying changes")
+    parser.add_argument("--dry-run", action="store_true", help="Show the plan without applying changes")
+    parser.add_argument(
+        "--baseline",
+        type=int,
+        metavar="VERSION",
+        help="Record pending migrations up to VERSION as applied without running them",
+    )
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help=f"Run {RESET_MIGRATION}, clear the ledger and apply every migration",
+    )
+    parser.add_argument("--lock-timeout", type=float, default=60.0, help="Seconds to wait for a concurrent run")
     args = parser.parse_args()
 
-    run_migrations(args.path, args.dry_run)
+    sys.exit(run_migrations(args.path, args.dry_run, args.baseline, args.reset, args.lock_timeout))
@@ -12,7 +12,9 @@ ROOT_DIR = Path(__file__).resolve().parents[2]
 if str(ROOT_DIR) not in sys.path:
     sys.path.insert(0, str(ROOT_DIR))
 
+from src.core.cache.invalidation import INVALIDATE_ALL, broadcast
 from src.core.config.settings import settings
+from src.modules.channels.meta.services.meta_account_service import ACCOUNT_CACHE_TOPIC
 
 
 def get_database_url() -> str:
@@ -156,6 +158,10 @@ def main() -> None:
         )
         conn.commit()
         print("Seed de meta_accounts aplicado com sucesso.")
+        # Avisa os workers em execução (nesta máquina) para descartar o cache de contas
+        workers = broadcast(ACCOUNT_CACHE_TOPIC, INVALIDATE_ALL)
+        if workers:
+            print(f"Cache de contas invalidado em {workers} worker(s).")
     except Exception as e:
         conn.rollback()
         print(f"Erro ao executar seed de meta_accounts: {e}")
@@ -0,0 +1,55 @@
+"""
+Inspect the outbound message outbox.
+
+Examples:
+    python -m scripts.meta.outbox                  # counts per status
+    python -m scripts.meta.outbox --list dead
+    python -m scripts.meta.outbox --requeue-dead   # running senders pick them up
+"""
+
+import argparse
+import datetime
+import sys
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.core.config.settings import settings
+from src.core.outbox.sqlite_outbox import SQLiteOutbox
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Inspect the outbound message outbox")
+    parser.add_argument("--path", default=settings.outbox.path, help="Outbox database")
+    parser.add_argument("--list", choices=("pending", "sending", "sent", "dead"), help="List messages with this status")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum messages listed")
+    parser.add_argument("--requeue-dead", nargs="*", type=int, metavar="ID", help="Requeue dead messages (all if no ids)")
+    args = parser.parse_args(argv)
+
+    if not Path(args.path).exists():
+        print(f"No outbox at {args.path}")
+        return
+
+    outbox = SQLiteOutbox(args.path)
+    outbox.open()
+    try:
+        if args.requeue_dead is not None:
+            print(f"Requeued {outbox.requeue_dead(args.requeue_dead)} message(s)")
+        if args.list:
+            for message in outbox.messages(args.list, args.limit):
+                updated = datetime.datetime.fromtimestamp(message["updated_at"], datetime.timezone.utc).isoformat(
+                    timespec="seconds"
+                )
+                print(
+                    f"{message['id']:>8} {message['conversation']:<32} attempts={message['attempts']} {updated} "
+                    f"{message['provider_message_id'] or ''} {message['last_error'] or ''}"
+                )
+        print(outbox.counts())
+    finally:
+        outbox.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+Replay journaled inbound webhooks.
+
+Re-drives events recorded by the event journal (`JOURNAL_DIRECTORY`) through
+`MetaWebhookService`, either in-process (marks each event as resolved or
+failed in the journal) or by POSTing the raw bodies to a running server
+(useful as a realistic load source).
+
+Examples:
+    python -m scripts.meta.replay_events --list
+    python -m scripts.meta.replay_events                      # failed events, in-process
+    python -m scripts.meta.replay_events --select all --rate 20 --concurrency 4
+    python -m scripts.meta.replay_events --target http --url http://localhost:8000 --select all --rate 100
+"""
+
+import argparse
+import asyncio
+import datetime
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+ROOT_DIR = Path(__file__).resolve().parents[2]
+if str(ROOT_DIR) not in sys.path:
+    sys.path.insert(0, str(ROOT_DIR))
+
+from src.core.config.settings import settings
+from src.core.journal.event_journal import JournalEvent, load_events
+
+
+def parse_time(value: str) -> float:
+    """Unix timestamp or ISO-8601 datetime (naive values are UTC)."""
+    try:
+        return float(value)
+    except ValueError:
+        parsed = datetime.datetime.fromisoformat(value)
+        if parsed.tzinfo is None:
+            parsed = parsed.replace(tzinfo=datetime.timezone.utc)
+        return parsed.timestamp()
+
+
+def select_events(args) -> List[JournalEvent]:
+    events = load_events(args.journal_dir)
+    if args.select == "failed":
+        events = [e for e in events if e.failed]
+    if args.since is not None:
+        events = [e for e in events if e.received_at >= args.since]
+    if args.until is not None:
+        events = [e for e in events if e.received_at < args.until]
+    if args.limit is not None:
+        events = events[: args.limit]
+    return events
+
+
+def print_events(events: List[JournalEvent]) -> None:
+    print(f"{'event_id':<28} {'received_at':<26} {'bytes':>7} {'status':<9} last_error")
+    for event in events:
+        received = datetime.datetime.fromtimestamp(event.received_at, datetime.timezone.utc).isoformat(
+            timespec="seconds"
+        )
+        if event.failed:
+            status = "failed"
+        elif event.last_resolved_at is not None:
+            status = "resolved"
+        else:
+            status = "ok"
+        print(f"{event.event_id:<28} {received:<26} {len(event.data):>7} {status:<9} {event.last_error or ''}")
+
+
+async def paced(
+    events: List[JournalEvent],
+    handle: Callable[[JournalEvent], Awaitable[bool]],
+    rate: float,
+    concurrency: int,
+) -> Dict[str, float]:
+    """Run `handle` over `events` at most `rate` starts per second, `concurrency` at a time."""
+    semaphore = asyncio.Semaphore(concurrency)
+    outcome = {"replayed": 0, "failed": 0}
+    started = time.monotonic()
+
+    async def run(index: int, event: JournalEvent) -> None:
+        if rate > 0:
+            delay = started + index / rate - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+        async with semaphore:
+            ok = await handle(event)
+        outcome["replayed" if ok else "failed"] += 1
+
+    await asyncio.gather(*(run(i, e) for i, e in enumerate(events)))
+    elapsed = time.monotonic() - started
+    return {**outcome, "elapsed_s": round(elapsed, 3), "rate": round(len(events) / elapsed, 2) if elapsed else 0.0}
+
+
+async def replay_inprocess(events: List[JournalEvent], args) -> Dict[str, float]:
+    from src.core.di.container import Container
+    from src.modules.channels.meta.dtos.inbound import Payload
+
+    container = Container()
+    await container.init_resources()
+    try:
+        service = container.meta.meta_webhook_service()
+        journal = container.core.event_journal() if args.mark else None
+
+        async def handle(event: JournalEvent) -> bool:
+            try:
+                payload = Payload.model_validate_json(event.data)
+                # Heavy handlers fail after this returns: they mark the event themselves
+                await service.process_webhook(payload, event_id=event.event_id if journal is not None else None)
+            except Exception as e:
+                print(f"{event.event_id}: {type(e).__name__}: {e}")
+                if journal is not None:
+                    journal.mark_failed(event.event_id, e)
+                return False
+            if journal is not None:
+                journal.mark_resolved(event.event_id)
+            return True
+
+        return await paced(events, handle, args.rate, args.concurrency)
+    finally:
+        await container.shutdown_resources()
+
+
+async def replay_http(events: List[JournalEvent], args) -> Dict[str, float]:
+    import httpx
+
+    from src.modules.channels.meta.services.webhook.signature import SIGNATURE_HEADER, parse_secrets, sign
+
+    # Journaled bodies are the original bytes, so they are re-signed as Meta signed them
+    secrets = parse_secrets(settings.meta.app_secret)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30.0) as client:
+
+        async def handle(event: JournalEvent) -> bool:
+            headers = {"Content-Type": "application/json"}
+            if secrets:
+                headers[SIGNATURE_HEADER] = sign(event.data, secrets[0])
+            try:
+                response = await client.post("/webhook", content=event.data, headers=headers)
+            except httpx.HTTPError as e:
+                print(f"{event.event_id}: {type(e).__name__}: {e}")
+                return False
+            if response.status_code != 200:
+                print(f"{event.event_id}: HTTP {response.status_code}")
+            return response.status_code == 200
+
+        return await paced(events, handle, args.rate, args.concurrency)
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description="Replay journaled inbound webhooks")
+    parser.add_argument("--journal-dir", default=settings.journal.directory, help="Journal directory")
+    parser.add_argument("--select", choices=("failed", "all"), default="failed", help="Events to replay")
+    parser.add_argument("--since", type=parse_time, help="Only events received at/after (unix or ISO-8601)")
+    parser.add_argument("--until", type=parse_time, help="Only events received before (unix or ISO-8601)")
+    parser.add_argument("--limit", type=int, help="Maximum number of events")
+    parser.add_argument("--rate", type=float, default=10.0, help="Events started per second (0 = unlimited)")
+    parser.add_argument("--concurrency", type=int, default=1, help="Events replayed concurrently")
+    parser.add_argument("--target", choices=("inprocess", "http"), default="inprocess")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{settings.api.port}", help="Server URL for --target http")
+    parser.add_argument("--no-mark", dest="mark", action="store_false", help="Do not record replay outcomes in the journal")
+    parser.add_argument("--list", action="store_true", help="List the selected events and exit")
+    args = parser.parse_args(argv)
+
+    events = select_events(args)
+    if args.list:
+        print_events(events)
+        return
+    if not events:
+        print(f"No {args.select} events in {args.journal_dir}")
+        return
+
+    print(f"Replaying {len(events)} {args.select} event(s) from {args.journal_dir} via {args.target}")
+    if args.target == "inprocess":
+        outcome = asyncio.run(replay_inprocess(events, args))
+    else:
+        # The server journals replayed bodies again as new events
+        outcome = asyncio.run(replay_http(events, args))
+    print(
+        f"replayed={outcome['replayed']} failed={outcome['failed']} "
+        f"elapsed={outcome['elapsed_s']}s rate={outcome['rate']}/s"
+    )
+
+
+if __name__ == "__main__":
+    main()
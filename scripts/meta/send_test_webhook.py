@@ -1,5 +1,7 @@
+import json
 import requests
 from src.core.config.settings import settings
+from src.modules.channels.meta.services.webhook.signature import SIGNATURE_HEADER, parse_secrets, sign
 import time
 
 
@@ -47,8 +49,12 @@ def build_payload() -> dict:
 
 def main() -> None:
     url = "http://localhost:8000/webhook"
-    payload = build_payload()
-    response = requests.post(url, json=payload)
+    body = json.dumps(build_payload()).encode()
+    headers = {"Content-Type": "application/json"}
+    secrets = parse_secrets(settings.meta.app_secret)
+    if secrets:
+        headers[SIGNATURE_HEADER] = sign(body, secrets[0])
+    response = requests.post(url, data=body, headers=headers)
     print("Status:", response.status_code)
     print("Response:", response.text)
 
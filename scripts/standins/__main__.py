@@ -0,0 +1,46 @@
+"""
+Run the Graph API and PostgREST stand-ins for offline development.
+
+Usage:
+    python -m scripts.standins [--env-file .env.standins]
+
+Writes the environment that points the app at the stand-ins to the env
+file, then serves until interrupted. Start the app with that environment:
+    env $(cat .env.standins | xargs) python -m src.main
+"""
+
+import argparse
+import signal
+import threading
+
+from scripts.standins.environment import app_environment, start_standins
+from scripts.standins.settings import StandinSettings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run local Graph API and PostgREST stand-ins")
+    parser.add_argument("--env-file", default=".env.standins", help="Where to write the app environment")
+    args = parser.parse_args()
+
+    standin_settings = StandinSettings()
+    graph, postgrest = start_standins(standin_settings)
+
+    env = app_environment(graph.url, postgrest.url)
+    with open(args.env_file, "w") as f:
+        f.writelines(f"{key}={value}\n" for key, value in env.items())
+
+    print(f"Graph API stand-in: {graph.url}")
+    print(f"PostgREST stand-in: {postgrest.url}")
+    print(f"App environment written to {args.env_file}")
+
+    stop = threading.Event()
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    stop.wait()
+
+    graph.stop()
+    postgrest.stop()
+
+
+if __name__ == "__main__":
+    main()
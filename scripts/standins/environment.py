@@ -0,0 +1,101 @@
+"""
+Fixtures and environment wiring that point the app at the stand-in servers.
+"""
+
+from typing import Any, Dict, List, Tuple
+
+from scripts.standins.graph_api import GraphStandinConfig, create_graph_app
+from scripts.standins.postgrest import PostgrestStandinConfig, create_postgrest_app
+from scripts.standins.server import StandinServer
+from scripts.standins.settings import StandinSettings
+from src.core.utils.phone import normalize_phone
+
+STANDIN_BUSINESS_ACCOUNT_ID = "100000000000001"
+STANDIN_PHONE_NUMBER_ID = "200000000000001"
+STANDIN_PHONE_NUMBER = "5511900000001"
+STANDIN_OWNER_ID = "01ARZ3NDEKTSV4RRFFQ69G5FAV"
+STANDIN_ACCESS_TOKEN = "standin-access-token"
+STANDIN_VERIFICATION_TOKEN = "standin-verification-token"
+STANDIN_APP_SECRET = "standin-app-secret"
+STANDIN_GRAPH_VERSION = "v21.0"
+# supabase-py only accepts JWT-shaped keys
+STANDIN_SUPABASE_KEY = "standin.supabase.key"
+
+
+def meta_account_rows() -> List[Dict[str, Any]]:
+    """Rows served by the PostgREST stand-in for `meta_accounts`."""
+    return [
+        {
+            "id": 1,
+            "name": "Stand-in Meta Account",
+            "meta_business_account_id": STANDIN_BUSINESS_ACCOUNT_ID,
+            "phone_number_id": STANDIN_PHONE_NUMBER_ID,
+            "phone_number": STANDIN_PHONE_NUMBER,
+            "phone_numbers": [STANDIN_PHONE_NUMBER],
+            "system_user_access_token": STANDIN_ACCESS_TOKEN,
+            "webhook_verification_token": STANDIN_VERIFICATION_TOKEN,
+            "owner_id": STANDIN_OWNER_ID,
+        }
+    ]
+
+
+def normalized_phone_numbers(row: Dict[str, Any]) -> List[str]:
+    """`meta_accounts.normalized_phone_numbers`, as computed by migrations/003."""
+    numbers = [row.get("phone_number"), *(row.get("phone_numbers") or [])]
+    return list(dict.fromkeys(n for n in map(normalize_phone, numbers) if n))
+
+
+def app_environment(graph_url: str, postgrest_url: str) -> Dict[str, str]:
+    """Environment variables that route the app's settings to the stand-ins."""
+    return {
+        "API_ENVIRONMENT": "staging",
+        "API_USE_FAKE_SENDER": "false",
+        "DATABASE_BACKEND": "supabase",
+        "SUPABASE_URL": postgrest_url,
+        "SUPABASE_KEY": STANDIN_SUPABASE_KEY,
+        "SUPABASE_SERVICE_KEY": STANDIN_SUPABASE_KEY,
+        "META_GRAPH_API_URL": graph_url,
+        "META_VERSION_API": STANDIN_GRAPH_VERSION,
+        "META_BEARER_TOKEN_ACCESS": STANDIN_ACCESS_TOKEN,
+        "META_VERIFICATION_TOKEN": STANDIN_VERIFICATION_TOKEN,
+        "META_APP_SECRET": STANDIN_APP_SECRET,
+        "META_PHONE_NUMBER_ID": STANDIN_PHONE_NUMBER_ID,
+        "META_PHONE_NUMBER": STANDIN_PHONE_NUMBER,
+        "META_BUSINESS_ACCOUNT_ID": STANDIN_BUSINESS_ACCOUNT_ID,
+    }
+
+
+def start_standins(
+    standin_settings: StandinSettings, ephemeral_ports: bool = False
+) -> Tuple[StandinServer, StandinServer]:
+    """Start the Graph API and PostgREST stand-ins configured by `standin_settings`."""
+    graph = StandinServer(
+        create_graph_app(
+            GraphStandinConfig(
+                latency_ms=standin_settings.graph_latency_ms,
+                jitter_ms=standin_settings.graph_jitter_ms,
+                error_rate=standin_settings.graph_error_rate,
+                throttle_rate=standin_settings.graph_throttle_rate,
+                retry_after_seconds=standin_settings.graph_retry_after_seconds,
+                media_size_bytes=standin_settings.graph_media_size_bytes,
+                seed=standin_settings.seed,
+            )
+        ),
+        host=standin_settings.host,
+        port=0 if ephemeral_ports else standin_settings.graph_port,
+    ).start()
+    postgrest = StandinServer(
+        create_postgrest_app(
+            PostgrestStandinConfig(
+                latency_ms=standin_settings.db_latency_ms,
+                jitter_ms=standin_settings.db_jitter_ms,
+                error_rate=standin_settings.db_error_rate,
+                seed=standin_settings.seed,
+                tables={"meta_accounts": meta_account_rows()},
+                generated_columns={"meta_accounts": {"normalized_phone_numbers": normalized_phone_numbers}},
+            )
+        ),
+        host=standin_settings.host,
+        port=0 if ephemeral_ports else standin_settings.postgrest_port,
+    ).start()
+    return graph, postgrest
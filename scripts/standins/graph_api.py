@@ -0,0 +1,159 @@
+"""
+Local stand-in for the Meta Graph API.
+
+Implements the endpoints the app uses:
+- POST /{version}/{phone_number_id}/messages
+- GET  /{version}/{media_id}          (media URL resolution)
+- GET  /_media/{media_id}             (media download)
+
+Latency, jitter, error rate, 429 throttling and media size are configurable
+so clients can be exercised against a slow or failing Graph API.
+"""
+
+import asyncio
+import itertools
+import random
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+MEDIA_CHUNK_SIZE = 64 * 1024
+
+
+@dataclass
+class GraphStandinConfig:
+    """Behaviour knobs for the Graph API stand-in."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    throttle_rate: float = 0.0
+    retry_after_seconds: int = 1
+    media_size_bytes: int = 1024
+    media_mime_type: str = "application/octet-stream"
+    require_auth: bool = True
+    seed: Optional[int] = None
+    # Most recent sent messages, kept for assertions in tests and benchmarks
+    sent: Deque[Dict[str, Any]] = field(default_factory=lambda: deque(maxlen=10_000))
+
+
+def _graph_error(status_code: int, message: str, code: int, headers: Dict[str, str] | None = None) -> JSONResponse:
+    """Error body in the Graph API format."""
+    return JSONResponse(
+        {
+            "error": {
+                "message": message,
+                "type": "OAuthException",
+                "code": code,
+                "fbtrace_id": "STANDIN",
+            }
+        },
+        status_code=status_code,
+        headers=headers,
+    )
+
+
+def create_graph_app(config: GraphStandinConfig | None = None) -> FastAPI:
+    config = config or GraphStandinConfig()
+    app = FastAPI(title="Graph API stand-in", openapi_url=None, docs_url=None, redoc_url=None)
+    app.state.config = config
+    rng = random.Random(config.seed)
+    sequence = itertools.count(1)
+    counters = {"requests": 0, "errors": 0, "throttled": 0, "sent": 0, "media_bytes": 0}
+    app.state.counters = counters
+
+    async def _delay() -> None:
+        delay = config.latency_ms
+        if config.jitter_ms:
+            delay += rng.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+
+    def _fault(request: Request) -> Optional[Response]:
+        """Return an injected failure response, or None to serve normally."""
+        counters["requests"] += 1
+        if config.require_auth and not request.headers.get("authorization", "").startswith("Bearer "):
+            counters["errors"] += 1
+            return _graph_error(401, "Invalid OAuth access token.", 190)
+        if config.throttle_rate and rng.random() < config.throttle_rate:
+            counters["throttled"] += 1
+            return _graph_error(
+                429,
+                "(#80007) Rate limit hit for WhatsApp Business Account",
+                80007,
+                headers={"Retry-After": str(config.retry_after_seconds)},
+            )
+        if config.error_rate and rng.random() < config.error_rate:
+            counters["errors"] += 1
+            return _graph_error(500, "An unexpected error has occurred. Please retry your request later.", 2)
+        return None
+
+    @app.get("/_standin/stats")
+    async def stats():
+        return counters
+
+    @app.get("/_media/{media_id}")
+    async def download_media(media_id: str, request: Request):
+        await _delay()
+        fault = _fault(request)
+        if fault is not None:
+            return fault
+
+        size = config.media_size_bytes
+        counters["media_bytes"] += size
+
+        async def body():
+            chunk = b"\0" * MEDIA_CHUNK_SIZE
+            remaining = size
+            while remaining > 0:
+                yield chunk[: min(remaining, MEDIA_CHUNK_SIZE)]
+                remaining -= MEDIA_CHUNK_SIZE
+
+        return StreamingResponse(
+            body(), media_type=config.media_mime_type, headers={"Content-Length": str(size)}
+        )
+
+    @app.post("/{version}/{phone_number_id}/messages")
+    async def send_message(version: str, phone_number_id: str, request: Request):
+        await _delay()
+        fault = _fault(request)
+        if fault is not None:
+            return fault
+
+        body = await request.json()
+        if body.get("messaging_product") != "whatsapp" or not body.get("to"):
+            return _graph_error(400, "(#100) Invalid parameter", 100)
+
+        wamid = f"wamid.STANDIN{next(sequence):012d}"
+        config.sent.append({"phone_number_id": phone_number_id, "id": wamid, "body": body})
+        counters["sent"] += 1
+        to = body["to"]
+        return {
+            "messaging_product": "whatsapp",
+            "contacts": [{"input": to, "wa_id": to}],
+            "messages": [{"id": wamid}],
+        }
+
+    @app.get("/{version}/{media_id}")
+    async def resolve_media(version: str, media_id: str, request: Request):
+        await _delay()
+        fault = _fault(request)
+        if fault is not None:
+            return fault
+        return {
+            "url": str(request.base_url).rstrip("/") + f"/_media/{media_id}",
+            "mime_type": config.media_mime_type,
+            "sha256": "0" * 64,
+            "file_size": config.media_size_bytes,
+            "id": media_id,
+            "messaging_product": "whatsapp",
+        }
+
+    @app.get("/")
+    async def root():
+        return {"status": "ok"}
+
+    return app
@@ -0,0 +1,340 @@
+"""
+Local PostgREST-compatible stand-in for Supabase.
+
+Serves `/rest/v1/{table}` backed by in-memory rows with the subset of the
+PostgREST protocol used by supabase-py / postgrest-py:
+
+- GET/HEAD with `select`, `limit`, `offset`, `order` and horizontal filters
+  (`eq`, `neq`, `gt`, `gte`, `lt`, `lte`, `like`, `ilike`, `in`, `is`),
+  plus `or=(...)` groups
+- `Prefer: count=exact|planned|estimated` with a `Content-Range` header
+- POST (insert, single row or bulk), PATCH (update), DELETE
+- `Prefer: return=minimal|representation`
+- generated columns (`GENERATED ALWAYS AS ... STORED`), recomputed on
+  insert and update
+"""
+
+import asyncio
+import fnmatch
+import itertools
+import json
+import random
+import re
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+
+@dataclass
+class PostgrestStandinConfig:
+    """Behaviour knobs for the PostgREST stand-in."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    seed: Optional[int] = None
+    tables: Dict[str, List[Dict[str, Any]]] = field(default_factory=dict)
+    # table -> column -> function of the row
+    generated_columns: Dict[str, Dict[str, Callable[[Dict[str, Any]], Any]]] = field(default_factory=dict)
+
+
+RESERVED_PARAMS = {"select", "limit", "offset", "order", "columns", "on_conflict"}
+
+
+def _coerce(raw: str, sample: Any) -> Any:
+    """Coerce a filter literal to the type of the stored value for comparisons."""
+    if isinstance(sample, bool):
+        return raw.lower() == "true"
+    if isinstance(sample, int):
+        try:
+            return int(raw)
+        except ValueError:
+            return raw
+    if isinstance(sample, float):
+        try:
+            return float(raw)
+        except ValueError:
+            return raw
+    return raw
+
+
+def _split_list(raw: str) -> List[str]:
+    inner = raw[1:-1] if raw.startswith("(") and raw.endswith(")") else raw
+    return [item.strip().strip('"') for item in inner.split(",") if item.strip()]
+
+
+def _unquote(raw: str) -> str:
+    """A double-quoted PostgREST value (`"a,b"`, with `\\` escapes) as plain text."""
+    if len(raw) < 2 or not (raw.startswith('"') and raw.endswith('"')):
+        return raw
+    return re.sub(r"\\(.)", r"\1", raw[1:-1])
+
+
+def _compile_condition(column: str, expression: str) -> Callable[[Dict[str, Any]], bool]:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, raw = expression.partition(".")
+    raw = _unquote(raw)
+
+    def check(row: Dict[str, Any]) -> bool:
+        value = row.get(column)
+        if op == "is":
+            if raw == "null":
+                return value is None
+            return str(value).lower() == raw
+        if op == "in":
+            return str(value) in _split_list(raw)
+        if value is None:
+            return False
+        if op == "eq":
+            return str(value) == raw
+        if op == "neq":
+            return str(value) != raw
+        if op in ("like", "ilike"):
+            pattern = raw.replace("%", "*")
+            if op == "ilike":
+                return fnmatch.fnmatch(str(value).lower(), pattern.lower())
+            return fnmatch.fnmatchcase(str(value), pattern)
+        if op == "cs":
+            # JSON containment for array columns, e.g. phone_numbers=cs.["5511..."]
+            try:
+                wanted = json.loads(raw)
+            except json.JSONDecodeError:
+                wanted = _split_list(raw.replace("{", "(").replace("}", ")"))
+            return isinstance(value, list) and all(w in value for w in wanted)
+        literal = _coerce(raw, value)
+        try:
+            if op == "gt":
+                return value > literal
+            if op == "gte":
+                return value >= literal
+            if op == "lt":
+                return value < literal
+            if op == "lte":
+                return value <= literal
+        except TypeError:
+            return False
+        # Unknown operators don't filter; the stand-in favours availability
+        return True
+
+    return (lambda row: not check(row)) if negate else check
+
+
+def _split_top_level(raw: str) -> List[str]:
+    parts, depth, current = [], 0, []
+    quoted = escaped = False
+    for char in raw:
+        if escaped:
+            escaped = False
+        elif quoted and char == "\\":
+            escaped = True
+        elif char == '"':
+            quoted = not quoted
+        elif quoted:
+            pass
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0 and not quoted:
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _compile_group(raw: str, combine_any: bool) -> Callable[[Dict[str, Any]], bool]:
+    """Compile an `or=(a.eq.1,and(b.gt.2,c.lt.3))` style group."""
+    inner = raw[1:-1] if raw.startswith("(") else raw
+    checks = []
+    for part in _split_top_level(inner):
+        if part.startswith("and(") or part.startswith("or("):
+            name, _, rest = part.partition("(")
+            checks.append(_compile_group("(" + rest, combine_any=name == "or"))
+        else:
+            column, _, expression = part.partition(".")
+            checks.append(_compile_condition(column, expression))
+    if combine_any:
+        return lambda row: any(check(row) for check in checks)
+    return lambda row: all(check(row) for check in checks)
+
+
+def _row_filter(params) -> Callable[[Dict[str, Any]], bool]:
+    checks = []
+    for column, expression in params.multi_items():
+        if column in RESERVED_PARAMS:
+            continue
+        if column in ("or", "and"):
+            checks.append(_compile_group(expression, combine_any=column == "or"))
+        else:
+            checks.append(_compile_condition(column, expression))
+    return lambda row: all(check(row) for check in checks)
+
+
+def _order(rows: List[Dict[str, Any]], order: Optional[str]) -> List[Dict[str, Any]]:
+    if not order:
+        return rows
+    for term in reversed(order.split(",")):
+        column, *modifiers = term.split(".")
+        descending = "desc" in modifiers
+        rows = sorted(
+            rows,
+            key=lambda r: (r.get(column) is None, r.get(column) if r.get(column) is not None else 0),
+            reverse=descending,
+        )
+    return rows
+
+
+def _project(row: Dict[str, Any], select: str) -> Dict[str, Any]:
+    if not select or select == "*":
+        return dict(row)
+    columns = [c.strip() for c in select.split(",")]
+    return {c: row.get(c) for c in columns}
+
+
+def _prefer(request: Request) -> Dict[str, str]:
+    prefs = {}
+    for item in request.headers.get("prefer", "").split(","):
+        key, _, value = item.strip().partition("=")
+        if key:
+            prefs[key] = value
+    return prefs
+
+
+def _postgrest_error(status_code: int, message: str, code: str = "PGRST000") -> JSONResponse:
+    return JSONResponse(
+        {"code": code, "details": None, "hint": None, "message": message}, status_code=status_code
+    )
+
+
+def create_postgrest_app(config: PostgrestStandinConfig | None = None) -> FastAPI:
+    config = config or PostgrestStandinConfig()
+    app = FastAPI(title="PostgREST stand-in", openapi_url=None, docs_url=None, redoc_url=None)
+    app.state.config = config
+    rng = random.Random(config.seed)
+    id_sequences: Dict[str, itertools.count] = {}
+
+    def _generate(table: str, row: Dict[str, Any]) -> None:
+        for column, compute in config.generated_columns.get(table, {}).items():
+            row[column] = compute(row)
+
+    for table, rows in config.tables.items():
+        for row in rows:
+            _generate(table, row)
+    counters = {"requests": 0, "errors": 0}
+    app.state.counters = counters
+
+    def _sequence(table: str) -> itertools.count:
+        if table not in id_sequences:
+            rows = config.tables.get(table, [])
+            start = max((r.get("id") for r in rows if isinstance(r.get("id"), int)), default=0) + 1
+            id_sequences[table] = itertools.count(start)
+        return id_sequences[table]
+
+    async def _before_request() -> Optional[Response]:
+        counters["requests"] += 1
+        delay = config.latency_ms
+        if config.jitter_ms:
+            delay += rng.uniform(-config.jitter_ms, config.jitter_ms)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000.0)
+        if config.error_rate and rng.random() < config.error_rate:
+            counters["errors"] += 1
+            return _postgrest_error(503, "Database client error. Retrying the connection.", "PGRST001")
+        return None
+
+    def _select(table: str, request: Request) -> Tuple[List[Dict[str, Any]], int, int]:
+        params = request.query_params
+        row_filter = _row_filter(params)
+        matches = [r for r in config.tables.get(table, []) if row_filter(r)]
+        matches = _order(matches, params.get("order"))
+        offset = int(params.get("offset", 0))
+        limit = params.get("limit")
+        page = matches[offset:offset + int(limit)] if limit else matches[offset:]
+        return page, offset, len(matches)
+
+    def _content_range(offset: int, returned: int, total: Optional[int]) -> str:
+        end = f"{offset}-{offset + returned - 1}" if returned else "*"
+        return f"{end}/{total if total is not None else '*'}"
+
+    @app.api_route("/rest/v1/{table}", methods=["GET", "HEAD"])
+    async def select_rows(table: str, request: Request):
+        fault = await _before_request()
+        if fault is not None:
+            return fault
+
+        page, offset, total = _select(table, request)
+        prefs = _prefer(request)
+        headers = {"Content-Range": _content_range(offset, len(page), total if "count" in prefs else None)}
+        if request.method == "HEAD":
+            return Response(status_code=200, headers=headers)
+        select = request.query_params.get("select", "*")
+        return JSONResponse([_project(r, select) for r in page], headers=headers)
+
+    @app.post("/rest/v1/{table}")
+    async def insert_rows(table: str, request: Request):
+        fault = await _before_request()
+        if fault is not None:
+            return fault
+
+        body = await request.json()
+        rows = body if isinstance(body, list) else [body]
+        stored = config.tables.setdefault(table, [])
+        now = datetime.now(timezone.utc).isoformat()
+        created = []
+        for row in rows:
+            record = {"id": next(_sequence(table)), "created_at": now, "updated_at": now, **row}
+            _generate(table, record)
+            stored.append(record)
+            created.append(record)
+
+        if _prefer(request).get("return") == "minimal":
+            return Response(status_code=201)
+        return JSONResponse(created, status_code=201)
+
+    @app.patch("/rest/v1/{table}")
+    async def update_rows(table: str, request: Request):
+        fault = await _before_request()
+        if fault is not None:
+            return fault
+
+        changes = await request.json()
+        row_filter = _row_filter(request.query_params)
+        matches = [r for r in config.tables.get(table, []) if row_filter(r)]
+        now = datetime.now(timezone.utc).isoformat()
+        for row in matches:
+            row.update(changes)
+            row["updated_at"] = now
+            _generate(table, row)
+
+        if _prefer(request).get("return") == "minimal":
+            return Response(status_code=204)
+        return JSONResponse(matches)
+
+    @app.delete("/rest/v1/{table}")
+    async def delete_rows(table: str, request: Request):
+        fault = await _before_request()
+        if fault is not None:
+            return fault
+
+        row_filter = _row_filter(request.query_params)
+        rows = config.tables.get(table, [])
+        deleted = [r for r in rows if row_filter(r)]
+        config.tables[table] = [r for r in rows if not row_filter(r)]
+
+        if _prefer(request).get("return") == "minimal":
+            return Response(status_code=204)
+        return JSONResponse(deleted)
+
+    @app.get("/_standin/stats")
+    async def stats():
+        return {**counters, "tables": {name: len(rows) for name, rows in config.tables.items()}}
+
+    return app
@@ -0,0 +1,40 @@
+"""
+Stand-in server settings.
+
+Read from `STANDIN_*` environment variables (or `.env`) so the app, tests and
+benchmarks share one configuration for offline runs.
+"""
+
+from typing import Optional
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class StandinSettings(BaseSettings):
+    """Local Graph API / PostgREST stand-in settings."""
+
+    host: str = Field(default="127.0.0.1", description="Interface the stand-ins bind to")
+    graph_port: int = Field(default=8701, description="Graph API stand-in port")
+    postgrest_port: int = Field(default=8702, description="PostgREST stand-in port")
+
+    graph_latency_ms: float = Field(default=0.0, description="Graph API injected latency (ms)")
+    graph_jitter_ms: float = Field(default=0.0, description="Graph API latency jitter (ms)")
+    graph_error_rate: float = Field(default=0.0, description="Fraction of Graph API calls failing with 500")
+    graph_throttle_rate: float = Field(default=0.0, description="Fraction of Graph API calls throttled with 429")
+    graph_retry_after_seconds: int = Field(default=1, description="Retry-After sent with 429 responses")
+    graph_media_size_bytes: int = Field(default=1024, description="Size of downloaded media bodies")
+
+    db_latency_ms: float = Field(default=0.0, description="PostgREST injected latency (ms)")
+    db_jitter_ms: float = Field(default=0.0, description="PostgREST latency jitter (ms)")
+    db_error_rate: float = Field(default=0.0, description="Fraction of PostgREST calls failing with 503")
+
+    seed: Optional[int] = Field(default=None, description="Random seed for fault injection")
+
+    model_config = SettingsConfigDict(
+        env_prefix="STANDIN_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
@@ -0,0 +1,259 @@
+"""
+Cross-worker cache invalidation bus.
+
+Every worker keeps its own in-memory caches; when shared state changes
+(e.g. a Meta account is updated) the change is published on the bus and
+every worker drops the affected keys.
+
+Backends:
+- `local`: in-process only (single worker)
+- `unix`: one Unix datagram socket per worker in a shared directory; a
+  publish is a non-blocking `sendto` to each peer socket, no broker needed
+- `package.module:ClassName`: any `InvalidationBus` implementation (e.g. a
+  Redis pub/sub bus), built with `from_settings()` when available
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import socket
+import tempfile
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, DefaultDict, Iterable, List, Optional
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Handler called with the invalidated keys of a topic
+InvalidationHandler = Callable[[List[str]], None]
+
+# Key that invalidates every entry of a topic
+INVALIDATE_ALL = "*"
+
+# Datagrams above this size are split; well under the Linux default limit
+MAX_DATAGRAM_BYTES = 8192
+
+
+class InvalidationBus(ABC):
+    """Publish/subscribe channel for cache invalidations between workers."""
+
+    def __init__(self):
+        self._handlers: DefaultDict[str, List[InvalidationHandler]] = defaultdict(list)
+
+    def subscribe(self, topic: str, handler: InvalidationHandler) -> None:
+        """Call `handler(keys)` whenever keys of `topic` are invalidated (locally or remotely)."""
+        self._handlers[topic].append(handler)
+
+    async def publish(self, topic: str, *keys: str) -> None:
+        """Invalidate `keys` of `topic` in this worker and broadcast to the others."""
+        if not keys:
+            return
+        self._dispatch(topic, list(keys))
+        metrics.inc("cache.invalidation.published", topic=topic)
+        await self._broadcast(topic, list(keys))
+
+    def _dispatch(self, topic: str, keys: List[str]) -> None:
+        for handler in self._handlers.get(topic, ()):
+            try:
+                handler(keys)
+            except Exception as e:
+                logger.error("Invalidation handler failed", topic=topic, error=str(e))
+
+    @abstractmethod
+    async def _broadcast(self, topic: str, keys: List[str]) -> None:
+        """Deliver an invalidation to the other workers."""
+
+    async def start(self) -> None:
+        """Start receiving invalidations from other workers."""
+
+    async def stop(self) -> None:
+        """Stop receiving invalidations and release resources."""
+
+
+class LocalInvalidationBus(InvalidationBus):
+    """In-process bus for single-worker deployments."""
+
+    async def _broadcast(self, topic: str, keys: List[str]) -> None:
+        return None
+
+
+def _encode(topic: str, keys: List[str], origin: int) -> Iterable[bytes]:
+    """Encode an invalidation, splitting the key list to fit datagrams."""
+    batch: List[str] = []
+    size = 0
+    for key in keys:
+        if batch and size + len(key) + 4 > MAX_DATAGRAM_BYTES - len(topic) - 64:
+            yield json.dumps({"t": topic, "k": batch, "o": origin}).encode()
+            batch, size = [], 0
+        batch.append(key)
+        size += len(key) + 4
+    if batch:
+        yield json.dumps({"t": topic, "k": batch, "o": origin}).encode()
+
+
+class UnixSocketInvalidationBus(InvalidationBus):
+    """
+    Broker-less bus over Unix datagram sockets.
+
+    Each worker binds `<directory>/<pid>.sock` and publishes by sending one
+    datagram to every other socket in the directory. Sockets left behind by
+    dead workers are removed on the first failed send. Datagrams are
+    dropped (and counted) if a peer's receive buffer is full; cache TTLs
+    bound staleness in that case.
+    """
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = directory
+        self.path = os.path.join(directory, f"{os.getpid()}.sock")
+        self._socket: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @classmethod
+    def from_settings(cls) -> "UnixSocketInvalidationBus":
+        directory = settings.cache.invalidation_socket_dir or os.path.join(
+            tempfile.gettempdir(), f"owner-api-invalidation-{settings.api.port}"
+        )
+        return cls(directory)
+
+    async def start(self) -> None:
+        if self._socket is not None:
+            return
+        os.makedirs(self.directory, mode=0o700, exist_ok=True)
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+        sock.bind(self.path)
+        self._socket = sock
+        self._loop = asyncio.get_running_loop()
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+        logger.info("Invalidation bus listening", path=self.path)
+
+    async def stop(self) -> None:
+        if self._socket is None:
+            return
+        self._loop.remove_reader(self._socket.fileno())
+        self._socket.close()
+        self._socket = None
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def peers(self) -> List[str]:
+        return [path for path in socket_paths(self.directory) if path != self.path]
+
+    def _on_readable(self) -> None:
+        while True:
+            try:
+                data = self._socket.recv(MAX_DATAGRAM_BYTES)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                logger.error("Invalidation bus receive failed", error=str(e))
+                return
+            try:
+                message = json.loads(data)
+                topic, keys = message["t"], message["k"]
+            except (ValueError, KeyError, TypeError):
+                metrics.inc("cache.invalidation.malformed")
+                continue
+            metrics.inc("cache.invalidation.received", topic=topic)
+            self._dispatch(topic, keys)
+
+    async def _broadcast(self, topic: str, keys: List[str]) -> None:
+        send(self.peers(), topic, keys, sock=self._socket)
+
+
+def socket_paths(directory: str) -> List[str]:
+    """Sockets of every worker bound in `directory`."""
+    try:
+        entries = os.scandir(directory)
+    except FileNotFoundError:
+        return []
+    with entries:
+        return [e.path for e in entries if e.name.endswith(".sock")]
+
+
+def send(paths: Iterable[str], topic: str, keys: List[str], sock: Optional[socket.socket] = None) -> int:
+    """
+    Send an invalidation datagram to each socket in `paths`.
+
+    Usable outside the application (scripts, admin tools) with a throwaway
+    socket. Returns the number of peers reached.
+    """
+    own = sock is None
+    if own:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.setblocking(False)
+    delivered = 0
+    try:
+        datagrams = list(_encode(topic, keys, os.getpid()))
+        for path in paths:
+            try:
+                for datagram in datagrams:
+                    sock.sendto(datagram, path)
+                delivered += 1
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Peer is gone: remove its stale socket file
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            except (BlockingIOError, InterruptedError):
+                metrics.inc("cache.invalidation.dropped", topic=topic)
+    finally:
+        if own:
+            sock.close()
+    return delivered
+
+
+def broadcast(topic: str, *keys: str, directory: Optional[str] = None) -> int:
+    """Publish an invalidation to every running worker from outside the app."""
+    if directory is None:
+        directory = UnixSocketInvalidationBus.from_settings().directory
+    return send(socket_paths(directory), topic, list(keys))
+
+
+def _import_backend(path: str) -> type:
+    module_name, _, class_name = path.partition(":")
+    if not class_name:
+        raise ValueError(f"Invalidation backend must be 'package.module:ClassName', got {path!r}")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_invalidation_bus() -> InvalidationBus:
+    """Build the invalidation bus selected by `CACHE_INVALIDATION_BACKEND`."""
+    backend = settings.cache.invalidation_backend
+    if backend == "auto":
+        backend = "unix" if settings.api.workers > 1 else "local"
+
+    if backend == "local":
+        return LocalInvalidationBus()
+    if backend == "unix":
+        return UnixSocketInvalidationBus.from_settings()
+
+    bus_cls = _import_backend(backend)
+    if hasattr(bus_cls, "from_settings"):
+        return bus_cls.from_settings()
+    return bus_cls()
+
+
+async def invalidation_bus_resource(bus: InvalidationBus):
+    """
+    DI resource driving the invalidation bus lifecycle.
+
+    Started by `container.init_resources()` and stopped by
+    `container.shutdown_resources()`.
+    """
+    await bus.start()
+    try:
+        yield bus
+    finally:
+        await bus.stop()
@@ -0,0 +1,118 @@
+"""
+In-memory TTL cache.
+
+Per-process (shared-nothing) cache with expiry and LRU eviction. Entries
+are dropped across workers through the invalidation bus
+(`src.core.cache.invalidation`); the TTL bounds staleness if an
+invalidation message is ever lost.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Generic, Hashable, Optional, Tuple, TypeVar
+
+from src.core.observability.metrics import MetricsRegistry, metrics
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Bounded cache whose entries expire `ttl` seconds after being stored.
+
+    `version` is bumped by every invalidation: a value loaded before an
+    invalidation is discarded by `set(..., version=...)` instead of
+    re-populating the cache with stale data.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int = 10000,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.version = 0
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale_writes": 0,
+        }
+        registry.register_collector(f"cache.{name}", self.stats)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._counters["expired"] += 1
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return value
+
+    def set(self, key: Hashable, value: V, version: Optional[int] = None) -> bool:
+        """
+        Store `value` under `key`.
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            version: `self.version` read before loading the value; the write
+                     is dropped if an invalidation happened since
+
+        Returns:
+            True if the value was stored
+        """
+        with self._lock:
+            if version is not None and version != self.version:
+                self._counters["stale_writes"] += 1
+                return False
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+            return True
+
+    def invalidate(self, *keys: Hashable) -> None:
+        """Drop `keys` from the cache."""
+        with self._lock:
+            self.version += 1
+            for key in keys:
+                if self._entries.pop(key, None) is not None:
+                    self._counters["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self.version += 1
+            self._counters["invalidations"] += len(self._entries)
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["hits"] + self._counters["misses"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            **self._counters,
+            "hit_ratio": round(self._counters["hits"] / lookups, 4) if lookups else None,
+        }
@@ -0,0 +1,238 @@
+"""
+Adaptive concurrency limiter.
+
+Admission control for request handlers: the number of requests allowed in
+flight is adjusted from the latency they actually observe, so when a
+downstream dependency slows down the limit shrinks and the excess is shed
+up front instead of piling up in memory and latency.
+
+Algorithms:
+- `gradient`: compares the latency of recent requests with a baseline (the
+  latency without queueing) kept per kind of request; the limit shrinks in
+  proportion as latency rises above the baseline times `tolerance` and
+  grows by a small headroom otherwise (after Netflix's Gradient2 limiter)
+- `aimd`: additive increase while latency stays under `latency_threshold`,
+  multiplicative decrease (`backoff_ratio`) on a slow or failed request
+
+Requests carry a priority. Low-priority requests are only admitted while
+the in-flight count is under `low_priority_share` of the limit, so they are
+shed first and always leave room for high-priority ones.
+"""
+
+import enum
+import math
+import time
+from typing import Any, Dict, List, Optional
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+ALGORITHMS = ("gradient", "aimd")
+
+# Distinct request kinds with their own latency baseline (others share one)
+MAX_KINDS = 32
+
+
+class Priority(enum.IntEnum):
+    LOW = 0
+    HIGH = 1
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    Non-blocking admission gate: `try_acquire()` admits or sheds at once.
+
+    Every admitted request must call `release(latency)` exactly once; pass
+    None as latency for requests that say nothing about downstream health
+    (e.g. rejected as invalid). Meant to be used from the event loop only.
+    """
+
+    def __init__(
+        self,
+        algorithm: str = "gradient",
+        initial_limit: int = 64,
+        min_limit: int = 8,
+        max_limit: int = 512,
+        low_priority_share: float = 0.5,
+        tolerance: float = 2.0,
+        smoothing: float = 0.2,
+        latency_threshold: float = 1.0,
+        latency_floor: float = 0.02,
+        backoff_ratio: float = 0.9,
+        short_window: int = 10,
+        baseline_window: float = 60.0,
+        name: str = "admission",
+        registry: MetricsRegistry = metrics,
+    ):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown limiter algorithm {algorithm!r} (expected one of {', '.join(ALGORITHMS)})")
+        self.algorithm = algorithm
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.low_priority_share = min(1.0, max(0.0, low_priority_share))
+        self.tolerance = max(1.0, tolerance)
+        self.smoothing = smoothing
+        self.latency_threshold = latency_threshold
+        self.latency_floor = max(0.0, latency_floor)
+        self.backoff_ratio = backoff_ratio
+        self.name = name
+        self.registry = registry
+        self._limit = float(min(self.max_limit, max(self.min_limit, initial_limit)))
+        self._short_alpha = 2.0 / (short_window + 1)
+        self.baseline_window = max(1e-3, baseline_window)
+        # Per kind: [baseline latency, last update (monotonic)]
+        self._baselines: Dict[str, List[float]] = {}
+        # Smoothed latency / baseline ratio of recent requests
+        self._ratio: Optional[float] = None
+        self._shed_pending = False
+        self._in_flight = 0
+        # Exponentially weighted share of recent requests that were shed
+        self._shed_rate = 0.0
+        self._counters: Dict[str, int] = {"admitted": 0, "shed_low": 0, "shed_high": 0, "dropped": 0}
+
+    @classmethod
+    def from_settings(cls, name: str = "admission") -> "AdaptiveConcurrencyLimiter":
+        api = settings.api
+        return cls(
+            algorithm=api.admission_algorithm,
+            initial_limit=api.admission_initial_limit,
+            min_limit=api.admission_min_limit,
+            max_limit=api.admission_max_limit,
+            low_priority_share=api.admission_low_priority_share,
+            tolerance=api.admission_latency_tolerance,
+            latency_threshold=api.admission_latency_threshold_ms / 1000.0,
+            name=name,
+        )
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    # Admission
+
+    def try_acquire(self, priority: Priority = Priority.HIGH) -> bool:
+        """Admit a request now or shed it (never waits)."""
+        limit = self._limit if priority is Priority.HIGH else self._limit * self.low_priority_share
+        if self._in_flight < max(1, int(limit)):
+            self._in_flight += 1
+            self._counters["admitted"] += 1
+            self._shed_rate *= 0.98
+            return True
+        self._counters["shed_high" if priority is Priority.HIGH else "shed_low"] += 1
+        self._shed_pending = True
+        self._shed_rate = self._shed_rate * 0.98 + 0.02
+        self.registry.inc(f"{self.name}.shed", priority=priority.name.lower())
+        return False
+
+    def release(self, latency: Optional[float], kind: str = "", dropped: bool = False) -> None:
+        """
+        Finish an admitted request and feed its outcome to the limit.
+
+        Args:
+            latency: Time the request took in seconds (None: not a sample)
+            kind: Class of work (e.g. the message type); latency is judged
+                  against the baseline of its own kind, so slow-by-nature
+                  requests are not mistaken for congestion
+            dropped: The request failed because of a downstream timeout or
+                     overload (treated as a congestion signal)
+        """
+        in_flight = self._in_flight
+        self._in_flight = in_flight - 1
+        if dropped:
+            self._counters["dropped"] += 1
+            self._set_limit(self._limit * self.backoff_ratio)
+            return
+        if latency is None:
+            return
+        # App-limited: with few requests in flight and none shed, latency
+        # says nothing about how far the limit could go
+        saturated = self._shed_pending or in_flight * 2 >= self._limit
+        self._shed_pending = False
+        if self.algorithm == "aimd":
+            self._update_aimd(latency, saturated)
+        else:
+            self._update_gradient(latency, kind, saturated)
+
+    # Limit algorithms
+
+    def _update_aimd(self, latency: float, saturated: bool) -> None:
+        if latency > self.latency_threshold:
+            self._set_limit(self._limit * self.backoff_ratio)
+        elif saturated:
+            self._set_limit(self._limit + 1.0 / math.sqrt(self._limit))
+
+    def _update_gradient(self, latency: float, kind: str, saturated: bool) -> None:
+        now = time.monotonic()
+        if kind not in self._baselines and len(self._baselines) >= MAX_KINDS:
+            kind = "*"
+        baseline = self._baselines.get(kind)
+        if baseline is None:
+            self._baselines[kind] = [latency, now]
+            return
+
+        # The baseline of a kind follows latency down quickly but up only
+        # over `baseline_window` seconds: queueing caused by a too-high limit
+        # is corrected before it becomes the new normal, while a downstream
+        # that got slower for good is eventually accepted as the baseline
+        rtt, updated_at = baseline
+        if latency <= rtt:
+            rtt += (latency - rtt) * 0.5
+        else:
+            rtt += (latency - rtt) * min(1.0, (now - updated_at) / self.baseline_window)
+        baseline[0], baseline[1] = max(rtt, 1e-6), now
+
+        # Latency relative to the baseline, smoothed over the last requests of
+        # every kind. Both are padded by `latency_floor` (scheduling jitter on
+        # a millisecond request is not congestion) and one outlier can move
+        # the average by a bounded amount only
+        ratio = min((latency + self.latency_floor) / (baseline[0] + self.latency_floor), 4.0 * self.tolerance)
+        self._ratio = ratio if self._ratio is None else self._ratio + self._short_alpha * (ratio - self._ratio)
+        gradient = max(0.5, min(1.0, self.tolerance / self._ratio))
+        if gradient >= 1.0 and not saturated:
+            return
+        target = self._limit * gradient + math.sqrt(self._limit)
+        self._set_limit(self._limit * (1.0 - self.smoothing) + target * self.smoothing)
+
+    def _set_limit(self, limit: float) -> None:
+        previous = int(self._limit)
+        self._limit = min(float(self.max_limit), max(float(self.min_limit), limit))
+        if int(self._limit) != previous:
+            self.registry.set_gauge(f"{self.name}.limit", int(self._limit))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "algorithm": self.algorithm,
+            "limit": int(self._limit),
+            "low_priority_limit": max(1, int(self._limit * self.low_priority_share)),
+            "in_flight": self._in_flight,
+            "shed_rate": round(self._shed_rate, 4),
+            "latency_ratio": round(self._ratio, 3) if self._ratio is not None else None,
+            "baseline_ms": {kind: round(rtt * 1000.0, 2) for kind, (rtt, _) in self._baselines.items()},
+            **self._counters,
+        }
+
+
+def create_admission_limiter() -> Optional[AdaptiveConcurrencyLimiter]:
+    """Webhook admission limiter configured by `API_ADMISSION_*`, or None when disabled."""
+    if not settings.api.admission_control:
+        return None
+    return AdaptiveConcurrencyLimiter.from_settings(name="webhook.admission")
+
+
+async def admission_limiter_resource(limiter: Optional[AdaptiveConcurrencyLimiter]):
+    """DI resource exposing the limiter's state on `/metrics` while the app runs."""
+    if limiter is None:
+        yield None
+        return
+    limiter.registry.register_collector(limiter.name, limiter.stats)
+    try:
+        yield limiter
+    finally:
+        limiter.registry.unregister_collector(limiter.name)
@@ -0,0 +1,269 @@
+"""
+Per-owner bulkheads.
+
+Isolates tenants sharing one process: each owner gets a bounded
+concurrency budget and a bounded queue, and the shared capacity is handed
+out across owners by weighted fair queuing (start-time fair queuing: every
+job started advances its owner's virtual time by 1/weight and the waiting
+owner with the lowest virtual time goes next). An owner bursting with
+work therefore waits behind its own queue instead of everyone else's.
+
+Overflow policies, applied when an owner's queue is full:
+- `reject`: the new job is rejected
+- `drop_oldest`: the oldest queued job of that owner is rejected and the
+  new one is queued (fresh work wins, e.g. for chat replies)
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Mapping, Optional, Tuple, TypeVar
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+
+T = TypeVar("T")
+
+OVERFLOW_POLICIES = ("reject", "drop_oldest")
+
+# Owners listed individually by `stats()` (the busiest ones)
+STATS_TOP_OWNERS = 20
+
+
+class BulkheadRejected(Exception):
+    """A job was refused because its owner's queue was full."""
+
+    def __init__(self, name: str, owner_id: str):
+        super().__init__(f"{name}: queue of owner {owner_id} is full")
+        self.name = name
+        self.owner_id = owner_id
+
+
+def parse_weights(value: Optional[str]) -> Dict[str, float]:
+    """Parse `owner=weight,owner=weight` (invalid or non-positive entries are ignored)."""
+    weights: Dict[str, float] = {}
+    for item in (value or "").split(","):
+        owner_id, _, weight = item.partition("=")
+        try:
+            parsed = float(weight)
+        except ValueError:
+            continue
+        if owner_id.strip() and parsed > 0:
+            weights[owner_id.strip()] = parsed
+    return weights
+
+
+class _Owner:
+    __slots__ = ("weight", "in_flight", "waiters", "vtime", "scheduled", "admitted", "rejected")
+
+    def __init__(self, weight: float, vtime: float):
+        self.weight = weight
+        self.in_flight = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+        self.vtime = vtime
+        self.scheduled = False
+        self.admitted = 0
+        self.rejected = 0
+
+
+class OwnerBulkheads:
+    """
+    Weighted fair admission of jobs keyed by owner.
+
+    `run(owner_id, fn)` runs `fn` once both a slot of the shared `capacity`
+    and one of the owner's `owner_concurrency` slots are free. Owners with
+    no work in flight or queued are forgotten. Meant to be used from the
+    event loop only.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 64,
+        owner_concurrency: int = 16,
+        owner_queue: int = 256,
+        overflow_policy: str = "reject",
+        weights: Optional[Mapping[str, float]] = None,
+        name: str = "bulkhead",
+        registry: MetricsRegistry = metrics,
+    ):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy {overflow_policy!r} (expected one of {', '.join(OVERFLOW_POLICIES)})"
+            )
+        self.capacity = max(1, capacity)
+        self.owner_concurrency = max(1, min(owner_concurrency, self.capacity))
+        self.owner_queue = max(0, owner_queue)
+        self.overflow_policy = overflow_policy
+        self.weights = dict(weights or {})
+        self.name = name
+        self.registry = registry
+        self._owners: Dict[str, _Owner] = {}
+        # Owners with queued jobs and a free slot of their own, by virtual time
+        self._ready: List[Tuple[float, int, str, _Owner]] = []
+        self._sequence = itertools.count()
+        self._vtime = 0.0
+        self._in_flight = 0
+        self._counters: Dict[str, int] = {"admitted": 0, "queued": 0, "rejected": 0}
+
+    async def run(self, owner_id: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` within the budget of `owner_id` and return its result.
+
+        Raises:
+            BulkheadRejected: The owner's queue is full (or, with
+                `drop_oldest`, this job was the oldest queued one)
+        """
+        await self.acquire(owner_id)
+        try:
+            return await fn()
+        finally:
+            self.release(owner_id)
+
+    async def acquire(self, owner_id: str) -> None:
+        """Take a slot for `owner_id` (waits in its queue); pair with `release()`."""
+        owner = self._owners.get(owner_id)
+        if owner is None:
+            owner = self._owners[owner_id] = _Owner(self.weights.get(owner_id, 1.0), self._vtime)
+        # Fast path: queued jobs of other owners only exist while the shared
+        # capacity is exhausted
+        if not owner.waiters and owner.in_flight < self.owner_concurrency and self._in_flight < self.capacity:
+            self._start(owner)
+            return
+
+        if len(owner.waiters) >= self.owner_queue:
+            if self.overflow_policy == "reject" or not owner.waiters:
+                self._reject(owner_id, owner)
+                self._forget_if_idle(owner_id, owner)
+                raise BulkheadRejected(self.name, owner_id)
+            oldest = owner.waiters.popleft()
+            if not oldest.done():
+                self._reject(owner_id, owner)
+                oldest.set_exception(BulkheadRejected(self.name, owner_id))
+
+        future = asyncio.get_running_loop().create_future()
+        owner.waiters.append(future)
+        self._counters["queued"] += 1
+        self._schedule(owner_id, owner)
+        queued_at = time.perf_counter()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                # The slot was granted as the caller went away
+                self.release(owner_id)
+            else:
+                if future in owner.waiters:
+                    owner.waiters.remove(future)
+                self._forget_if_idle(owner_id, owner)
+            raise
+        except BulkheadRejected:
+            self._forget_if_idle(owner_id, owner)
+            raise
+        self.registry.observe(f"{self.name}.queue_wait_ms", (time.perf_counter() - queued_at) * 1000.0)
+
+    def release(self, owner_id: str) -> None:
+        owner = self._owners.get(owner_id)
+        if owner is None:
+            return
+        owner.in_flight -= 1
+        self._in_flight -= 1
+        self._schedule(owner_id, owner)
+        self._dispatch()
+        self._forget_if_idle(owner_id, owner)
+
+    # Scheduling
+
+    def _start(self, owner: _Owner) -> None:
+        start = max(owner.vtime, self._vtime)
+        self._vtime = start
+        owner.vtime = start + 1.0 / owner.weight
+        owner.in_flight += 1
+        owner.admitted += 1
+        self._in_flight += 1
+        self._counters["admitted"] += 1
+
+    def _schedule(self, owner_id: str, owner: _Owner) -> None:
+        if owner.scheduled or not owner.waiters or owner.in_flight >= self.owner_concurrency:
+            return
+        # An owner coming back from idle does not get credit for the time it
+        # had nothing to do
+        owner.vtime = max(owner.vtime, self._vtime)
+        owner.scheduled = True
+        heapq.heappush(self._ready, (owner.vtime, next(self._sequence), owner_id, owner))
+
+    def _dispatch(self) -> None:
+        while self._in_flight < self.capacity and self._ready:
+            _, _, owner_id, owner = heapq.heappop(self._ready)
+            owner.scheduled = False
+            if self._owners.get(owner_id) is not owner:
+                continue
+            while owner.waiters and owner.in_flight < self.owner_concurrency:
+                future = owner.waiters.popleft()
+                if future.done():  # cancelled while queued
+                    continue
+                self._start(owner)
+                future.set_result(None)
+                break
+            self._schedule(owner_id, owner)
+
+    def _reject(self, owner_id: str, owner: _Owner) -> None:
+        owner.rejected += 1
+        self._counters["rejected"] += 1
+        self.registry.inc(f"{self.name}.rejected", owner=owner_id)
+
+    def _forget_if_idle(self, owner_id: str, owner: _Owner) -> None:
+        if not owner.in_flight and not owner.waiters and self._owners.get(owner_id) is owner:
+            del self._owners[owner_id]
+
+    def stats(self) -> Dict[str, Any]:
+        busiest = sorted(
+            self._owners.items(), key=lambda item: (len(item[1].waiters), item[1].in_flight), reverse=True
+        )[:STATS_TOP_OWNERS]
+        return {
+            "capacity": self.capacity,
+            "owner_concurrency": self.owner_concurrency,
+            "overflow_policy": self.overflow_policy,
+            "in_flight": self._in_flight,
+            "owners": len(self._owners),
+            "queue_depth": sum(len(owner.waiters) for owner in self._owners.values()),
+            **self._counters,
+            "by_owner": {
+                owner_id: {
+                    "weight": owner.weight,
+                    "in_flight": owner.in_flight,
+                    "queue_depth": len(owner.waiters),
+                    "admitted": owner.admitted,
+                    "rejected": owner.rejected,
+                }
+                for owner_id, owner in busiest
+            },
+        }
+
+
+def create_owner_bulkheads(name: str, capacity: int, owner_concurrency: int) -> Optional[OwnerBulkheads]:
+    """Bulkheads configured by `BULKHEAD_*`, or None when disabled."""
+    config = settings.bulkhead
+    if not config.enabled:
+        return None
+    return OwnerBulkheads(
+        capacity=capacity,
+        owner_concurrency=owner_concurrency,
+        owner_queue=config.owner_queue,
+        overflow_policy=config.overflow_policy,
+        weights=parse_weights(config.owner_weights),
+        name=name,
+    )
+
+
+async def owner_bulkheads_resource(bulkheads: Optional[OwnerBulkheads]):
+    """DI resource exposing the per-owner queues on `/metrics` while the app runs."""
+    if bulkheads is None:
+        yield None
+        return
+    bulkheads.registry.register_collector(bulkheads.name, bulkheads.stats)
+    try:
+        yield bulkheads
+    finally:
+        bulkheads.registry.unregister_collector(bulkheads.name)
@@ -0,0 +1,222 @@
+"""
+Keyed executor.
+
+Runs jobs concurrently across keys while keeping jobs of the same key
+strictly sequential and ordered by a caller-supplied order value (e.g. the
+message timestamp), up to an optional global concurrency cap.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional, Set, Tuple, TypeVar
+
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class _Job:
+    __slots__ = ("order", "fn", "future", "enqueued_at")
+
+    def __init__(self, order: float, fn: Callable[[], Awaitable[Any]], future: asyncio.Future):
+        self.order = order
+        self.fn = fn
+        self.future = future
+        self.enqueued_at = time.perf_counter()
+
+
+class _KeyState:
+    """Pending jobs (min-heap by order, then arrival) and history of one key."""
+
+    __slots__ = ("pending", "running", "last_order", "last_active")
+
+    def __init__(self):
+        self.pending: List[Tuple[float, int, _Job]] = []
+        self.running = False
+        self.last_order: Optional[float] = None
+        self.last_active = time.monotonic()
+
+
+class KeyedExecutor:
+    """
+    Per-key sequential, cross-key concurrent executor.
+
+    `submit(key, order, fn)` queues `fn` behind the other jobs of `key`; while
+    a job of a key runs, newly queued jobs of that key are sorted by `order`,
+    so bursts delivered concurrently are processed in order. A job whose
+    order is older than one already processed for its key can no longer be
+    put back in sequence: it runs anyway and is counted as out of order.
+
+    Keys with no pending work are kept for `idle_ttl` seconds (to detect
+    late, out-of-order jobs) and then evicted. With `max_concurrency=None`
+    keys run unbounded (concurrency is then bounded by the jobs themselves,
+    e.g. per-owner bulkheads).
+
+    The task draining each active key is kept until it finishes; `stop()`
+    waits for them and cancels what is left.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = 64,
+        idle_ttl: float = 300.0,
+        name: str = "keyed_executor",
+        registry: MetricsRegistry = metrics,
+    ):
+        self.max_concurrency = None if max_concurrency is None else max(1, max_concurrency)
+        self.idle_ttl = idle_ttl
+        self.name = name
+        self.registry = registry
+        self._keys: Dict[Hashable, _KeyState] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._arrival = itertools.count()
+        self._drains: Set[asyncio.Task] = set()
+        self._in_flight = 0
+        self._last_sweep = time.monotonic()
+        self._sweep_interval = max(1.0, idle_ttl / 4.0)
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "out_of_order": 0,
+            "evicted": 0,
+        }
+        registry.register_collector(name, self.stats)
+
+    async def submit(self, key: Hashable, order: float, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run `fn` after every earlier-ordered job of `key` and return its result.
+
+        Args:
+            key: Sequencing key (e.g. (owner_id, wa_id))
+            order: Ordering value within the key; unix timestamp in seconds
+                   when lag should be reported
+            fn: Coroutine function to run
+
+        Returns:
+            The result of `fn()` (its exception is re-raised)
+        """
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None and self.max_concurrency is not None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        now = time.monotonic()
+        if now - self._last_sweep >= self._sweep_interval:
+            self._sweep(now)
+
+        state = self._keys.get(key)
+        if state is None:
+            state = self._keys[key] = _KeyState()
+        job = _Job(order, fn, loop.create_future())
+        heapq.heappush(state.pending, (order, next(self._arrival), job))
+        self._counters["submitted"] += 1
+
+        if not state.running:
+            state.running = True
+            task = loop.create_task(self._drain(key, state))
+            self._drains.add(task)
+            task.add_done_callback(self._drains.discard)
+        # The job keeps running if the caller goes away (e.g. client disconnect)
+        return await asyncio.shield(job.future)
+
+    async def _drain(self, key: Hashable, state: _KeyState) -> None:
+        try:
+            while state.pending:
+                _, _, job = heapq.heappop(state.pending)
+                if state.last_order is not None and job.order < state.last_order:
+                    self._counters["out_of_order"] += 1
+                    self.registry.inc(f"{self.name}.out_of_order")
+                    logger.warning(
+                        "Job processed out of order",
+                        executor=self.name,
+                        key=str(key),
+                        order=job.order,
+                        last_order=state.last_order,
+                    )
+                await self._run(job)
+                if state.last_order is None or job.order > state.last_order:
+                    state.last_order = job.order
+        finally:
+            state.running = False
+            state.last_active = time.monotonic()
+
+    async def _run(self, job: _Job) -> None:
+        async with self._semaphore or contextlib.nullcontext():
+            started = time.perf_counter()
+            self.registry.observe(f"{self.name}.queue_wait_ms", (started - job.enqueued_at) * 1000.0)
+            self.registry.observe(f"{self.name}.lag_ms", max(0.0, time.time() - job.order) * 1000.0)
+            self._in_flight += 1
+            try:
+                result = await job.fn()
+            except asyncio.CancelledError:
+                job.future.cancel()
+                raise
+            except Exception as e:
+                self._counters["failed"] += 1
+                if not job.future.done():
+                    job.future.set_exception(e)
+            else:
+                self._counters["completed"] += 1
+                if not job.future.done():
+                    job.future.set_result(result)
+            finally:
+                self._in_flight -= 1
+
+    async def stop(self, timeout: float = 15.0) -> None:
+        """Let queued jobs finish (up to `timeout` seconds), then cancel the rest."""
+        if not self._drains:
+            return
+        _, pending = await asyncio.wait(set(self._drains), timeout=timeout)
+        if not pending:
+            return
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+        cancelled = 0
+        for state in self._keys.values():
+            for _, _, job in state.pending:
+                job.future.cancel()
+            cancelled += len(state.pending)
+            state.pending.clear()
+        logger.warning("Keyed executor stopped with jobs pending", executor=self.name, cancelled=cancelled)
+
+    def _sweep(self, now: float) -> None:
+        """Evict keys idle for longer than `idle_ttl`."""
+        self._last_sweep = now
+        idle = [
+            key
+            for key, state in self._keys.items()
+            if not state.running and not state.pending and now - state.last_active >= self.idle_ttl
+        ]
+        for key in idle:
+            del self._keys[key]
+        self._counters["evicted"] += len(idle)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "keys": len(self._keys),
+            "active_keys": sum(1 for s in self._keys.values() if s.running),
+            "queued": sum(len(s.pending) for s in self._keys.values()),
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            **self._counters,
+        }
+
+
+async def keyed_executor_resource(executor: KeyedExecutor, *resources: Any):
+    """
+    DI resource draining the executor on shutdown.
+
+    `resources` are opened resources its jobs use; depending on them makes
+    the container stop the executor before closing them.
+    """
+    try:
+        yield executor
+    finally:
+        await executor.stop()
@@ -3,6 +3,11 @@ Configuration module for the project.
 Handles environment variables and application settings.
 """
 
+import os
+from functools import lru_cache
+from typing import Literal
+
+from dotenv import load_dotenv
 from pydantic import Field, field_validator, model_validator, AliasChoices
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +17,9 @@ class APISettings(BaseSettings):
 
     host: str = Field(default="0.0.0.0", description="API host")
     port: int = Field(default=8000, description="API port")
+    workers: int = Field(
+        default=1, description="Number of worker processes (ignored when reloading in debug mode)"
+    )
     debug: bool = Field(default=False, description="Debug mode")
     environment: str = Field(
         default="development",
@@ -24,6 +32,32 @@ class APISettings(BaseSettings):
         default=False,
         description="Bypass subscription validation (Development only)",
     )
+    prewarm_connections: bool = Field(
+        default=True,
+        description="Open database and Graph API connections during startup instead of on the first request",
+    )
+    admission_control: bool = Field(
+        default=True, description="Adaptive concurrency limit (load shedding) on the webhook endpoint"
+    )
+    admission_algorithm: Literal["gradient", "aimd"] = Field(
+        default="gradient", description="Limit algorithm: gradient (latency vs. baseline) or aimd"
+    )
+    admission_initial_limit: int = Field(default=64, description="In-flight webhook limit at startup")
+    admission_min_limit: int = Field(default=8, description="Lowest in-flight webhook limit")
+    admission_max_limit: int = Field(default=512, description="Highest in-flight webhook limit")
+    admission_low_priority_share: float = Field(
+        default=0.5,
+        description="Share of the limit usable by low-priority webhooks (status callbacks), shed first",
+    )
+    admission_latency_tolerance: float = Field(
+        default=2.0, description="gradient: latency increase over the baseline tolerated before shrinking"
+    )
+    admission_latency_threshold_ms: float = Field(
+        default=1000.0, description="aimd: webhook latency above which the limit is decreased"
+    )
+    admission_retry_after_seconds: int = Field(
+        default=5, description="Retry-After sent with 503 responses to shed webhooks"
+    )
 
     model_config = SettingsConfigDict(
         env_prefix="API_",
@@ -38,6 +72,38 @@ class DatabaseSettings(BaseSettings):
     """Database connection settings."""
 
     backend: str = Field(default="supabase", description="Database backend (e.g. supabase)")
+    pool_size: int = Field(default=4, description="Number of pooled Supabase/PostgREST sessions")
+    pool_prewarm: bool = Field(
+        default=True, description="Open every pooled session before serving instead of in the background"
+    )
+    pool_idle_timeout_seconds: float = Field(
+        default=60.0, description="Idle time after which a pooled session is health-checked"
+    )
+    pool_health_check_interval_seconds: float = Field(
+        default=15.0, description="Interval between pool health-check sweeps"
+    )
+    pool_health_check_table: str = Field(
+        default="meta_accounts", description="Table used by the pool health-check (HEAD, limit 1)"
+    )
+    pool_max_retries: int = Field(
+        default=2, description="Retries on another session after a connection failure"
+    )
+    pool_reconnect_backoff_seconds: float = Field(
+        default=0.5, description="Initial delay before reconnecting a broken session"
+    )
+    pool_reconnect_backoff_max_seconds: float = Field(
+        default=30.0, description="Maximum delay between reconnection attempts"
+    )
+    count_mode: Literal["exact", "planned", "estimated"] = Field(
+        default="exact",
+        description="Default repository count mode: exact, planned (planner estimate) or estimated",
+    )
+    count_cache_ttl_seconds: float = Field(
+        default=5.0, description="Longest time a cached repository count is served (0 disables the cache)"
+    )
+    count_cache_max_entries: int = Field(
+        default=1024, description="Maximum cached counts per repository"
+    )
 
     model_config = SettingsConfigDict(
         env_prefix="DATABASE_",
@@ -86,6 +152,13 @@ class MetaSettings(BaseSettings):
     business_account_id: str | None = Field(
         default=None, description="Meta Business Account ID"
     )
+    graph_api_url: str = Field(
+        default="https://graph.facebook.com", description="Meta Graph API base URL"
+    )
+    app_secret: str | None = Field(
+        default=None,
+        description="Meta app secret signing webhooks (X-Hub-Signature-256); comma-separated to rotate",
+    )
 
     model_config = SettingsConfigDict(
         env_prefix="META_",
@@ -95,13 +168,262 @@ class MetaSettings(BaseSettings):
         extra="ignore"
     )
 
+
+class MonitoringSettings(BaseSettings):
+    """Runtime monitoring settings (event loop watchdog, diagnostics)."""
+
+    loop_monitor_enabled: bool = Field(
+        default=False, description="Enable the event loop lag watchdog"
+    )
+    loop_monitor_interval_ms: float = Field(
+        default=100.0, description="Event loop heartbeat interval in milliseconds"
+    )
+    loop_lag_threshold_ms: float = Field(
+        default=250.0,
+        description="Loop lag (ms) above which the running stack is captured as a blocking call",
+    )
+    loop_monitor_max_sites: int = Field(
+        default=50, description="Maximum number of distinct blocking call sites tracked"
+    )
+    keep_alive_refresh_seconds: float = Field(
+        default=30.0, description="Interval between background keep-alive diagnostics refreshes"
+    )
+    keep_alive_timeout_seconds: float = Field(
+        default=3.0, description="Timeout for each keep-alive diagnostics check"
+    )
+    readiness_interval_seconds: float = Field(
+        default=5.0, description="Interval between background readiness probe runs"
+    )
+    readiness_probe_timeout_seconds: float = Field(
+        default=2.0, description="Timeout for each readiness dependency probe"
+    )
+    readiness_max_loop_lag_ms: float = Field(
+        default=500.0, description="Event loop lag (ms) above which the worker is not ready"
+    )
+    readiness_max_queue_utilization: float = Field(
+        default=0.9, description="Queue/pool utilization ratio above which the worker is not ready"
+    )
+
+    model_config = SettingsConfigDict(
+        env_prefix="MONITORING_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
+def _from_environment(settings_cls):
+    """
+    Factory for a nested settings section that skips its own `.env` read.
+
+    `get_settings()` loads `.env` into the process environment once, so each
+    section only needs to look at `os.environ`.
+    """
+    return lambda: settings_cls(_env_file=None)
+
+
+class WebhookSettings(BaseSettings):
+    """Inbound webhook processing settings."""
+
+    max_concurrency: int = Field(
+        default=64, description="Maximum conversations processed concurrently per worker"
+    )
+    sequencer_idle_ttl_seconds: float = Field(
+        default=300.0,
+        description="Idle time after which a conversation's ordering state is evicted",
+    )
+    cpu_handler_threads: int = Field(
+        default=2, description="Threads running CPU-bound synchronous message handlers"
+    )
+    verify_signature: bool = Field(
+        default=True,
+        description="Reject webhooks without a valid X-Hub-Signature-256 (unsigned ones are accepted only "
+        "in development while no app secret is known)",
+    )
+    secrets_refresh_seconds: float = Field(
+        default=300.0, description="Interval between reloads of the per-account app secrets"
+    )
+
+    model_config = SettingsConfigDict(
+        env_prefix="WEBHOOK_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
+class JournalSettings(BaseSettings):
+    """Durable inbound event journal settings."""
+
+    enabled: bool = Field(default=True, description="Journal raw inbound webhooks before processing")
+    directory: str = Field(default="data/journal", description="Directory holding journal segments")
+    segment_max_bytes: int = Field(
+        default=64 * 1024 * 1024, description="Segment size that triggers rotation"
+    )
+    fsync: bool = Field(default=True, description="fsync each written batch")
+    wait_for_durability: bool = Field(
+        default=True, description="Acknowledge the webhook only after its batch is written"
+    )
+    max_batch_delay_ms: float = Field(
+        default=2.0, description="Time the writer waits for more records before writing a batch"
+    )
+    max_batch_records: int = Field(default=512, description="Maximum records per write/fsync")
+    retention_hours: float = Field(
+        default=168.0, description="Delete segments older than this (0 keeps everything)"
+    )
+
+    model_config = SettingsConfigDict(
+        env_prefix="JOURNAL_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
+class CacheSettings(BaseSettings):
+    """Per-worker caches and cross-worker invalidation settings."""
+
+    invalidation_backend: str = Field(
+        default="auto",
+        description="Invalidation bus: auto, local, unix or 'package.module:ClassName'",
+    )
+    invalidation_socket_dir: str | None = Field(
+        default=None,
+        description="Directory holding the workers' invalidation sockets (default: per-port temp dir)",
+    )
+    account_ttl_seconds: float = Field(
+        default=30.0, description="Upper bound on how long a cached Meta account may be stale"
+    )
+    account_max_entries: int = Field(
+        default=10000, description="Maximum cached Meta account lookups per worker"
+    )
+    routing_snapshot_enabled: bool = Field(
+        default=True, description="Resolve webhook owners from a memory-mapped routing snapshot first"
+    )
+    routing_snapshot_path: str = Field(
+        default="data/routing_snapshot.bin", description="Routing snapshot file shared by the workers"
+    )
+    routing_snapshot_refresh_seconds: float = Field(
+        default=300.0, description="Age after which the routing snapshot is rebuilt from the database"
+    )
+    routing_snapshot_page_size: int = Field(
+        default=1000, description="Meta accounts read per request while building the routing snapshot"
+    )
+
+    model_config = SettingsConfigDict(
+        env_prefix="CACHE_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
+class OutboxSettings(BaseSettings):
+    """Outbound message outbox settings."""
+
+    enabled: bool = Field(default=True, description="Queue outbound messages in the outbox instead of sending inline")
+    path: str = Field(default="data/outbox.sqlite3", description="SQLite database holding the outbox")
+    synchronous: str = Field(
+        default="NORMAL",
+        description="SQLite synchronous mode: NORMAL survives process crashes, FULL also power loss",
+    )
+    batch_size: int = Field(default=50, description="Messages claimed per sender iteration")
+    concurrency: int = Field(default=8, description="Conversations sent concurrently per batch")
+    poll_interval_seconds: float = Field(
+        default=1.0, description="Idle polling interval (retries and messages queued by other workers)"
+    )
+    lease_seconds: float = Field(
+        default=30.0, description="Time after which a claimed but unconfirmed message is sent again"
+    )
+    max_attempts: int = Field(default=8, description="Attempts before a message is dead-lettered")
+    retry_backoff_seconds: float = Field(default=1.0, description="Initial retry backoff")
+    retry_backoff_max_seconds: float = Field(default=300.0, description="Maximum retry backoff")
+    retention_hours: float = Field(
+        default=168.0, description="Delete sent and dead messages older than this (0 keeps everything)"
+    )
+    stats_interval_seconds: float = Field(
+        default=10.0, description="Minimum interval between status counts reported to /metrics"
+    )
+
+    model_config = SettingsConfigDict(
+        env_prefix="OUTBOX_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
+class MediaSettings(BaseSettings):
+    """Media processing pool settings."""
+
+    enabled: bool = Field(default=True, description="Process inbound media in worker processes")
+    workers: int = Field(default=2, description="Media worker processes per API worker")
+    max_queue: int = Field(default=32, description="Jobs allowed to wait for a worker before new ones are rejected")
+    job_timeout_seconds: float = Field(default=30.0, description="Time limit of a single media job")
+    start_method: str = Field(
+        default="forkserver",
+        description="multiprocessing start method: forkserver (main module imported once) or spawn",
+    )
+    prewarm: bool = Field(default=True, description="Start the worker processes at startup")
+    processors: str | None = Field(
+        default=None,
+        description="Extra processors, e.g. 'audio/ogg=package.module:function,image/*=package.module:function'",
+    )
+
+    model_config = SettingsConfigDict(
+        env_prefix="MEDIA_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
+class BulkheadSettings(BaseSettings):
+    """Per-owner isolation settings (webhook processing and outbound sends)."""
+
+    enabled: bool = Field(default=True, description="Bound and fairly share capacity per owner")
+    owner_weights: str | None = Field(
+        default=None, description="Scheduling weights, e.g. 'owner_a=2,owner_b=0.5' (default 1)"
+    )
+    owner_queue: int = Field(default=256, description="Jobs an owner may have waiting before the overflow policy applies")
+    overflow_policy: Literal["reject", "drop_oldest"] = Field(
+        default="reject", description="When an owner's queue is full: reject (new job) or drop_oldest"
+    )
+    webhook_owner_concurrency: int = Field(
+        default=16, description="Inbound messages of one owner processed concurrently (of WEBHOOK_MAX_CONCURRENCY)"
+    )
+    outbound_concurrency: int = Field(default=16, description="Graph API sends in flight across owners")
+    outbound_owner_concurrency: int = Field(default=4, description="Graph API sends in flight per owner")
+
+    model_config = SettingsConfigDict(
+        env_prefix="BULKHEAD_",
+        env_file=".env",
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore"
+    )
+
+
 class Settings(BaseSettings):
     """Main application settings."""
-    
-    api: APISettings = Field(default_factory=APISettings)
-    database: DatabaseSettings = Field(default_factory=DatabaseSettings)
-    supabase: SupabaseSettings = Field(default_factory=SupabaseSettings)
-    meta: MetaSettings = Field(default_factory=MetaSettings)
+
+    api: APISettings = Field(default_factory=_from_environment(APISettings))
+    database: DatabaseSettings = Field(default_factory=_from_environment(DatabaseSettings))
+    supabase: SupabaseSettings = Field(default_factory=_from_environment(SupabaseSettings))
+    meta: MetaSettings = Field(default_factory=_from_environment(MetaSettings))
+    monitoring: MonitoringSettings = Field(default_factory=_from_environment(MonitoringSettings))
+    cache: CacheSettings = Field(default_factory=_from_environment(CacheSettings))
+    webhook: WebhookSettings = Field(default_factory=_from_environment(WebhookSettings))
+    journal: JournalSettings = Field(default_factory=_from_environment(JournalSettings))
+    outbox: OutboxSettings = Field(default_factory=_from_environment(OutboxSettings))
+    media: MediaSettings = Field(default_factory=_from_environment(MediaSettings))
+    bulkhead: BulkheadSettings = Field(default_factory=_from_environment(BulkheadSettings))
 
 
     model_config = SettingsConfigDict(
@@ -109,5 +431,19 @@ class Settings(BaseSettings):
     )
 
 
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Build the application settings once per process.
+
+    `.env` is read a single time (real environment variables take
+    precedence over it) instead of once per nested settings section.
+    """
+    env_file = Settings.model_config.get("env_file")
+    if env_file and os.path.exists(env_file):
+        load_dotenv(env_file, override=False, encoding="utf-8")
+    return Settings(_env_file=None)
+
+
 # Global settings instance
-settings = Settings()
+settings = get_settings()
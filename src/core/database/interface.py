@@ -1,4 +1,4 @@
-from typing import Any, Dict, Generic, List, Optional, Protocol, TypeVar, Union
+from typing import Any, AsyncIterator, Dict, Generic, List, Optional, Protocol, TypeVar, Union
 
 T = TypeVar("T")
 
@@ -24,6 +24,10 @@ class IRepository(Generic[T], Protocol):
         """Cria um novo registro."""
         ...
 
+    def create_many(self, rows: List[Dict[str, Any]]) -> List[T]:
+        """Cria vários registros em uma única requisição."""
+        ...
+
     def find_by_id(self, id_value: Any, id_column: str = "id") -> Optional[T]:
         """Busca um registro pelo ID."""
         ...
@@ -42,12 +46,33 @@ class IRepository(Generic[T], Protocol):
         """Busca registros baseados em filtros simples de igualdade."""
         ...
 
-    def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
-        """Conta registros baseados em filtros."""
+    def count(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        max_age: Optional[float] = None,
+    ) -> int:
+        """Conta registros baseados em filtros (exato, planejado ou estimado; pode vir do cache)."""
         ...
 
     def query_dynamic(
-        self, select_columns: List[str] = None, filters: List[Dict[str, Any]] = None
+        self,
+        select_columns: List[str] = None,
+        filters: List[Dict[str, Any]] = None,
+        order_by: Optional[List[Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Any = None,
     ) -> List[Dict[str, Any]]:
         """Executa uma query dinâmica com filtros complexos."""
         ...
+
+    def iter_pages(
+        self,
+        select_columns: Optional[List[str]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = 1000,
+        key_column: Optional[str] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Percorre os registros página a página (paginação por chave)."""
+        ...
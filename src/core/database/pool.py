@@ -0,0 +1,467 @@
+"""
+Supabase/PostgREST session pool.
+
+Keeps `pool_size` Supabase clients, each with its own keep-alive HTTP
+connections, prewarms them at startup, health-checks idle ones in the
+background and rebuilds broken ones with exponential backoff. Clients are
+created and probed on worker threads, outside the pool's lock: a query
+only ever picks among sessions that are already open.
+
+The pool implements `IDatabaseSession`: `table(name)` returns a query that
+records the builder calls and replays them on a healthy session when
+`execute()` is called, so a query that hits a dead connection can be retried
+on another session transparently.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+logger = get_logger(__name__)
+
+# A recorded builder step: ("attr", name) or ("call", args, kwargs)
+Step = Tuple[Any, ...]
+
+# Builder entry points that never modify data and are safe to replay
+READ_ONLY_OPERATIONS = frozenset({"select"})
+
+
+class PoolUnavailableError(RuntimeError):
+    """Raised when every pooled session is broken and backing off."""
+
+
+class _Session:
+    """One pooled Supabase client and its health bookkeeping."""
+
+    __slots__ = (
+        "index",
+        "client",
+        "created_at",
+        "last_used",
+        "last_checked",
+        "uses",
+        "failures",
+        "broken",
+        "opening",
+        "retry_at",
+        "last_error",
+    )
+
+    def __init__(self, index: int):
+        self.index = index
+        self.client: Optional["Client"] = None
+        self.created_at = 0.0
+        self.last_used = 0.0
+        self.last_checked = 0.0
+        self.uses = 0
+        self.failures = 0
+        self.broken = False
+        # A client is being created for this session (outside the lock)
+        self.opening = False
+        self.retry_at = 0.0
+        self.last_error: Optional[str] = None
+
+    def as_dict(self, now: float) -> Dict[str, Any]:
+        return {
+            "index": self.index,
+            "open": self.client is not None,
+            "broken": self.broken,
+            "uses": self.uses,
+            "failures": self.failures,
+            "age_s": round(now - self.created_at, 3) if self.client is not None else None,
+            "idle_s": round(now - max(self.last_used, self.last_checked), 3) if self.client is not None else None,
+            "retry_in_s": round(max(0.0, self.retry_at - now), 3) if self.broken else None,
+            "last_error": self.last_error,
+        }
+
+
+class PooledQuery:
+    """
+    PostgREST builder chain recorded against the pool.
+
+    Behaves like the query builder returned by `client.table(name)`; the
+    chain is replayed on a pooled session when `execute()` is called.
+    """
+
+    __slots__ = ("_pool", "_table", "_steps")
+
+    def __init__(self, pool: "SupabaseSessionPool", table: str, steps: Tuple[Step, ...] = ()):
+        self._pool = pool
+        self._table = table
+        self._steps = steps
+
+    def __getattr__(self, name: str) -> "PooledQuery":
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return PooledQuery(self._pool, self._table, self._steps + (("attr", name),))
+
+    def __call__(self, *args, **kwargs) -> Any:
+        if self._steps and self._steps[-1] == ("attr", "execute"):
+            return self._pool.execute(self._table, self._steps[:-1])
+        return PooledQuery(self._pool, self._table, self._steps + (("call", args, kwargs),))
+
+
+class SupabaseSessionPool:
+    """
+    Pool of Supabase sessions with prewarming, health checks and reconnection.
+
+    Queries are spread round-robin over open sessions. A connection failure
+    marks the session broken (its client is discarded) and the query is
+    retried on another session when that is safe: always if the request
+    never reached the server, and for reads otherwise. Broken sessions are
+    rebuilt by the background task once their exponential backoff has
+    elapsed; it is woken up as soon as a session breaks. Without `start()`
+    (scripts), a query finding no open session opens one itself.
+    """
+
+    def __init__(
+        self,
+        client_factory: Callable[[], "Client"],
+        size: int = 4,
+        idle_timeout: float = 60.0,
+        health_check_interval: float = 15.0,
+        health_check_table: str = "meta_accounts",
+        max_retries: int = 2,
+        backoff: float = 0.5,
+        backoff_max: float = 30.0,
+        registry: MetricsRegistry = metrics,
+    ):
+        self._factory = client_factory
+        self.size = max(1, size)
+        self.idle_timeout = idle_timeout
+        self.health_check_interval = health_check_interval
+        self.health_check_table = health_check_table
+        self.max_retries = max(0, max_retries)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.registry = registry
+
+        self._sessions: List[_Session] = [_Session(i) for i in range(self.size)]
+        self._lock = threading.Lock()
+        self._cursor = 0
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._counters: Dict[str, int] = {
+            "queries": 0,
+            "retries": 0,
+            "connection_errors": 0,
+            "reconnects": 0,
+            "unavailable": 0,
+            "health_checks": 0,
+            "health_check_failures": 0,
+        }
+
+    @classmethod
+    def from_settings(cls, client_factory: Callable[[], "Client"]) -> "SupabaseSessionPool":
+        database = settings.database
+        return cls(
+            client_factory,
+            size=database.pool_size,
+            idle_timeout=database.pool_idle_timeout_seconds,
+            health_check_interval=database.pool_health_check_interval_seconds,
+            health_check_table=database.pool_health_check_table,
+            max_retries=database.pool_max_retries,
+            backoff=database.pool_reconnect_backoff_seconds,
+            backoff_max=database.pool_reconnect_backoff_max_seconds,
+        )
+
+    # IDatabaseSession
+
+    def table(self, name: str) -> PooledQuery:
+        return PooledQuery(self, name)
+
+    def client(self) -> "Client":
+        """Raw client of a healthy session (for code that needs the SDK directly)."""
+        return self._checkout().client
+
+    # Query execution
+
+    def execute(self, table: str, steps: Tuple[Step, ...]) -> Any:
+        """Replay a recorded builder chain on a pooled session and execute it."""
+        read_only = bool(steps) and steps[0][0] == "attr" and steps[0][1] in READ_ONLY_OPERATIONS
+        attempt = 0
+        while True:
+            session = self._checkout()
+            started = time.perf_counter()
+            try:
+                query = session.client.table(table)
+                for step in steps:
+                    query = getattr(query, step[1]) if step[0] == "attr" else query(*step[1], **step[2])
+                result = query.execute()
+            except Exception as e:
+                connection_failed, request_sent = self._classify(e)
+                if not connection_failed:
+                    raise
+                self._mark_broken(session, e)
+                if attempt >= self.max_retries or (request_sent and not read_only):
+                    raise
+                attempt += 1
+                self._counters["retries"] += 1
+                continue
+
+            self.registry.observe("database.query_ms", (time.perf_counter() - started) * 1000.0, table=table)
+            self._counters["queries"] += 1
+            if session.failures:
+                session.failures = 0
+            return result
+
+    @staticmethod
+    def _classify(error: Exception) -> Tuple[bool, bool]:
+        """Return (connection_failed, request_may_have_reached_the_server)."""
+        import httpx
+
+        if isinstance(error, (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)):
+            return True, False
+        if isinstance(error, httpx.TransportError):
+            return True, True
+        return False, True
+
+    def _checkout(self) -> _Session:
+        with self._lock:
+            session = self._next_open()
+            if session is not None:
+                return session
+        if self._task is None or self._task.done():
+            # No background task to open sessions (pool not started)
+            session = self._open_due()
+            if session is not None:
+                with self._lock:
+                    if session.client is not None:
+                        return self._use(session)
+        self._wake()
+        with self._lock:
+            self._counters["unavailable"] += 1
+            now = time.monotonic()
+            retry_at = min(s.retry_at for s in self._sessions)
+            last_error = next((s.last_error for s in self._sessions if s.last_error), None)
+        raise PoolUnavailableError(
+            f"No open Supabase session ({self.size} configured); "
+            f"next reconnect in {max(0.0, retry_at - now):.1f}s ({last_error})"
+        )
+
+    def _next_open(self) -> Optional[_Session]:
+        """Next open session round-robin; must be called with the lock held."""
+        for _ in range(self.size):
+            session = self._sessions[self._cursor]
+            self._cursor = (self._cursor + 1) % self.size
+            if session.client is not None:
+                return self._use(session)
+        return None
+
+    def _use(self, session: _Session) -> _Session:
+        session.uses += 1
+        session.last_used = time.monotonic()
+        return session
+
+    def _open_due(self) -> Optional[_Session]:
+        """Open a closed session out of backoff, if any (blocking; lock not held)."""
+        with self._lock:
+            now = time.monotonic()
+            session = next(
+                (s for s in self._sessions if s.client is None and not s.opening and s.retry_at <= now), None
+            )
+            if session is None:
+                return None
+            session.opening = True
+        try:
+            self._install(session, self._factory())
+        except Exception as e:
+            self._mark_broken(session, e)
+            return None
+        finally:
+            session.opening = False
+        return session
+
+    def _install(self, session: _Session, client: "Client") -> None:
+        """Hand a new client of `session` out to queries."""
+        with self._lock:
+            reconnect = session.broken or session.failures > 0
+            session.client = client
+            session.created_at = time.monotonic()
+            session.broken = False
+        if reconnect:
+            self._counters["reconnects"] += 1
+            logger.info("Supabase session reconnected", session=session.index, failures=session.failures)
+
+    def _mark_broken(self, session: _Session, error: Exception) -> None:
+        with self._lock:
+            client, session.client = session.client, None
+            session.broken = True
+            session.failures += 1
+            delay = min(self.backoff_max, self.backoff * (2 ** (session.failures - 1)))
+            session.retry_at = time.monotonic() + delay * random.uniform(0.5, 1.0)
+            session.last_error = f"{type(error).__name__}: {error}"
+            self._counters["connection_errors"] += 1
+        logger.warning(
+            "Supabase session broken",
+            session=session.index,
+            failures=session.failures,
+            retry_in_s=round(delay, 3),
+            error=session.last_error,
+        )
+        _close_client(client)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Have the background task look at the sessions now (from any thread)."""
+        if self._loop is not None and self._wakeup is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._wakeup.set)
+            except RuntimeError:
+                # Loop closed
+                pass
+
+    # Health checks
+
+    def _check(self, session: _Session) -> bool:
+        """
+        Probe one session, opening it first if it is closed; runs in a worker thread.
+
+        A new client is only handed out to queries once its probe succeeded.
+        """
+        from postgrest.exceptions import APIError
+
+        with self._lock:
+            client = session.client
+            opening = client is None
+            if opening:
+                if session.opening:
+                    # Being opened by a query (pool not started yet)
+                    return False
+                session.opening = True
+        self._counters["health_checks"] += 1
+        try:
+            if opening:
+                client = self._factory()
+            try:
+                client.table(self.health_check_table).select("*", head=True).limit(1).execute()
+            except APIError:
+                # The server answered: the connection itself is healthy
+                pass
+        except Exception as e:
+            self._counters["health_check_failures"] += 1
+            if opening and client is not None:
+                _close_client(client)
+            self._mark_broken(session, e)
+            return False
+        else:
+            if opening:
+                self._install(session, client)
+        finally:
+            if opening:
+                session.opening = False
+        session.last_checked = time.monotonic()
+        session.failures = 0
+        return True
+
+    def _due_for_check(self, now: float) -> List[_Session]:
+        due = []
+        for session in self._sessions:
+            if session.opening:
+                continue
+            if session.client is None:
+                if now >= session.retry_at:
+                    due.append(session)
+            elif now - max(session.last_used, session.last_checked) >= self.idle_timeout:
+                due.append(session)
+        return due
+
+    def _next_check_in(self, now: float) -> float:
+        """Seconds until a closed session is due to be opened, at most the check interval."""
+        delay = self.health_check_interval
+        for session in self._sessions:
+            if session.client is None and not session.opening:
+                delay = min(delay, session.retry_at - now)
+        return max(0.0, delay)
+
+    async def prewarm(self) -> int:
+        """Open and probe every session concurrently; return how many are healthy."""
+        started = time.perf_counter()
+        await asyncio.gather(*(asyncio.to_thread(self._check, s) for s in self._sessions))
+        # Queries during startup may open sessions too
+        healthy = sum(1 for s in self._sessions if s.client is not None)
+        log = logger.info if healthy == self.size else logger.warning
+        log(
+            "Supabase session pool prewarmed",
+            healthy=healthy,
+            size=self.size,
+            elapsed_ms=round((time.perf_counter() - started) * 1000.0, 1),
+        )
+        return healthy
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self._next_check_in(time.monotonic()))
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                due = self._due_for_check(time.monotonic())
+                if due:
+                    await asyncio.gather(*(asyncio.to_thread(self._check, s) for s in due))
+            except Exception as e:
+                logger.error("Supabase pool health check failed", error=str(e))
+
+    # Lifecycle
+
+    async def start(self, prewarm: bool = True) -> None:
+        if prewarm:
+            await self.prewarm()
+        self.registry.register_collector("database_pool", self.stats)
+        if self._task is None or self._task.done():
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._loop = self._wakeup = None
+        self.registry.unregister_collector("database_pool")
+        self.close()
+
+    def close(self) -> None:
+        """Close every session's HTTP connections."""
+        with self._lock:
+            clients = [s.client for s in self._sessions]
+            for session in self._sessions:
+                session.client = None
+        for client in clients:
+            _close_client(client)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        sessions = [s.as_dict(now) for s in self._sessions]
+        return {
+            "size": self.size,
+            "open": sum(1 for s in sessions if s["open"]),
+            "healthy": sum(1 for s in sessions if s["open"] and not s["broken"]),
+            "broken": sum(1 for s in sessions if s["broken"]),
+            **self._counters,
+            "sessions": sessions,
+        }
+
+
+def _close_client(client: Optional["Client"]) -> None:
+    if client is None:
+        return
+    try:
+        client.postgrest.session.close()
+    except Exception as e:
+        logger.debug("Error closing Supabase session", error=str(e))
@@ -4,12 +4,14 @@ Handles Supabase client initialization and management.
 """
 
 import logging
-from typing import Any, Optional
-
-from supabase import Client, ClientOptions, create_client
+from typing import TYPE_CHECKING, Any, Optional
 
 from src.core.config.settings import settings
 from src.core.database.interface import IDatabaseSession
+from src.core.database.pool import SupabaseSessionPool
+
+if TYPE_CHECKING:
+    from supabase import Client
 
 logger = logging.getLogger(__name__)
 
@@ -19,7 +21,7 @@ class SupabaseSession(IDatabaseSession):
     Wrapper for Supabase client implementing IDatabaseSession.
     """
 
-    def __init__(self, client: Client):
+    def __init__(self, client: "Client"):
         self._client = client
 
     def table(self, name: str) -> Any:
@@ -28,12 +30,11 @@ class SupabaseSession(IDatabaseSession):
 
 class DatabaseConnection:
     """
-    Singleton class to manage Supabase database connection.
+    Singleton class to manage the Supabase session pool.
     """
 
     _instance: Optional["DatabaseConnection"] = None
-    _client: Optional[Client] = None
-    _session: Optional[IDatabaseSession] = None
+    _pool: Optional[SupabaseSessionPool] = None
 
     def __new__(cls):
         if cls._instance is None:
@@ -56,54 +57,62 @@ class DatabaseConnection:
                 + ", ".join(missing)
             )
 
+    def _create_client(self) -> "Client":
+        """Create one Supabase client (a pooled session)."""
+        # The supabase SDK (and its httpx/postgrest stack) is imported on
+        # first connection rather than at module import, to keep cold start fast
+        from supabase import ClientOptions, create_client
+
+        # Use Service Key if available (Backend should use Service Role to bypass RLS)
+        # Otherwise fall back to Anon Key
+        api_key = settings.supabase.service_key or settings.supabase.key
+        options = ClientOptions(schema=settings.supabase.db_schema)
+        return create_client(settings.supabase.url, api_key, options=options)
+
     def _connect(self):
-        """Establish connection to Supabase."""
+        """Set up the Supabase session pool (sessions are opened on demand or by prewarm)."""
         if settings.database.backend != "supabase":
             raise RuntimeError(
                 f"DatabaseConnection (Supabase) não pode ser usado quando DATABASE_BACKEND={settings.database.backend}"
             )
         try:
             self._validate_supabase_settings()
-            
-            # Use Service Key if available (Backend should use Service Role to bypass RLS)
-            # Otherwise fall back to Anon Key
-            api_key = settings.supabase.service_key or settings.supabase.key
+
             key_type = "SERVICE_KEY" if settings.supabase.service_key else "ANON_KEY"
-            
-            if not api_key:
+            if not (settings.supabase.service_key or settings.supabase.key):
                  raise RuntimeError("No Supabase API key found (neither SERVICE_KEY nor KEY)")
 
-            options = ClientOptions(schema=settings.supabase.db_schema)
-            self._client = create_client(
-                settings.supabase.url, api_key, options=options
-            )
-            self._session = SupabaseSession(self._client)
+            self._pool = SupabaseSessionPool.from_settings(self._create_client)
             logger.info(
-                f"Successfully connected to Supabase (schema={settings.supabase.db_schema}, key_type={key_type})"
+                f"Supabase session pool configured (schema={settings.supabase.db_schema}, "
+                f"key_type={key_type}, size={self._pool.size})"
             )
         except Exception as e:
             logger.error(f"Failed to connect to Supabase: {e}")
             raise
 
     @property
-    def client(self) -> Client:
-        """Get Supabase client instance (Deprecated - prefer session)."""
-        if self._client is None:
+    def pool(self) -> SupabaseSessionPool:
+        """Get the Supabase session pool."""
+        if self._pool is None:
             self._connect()
-        return self._client
+        return self._pool
+
+    @property
+    def client(self) -> "Client":
+        """Get Supabase client instance (Deprecated - prefer session)."""
+        return self.pool.client()
 
     @property
     def session(self) -> IDatabaseSession:
-        """Get database session instance."""
-        if self._client is None:
-            self._connect()
-        return self._session
+        """Get database session instance (the session pool)."""
+        return self.pool
 
     def disconnect(self):
-        """Disconnect from database."""
-        # Supabase client doesn't require explicit disconnection
-        self._client = None
-        self._session = None
+        """Disconnect from database, closing every pooled session."""
+        if self._pool is not None:
+            self._pool.close()
+        self._pool = None
         logger.info("Disconnected from Supabase")
 
 
@@ -120,3 +129,28 @@ def get_db() -> IDatabaseSession:
         IDatabaseSession instance
     """
     return db.session
+
+
+async def supabase_pool_resource(connection: DatabaseConnection):
+    """
+    DI resource owning the Supabase session pool.
+
+    Prewarms the pool and starts its health checks on
+    `container.init_resources()`; closes every session on
+    `container.shutdown_resources()`. A missing Supabase configuration is
+    logged instead of failing startup (readiness reports it).
+    """
+    if settings.database.backend != "supabase":
+        yield None
+        return
+    try:
+        pool = connection.pool
+    except RuntimeError:
+        yield None
+        return
+
+    await pool.start(prewarm=settings.database.pool_prewarm)
+    try:
+        yield pool
+    finally:
+        await pool.stop()
@@ -3,9 +3,15 @@ Supabase implementation of the Repository Pattern (Async).
 Provides CRUD operations using Supabase client, compatible with async/await.
 """
 
-from typing import Any, Dict, Generic, List, Optional, TypeVar, Union
+import asyncio
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Generic, Hashable, Iterator, List, Optional, Tuple, TypeVar, Union
 
+from src.core.cache.ttl_cache import TTLCache
+from src.core.config.settings import settings
 from src.core.database.interface import IDatabaseSession
+from src.core.database.query import build_query
+from src.core.database.write_plan import WritePlan
 from src.core.utils.logging import get_logger
 from src.core.utils.custom_ulid import is_valid_ulid
 
@@ -13,6 +19,34 @@ logger = get_logger(__name__)
 
 T = TypeVar("T")
 
+# PostgREST count methods (Prefer: count=...):
+# - exact: COUNT(*) of the filtered rows, a full scan on big tables
+# - planned: the planner's row estimate, no scan
+# - estimated: exact below PostgREST's db-max-rows, planned above it
+COUNT_MODES = ("exact", "planned", "estimated")
+
+
+def iterate_pages(pages: Callable[[], AsyncIterator[List[Dict[str, Any]]]]) -> Iterator[Dict[str, Any]]:
+    """
+    Rows of an async page iterator (e.g. `iter_pages`), driven from a worker thread.
+
+    The page requests are blocking calls; running them on a private event
+    loop in the calling thread (`asyncio.to_thread`) keeps them off the
+    main one.
+    """
+    loop = asyncio.new_event_loop()
+    iterator = pages()
+    try:
+        while True:
+            try:
+                page = loop.run_until_complete(iterator.__anext__())
+            except StopAsyncIteration:
+                return
+            yield from page
+    finally:
+        loop.run_until_complete(iterator.aclose())
+        loop.close()
+
 
 class SupabaseAsyncRepository(Generic[T]):
     """
@@ -21,6 +55,12 @@ class SupabaseAsyncRepository(Generic[T]):
     Supports both traditional integer IDs and ULID string IDs with
     automatic validation based on ID type.
 
+    Write payloads are prepared by a `WritePlan` derived once per model
+    (ULID-checked, excluded and datetime columns), in a single pass per row.
+
+    Counts are cached for a few seconds per mode and filter set; every write
+    through the repository drops them.
+
     Attributes:
         table_name: Name of the database table
         model_class: Pydantic model class for this repository
@@ -53,6 +93,14 @@ class SupabaseAsyncRepository(Generic[T]):
         self.validates_ulid = validates_ulid
         self.exclude_on_create = exclude_on_create or []
         self.primary_key = primary_key
+        self.write_plan = WritePlan.for_model(model_class, validates_ulid, self.exclude_on_create)
+        self.count_cache: Optional[TTLCache[Tuple[float, int]]] = None
+        if settings.database.count_cache_ttl_seconds > 0:
+            self.count_cache = TTLCache(
+                f"count.{table_name}",
+                ttl=settings.database.count_cache_ttl_seconds,
+                max_entries=settings.database.count_cache_max_entries,
+            )
 
     def _validate_id(self, id_value: Any, id_name: Optional[str] = None) -> None:
         """
@@ -87,16 +135,6 @@ class SupabaseAsyncRepository(Generic[T]):
                 type=type(id_value).__name__,
             )
 
-    def _serialize_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
-        """Convert complex types (like datetime) to JSON-serializable format."""
-        serialized = {}
-        for key, value in data.items():
-            if hasattr(value, "isoformat"):  # datetime, date, time
-                serialized[key] = value.isoformat()
-            else:
-                serialized[key] = value
-        return serialized
-
     async def create(self, data: Dict[str, Any]) -> Optional[T]:
         """
         Create a new record.
@@ -111,26 +149,14 @@ class SupabaseAsyncRepository(Generic[T]):
             Created model instance or None
         """
         try:
-            # Validate any ULID fields in data if validation is enabled
-            if self.validates_ulid:
-                for key, value in data.items():
-                    if isinstance(value, str) and len(value) == 26:
-                        # Looks like a ULID, validate it
-                        if "id" in key.lower() and not is_valid_ulid(value):
-                            raise ValueError(f"Invalid ULID format for {key}: {value}")
-
-            if self.exclude_on_create:
-                for col in self.exclude_on_create:
-                    if col in data:
-                        data = {**data}
-                        data.pop(col, None)
-
-            # Serialize data (e.g. datetime -> ISO string)
-            serialized_data = self._serialize_data(data)
+            # Validate ULID fields, drop excluded columns and serialize
+            # (e.g. datetime -> ISO string) in one pass
+            serialized_data = self.write_plan.prepare(data)
 
             # Note: client.table(...).insert(...).execute() is synchronous
             # Wrapping in async def makes it awaitable
             result = self.client.table(self.table_name).insert(serialized_data).execute()
+            self._invalidate_counts()
             if result.data:
                 return self.model_class(**result.data[0])
             return None
@@ -138,6 +164,30 @@ class SupabaseAsyncRepository(Generic[T]):
             logger.error(f"Error creating record in {self.table_name}", error=str(e))
             raise
 
+    async def create_many(self, rows: List[Dict[str, Any]]) -> List[T]:
+        """
+        Create several records with a single insert request.
+
+        The rows are prepared with the same write plan as `create`, ULID
+        columns being validated across the whole batch at once.
+
+        Args:
+            rows: Data of each record to insert
+
+        Returns:
+            Created model instances, in insertion order
+        """
+        if not rows:
+            return []
+        try:
+            serialized_rows = self.write_plan.prepare_many(rows)
+            result = self.client.table(self.table_name).insert(serialized_rows).execute()
+            self._invalidate_counts()
+            return [self.model_class(**item) for item in result.data or []]
+        except Exception as e:
+            logger.error(f"Error creating records in {self.table_name}", error=str(e), rows=len(rows))
+            raise
+
     async def find_by_id(self, id_value: Any, id_column: Optional[str] = None) -> Optional[T]:
         """
         Find a record by ID.
@@ -232,21 +282,12 @@ class SupabaseAsyncRepository(Generic[T]):
         # Validate ID if it's a string (ULID)
         self._validate_id(id_value, id_column)
 
-        # Validate any ULID fields in update data
-        if self.validates_ulid:
-            for key, value in data.items():
-                if isinstance(value, str) and len(value) == 26:
-                    if "id" in key.lower() and not is_valid_ulid(value):
-                        raise ValueError(f"Invalid ULID format for {key}: {value}")
+        # Validate ULID fields in update data and serialize (e.g. datetime -> ISO string)
+        serialized_data = self.write_plan.prepare(data, creating=False)
+        if current_version is not None and "version" not in serialized_data:
+            serialized_data["version"] = current_version + 1
 
         try:
-            if current_version is not None:
-                if "version" not in data:
-                    data = {**data, "version": current_version + 1}
-
-            # Serialize data (e.g. datetime -> ISO string)
-            serialized_data = self._serialize_data(data)
-
             query = self.client.table(self.table_name).update(serialized_data).eq(
                 id_column, id_value
             )
@@ -254,6 +295,7 @@ class SupabaseAsyncRepository(Generic[T]):
                 query = query.eq("version", current_version)
 
             result = query.execute()
+            self._invalidate_counts()
 
             if result.data:
                 return self.model_class(**result.data[0])
@@ -292,6 +334,7 @@ class SupabaseAsyncRepository(Generic[T]):
                 .eq(id_column, id_value)
                 .execute()
             )
+            self._invalidate_counts()
 
             return len(result.data) > 0
         except Exception as e:
@@ -315,11 +358,7 @@ class SupabaseAsyncRepository(Generic[T]):
             ValueError: If ULID validation fails
         """
         # Validate any ULID values in filters
-        if self.validates_ulid:
-            for key, value in filters.items():
-                if isinstance(value, str) and len(value) == 26:
-                    if "id" in key.lower():
-                        self._validate_id(value, key)
+        self.write_plan.validate(filters)
 
         try:
             query = self.client.table(self.table_name).select("*")
@@ -336,95 +375,125 @@ class SupabaseAsyncRepository(Generic[T]):
             )
             raise
 
-    async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
+    async def count(
+        self,
+        filters: Optional[Dict[str, Any]] = None,
+        mode: Optional[str] = None,
+        max_age: Optional[float] = None,
+    ) -> int:
         """
         Count records matching filters.
 
+        Only the count is requested, no rows are transferred.
+
         Args:
             filters: Optional dictionary of column:value pairs to filter by
+            mode: "exact", "planned" or "estimated" (default:
+                  DATABASE_COUNT_MODE); see COUNT_MODES
+            max_age: Oldest cached count accepted, in seconds (default: the
+                     cache TTL); 0 always queries the database
 
         Returns:
             Number of matching records
-        """
-        try:
-            query = self.client.table(self.table_name).select("*", count="exact")
 
-            if filters:
-                # Validate any ULID values in filters
-                if self.validates_ulid:
-                    for key, value in filters.items():
-                        if isinstance(value, str) and len(value) == 26:
-                            if "id" in key.lower():
-                                self._validate_id(value, key)
+        Raises:
+            ValueError: On an unknown mode or an invalid ULID filter value
+        """
+        mode = mode or settings.database.count_mode
+        if mode not in COUNT_MODES:
+            raise ValueError(f"Unknown count mode {mode!r}, expected one of {COUNT_MODES}")
+        if filters:
+            # Validate any ULID values in filters
+            self.write_plan.validate(filters)
+
+        cache = self.count_cache
+        key = self._count_key(mode, filters)
+        version = None
+        if cache is not None:
+            # Read before querying: a count racing a write is not cached
+            version = cache.version
+            if max_age is None or max_age > 0:
+                cached = cache.get(key)
+                if cached is not None and (max_age is None or time.monotonic() - cached[0] <= max_age):
+                    return cached[1]
 
-                for column, value in filters.items():
-                    query = query.eq(column, value)
+        try:
+            # limit=0: the total comes in Content-Range without any row. (HEAD
+            # would do too, but postgrest-py reads its empty body as count 0.)
+            query = self.client.table(self.table_name).select("*", count=mode)
+            for column, value in (filters or {}).items():
+                query = query.eq(column, value)
+            query = query.limit(0)
 
             result = query.execute()
-            return result.count or 0
         except Exception as e:
-            logger.error(f"Error counting records in {self.table_name}", error=str(e))
+            logger.error(f"Error counting records in {self.table_name}", error=str(e), mode=mode)
             raise
 
+        total = result.count or 0
+        if cache is not None:
+            cache.set(key, (time.monotonic(), total), version=version)
+        return total
+
+    @staticmethod
+    def _count_key(mode: str, filters: Optional[Dict[str, Any]]) -> Hashable:
+        # repr() keeps unhashable filter values (lists) usable in the key
+        return mode, tuple(sorted((column, repr(value)) for column, value in (filters or {}).items()))
+
+    def _invalidate_counts(self) -> None:
+        """Drop cached counts (any write may change any filtered count)."""
+        if self.count_cache is not None:
+            self.count_cache.clear()
+
     async def query_dynamic(
-        self, select_columns: List[str] = None, filters: List[Dict[str, Any]] = None
+        self,
+        select_columns: List[str] = None,
+        filters: List[Dict[str, Any]] = None,
+        order_by: Optional[List[Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        cursor: Any = None,
     ) -> List[Dict[str, Any]]:
         """
         Execute a dynamic query with custom selection and filters.
 
+        Filters, ordering and pagination are applied on the server. See
+        `src.core.database.query` for the spec format.
+
         Args:
             select_columns: List of columns to select (default: ["*"])
             filters: List of filter dictionaries with keys:
                      - column: str
-                     - operator: str (eq, gt, lt, gte, lte, ne, ct, in)
+                     - operator: str (eq, ne, gt, gte, lt, lte, between, in,
+                       is, is_null, not_null, like, ct/ilike)
                      - value: Any
+                     or {"or": [...]} / {"and": [...]} groups of them
+            order_by: Columns ("created_at", "-id" for descending) or
+                      {"column", "desc", "nulls_first"} dicts
+            limit: Maximum number of records
+            offset: Records to skip
+            cursor: Return only records after this value of the first
+                    order_by column (keyset pagination)
 
         Returns:
             List of records as dictionaries
+
+        Raises:
+            ValueError: On an unknown operator, or a cursor without order_by
         """
-        try:
-            # Determine selection
-            select_str = "*"
-            if select_columns and select_columns != ["*"]:
-                select_str = ", ".join(select_columns)
-
-            query = self.client.table(self.table_name).select(select_str)
-
-            # Apply filters
-            if filters:
-                for f in filters:
-                    column = f.get("column")
-                    operator = f.get("operator", "eq")
-                    value = f.get("value")
-
-                    if not column:
-                        continue
-
-                    # Basic validation for ULIDs in filters could be added here
-
-                    if operator == "eq":
-                        query = query.eq(column, value)
-                    elif operator == "gt":
-                        query = query.gt(column, value)
-                    elif operator == "lt":
-                        query = query.lt(column, value)
-                    elif operator == "gte":
-                        query = query.gte(column, value)
-                    elif operator == "lte":
-                        query = query.lte(column, value)
-                    elif operator == "ne":
-                        query = query.neq(column, value)
-                    elif operator == "ct" or operator == "ilike":
-                        query = query.ilike(column, f"%{value}%")
-                    elif operator == "in":
-                        query = query.in_(column, value)
-                    elif operator == "is":
-                        query = query.is_(column, value)
-                    elif operator == "is_null":
-                        query = query.is_(column, "null")
-                    elif operator == "not_null":
-                        query = query.neq(column, "null")
+        select_str = "*"
+        if select_columns and select_columns != ["*"]:
+            select_str = ", ".join(select_columns)
+        query = build_query(
+            self.client.table(self.table_name).select(select_str),
+            filters,
+            order_by=order_by,
+            limit=limit,
+            offset=offset,
+            cursor=cursor,
+        )
 
+        try:
             result = query.execute()
             return result.data
 
@@ -433,3 +502,41 @@ class SupabaseAsyncRepository(Generic[T]):
                 f"Error executing dynamic query in {self.table_name}", error=str(e)
             )
             raise
+
+    async def iter_pages(
+        self,
+        select_columns: Optional[List[str]] = None,
+        filters: Optional[List[Dict[str, Any]]] = None,
+        page_size: int = 1000,
+        key_column: Optional[str] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """
+        Stream matching records page by page.
+
+        Pages follow `key_column` (keyset pagination): each request starts
+        after the last key seen, so deep pages cost the same as the first
+        and rows inserted meanwhile are not skipped or repeated.
+
+        Args:
+            select_columns: Columns to select (default: all); the key column
+                            is added if missing
+            filters: Filters, as for `query_dynamic`
+            page_size: Records per request
+            key_column: Unique, ordered column (defaults to self.primary_key)
+
+        Yields:
+            Lists of records as dictionaries (never empty)
+        """
+        key_column = key_column or self.primary_key
+        if select_columns and select_columns != ["*"] and key_column not in select_columns:
+            select_columns = [*select_columns, key_column]
+        cursor = None
+        while True:
+            page = await self.query_dynamic(
+                select_columns, filters, order_by=[key_column], limit=page_size, cursor=cursor
+            )
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            cursor = page[-1][key_column]
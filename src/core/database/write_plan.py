@@ -0,0 +1,227 @@
+"""
+Write plans for repository payloads.
+
+What a write has to do with each column (check it as a ULID, drop it on
+insert, turn a datetime into ISO-8601) depends only on the column and the
+model, so it is decided once per model and column instead of per row: a
+`WritePlan` keeps, per model, the columns needing each treatment, and
+preparing a row only visits those columns.
+"""
+
+import datetime
+import decimal
+import enum
+import threading
+import types
+import typing
+from typing import Any, Dict, FrozenSet, Iterable, List, Tuple
+
+from src.core.utils.custom_ulid import ULID_LENGTH, is_valid_ulid, validate_many
+
+# Column flags
+ULID = 1  # 26-char string values are validated as ULIDs
+EXCLUDED = 2  # left out of inserts
+TEMPORAL = 4  # datetime/date/time values are sent as ISO-8601
+UNTYPED = 8  # type unknown: any value with `isoformat()` is converted
+
+_TEMPORAL_TYPES = (datetime.datetime, datetime.date, datetime.time)
+# Types sent as they are
+_PLAIN_TYPES = (str, int, float, bool, bytes, list, dict, tuple, set, decimal.Decimal, type(None))
+
+# Columns outside the model learned per plan (bounds memory for ad-hoc keys)
+MAX_LEARNED_COLUMNS = 256
+
+
+def _annotation_kind(annotation: Any) -> int:
+    """TEMPORAL, 0 (plain) or UNTYPED for a field annotation."""
+    origin = typing.get_origin(annotation)
+    if origin is typing.Annotated:
+        return _annotation_kind(typing.get_args(annotation)[0])
+    if origin in (typing.Union, types.UnionType):
+        kinds = [_annotation_kind(arg) for arg in typing.get_args(annotation)]
+        if UNTYPED in kinds:
+            return UNTYPED
+        return TEMPORAL if TEMPORAL in kinds else 0
+    if origin is not None:
+        # Parametrized containers (List[str], Dict[str, Any], ...)
+        return 0 if isinstance(origin, type) and issubclass(origin, _PLAIN_TYPES) else UNTYPED
+    if isinstance(annotation, type):
+        if issubclass(annotation, _TEMPORAL_TYPES):
+            return TEMPORAL
+        if issubclass(annotation, _PLAIN_TYPES) and not issubclass(annotation, enum.Enum):
+            return 0
+    return UNTYPED
+
+
+# (model, validates_ulid, excluded columns) -> plan
+_plans: Dict[Tuple[type, bool, FrozenSet[str]], "WritePlan"] = {}
+
+
+class WritePlan:
+    """
+    Per-model preparation of insert/update payloads.
+
+    Use `WritePlan.for_model()`: one plan is shared by every repository of
+    the same model and options. A row is copied once (C-level) and only the
+    columns that need work are touched. Columns outside the model are
+    classified on first sight (as before: ULID check by name, `isoformat()`
+    conversion by value) and remembered.
+    """
+
+    __slots__ = ("validates_ulid", "excluded", "_state", "_lock")
+
+    def __init__(self, validates_ulid: bool, excluded: FrozenSet[str], columns: Dict[str, int]):
+        self.validates_ulid = validates_ulid
+        self.excluded = excluded
+        self._lock = threading.Lock()
+        self._set_columns(columns)
+
+    @classmethod
+    def for_model(
+        cls, model_class: type, validates_ulid: bool = True, exclude_on_create: Iterable[str] = ()
+    ) -> "WritePlan":
+        key = (model_class, validates_ulid, frozenset(exclude_on_create))
+        plan = _plans.get(key)
+        if plan is None:
+            plan = _plans.setdefault(key, cls._build(*key))
+        return plan
+
+    @classmethod
+    def _build(cls, model_class: type, validates_ulid: bool, excluded: FrozenSet[str]) -> "WritePlan":
+        plan = cls(validates_ulid, excluded, {})
+        fields = getattr(model_class, "model_fields", None) or {}
+        plan._set_columns(
+            {name: plan._name_flags(name) | _annotation_kind(field.annotation) for name, field in fields.items()}
+        )
+        return plan
+
+    def _name_flags(self, column: str) -> int:
+        flags = 0
+        if self.validates_ulid and "id" in column.lower():
+            flags |= ULID
+        if column in self.excluded:
+            flags |= EXCLUDED
+        return flags
+
+    def _set_columns(self, columns: Dict[str, int]) -> None:
+        # Swapped as a whole: readers on other threads see one consistent state
+        self._state = (
+            columns,
+            frozenset(columns),
+            tuple(name for name, flags in columns.items() if flags & ULID),
+            tuple(name for name, flags in columns.items() if flags & TEMPORAL),
+            tuple(name for name, flags in columns.items() if flags & UNTYPED),
+        )
+
+    def _learn(self, data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Classify the columns of `data` outside the plan.
+
+        Returns:
+            Flags of the new columns that could not be remembered (plan full)
+        """
+        columns = self._state[0]
+        new = {name: self._name_flags(name) | UNTYPED for name in data if name not in columns}
+        with self._lock:
+            columns = self._state[0]
+            if len(columns) + len(new) <= MAX_LEARNED_COLUMNS:
+                self._set_columns({**columns, **new})
+                return {}
+        return new
+
+    def flags(self, column: str) -> int:
+        flags = self._state[0].get(column)
+        return flags if flags is not None else self._name_flags(column) | UNTYPED
+
+    # Preparation
+
+    def validate(self, data: Dict[str, Any]) -> None:
+        """
+        Check the ULID columns of `data` (e.g. filters).
+
+        Raises:
+            ValueError: If a 26-char value of a ULID column is not a ULID
+        """
+        if not self.validates_ulid:
+            return
+        for key, value in data.items():
+            if isinstance(value, str) and len(value) == ULID_LENGTH and self.flags(key) & ULID:
+                if not is_valid_ulid(value):
+                    raise ValueError(f"Invalid ULID format for {key}: {value}")
+
+    def prepare(self, data: Dict[str, Any], creating: bool = True) -> Dict[str, Any]:
+        """
+        Validate and serialize one row.
+
+        Args:
+            data: Column values (not modified)
+            creating: Drop the columns excluded on create
+
+        Returns:
+            A new dict ready to send
+
+        Raises:
+            ValueError: If a ULID column holds an invalid ULID
+        """
+        row = self._convert(data, creating)
+        for key in self._state[2]:
+            value = row.get(key)
+            if isinstance(value, str) and len(value) == ULID_LENGTH and not is_valid_ulid(value):
+                raise ValueError(f"Invalid ULID format for {key}: {value}")
+        return row
+
+    def prepare_many(self, rows: Iterable[Dict[str, Any]], creating: bool = True) -> List[Dict[str, Any]]:
+        """
+        Prepare a batch of rows; ULID columns are validated across the whole
+        batch at once.
+
+        Raises:
+            ValueError: If a ULID column of any row holds an invalid ULID
+        """
+        prepared = [self._convert(data, creating) for data in rows]
+        candidates: List[Tuple[str, str]] = []
+        for key in self._state[2]:
+            for row in prepared:
+                value = row.get(key)
+                if isinstance(value, str) and len(value) == ULID_LENGTH:
+                    candidates.append((key, value))
+        if candidates:
+            for (key, value), valid in zip(candidates, validate_many([value for _, value in candidates])):
+                if not valid:
+                    raise ValueError(f"Invalid ULID format for {key}: {value}")
+        return prepared
+
+    def _convert(self, data: Dict[str, Any], creating: bool) -> Dict[str, Any]:
+        """Copy of `data` without excluded columns, temporal values as ISO-8601."""
+        known = self._state[1]
+        unlearned = {} if known.issuperset(data) else self._learn(data)
+        _, _, ulid, temporal, untyped = self._state
+        row = dict(data)
+        if creating:
+            for key in self.excluded:
+                row.pop(key, None)
+        for key in temporal:
+            value = row.get(key)
+            if isinstance(value, _TEMPORAL_TYPES):
+                row[key] = value.isoformat()
+        for key in untyped:
+            value = row.get(key)
+            if value is not None and hasattr(value, "isoformat"):
+                row[key] = value.isoformat()
+        for key, flags in unlearned.items():
+            value = row.get(key)
+            if value is not None and hasattr(value, "isoformat"):
+                row[key] = value.isoformat()
+            if flags & ULID and isinstance(value, str) and len(value) == ULID_LENGTH and not is_valid_ulid(value):
+                raise ValueError(f"Invalid ULID format for {key}: {value}")
+        return row
+
+    def describe(self) -> Dict[str, List[str]]:
+        """Columns per treatment (for logs and debugging)."""
+        columns, _, ulid, temporal, untyped = self._state
+        return {
+            "ulid": sorted(ulid),
+            "excluded": sorted(self.excluded),
+            "temporal": sorted(temporal),
+            "untyped": sorted(untyped),
+        }
@@ -2,12 +2,44 @@
 Dependency Injection Container.
 """
 
+import asyncio
+import inspect
+
 from dependency_injector import containers, providers
 
 from src.core.di.modules.core import CoreContainer
 from src.core.di.modules.meta import MetaContainer
 
 
+class ApplicationContainer(containers.DynamicContainer):
+    """
+    Container whose shutdown follows resource dependencies across modules.
+
+    dependency-injector only orders shutdown by the direct arguments of each
+    resource, and a module reaches core resources through its
+    `DependenciesContainer` (e.g. `core.http_client`), so a module resource
+    would be closed together with the core resources it still uses. Here a
+    resource stops only after every resource that depends on it, directly
+    or through other providers.
+    """
+
+    async def shutdown_resources(self, resource_type=providers.Resource) -> None:
+        resources = list(self.traverse(types=[resource_type]))
+        uses = {
+            resource: {used for used in resource.traverse(types=[resource_type]) if used is not resource}
+            for resource in resources
+        }
+        while True:
+            running = [resource for resource in resources if resource.initialized]
+            if not running:
+                return
+            unused = [resource for resource in running if not any(resource in uses[other] for other in running)]
+            if not unused:
+                raise RuntimeError("Unable to resolve resources shutdown order")
+            results = [resource.shutdown() for resource in unused]
+            await asyncio.gather(*(result for result in results if inspect.isawaitable(result)))
+
+
 class Container(containers.DeclarativeContainer):
     """
     Main Dependency Injection Container.
@@ -16,6 +48,8 @@ class Container(containers.DeclarativeContainer):
     for the application's dependencies.
     """
 
+    instance_type = ApplicationContainer
+
     # Wiring configuration
     wiring_config = containers.WiringConfiguration(
         modules=[
@@ -23,11 +57,12 @@ class Container(containers.DeclarativeContainer):
             "src.modules.channels.meta.services.meta_account_service",
             "src.modules.channels.meta.services.meta_webhook_service",
             "src.modules.channels.meta.services.webhook.owner_resolver",
-            "src.main",
+            # Routes resolve services from app.container and carry no Provide
+            # markers, so the API modules need no wiring
         ],
     )
     # Core Infrastructure
     core = providers.Container(CoreContainer)
 
     # Meta Module
-    meta = providers.Container(MetaContainer)
+    meta = providers.Container(MetaContainer, core=core)
@@ -1,7 +1,13 @@
 from dependency_injector import containers, providers
 
+from src.core.cache.invalidation import create_invalidation_bus, invalidation_bus_resource
+from src.core.concurrency.adaptive_limiter import admission_limiter_resource, create_admission_limiter
 from src.core.config.settings import settings
-from src.core.database.session import DatabaseConnection
+from src.core.database.session import DatabaseConnection, supabase_pool_resource
+from src.core.http.client import http_client_resource
+from src.core.journal.event_journal import create_event_journal, event_journal_resource
+from src.core.media.processing_pool import create_media_pool, media_pool_resource
+from src.core.outbox.sqlite_outbox import create_outbox
 
 
 class CoreContainer(containers.DeclarativeContainer):
@@ -14,6 +20,35 @@ class CoreContainer(containers.DeclarativeContainer):
 
     supabase_connection = providers.Singleton(DatabaseConnection)
 
+    # Session pool (prewarmed, health-checked and closed with the application lifespan)
+    supabase_pool = providers.Resource(supabase_pool_resource, supabase_connection)
+
     supabase_session = providers.Singleton(lambda db: db.session, supabase_connection)
 
     supabase_client = providers.Singleton(lambda db: db.client, supabase_connection)
+
+    # HTTP (pooled client, opened/closed with the application lifespan)
+    http_client = providers.Resource(http_client_resource)
+
+    # Cross-worker cache invalidation (started/stopped with the application lifespan)
+    invalidation_bus = providers.Singleton(create_invalidation_bus)
+
+    invalidation_bus_lifecycle = providers.Resource(invalidation_bus_resource, invalidation_bus)
+
+    # Inbound event journal (writer thread started/stopped with the application lifespan)
+    event_journal = providers.Singleton(create_event_journal)
+
+    event_journal_lifecycle = providers.Resource(event_journal_resource, event_journal)
+
+    # Outbound message outbox (opened/closed by the module that drains it, see `MetaContainer`)
+    outbox = providers.Singleton(create_outbox)
+
+    # Media worker processes (started/stopped with the application lifespan)
+    media_pool = providers.Singleton(create_media_pool)
+
+    media_pool_lifecycle = providers.Resource(media_pool_resource, media_pool)
+
+    # Webhook admission control (limit and shed rate exposed on /metrics while the app runs)
+    admission_limiter = providers.Singleton(create_admission_limiter)
+
+    admission_limiter_lifecycle = providers.Resource(admission_limiter_resource, admission_limiter)
@@ -1,43 +1,154 @@
 from dependency_injector import containers, providers
 
-from src.core.di.modules.core import CoreContainer
+from src.core.concurrency.bulkhead import create_owner_bulkheads, owner_bulkheads_resource
+from src.core.concurrency.keyed_executor import KeyedExecutor, keyed_executor_resource
+from src.core.config.settings import settings
+from src.core.outbox.sqlite_outbox import outbox_resource
+
 from src.modules.channels.meta.repositories.impl.supabase_meta_account_repository import SupabaseMetaAccountRepository
 from src.modules.channels.meta.services.meta_service import MetaService
 from src.modules.channels.meta.services.meta_account_service import MetaAccountService
+from src.modules.channels.meta.services.meta_outbox_sender import MetaOutboxSender, meta_outbox_sender_resource
+from src.modules.channels.meta.services.routing_snapshot import create_routing_table, routing_table_resource
+from src.modules.channels.meta.services.webhook.context import WebhookContext
+from src.modules.channels.meta.services.webhook.message_router import MessageRouter, message_router_resource
 from src.modules.channels.meta.services.webhook.owner_resolver import MetaWebhookOwnerResolver
+from src.modules.channels.meta.services.webhook.signature import (
+    WebhookSignatureVerifier,
+    webhook_signature_verifier_resource,
+)
 from src.modules.channels.meta.services.meta_webhook_service import MetaWebhookService
 
 
 class MetaContainer(containers.DeclarativeContainer):
     """
     Meta Module Container.
+
+    Scopes:
+    - Application singletons: repositories and services (built once per process)
+    - Request scope: `webhook_context`, a new instance per inbound webhook
+    - Resources: providers owning connections/pools (see `CoreContainer`)
+      are started and stopped by the application lifespan
     """
-    core = providers.Container(CoreContainer)
+    core = providers.DependenciesContainer()
 
     # Repositories
     meta_account_repository = providers.Selector(
         core.db_backend,
-        supabase=providers.Factory(
+        supabase=providers.Singleton(
             SupabaseMetaAccountRepository,
             client=core.supabase_session,
         ),
     )
 
+    # Request scope
+    webhook_context = providers.Factory(WebhookContext.from_payload)
+
+    # Per-owner isolation (queue depths exposed on /metrics while the app runs)
+    outbound_bulkheads = providers.Singleton(
+        create_owner_bulkheads,
+        name="bulkhead.outbound",
+        capacity=settings.bulkhead.outbound_concurrency,
+        owner_concurrency=settings.bulkhead.outbound_owner_concurrency,
+    )
+
+    outbound_bulkheads_lifecycle = providers.Resource(owner_bulkheads_resource, outbound_bulkheads)
+
+    webhook_bulkheads = providers.Singleton(
+        create_owner_bulkheads,
+        name="bulkhead.webhook",
+        capacity=settings.webhook.max_concurrency,
+        owner_concurrency=settings.bulkhead.webhook_owner_concurrency,
+    )
+
+    webhook_bulkheads_lifecycle = providers.Resource(owner_bulkheads_resource, webhook_bulkheads)
+
     # Services
-    meta_service = providers.Factory(
-        MetaService, meta_account_repo=meta_account_repository
+    meta_service = providers.Singleton(
+        MetaService, meta_account_repo=meta_account_repository, outbox=core.outbox, bulkheads=outbound_bulkheads
+    )
+
+    # Outbox delivery loop (started/stopped with the application lifespan). The
+    # sender takes the outbox and HTTP client resources as arguments so it
+    # stops before they close (shutdown follows resource dependencies, see
+    # `ApplicationContainer`)
+    outbox_lifecycle = providers.Resource(outbox_resource, core.outbox)
+
+    meta_outbox_sender = providers.Singleton(
+        MetaOutboxSender.from_settings, outbox=core.outbox, meta_service=meta_service
     )
 
-    meta_account_service = providers.Factory(
-        MetaAccountService, repo=meta_account_repository
+    meta_outbox_sender_lifecycle = providers.Resource(
+        meta_outbox_sender_resource, meta_outbox_sender, outbox_lifecycle, core.http_client
     )
 
-    meta_webhook_owner_resolver = providers.Factory(
+    # Owner routing snapshot, mapped at startup and rebuilt in the background
+    routing_table = providers.Singleton(create_routing_table, repo=meta_account_repository)
+
+    routing_table_lifecycle = providers.Resource(routing_table_resource, routing_table)
+
+    meta_account_service = providers.Singleton(
+        MetaAccountService,
+        repo=meta_account_repository,
+        invalidation_bus=core.invalidation_bus,
+        routing=routing_table,
+    )
+
+    meta_webhook_owner_resolver = providers.Singleton(
         MetaWebhookOwnerResolver, meta_account_service=meta_account_service
     )
 
-    meta_webhook_service = providers.Factory(
+    # X-Hub-Signature-256 check of inbound webhooks (secrets refreshed in the background)
+    webhook_signature_verifier = providers.Singleton(
+        WebhookSignatureVerifier.from_settings,
+        account_service=meta_account_service,
+        invalidation_bus=core.invalidation_bus,
+    )
+
+    webhook_signature_verifier_lifecycle = providers.Resource(
+        webhook_signature_verifier_resource, webhook_signature_verifier
+    )
+
+    # Per-conversation ordering of inbound messages. With bulkheads, those
+    # (taken inside each sequenced job) bound concurrency instead
+    webhook_sequencer = providers.Singleton(
+        KeyedExecutor,
+        max_concurrency=None if settings.bulkhead.enabled else settings.webhook.max_concurrency,
+        idle_ttl=settings.webhook.sequencer_idle_ttl_seconds,
+        name="webhook.sequencer",
+    )
+
+    # Inbound message dispatch by message type
+    message_router = providers.Singleton(
+        MessageRouter.default,
+        meta_service=meta_service,
+        media_pool=core.media_pool,
+        cpu_threads=settings.webhook.cpu_handler_threads,
+        journal=core.event_journal,
+    )
+
+    # Background (heavy) handlers download media, use the media pool and mark
+    # their failures in the journal: drained before any of them closes
+    message_router_lifecycle = providers.Resource(
+        message_router_resource,
+        message_router,
+        core.http_client,
+        core.media_pool_lifecycle,
+        core.event_journal_lifecycle,
+    )
+
+    # Sequenced jobs dispatch through the router: drained before it stops
+    webhook_sequencer_lifecycle = providers.Resource(
+        keyed_executor_resource, webhook_sequencer, message_router_lifecycle
+    )
+
+    meta_webhook_service = providers.Singleton(
         MetaWebhookService,
         owner_resolver=meta_webhook_owner_resolver,
         meta_service=meta_service,
+        context_factory=webhook_context.provider,
+        sequencer=webhook_sequencer,
+        journal=core.event_journal,
+        message_router=message_router,
+        bulkheads=webhook_bulkheads,
     )
@@ -0,0 +1,79 @@
+"""
+Shared HTTP client.
+
+A single pooled `httpx.AsyncClient` per process so outbound calls reuse
+TCP/TLS connections instead of opening a new client on every request.
+"""
+
+from typing import TYPE_CHECKING, Optional
+
+from src.core.utils.logging import get_logger
+
+if TYPE_CHECKING:
+    import httpx
+
+logger = get_logger(__name__)
+
+# Timeouts (seconds) and pool limits; httpx itself is imported on first use
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 5.0
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+
+_client: Optional["httpx.AsyncClient"] = None
+# Set once the owning resource closed the client: late callers (tasks still
+# running at shutdown) get an error instead of a new client nobody closes
+_shut_down = False
+
+
+def get_http_client() -> "httpx.AsyncClient":
+    """
+    Get the process-wide pooled async HTTP client.
+
+    The client is created on first use and must be closed with
+    `close_http_client()` on application shutdown.
+
+    Raises:
+        RuntimeError: After `close_http_client()` (application shut down)
+    """
+    global _client
+    if _shut_down:
+        raise RuntimeError("Pooled HTTP client is closed (application shut down)")
+    if _client is None or _client.is_closed:
+        import httpx
+
+        _client = httpx.AsyncClient(
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT_SECONDS, connect=DEFAULT_CONNECT_TIMEOUT_SECONDS),
+            limits=httpx.Limits(
+                max_connections=DEFAULT_MAX_CONNECTIONS,
+                max_keepalive_connections=DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+            ),
+        )
+        logger.info("Pooled HTTP client created")
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the pooled HTTP client, releasing its connections."""
+    global _client, _shut_down
+    _shut_down = True
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+        logger.info("Pooled HTTP client closed")
+    _client = None
+
+
+async def http_client_resource():
+    """
+    DI resource owning the pooled HTTP client.
+
+    Initialized by `container.init_resources()` at startup and closed by
+    `container.shutdown_resources()` at shutdown.
+    """
+    global _shut_down
+    _shut_down = False
+    client = get_http_client()
+    try:
+        yield client
+    finally:
+        await close_http_client()
@@ -0,0 +1,398 @@
+"""
+Append-only inbound event journal.
+
+Raw webhook bodies are appended to segment files before processing, so an
+event that fails after Meta already got its 200 can be replayed
+(`scripts/meta/replay_events.py`).
+
+Segment layout: a 4-byte magic followed by records of
+`<u32 body length><u32 crc32(body)><u8 kind>` + body, where the body is
+`<26-byte event id (ULID)><f64 unix timestamp><data>`. Kinds are EVENT (data
+is the raw payload), FAILED (data is the error) and RESOLVED (a successful
+replay). Each writer (worker process) appends to its own segments, named
+`<start ms>-<pid>-<seq>.seg`; segments rotate by size and are fsynced in
+batches by a writer thread (group commit).
+"""
+
+import asyncio
+import os
+import struct
+import threading
+import time
+import zlib
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.custom_ulid import monotonic_ulid
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+SEGMENT_MAGIC = b"WHJ1"
+SEGMENT_SUFFIX = ".seg"
+RECORD_HEADER = struct.Struct("<IIB")
+TIMESTAMP = struct.Struct("<d")
+EVENT_ID_SIZE = 26
+# Sanity bound when reading: anything larger is treated as corruption
+MAX_RECORD_BYTES = 64 * 1024 * 1024
+
+EVENT = 1
+FAILED = 2
+RESOLVED = 3
+
+
+def encode_record(kind: int, event_id: str, timestamp: float, data: bytes) -> bytes:
+    body = event_id.encode("ascii") + TIMESTAMP.pack(timestamp) + data
+    return RECORD_HEADER.pack(len(body), zlib.crc32(body), kind) + body
+
+
+class _Pending:
+    __slots__ = ("record", "future", "loop")
+
+    def __init__(self, record: bytes, future: Optional[asyncio.Future], loop: Optional[asyncio.AbstractEventLoop]):
+        self.record = record
+        self.future = future
+        self.loop = loop
+
+
+class EventJournal:
+    """
+    Segmented append-only journal written by a background thread.
+
+    `record()` queues an event and, when `wait_for_durability` is set, waits
+    until the batch containing it has been written and fsynced. Every batch
+    is one write + one fsync, so concurrent requests share the fsync cost.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_max_bytes: int = 64 * 1024 * 1024,
+        fsync: bool = True,
+        wait_for_durability: bool = True,
+        max_batch_delay_ms: float = 2.0,
+        max_batch_records: int = 512,
+        retention_hours: float = 168.0,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.directory = directory
+        self.segment_max_bytes = segment_max_bytes
+        self.fsync = fsync
+        self.wait_for_durability = wait_for_durability
+        self.max_batch_delay = max_batch_delay_ms / 1000.0
+        self.max_batch_records = max(1, max_batch_records)
+        self.retention_seconds = retention_hours * 3600.0
+        self.registry = registry
+
+        self._queue: Deque[_Pending] = deque()
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._closing = False
+        self._file = None
+        self._segment_path: Optional[str] = None
+        self._segment_size = 0
+        self._segment_seq = 0
+        self._prefix = f"{int(time.time() * 1000):013d}-{os.getpid()}"
+        self._counters: Dict[str, int] = {
+            "records": 0,
+            "bytes": 0,
+            "batches": 0,
+            "fsyncs": 0,
+            "segments": 0,
+            "errors": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "EventJournal":
+        journal = settings.journal
+        return cls(
+            journal.directory,
+            segment_max_bytes=journal.segment_max_bytes,
+            fsync=journal.fsync,
+            wait_for_durability=journal.wait_for_durability,
+            max_batch_delay_ms=journal.max_batch_delay_ms,
+            max_batch_records=journal.max_batch_records,
+            retention_hours=journal.retention_hours,
+        )
+
+    # Writing
+
+    async def record(self, data: bytes, received_at: Optional[float] = None) -> str:
+        """Append a raw inbound event and return its id."""
+        event_id = monotonic_ulid()
+        record = encode_record(EVENT, event_id, received_at or time.time(), data)
+        if self.wait_for_durability:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._enqueue(_Pending(record, future, loop))
+            await future
+        else:
+            self._enqueue(_Pending(record, None, None))
+        return event_id
+
+    def mark_failed(self, event_id: str, error: Any) -> None:
+        """Record that processing `event_id` failed (not waited for)."""
+        message = f"{type(error).__name__}: {error}" if isinstance(error, BaseException) else str(error)
+        self._enqueue(_Pending(encode_record(FAILED, event_id, time.time(), message.encode("utf-8")), None, None))
+
+    def mark_resolved(self, event_id: str) -> None:
+        """Record that `event_id` was successfully replayed (not waited for)."""
+        self._enqueue(_Pending(encode_record(RESOLVED, event_id, time.time(), b""), None, None))
+
+    def _enqueue(self, pending: _Pending) -> None:
+        with self._cond:
+            if self._thread is None or self._closing:
+                raise RuntimeError("Event journal is not running")
+            self._queue.append(pending)
+            self._cond.notify()
+
+    def _writer(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue and not self._closing:
+                    self._cond.wait()
+                if not self._queue and self._closing:
+                    return
+                short = len(self._queue) < self.max_batch_records
+            if short and self.max_batch_delay > 0 and not self._closing:
+                # Let concurrent requests join this batch and share its fsync
+                time.sleep(self.max_batch_delay)
+            with self._cond:
+                batch = [self._queue.popleft() for _ in range(min(len(self._queue), self.max_batch_records))]
+            self._write_batch(batch)
+
+    def _write_batch(self, batch: List[_Pending]) -> None:
+        error: Optional[BaseException] = None
+        try:
+            data = b"".join(p.record for p in batch)
+            if self._file is None or (
+                self._segment_size + len(data) > self.segment_max_bytes and self._segment_size > len(SEGMENT_MAGIC)
+            ):
+                self._rotate()
+            self._file.write(data)
+            self._file.flush()
+            if self.fsync:
+                started = time.perf_counter()
+                os.fsync(self._file.fileno())
+                self.registry.observe("journal.fsync_ms", (time.perf_counter() - started) * 1000.0)
+                self._counters["fsyncs"] += 1
+            self._segment_size += len(data)
+            self._counters["records"] += len(batch)
+            self._counters["bytes"] += len(data)
+            self._counters["batches"] += 1
+            self.registry.observe("journal.batch_records", len(batch))
+        except Exception as e:
+            error = e
+            self._counters["errors"] += 1
+            logger.error("Event journal write failed", error=str(e), records=len(batch))
+
+        for pending in batch:
+            if pending.future is not None:
+                pending.loop.call_soon_threadsafe(_resolve, pending.future, error)
+
+    def _rotate(self) -> None:
+        if self._file is not None:
+            self._file.close()
+        self._segment_seq += 1
+        os.makedirs(self.directory, exist_ok=True)
+        self._segment_path = os.path.join(self.directory, f"{self._prefix}-{self._segment_seq:06d}{SEGMENT_SUFFIX}")
+        self._file = open(self._segment_path, "ab")
+        self._file.write(SEGMENT_MAGIC)
+        self._segment_size = len(SEGMENT_MAGIC)
+        self._counters["segments"] += 1
+        self._apply_retention()
+
+    def _apply_retention(self) -> None:
+        if self.retention_seconds <= 0:
+            return
+        cutoff = time.time() - self.retention_seconds
+        for path in segment_paths(self.directory):
+            try:
+                if path != self._segment_path and os.path.getmtime(path) < cutoff:
+                    os.unlink(path)
+            except OSError:
+                pass
+
+    # Lifecycle
+
+    def start(self) -> None:
+        with self._cond:
+            if self._thread is not None:
+                return
+            self._closing = False
+            self._thread = threading.Thread(target=self._writer, name="event-journal", daemon=True)
+            self._thread.start()
+        self.registry.register_collector("journal", self.stats)
+        logger.info("Event journal started", directory=os.path.abspath(self.directory))
+
+    def close(self) -> None:
+        """Flush everything queued, then stop the writer and close the segment."""
+        with self._cond:
+            thread = self._thread
+            if thread is None:
+                return
+            self._closing = True
+            self._cond.notify()
+        thread.join()
+        self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.registry.unregister_collector("journal")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "segment": os.path.basename(self._segment_path) if self._segment_path else None,
+            "segment_bytes": self._segment_size,
+            "queued": len(self._queue),
+            **self._counters,
+        }
+
+
+def _resolve(future: asyncio.Future, error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(None)
+
+
+def create_event_journal() -> Optional[EventJournal]:
+    """Journal configured by `JOURNAL_*`, or None when disabled."""
+    return EventJournal.from_settings() if settings.journal.enabled else None
+
+
+async def event_journal_resource(journal: Optional[EventJournal]):
+    """
+    DI resource driving the journal writer thread.
+
+    Started by `container.init_resources()`; on
+    `container.shutdown_resources()` queued records are flushed first.
+    """
+    if journal is None:
+        yield None
+        return
+    journal.start()
+    try:
+        yield journal
+    finally:
+        await asyncio.to_thread(journal.close)
+
+
+# Reading
+
+
+@dataclass
+class JournalRecord:
+    kind: int
+    event_id: str
+    timestamp: float
+    data: bytes
+    segment: str
+    offset: int
+
+
+@dataclass
+class JournalEvent:
+    """An inbound event and its processing outcome across the journal."""
+
+    event_id: str
+    received_at: float
+    data: bytes
+    failures: int = 0
+    last_error: Optional[str] = None
+    last_failed_at: Optional[float] = None
+    last_resolved_at: Optional[float] = None
+    segment: str = field(default="", repr=False)
+
+    @property
+    def failed(self) -> bool:
+        """Failed and not successfully replayed since."""
+        if self.last_failed_at is None:
+            return False
+        return self.last_resolved_at is None or self.last_resolved_at < self.last_failed_at
+
+
+def segment_paths(directory: str) -> List[str]:
+    """Segment files in `directory`, oldest first."""
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, n) for n in sorted(names) if n.endswith(SEGMENT_SUFFIX)]
+
+
+def read_segment(path: str) -> Iterator[JournalRecord]:
+    """
+    Yield the records of one segment.
+
+    A truncated tail (crash mid-write) ends the segment; a record whose
+    checksum does not match is skipped.
+    """
+    with open(path, "rb") as f:
+        content = f.read()
+    if not content.startswith(SEGMENT_MAGIC):
+        logger.warning("Not a journal segment", segment=path)
+        return
+    offset = len(SEGMENT_MAGIC)
+    prefix = EVENT_ID_SIZE + TIMESTAMP.size
+    while offset + RECORD_HEADER.size <= len(content):
+        length, crc, kind = RECORD_HEADER.unpack_from(content, offset)
+        start = offset + RECORD_HEADER.size
+        end = start + length
+        if length < prefix or length > MAX_RECORD_BYTES or end > len(content):
+            logger.warning("Truncated journal segment", segment=path, offset=offset)
+            return
+        body = content[start:end]
+        if zlib.crc32(body) != crc:
+            logger.warning("Corrupt journal record skipped", segment=path, offset=offset)
+        else:
+            yield JournalRecord(
+                kind=kind,
+                event_id=body[:EVENT_ID_SIZE].decode("ascii"),
+                timestamp=TIMESTAMP.unpack_from(body, EVENT_ID_SIZE)[0],
+                data=body[prefix:],
+                segment=path,
+                offset=offset,
+            )
+        offset = end
+
+
+def read_journal(directory: str) -> Iterator[JournalRecord]:
+    for path in segment_paths(directory):
+        yield from read_segment(path)
+
+
+def load_events(directory: str) -> List[JournalEvent]:
+    """Every journaled event, in journal order, with its failure/replay state."""
+    events: Dict[str, JournalEvent] = {}
+    marks: List[JournalRecord] = []
+    for record in read_journal(directory):
+        if record.kind == EVENT:
+            events[record.event_id] = JournalEvent(
+                event_id=record.event_id,
+                received_at=record.timestamp,
+                data=record.data,
+                segment=record.segment,
+            )
+        else:
+            # Replay marks may live in segments written after (or before, by
+            # name) the event's own segment: apply them once all are loaded
+            marks.append(record)
+    for record in marks:
+        event = events.get(record.event_id)
+        if event is None:
+            continue
+        if record.kind == FAILED:
+            event.failures += 1
+            if event.last_failed_at is None or record.timestamp >= event.last_failed_at:
+                event.last_failed_at = record.timestamp
+                event.last_error = record.data.decode("utf-8", "replace")
+        elif record.kind == RESOLVED:
+            if event.last_resolved_at is None or record.timestamp > event.last_resolved_at:
+                event.last_resolved_at = record.timestamp
+    return list(events.values())
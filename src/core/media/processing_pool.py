@@ -0,0 +1,286 @@
+"""
+Media processing pool.
+
+CPU-heavy media work (probing, transcoding, thumbnailing) runs in a pool of
+worker processes so it never blocks the event loop. Jobs are routed to a
+processor by MIME type, bounded by a queue limit and a per-job timeout, and
+awaited asynchronously by the webhook flow.
+"""
+
+import asyncio
+import concurrent.futures
+import concurrent.futures.process
+import multiprocessing
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from src.core.config.settings import settings
+from src.core.media import processors
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Built-in processors by MIME pattern (`type/subtype`, `type/*` or `*/*`)
+DEFAULT_PROCESSORS: Dict[str, str] = {
+    "audio/ogg": "src.core.media.processors:audio_processor",
+    "image/*": "src.core.media.processors:image_processor",
+    "video/mp4": "src.core.media.processors:video_processor",
+    "video/3gpp": "src.core.media.processors:video_processor",
+    "*/*": "src.core.media.processors:default_processor",
+}
+
+
+class MediaQueueFullError(RuntimeError):
+    """The pool already holds its maximum number of queued and running jobs."""
+
+
+class MediaJobTimeoutError(TimeoutError):
+    """A media job did not finish within its time limit."""
+
+
+@dataclass
+class MediaResult:
+    mime_type: str
+    processor: str
+    data: Dict[str, Any]
+    queue_ms: float
+    run_ms: float
+
+
+def parse_processors(spec: Optional[str]) -> Dict[str, str]:
+    """Parse `audio/ogg=pkg.mod:func,image/*=pkg.mod:func` into a mapping."""
+    mapping: Dict[str, str] = {}
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        pattern, _, path = item.partition("=")
+        if not path or ":" not in path:
+            raise ValueError(f"Media processor must be 'mime/type=package.module:function', got {item!r}")
+        mapping[pattern.strip().lower()] = path.strip()
+    return mapping
+
+
+class MediaProcessingPool:
+    """
+    Process pool running media processors off the event loop.
+
+    At most `workers` jobs run at once and `max_queue` more may wait; beyond
+    that `submit()` fails fast with `MediaQueueFullError` so a burst of media
+    cannot pile up unbounded work. A job is interrupted inside its worker
+    after `job_timeout` seconds. Cancelling the awaiting task drops a job
+    that has not started yet.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_queue: int = 32,
+        job_timeout: float = 30.0,
+        start_method: str = "forkserver",
+        processor_paths: Optional[Dict[str, str]] = None,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.job_timeout = job_timeout
+        self.start_method = start_method
+        self.registry = registry
+        self._processors: Dict[str, str] = {**DEFAULT_PROCESSORS, **(processor_paths or {})}
+        self._executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._in_flight = 0
+        self._counters: Dict[str, int] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "timeouts": 0,
+            "rejected": 0,
+            "cancelled": 0,
+            "restarts": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "MediaProcessingPool":
+        media = settings.media
+        return cls(
+            workers=media.workers,
+            max_queue=media.max_queue,
+            job_timeout=media.job_timeout_seconds,
+            start_method=media.start_method,
+            processor_paths=parse_processors(media.processors),
+        )
+
+    # Processors
+
+    def register(self, pattern: str, path: str) -> None:
+        """Route MIME `pattern` to processor `package.module:function`."""
+        self._processors[pattern.lower()] = path
+
+    def processor_for(self, mime_type: str) -> str:
+        base = mime_type.split(";")[0].strip().lower()
+        major = base.split("/")[0]
+        for pattern in (base, f"{major}/*", "*/*"):
+            if pattern in self._processors:
+                return self._processors[pattern]
+        raise LookupError(f"No media processor for {mime_type!r}")
+
+    # Lifecycle
+
+    async def start(self, prewarm: bool = True) -> None:
+        if self._executor is not None:
+            return
+        self._executor = self._new_executor()
+        self._slots = asyncio.Semaphore(self.workers + self.max_queue)
+        self.registry.register_collector("media_pool", self.stats)
+        if prewarm:
+            # Workers start on demand: spawn them now instead of on the first media
+            loop = asyncio.get_running_loop()
+            started = time.perf_counter()
+            await asyncio.gather(*(loop.run_in_executor(self._executor, processors.ping) for _ in range(self.workers)))
+            logger.info(
+                "Media processing pool started",
+                workers=self.workers,
+                start_ms=round((time.perf_counter() - started) * 1000.0, 1),
+            )
+
+    def _new_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        context = multiprocessing.get_context(self.start_method)
+        if self.start_method == "forkserver":
+            # Workers fork from a server that already imported the processors
+            context.set_forkserver_preload([processors.__name__])
+        return concurrent.futures.ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+
+    def _replace_executor(self, broken: concurrent.futures.ProcessPoolExecutor) -> None:
+        if self._executor is not broken:
+            # Already replaced (or stopped) after another job hit the same failure
+            return
+        self._executor = self._new_executor()
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._counters["restarts"] += 1
+        logger.error("Media worker died; process pool replaced")
+
+    async def stop(self) -> None:
+        if self._executor is None:
+            return
+        executor, self._executor = self._executor, None
+        # Queued jobs are dropped; running ones finish (bounded by the job timeout)
+        await asyncio.to_thread(executor.shutdown, wait=True, cancel_futures=True)
+        self.registry.unregister_collector("media_pool")
+
+    # Jobs
+
+    async def submit(
+        self,
+        data: bytes,
+        mime_type: str,
+        options: Optional[Dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+    ) -> MediaResult:
+        """
+        Process `data` with the processor registered for `mime_type`.
+
+        Args:
+            data: Media content
+            mime_type: MIME type, parameters allowed (e.g. "audio/ogg; codecs=opus")
+            options: Processor options
+            timeout: Job time limit in seconds (default: the pool's)
+
+        Raises:
+            MediaQueueFullError: if the pool is saturated
+            MediaJobTimeoutError: if the job exceeded its time limit
+            LookupError: if no processor matches `mime_type`
+        """
+        if self._executor is None:
+            raise RuntimeError("Media processing pool is not running")
+        path = self.processor_for(mime_type)
+        if self._slots.locked():
+            self._counters["rejected"] += 1
+            self.registry.inc("media.jobs", status="rejected")
+            raise MediaQueueFullError(f"Media queue full ({self.workers} running, {self.max_queue} queued)")
+
+        timeout = self.job_timeout if timeout is None else timeout
+        loop = asyncio.get_running_loop()
+        submitted = time.perf_counter()
+        self._counters["submitted"] += 1
+        async with self._slots:
+            self._in_flight += 1
+            executor = self._executor
+            future = executor.submit(processors.run_processor, path, data, mime_type, options or {}, timeout)
+            try:
+                # The worker enforces `timeout` on the run itself; this outer bound
+                # (worst-case wait behind a full queue) only guards against a
+                # worker stuck where the timer cannot interrupt it
+                result = await asyncio.wait_for(asyncio.wrap_future(future, loop=loop), self._deadline(timeout))
+            except (TimeoutError, asyncio.TimeoutError) as e:
+                self._counters["timeouts"] += 1
+                self.registry.inc("media.jobs", status="timeout")
+                raise MediaJobTimeoutError(f"Media job timed out after {timeout}s ({path})") from e
+            except asyncio.CancelledError:
+                self._counters["cancelled"] += 1
+                self.registry.inc("media.jobs", status="cancelled")
+                raise
+            except concurrent.futures.process.BrokenProcessPool:
+                # A worker died (e.g. killed by the OOM killer): replace the pool
+                self._counters["failed"] += 1
+                self.registry.inc("media.jobs", status="error")
+                self._replace_executor(executor)
+                raise
+            except Exception:
+                self._counters["failed"] += 1
+                self.registry.inc("media.jobs", status="error")
+                raise
+            finally:
+                self._in_flight -= 1
+                if not future.done():
+                    future.cancel()
+
+        total_ms = (time.perf_counter() - submitted) * 1000.0
+        run_ms = result.pop("_run_ms", 0.0)
+        queue_ms = max(0.0, total_ms - run_ms)
+        self._counters["completed"] += 1
+        self.registry.inc("media.jobs", status="ok")
+        self.registry.observe("media.job_ms", total_ms)
+        self.registry.observe("media.run_ms", run_ms)
+        self.registry.observe("media.queue_wait_ms", queue_ms)
+        return MediaResult(mime_type=mime_type, processor=path, data=result, queue_ms=queue_ms, run_ms=run_ms)
+
+    def _deadline(self, timeout: Optional[float]) -> Optional[float]:
+        if not timeout:
+            return None
+        rounds = 1 + -(-self.max_queue // self.workers)
+        return timeout * rounds + 5.0
+
+    def stats(self) -> Dict[str, Any]:
+        in_flight = self._in_flight
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_flight": in_flight,
+            "saturation": round(min(1.0, in_flight / self.workers), 3),
+            "queue_utilization": round(max(0, in_flight - self.workers) / self.max_queue, 3) if self.max_queue else None,
+            **self._counters,
+        }
+
+
+def create_media_pool() -> Optional[MediaProcessingPool]:
+    """Pool configured by `MEDIA_*`, or None when disabled."""
+    return MediaProcessingPool.from_settings() if settings.media.enabled else None
+
+
+async def media_pool_resource(pool: Optional[MediaProcessingPool]):
+    """
+    DI resource owning the media worker processes.
+
+    Started (and prewarmed) by `container.init_resources()` and shut down by
+    `container.shutdown_resources()`.
+    """
+    if pool is None:
+        yield None
+        return
+    await pool.start(prewarm=settings.media.prewarm)
+    try:
+        yield pool
+    finally:
+        await pool.stop()
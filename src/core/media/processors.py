@@ -0,0 +1,230 @@
+"""
+Media processors executed in the media worker processes.
+
+A processor is a module-level function `processor(data, mime_type, options)`
+returning a picklable dict; it is referenced by its import path
+(`package.module:function`) so worker processes can load it. This module
+only imports the standard library to keep worker start-up cheap.
+
+Built-in processors probe the container formats WhatsApp delivers (Ogg/Opus
+voice notes, JPEG/PNG/WebP images, MP4 videos) without external tools;
+`image_processor` also builds a JPEG thumbnail when Pillow is installed.
+"""
+
+import hashlib
+import importlib
+import io
+import os
+import signal
+import struct
+import time
+from typing import Any, Callable, Dict, Optional
+
+Processor = Callable[[bytes, str, Dict[str, Any]], Dict[str, Any]]
+
+_processors: Dict[str, Processor] = {}
+
+
+def _describe(data: bytes) -> Dict[str, Any]:
+    return {"size_bytes": len(data), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def default_processor(data: bytes, mime_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Size and checksum of any media."""
+    return _describe(data)
+
+
+# Audio
+
+
+def _ogg_pages(data: bytes):
+    """Yield (header_type, granule_position, segment payload) of each Ogg page."""
+    offset = 0
+    while offset + 27 <= len(data):
+        if data[offset:offset + 4] != b"OggS":
+            offset = data.find(b"OggS", offset + 1)
+            if offset < 0:
+                return
+            continue
+        header_type = data[offset + 5]
+        granule = struct.unpack_from("<q", data, offset + 6)[0]
+        segments = data[offset + 26]
+        lacing = data[offset + 27:offset + 27 + segments]
+        start = offset + 27 + segments
+        size = sum(lacing)
+        yield header_type, granule, data[start:start + size]
+        offset = start + size
+
+
+def audio_processor(data: bytes, mime_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Codec, channels, sample rate and duration of Ogg (Opus/Vorbis) audio."""
+    result = _describe(data)
+    pre_skip = 0
+    rate = None
+    last_granule = None
+    for index, (_, granule, payload) in enumerate(_ogg_pages(data)):
+        if index == 0:
+            if payload.startswith(b"OpusHead") and len(payload) >= 19:
+                channels, pre_skip, input_rate = struct.unpack_from("<BHI", payload, 9)
+                # Opus granule positions always count 48 kHz samples
+                rate = 48000
+                result.update(codec="opus", channels=channels, input_sample_rate=input_rate)
+            elif payload.startswith(b"\x01vorbis") and len(payload) >= 16:
+                channels, rate = struct.unpack_from("<BI", payload, 11)
+                result.update(codec="vorbis", channels=channels, sample_rate=rate)
+        if granule >= 0:
+            last_granule = granule
+    if rate and last_granule is not None:
+        result["duration_s"] = round(max(0, last_granule - pre_skip) / rate, 3)
+    return result
+
+
+# Images
+
+
+def _image_size(data: bytes) -> Optional[Dict[str, Any]]:
+    if data.startswith(b"\x89PNG\r\n\x1a\n") and len(data) >= 24:
+        width, height = struct.unpack_from(">II", data, 16)
+        return {"format": "png", "width": width, "height": height}
+    if data.startswith(b"RIFF") and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8X":
+            width = 1 + int.from_bytes(data[24:27], "little")
+            height = 1 + int.from_bytes(data[27:30], "little")
+        elif chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            width, height = 1 + (bits & 0x3FFF), 1 + ((bits >> 14) & 0x3FFF)
+        else:
+            width, height = (v & 0x3FFF for v in struct.unpack_from("<HH", data, 26))
+        return {"format": "webp", "width": width, "height": height}
+    if data.startswith(b"\xff\xd8"):
+        offset = 2
+        while offset + 9 <= len(data):
+            if data[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = data[offset + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+                offset += 2
+                continue
+            length = struct.unpack_from(">H", data, offset + 2)[0]
+            # Start-of-frame markers (excluding DHT, JPG and DAC)
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack_from(">HH", data, offset + 5)
+                return {"format": "jpeg", "width": width, "height": height}
+            offset += 2 + length
+    return None
+
+
+def image_processor(data: bytes, mime_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Format and dimensions of an image, plus a JPEG thumbnail with Pillow.
+
+    Options:
+        thumbnail_size: Longest side of the thumbnail in pixels (default 320)
+    """
+    result = _describe(data)
+    result.update(_image_size(data) or {})
+    try:
+        from PIL import Image
+    except ImportError:
+        return result
+
+    size = int(options.get("thumbnail_size", 320))
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail((size, size))
+        buffer = io.BytesIO()
+        image.convert("RGB").save(buffer, format="JPEG", quality=80)
+    result["thumbnail_jpeg"] = buffer.getvalue()
+    return result
+
+
+# Video
+
+
+def _mp4_boxes(data: bytes, start: int, end: int):
+    offset = start
+    while offset + 8 <= end:
+        size, kind = struct.unpack_from(">I4s", data, offset)
+        header = 8
+        if size == 1 and offset + 16 <= end:
+            size = struct.unpack_from(">Q", data, offset + 8)[0]
+            header = 16
+        elif size == 0:
+            size = end - offset
+        if size < header:
+            return
+        yield kind, offset + header, min(offset + size, end)
+        offset += size
+
+
+def video_processor(data: bytes, mime_type: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Duration and frame size of MP4/3GP video (from the `moov` box)."""
+    result = _describe(data)
+    for kind, start, end in _mp4_boxes(data, 0, len(data)):
+        if kind != b"moov":
+            continue
+        for child, child_start, child_end in _mp4_boxes(data, start, end):
+            if child == b"mvhd":
+                version = data[child_start]
+                if version == 1:
+                    timescale, duration = struct.unpack_from(">IQ", data, child_start + 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", data, child_start + 12)
+                if timescale:
+                    result["duration_s"] = round(duration / timescale, 3)
+            elif child == b"trak":
+                for box, box_start, _ in _mp4_boxes(data, child_start, child_end):
+                    if box != b"tkhd":
+                        continue
+                    version = data[box_start]
+                    dims = box_start + (88 if version == 1 else 76)
+                    width, height = struct.unpack_from(">II", data, dims)
+                    if width and height and "width" not in result:
+                        result.update(width=width >> 16, height=height >> 16)
+        break
+    return result
+
+
+# Worker entry point
+
+
+def _load(path: str) -> Processor:
+    processor = _processors.get(path)
+    if processor is None:
+        module_name, _, function_name = path.partition(":")
+        processor = _processors[path] = getattr(importlib.import_module(module_name), function_name)
+    return processor
+
+
+def _expire(signum, frame):
+    raise TimeoutError("Media job exceeded its time limit")
+
+
+def run_processor(
+    path: str, data: bytes, mime_type: str, options: Dict[str, Any], timeout: Optional[float]
+) -> Dict[str, Any]:
+    """
+    Run processor `path` in the current (worker) process.
+
+    `timeout` is enforced inside the worker with an interval timer, so a
+    runaway job is interrupted and the worker is reused.
+    """
+    processor = _load(path)
+    if timeout:
+        previous = signal.signal(signal.SIGALRM, _expire)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    started = time.perf_counter()
+    try:
+        result = processor(data, mime_type, options)
+    finally:
+        if timeout:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    result["_run_ms"] = (time.perf_counter() - started) * 1000.0
+    return result
+
+
+def ping() -> int:
+    """No-op job used to start the worker processes ahead of traffic."""
+    return os.getpid()
@@ -0,0 +1,171 @@
+"""
+Keep-alive diagnostics.
+
+Checks that the public webhook URL answers the Meta verification handshake
+and that the local ngrok agent exposes its tunnels. Checks run concurrently
+in the background and the endpoint only serves the cached result.
+"""
+
+import asyncio
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+from src.core.config.settings import settings
+from src.core.http.client import get_http_client
+from src.core.observability.metrics import metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_VERIFICATION_TOKEN = "my_voice_is_my_password_verify_me"
+CHALLENGE = 123456
+
+
+class KeepAliveDiagnostics:
+    """
+    Background-refreshed keep-alive diagnostics.
+
+    `snapshot()` never performs I/O: it returns the last cached result and,
+    when that result is older than the refresh interval and no refresh is in
+    flight, schedules one in the background.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 30.0,
+        timeout: float = 3.0,
+        public_url: Optional[str] = None,
+        ngrok_api: Optional[str] = None,
+        verification_token: Optional[str] = None,
+    ):
+        self.refresh_interval = refresh_interval
+        self.timeout = timeout
+        self.public_url = public_url
+        self.ngrok_api = ngrok_api or "http://127.0.0.1:4040"
+        self.verification_token = verification_token or DEFAULT_VERIFICATION_TOKEN
+
+        self._result: Optional[Dict[str, Any]] = None
+        self._checked_at: Optional[float] = None
+        self._refreshing: Optional[asyncio.Task] = None
+        self._loop_task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "KeepAliveDiagnostics":
+        return cls(
+            refresh_interval=settings.monitoring.keep_alive_refresh_seconds,
+            timeout=settings.monitoring.keep_alive_timeout_seconds,
+            public_url=os.environ.get("PUBLIC_URL") or os.environ.get("NGROK_PUBLIC_URL"),
+            ngrok_api=os.environ.get("NGROK_API_URL"),
+            verification_token=settings.meta.verification_token
+            or os.environ.get("META_VERIFICATION_TOKEN"),
+        )
+
+    async def start(self) -> None:
+        """Start the periodic background refresh."""
+        if self._loop_task is None or self._loop_task.done():
+            self._loop_task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        for task in (self._loop_task, self._refreshing):
+            if task and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._loop_task = None
+        self._refreshing = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.refresh_interval)
+
+    async def refresh(self) -> Dict[str, Any]:
+        """Run both checks concurrently and update the cached result."""
+        started = time.perf_counter()
+        webhook_get, (ngrok_local, ngrok_tunnels) = await asyncio.gather(
+            self._check_webhook_get(), self._check_ngrok()
+        )
+        checks = {"webhook_get": webhook_get, "ngrok_local": ngrok_local}
+        reachable = None if not self.public_url else (webhook_get is True)
+
+        self._result = {
+            "status": "ok",
+            "public_url": self.public_url,
+            "checks": checks,
+            "reachable": reachable,
+            "ngrok_tunnels": ngrok_tunnels,
+            "ngrok_api": self.ngrok_api,
+        }
+        self._checked_at = time.time()
+        metrics.observe("keep_alive.refresh_ms", (time.perf_counter() - started) * 1000.0)
+        return self._result
+
+    async def _check_webhook_get(self) -> Optional[bool]:
+        if not self.public_url:
+            return None
+        try:
+            response = await get_http_client().get(
+                self.public_url.rstrip("/") + "/webhook",
+                params={
+                    "hub.mode": "subscribe",
+                    "hub.challenge": CHALLENGE,
+                    "hub.verify_token": self.verification_token,
+                },
+                timeout=self.timeout,
+            )
+            return response.status_code == 200 and response.text.strip() == str(CHALLENGE)
+        except Exception as e:
+            logger.debug("Keep-alive webhook check failed", error=str(e))
+            return False
+
+    async def _check_ngrok(self) -> tuple[bool, Optional[List[Dict[str, Any]]]]:
+        try:
+            response = await get_http_client().get(
+                self.ngrok_api.rstrip("/") + "/api/tunnels", timeout=self.timeout
+            )
+            if response.status_code != 200:
+                return False, None
+            tunnels = response.json().get("tunnels", [])
+            return True, [
+                {
+                    "name": t.get("name"),
+                    "public_url": t.get("public_url"),
+                    "proto": t.get("proto"),
+                    "addr": t.get("config", {}).get("addr"),
+                }
+                for t in tunnels
+            ]
+        except Exception as e:
+            logger.debug("Keep-alive ngrok check failed", error=str(e))
+            return False, None
+
+    def _schedule_refresh(self) -> None:
+        if self._refreshing is None or self._refreshing.done():
+            self._refreshing = asyncio.create_task(self.refresh())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return the cached diagnostics without blocking on any check."""
+        now = time.time()
+        if self._checked_at is None or now - self._checked_at > self.refresh_interval:
+            self._schedule_refresh()
+
+        if self._result is None:
+            return {
+                "status": "pending",
+                "public_url": self.public_url,
+                "checks": {"webhook_get": None, "ngrok_local": None},
+                "reachable": None,
+                "ngrok_tunnels": None,
+                "ngrok_api": self.ngrok_api,
+                "checked_at": None,
+                "age_seconds": None,
+            }
+
+        return {
+            **self._result,
+            "checked_at": self._checked_at,
+            "age_seconds": round(now - self._checked_at, 3),
+        }
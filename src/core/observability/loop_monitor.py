@@ -0,0 +1,236 @@
+"""
+Event loop lag watchdog.
+
+Measures event loop lag continuously with a heartbeat task and, from a
+separate thread, captures the stack of whatever is running on the loop
+thread when it stays blocked longer than a threshold. Offenders are
+aggregated by call site and reported through logs and the metrics registry.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# Frames under this directory are considered application code when picking
+# the call site to blame for a stall.
+_PROJECT_ROOT = os.path.dirname(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+)
+_THIS_FILE = os.path.abspath(__file__)
+
+
+@dataclass
+class BlockingSite:
+    """Aggregated statistics for one blocking call site."""
+
+    site: str
+    count: int = 0
+    total_ms: float = 0.0
+    max_ms: float = 0.0
+    last_seen: float = 0.0
+    stack: List[str] = field(default_factory=list)
+
+    def as_dict(self) -> Dict:
+        return {
+            "site": self.site,
+            "count": self.count,
+            "total_ms": round(self.total_ms, 1),
+            "max_ms": round(self.max_ms, 1),
+            "last_seen": self.last_seen,
+            "stack": self.stack,
+        }
+
+
+class LoopLagMonitor:
+    """
+    Watchdog for event loop stalls.
+
+    A heartbeat coroutine sleeps for `interval_ms` and records how late it
+    wakes up (loop lag). A daemon thread checks the heartbeat and, when the
+    loop has not ticked for longer than `threshold_ms`, samples the loop
+    thread's current frame via `sys._current_frames()`.
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = 100.0,
+        threshold_ms: float = 250.0,
+        max_sites: int = 50,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold_ms / 1000.0
+        self.max_sites = max_sites
+        self.registry = registry
+
+        self.last_lag_ms: float = 0.0
+        self.max_lag_ms: float = 0.0
+
+        self._sites: Dict[str, BlockingSite] = {}
+        self._lock = threading.Lock()
+        self._last_beat = time.monotonic()
+        self._beat_id = 0
+        self._captured_beat = -1
+        self._pending: Optional[tuple] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @classmethod
+    def from_settings(cls) -> "LoopLagMonitor":
+        return cls(
+            interval_ms=settings.monitoring.loop_monitor_interval_ms,
+            threshold_ms=settings.monitoring.loop_lag_threshold_ms,
+            max_sites=settings.monitoring.loop_monitor_max_sites,
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def start(self) -> None:
+        """Start the heartbeat task on the running loop and the watchdog thread."""
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        self._thread = threading.Thread(
+            target=self._watch, name="loop-lag-watchdog", daemon=True
+        )
+        self._thread.start()
+        self.registry.register_collector("event_loop", self.stats)
+        logger.info(
+            "Event loop watchdog started",
+            interval_ms=self.interval * 1000,
+            threshold_ms=self.threshold * 1000,
+        )
+
+    async def stop(self) -> None:
+        """Stop the heartbeat task and the watchdog thread."""
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=self.interval * 2 + 1)
+            self._thread = None
+        self.registry.unregister_collector("event_loop")
+
+    async def _heartbeat(self) -> None:
+        interval = self.interval
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            lag_ms = max(0.0, (now - started - interval) * 1000.0)
+            self._last_beat = now
+            self._beat_id += 1
+            self.last_lag_ms = lag_ms
+            if lag_ms > self.max_lag_ms:
+                self.max_lag_ms = lag_ms
+            self.registry.observe("event_loop.lag_ms", lag_ms)
+            self.registry.set_gauge("event_loop.lag_ms", lag_ms)
+            if self._pending is not None:
+                self._settle(lag_ms)
+
+    def _watch(self) -> None:
+        # Poll more often than the threshold so stalls are caught while they
+        # are still in progress, which is when the offending stack is visible.
+        poll = max(0.005, min(self.interval, self.threshold) / 2)
+        while not self._stop.wait(poll):
+            beat_id = self._beat_id
+            stalled = time.monotonic() - self._last_beat - self.interval
+            if stalled < self.threshold or beat_id == self._captured_beat:
+                continue
+            self._captured_beat = beat_id
+            self._capture(stalled * 1000.0)
+
+    def _capture(self, stalled_ms: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+
+        stack = traceback.extract_stack(frame)
+        site = self._call_site(stack)
+        formatted = [
+            f"{entry.filename}:{entry.lineno} in {entry.name}" for entry in stack[-15:]
+        ]
+
+        with self._lock:
+            entry = self._sites.get(site)
+            if entry is None:
+                if len(self._sites) >= self.max_sites:
+                    # Drop the least significant site to keep memory bounded
+                    victim = min(self._sites.values(), key=lambda s: s.total_ms)
+                    self._sites.pop(victim.site, None)
+                entry = self._sites[site] = BlockingSite(site=site, stack=formatted)
+            entry.count += 1
+            entry.total_ms += stalled_ms
+            entry.max_ms = max(entry.max_ms, stalled_ms)
+            entry.last_seen = time.time()
+            self._pending = (site, stalled_ms)
+
+        self.registry.inc("event_loop.blocked", site=site)
+        logger.warning(
+            "Event loop blocked",
+            site=site,
+            blocked_ms=round(stalled_ms, 1),
+            stack=" <- ".join(reversed(formatted[-5:])),
+        )
+
+    def _settle(self, lag_ms: float) -> None:
+        """Attribute the full duration of a finished stall to its sampled site."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None:
+                return
+            site, sampled_ms = pending
+            entry = self._sites.get(site)
+            if entry is None or lag_ms <= sampled_ms:
+                return
+            entry.total_ms += lag_ms - sampled_ms
+            entry.max_ms = max(entry.max_ms, lag_ms)
+
+    @staticmethod
+    def _call_site(stack: traceback.StackSummary) -> str:
+        """Pick the innermost application frame, falling back to the innermost frame."""
+        for entry in reversed(stack):
+            filename = os.path.abspath(entry.filename)
+            if filename == _THIS_FILE:
+                continue
+            if filename.startswith(_PROJECT_ROOT) and "site-packages" not in filename:
+                return f"{os.path.relpath(filename, _PROJECT_ROOT)}:{entry.lineno} in {entry.name}"
+        innermost = stack[-1]
+        return f"{innermost.filename}:{innermost.lineno} in {innermost.name}"
+
+    def offenders(self, limit: int = 10) -> List[Dict]:
+        """Return blocking call sites ordered by total blocked time."""
+        with self._lock:
+            ordered = sorted(self._sites.values(), key=lambda s: s.total_ms, reverse=True)
+            return [s.as_dict() for s in ordered[:limit]]
+
+    def stats(self) -> Dict:
+        return {
+            "last_lag_ms": round(self.last_lag_ms, 3),
+            "max_lag_ms": round(self.max_lag_ms, 3),
+            "threshold_ms": self.threshold * 1000,
+            "offenders": self.offenders(),
+        }
@@ -0,0 +1,152 @@
+"""
+In-process metrics registry.
+
+Lightweight counters, gauges and latency summaries shared by the application
+subsystems and exposed through the `/metrics` endpoint.
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Tuple
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Number of recent observations kept per summary to compute percentiles
+SUMMARY_RESERVOIR_SIZE = 1024
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_name(name: str, labels: LabelKey) -> str:
+    if not labels:
+        return name
+    rendered = ",".join(f"{k}={v}" for k, v in labels)
+    return f"{name}{{{rendered}}}"
+
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class _Summary:
+    """Running summary (count/sum/min/max) plus a reservoir for percentiles."""
+
+    __slots__ = ("count", "total", "min", "max", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self.recent: Deque[float] = deque(maxlen=SUMMARY_RESERVOIR_SIZE)
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.recent.append(value)
+
+    def snapshot(self) -> Dict[str, float]:
+        ordered = sorted(self.recent)
+        return {
+            "count": self.count,
+            "sum": round(self.total, 3),
+            "min": round(self.min, 3) if self.count else 0.0,
+            "max": round(self.max, 3) if self.count else 0.0,
+            "p50": round(_percentile(ordered, 50), 3),
+            "p95": round(_percentile(ordered, 95), 3),
+            "p99": round(_percentile(ordered, 99), 3),
+        }
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters, gauges and summaries.
+
+    Values are keyed by metric name plus an optional set of labels, e.g.
+    `metrics.inc("webhook.rejected", reason="signature")`.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._summaries: Dict[Tuple[str, LabelKey], _Summary] = {}
+        self._collectors: Dict[str, Callable[[], Any]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels: Any) -> None:
+        """Increment a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge to an absolute value."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record an observation (e.g. a latency in ms) into a summary."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            summary = self._summaries.get(key)
+            if summary is None:
+                summary = self._summaries[key] = _Summary()
+            summary.observe(value)
+
+    def register_collector(self, name: str, collector: Callable[[], Any]) -> None:
+        """
+        Register a callable evaluated on every snapshot.
+
+        Used by subsystems that already keep their own statistics (pools,
+        queues, watchdogs) so they don't have to push them continuously.
+        """
+        with self._lock:
+            self._collectors[name] = collector
+
+    def unregister_collector(self, name: str) -> None:
+        with self._lock:
+            self._collectors.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return a JSON-serializable view of every metric."""
+        with self._lock:
+            counters = {_format_name(n, l): v for (n, l), v in self._counters.items()}
+            gauges = {_format_name(n, l): v for (n, l), v in self._gauges.items()}
+            summaries = {
+                _format_name(n, l): s.snapshot() for (n, l), s in self._summaries.items()
+            }
+            collectors = dict(self._collectors)
+
+        collected: Dict[str, Any] = {}
+        for name, collector in collectors.items():
+            try:
+                collected[name] = collector()
+            except Exception as e:  # a broken collector must not break /metrics
+                collected[name] = {"error": str(e)}
+
+        return {
+            "counters": counters,
+            "gauges": gauges,
+            "summaries": summaries,
+            "collectors": collected,
+        }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._summaries.clear()
+
+
+# Global metrics registry
+metrics = MetricsRegistry()
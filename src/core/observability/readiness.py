@@ -0,0 +1,211 @@
+"""
+Readiness probes.
+
+Dependency probes run in the background on an interval and their results
+are cached, so the `/readiness` endpoint answers from memory and reports
+which component is degraded.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+# A probe returns either a bool or a (healthy, detail) tuple
+ProbeOutcome = Union[bool, Tuple[bool, Optional[Any]]]
+Probe = Callable[[], Awaitable[ProbeOutcome]]
+
+
+@dataclass
+class ProbeResult:
+    """Cached outcome of one dependency probe."""
+
+    name: str
+    healthy: bool
+    critical: bool
+    latency_ms: float
+    checked_at: float
+    detail: Optional[Any] = None
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "critical": self.critical,
+            "latency_ms": round(self.latency_ms, 3),
+            "checked_at": self.checked_at,
+            "detail": self.detail,
+        }
+
+
+class ReadinessMonitor:
+    """
+    Runs registered probes concurrently in the background and caches results.
+
+    Probes registered as non-critical are reported but do not flip the
+    worker to not-ready.
+    """
+
+    def __init__(self, interval: float = 5.0, timeout: float = 2.0):
+        self.interval = interval
+        self.timeout = timeout
+        self._probes: Dict[str, Tuple[Probe, bool]] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @classmethod
+    def from_settings(cls) -> "ReadinessMonitor":
+        return cls(
+            interval=settings.monitoring.readiness_interval_seconds,
+            timeout=settings.monitoring.readiness_probe_timeout_seconds,
+        )
+
+    def register(self, name: str, probe: Probe, critical: bool = True) -> None:
+        """Register a dependency probe."""
+        self._probes[name] = (probe, critical)
+
+    async def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    async def _run(self) -> None:
+        # Results primed by an explicit run_probes() at startup are still fresh
+        if self._results:
+            await asyncio.sleep(self.interval)
+        while True:
+            await self.run_probes()
+            await asyncio.sleep(self.interval)
+
+    async def run_probes(self) -> Dict[str, ProbeResult]:
+        """Run every probe concurrently and refresh the cached state."""
+        results = await asyncio.gather(
+            *(self._run_probe(name, probe, critical) for name, (probe, critical) in self._probes.items())
+        )
+        for result in results:
+            previous = self._results.get(result.name)
+            if previous is None or previous.healthy != result.healthy:
+                log = logger.info if result.healthy else logger.warning
+                log(
+                    "Readiness probe state changed",
+                    probe=result.name,
+                    healthy=result.healthy,
+                    detail=result.detail,
+                )
+            self._results[result.name] = result
+            metrics.set_gauge("readiness.probe_healthy", int(result.healthy), probe=result.name)
+        return self._results
+
+    async def _run_probe(self, name: str, probe: Probe, critical: bool) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            outcome = await asyncio.wait_for(probe(), timeout=self.timeout)
+            if isinstance(outcome, tuple):
+                healthy, detail = outcome
+            else:
+                healthy, detail = bool(outcome), None
+        except asyncio.TimeoutError:
+            healthy, detail = False, f"timeout after {self.timeout}s"
+        except Exception as e:
+            healthy, detail = False, f"{type(e).__name__}: {e}"
+        latency_ms = (time.perf_counter() - started) * 1000.0
+        metrics.observe("readiness.probe_ms", latency_ms, probe=name)
+        return ProbeResult(
+            name=name,
+            healthy=bool(healthy),
+            critical=critical,
+            latency_ms=latency_ms,
+            checked_at=time.time(),
+            detail=detail,
+        )
+
+    @property
+    def degraded(self) -> List[str]:
+        return [r.name for r in self._results.values() if not r.healthy]
+
+    def snapshot(self) -> Tuple[bool, Dict[str, Any]]:
+        """Return (ready, body) from cached probe results."""
+        if not self._results:
+            return False, {"status": "starting", "degraded": [], "probes": {}}
+
+        ready = all(r.healthy for r in self._results.values() if r.critical)
+        return ready, {
+            "status": "ready" if ready else "not_ready",
+            "degraded": self.degraded,
+            "probes": {name: r.as_dict() for name, r in self._results.items()},
+        }
+
+
+def supabase_probe(connection, table: str) -> Probe:
+    """Probe Supabase/PostgREST with a one-row select on `table`."""
+
+    def _query():
+        connection.session.table(table).select("*").limit(1).execute()
+
+    async def probe() -> ProbeOutcome:
+        # The Supabase client is synchronous; keep it off the event loop
+        await asyncio.to_thread(_query)
+        return True
+
+    return probe
+
+
+def http_reachability_probe(url: str) -> Probe:
+    """Probe that an HTTP endpoint answers with anything other than a 5xx."""
+
+    async def probe() -> ProbeOutcome:
+        from src.core.http.client import get_http_client
+
+        response = await get_http_client().get(url)
+        return response.status_code < 500, {"status_code": response.status_code}
+
+    return probe
+
+
+def threadpool_saturation_probe(max_utilization: float) -> Probe:
+    """Probe the AnyIO worker thread pool used by sync routes and `to_thread`."""
+
+    async def probe() -> ProbeOutcome:
+        import anyio.to_thread
+
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        utilization = limiter.borrowed_tokens / limiter.total_tokens
+        return utilization < max_utilization, {
+            "borrowed": limiter.borrowed_tokens,
+            "total": limiter.total_tokens,
+            "waiting": limiter.statistics().tasks_waiting,
+        }
+
+    return probe
+
+
+def queue_saturation_probe(depth: Callable[[], int], capacity: int, max_utilization: float) -> Probe:
+    """Probe a bounded queue given a callable returning its current depth."""
+
+    async def probe() -> ProbeOutcome:
+        current = depth()
+        return current / capacity < max_utilization, {"depth": current, "capacity": capacity}
+
+    return probe
+
+
+def loop_lag_probe(monitor, max_lag_ms: float) -> Probe:
+    """Probe the event loop lag measured by a running `LoopLagMonitor`."""
+
+    async def probe() -> ProbeOutcome:
+        return monitor.last_lag_ms < max_lag_ms, {"last_lag_ms": round(monitor.last_lag_ms, 3)}
+
+    return probe
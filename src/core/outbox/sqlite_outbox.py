@@ -0,0 +1,454 @@
+"""
+Transactional outbox for outbound messages.
+
+Outbound messages are committed to a local SQLite database (WAL mode) and
+delivered by a sender loop, so a reply survives a crash, a restart or a
+provider outage between the moment it is produced and the moment it is
+accepted by the provider.
+
+Rows move through `pending -> sending -> sent`, or to `dead` once they run
+out of attempts. A claimed row carries a lease: if its sender dies before
+recording the outcome, the row becomes claimable again when the lease
+expires. The lease expiry identifies the claim: renewing the lease and
+recording the outcome only succeed while that claim still holds the row,
+so a sender whose lease ran out can neither send the row nor overwrite
+what the worker that re-claimed it recorded. Rows of the same
+conversation are claimed in insertion order and never while an earlier
+row of that conversation is still waiting for a retry or in flight. An optional `dedupe_key` makes enqueueing idempotent
+(e.g. a reply keyed by the inbound message id is queued once even if the
+webhook is redelivered or replayed).
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypeVar
+
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+
+logger = get_logger(__name__)
+
+PENDING = "pending"
+SENDING = "sending"
+SENT = "sent"
+DEAD = "dead"
+
+T = TypeVar("T")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbound_messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedupe_key TEXT UNIQUE,
+    channel TEXT NOT NULL,
+    owner_id TEXT,
+    conversation TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    lease_until REAL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    sent_at REAL,
+    provider_message_id TEXT,
+    last_error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_outbound_messages_status
+    ON outbound_messages (status, next_attempt_at);
+CREATE INDEX IF NOT EXISTS idx_outbound_messages_conversation
+    ON outbound_messages (conversation, status, id);
+"""
+
+# Claimable rows (due pending rows and expired leases), skipping rows whose
+# conversation has an earlier row that is backing off or in flight
+CLAIM_SQL = """
+SELECT id, channel, owner_id, conversation, payload, attempts, dedupe_key, created_at
+FROM outbound_messages AS o
+WHERE ((o.status = 'pending' AND o.next_attempt_at <= :now)
+       OR (o.status = 'sending' AND o.lease_until <= :now))
+  AND NOT EXISTS (
+      SELECT 1 FROM outbound_messages AS e
+      WHERE e.conversation = o.conversation
+        AND e.id < o.id
+        AND ((e.status = 'pending' AND e.next_attempt_at > :now)
+             OR (e.status = 'sending' AND e.lease_until > :now))
+  )
+ORDER BY o.id
+LIMIT :limit
+"""
+
+
+@dataclass
+class OutboxMessage:
+    id: int
+    channel: str
+    owner_id: Optional[str]
+    conversation: str
+    payload: Dict[str, Any]
+    attempts: int
+    dedupe_key: Optional[str]
+    created_at: float
+    # Expiry of this claim's lease (unix time); identifies the claim
+    lease_until: float
+
+
+class SQLiteOutbox:
+    """
+    Outbox stored in a SQLite database shared by the workers of a host.
+
+    Every operation is a short local transaction (no fsync per commit with
+    `synchronous=NORMAL` in WAL mode), but the workers sharing the file
+    contend for its write lock (waiting up to `busy_timeout` seconds). The
+    async methods used by the application therefore run on the outbox's own
+    writer thread, never on the event loop; the synchronous ones (`counts`,
+    `messages`, `requeue_dead`) serve the CLI.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        synchronous: str = "NORMAL",
+        lease_seconds: float = 30.0,
+        busy_timeout: float = 5.0,
+        stats_interval: float = 10.0,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.path = path
+        self.synchronous = synchronous.upper()
+        self.lease_seconds = lease_seconds
+        self.busy_timeout = busy_timeout
+        self.stats_interval = stats_interval
+        self.registry = registry
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        # Single writer thread: transactions queue here instead of on the loop
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._last_counts: Dict[str, int] = {PENDING: 0, SENDING: 0, SENT: 0, DEAD: 0}
+        self._counts_at = float("-inf")
+        self._counts_refresh: Optional[concurrent.futures.Future] = None
+        self._listeners: List[Callable[[], None]] = []
+        self._counters: Dict[str, int] = {
+            "enqueued": 0,
+            "duplicates": 0,
+            "claimed": 0,
+            "sent": 0,
+            "retried": 0,
+            "dead": 0,
+            "lease_lost": 0,
+        }
+
+    @classmethod
+    def from_settings(cls) -> "SQLiteOutbox":
+        outbox = settings.outbox
+        return cls(
+            outbox.path,
+            synchronous=outbox.synchronous,
+            lease_seconds=outbox.lease_seconds,
+            stats_interval=outbox.stats_interval_seconds,
+        )
+
+    # Lifecycle
+
+    def open(self) -> None:
+        if self._conn is not None:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False, timeout=self.busy_timeout)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="outbox")
+        self.registry.register_collector("outbox", self.stats)
+        logger.info("Outbox opened", path=os.path.abspath(self.path), synchronous=self.synchronous)
+
+    def close(self) -> None:
+        """Finish the queued operations and close the database (blocking)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.close()
+            self._conn = None
+        self.registry.unregister_collector("outbox")
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            raise RuntimeError("Outbox is not open")
+        return self._conn
+
+    async def _call(self, fn: Callable[..., T], *args: Any) -> T:
+        """Run `fn(*args)` on the writer thread."""
+        if self._executor is None:
+            raise RuntimeError("Outbox is not open")
+        return await asyncio.get_running_loop().run_in_executor(self._executor, functools.partial(fn, *args))
+
+    # Producing
+
+    def add_listener(self, callback: Callable[[], None]) -> None:
+        """Call `callback()` after every new message (wakes up the sender)."""
+        self._listeners.append(callback)
+
+    async def enqueue(
+        self,
+        channel: str,
+        conversation: str,
+        payload: Dict[str, Any],
+        owner_id: Optional[str] = None,
+        dedupe_key: Optional[str] = None,
+    ) -> Optional[int]:
+        """
+        Commit an outbound message.
+
+        Args:
+            channel: Delivery channel (e.g. "meta")
+            conversation: Ordering key; messages of a conversation are
+                          delivered in enqueue order
+            payload: JSON-serializable provider request
+            owner_id: Owner ID (ULID)
+            dedupe_key: Idempotency key; a second message with the same key
+                        is ignored
+
+        Returns:
+            The message id, or None if `dedupe_key` was already queued
+        """
+        started = time.perf_counter()
+        message_id = await self._call(self._insert, channel, conversation, json.dumps(payload), owner_id, dedupe_key)
+        self.registry.observe("outbox.enqueue_ms", (time.perf_counter() - started) * 1000.0)
+        if message_id is None:
+            self._counters["duplicates"] += 1
+            logger.info("Duplicate outbound message ignored", dedupe_key=dedupe_key)
+            return None
+        self._counters["enqueued"] += 1
+        for callback in self._listeners:
+            callback()
+        return message_id
+
+    def _insert(
+        self, channel: str, conversation: str, payload: str, owner_id: Optional[str], dedupe_key: Optional[str]
+    ) -> Optional[int]:
+        now = time.time()
+        with self._lock:
+            cursor = self._connection().execute(
+                "INSERT INTO outbound_messages "
+                "(dedupe_key, channel, owner_id, conversation, payload, next_attempt_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (dedupe_key) DO NOTHING",
+                (dedupe_key, channel, owner_id, conversation, payload, now, now, now),
+            )
+        return cursor.lastrowid if cursor.rowcount else None
+
+    # Consuming
+
+    async def claim(self, limit: int) -> List[OutboxMessage]:
+        """Lease up to `limit` deliverable messages, oldest first."""
+        rows, lease_until = await self._call(self._claim_rows, limit)
+        self._counters["claimed"] += len(rows)
+        return [
+            OutboxMessage(
+                id=row[0],
+                channel=row[1],
+                owner_id=row[2],
+                conversation=row[3],
+                payload=json.loads(row[4]),
+                attempts=row[5] + 1,
+                dedupe_key=row[6],
+                created_at=row[7],
+                lease_until=lease_until,
+            )
+            for row in rows
+        ]
+
+    def _claim_rows(self, limit: int) -> Tuple[List[tuple], float]:
+        now = time.time()
+        lease_until = now + self.lease_seconds
+        with self._lock:
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(CLAIM_SQL, {"now": now, "limit": limit}).fetchall()
+                if rows:
+                    conn.executemany(
+                        "UPDATE outbound_messages SET status = 'sending', lease_until = ?, "
+                        "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                        [(lease_until, now, row[0]) for row in rows],
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return rows, lease_until
+
+    async def renew_lease(self, message: OutboxMessage) -> bool:
+        """
+        Extend the lease of a claimed message, e.g. right before sending it.
+
+        Returns:
+            False if the lease already expired or the claim no longer holds
+            the message (it must then not be sent)
+        """
+        now = time.time()
+        lease_until = now + self.lease_seconds
+        renewed = await self._settle(
+            message,
+            "UPDATE outbound_messages SET lease_until = ?, updated_at = ? "
+            "WHERE id = ? AND status = 'sending' AND lease_until = ? AND lease_until > ?",
+            (lease_until, now, message.id, message.lease_until, now),
+        )
+        if renewed:
+            message.lease_until = lease_until
+        return renewed
+
+    async def mark_sent(self, message: OutboxMessage, provider_message_id: Optional[str]) -> bool:
+        """Record a delivery; False if the claim no longer held the message."""
+        now = time.time()
+        marked = await self._settle(
+            message,
+            "UPDATE outbound_messages SET status = 'sent', sent_at = ?, updated_at = ?, lease_until = NULL, "
+            "provider_message_id = ?, last_error = NULL WHERE id = ? AND status = 'sending' AND lease_until = ?",
+            (now, now, provider_message_id, message.id, message.lease_until),
+        )
+        if marked:
+            self._counters["sent"] += 1
+        return marked
+
+    async def mark_retry(self, message: OutboxMessage, error: str, delay: float) -> bool:
+        now = time.time()
+        marked = await self._settle(
+            message,
+            "UPDATE outbound_messages SET status = 'pending', next_attempt_at = ?, updated_at = ?, "
+            "lease_until = NULL, last_error = ? WHERE id = ? AND status = 'sending' AND lease_until = ?",
+            (now + delay, now, error, message.id, message.lease_until),
+        )
+        if marked:
+            self._counters["retried"] += 1
+        return marked
+
+    async def mark_dead(self, message: OutboxMessage, error: str) -> bool:
+        now = time.time()
+        marked = await self._settle(
+            message,
+            "UPDATE outbound_messages SET status = 'dead', updated_at = ?, lease_until = NULL, "
+            "last_error = ? WHERE id = ? AND status = 'sending' AND lease_until = ?",
+            (now, error, message.id, message.lease_until),
+        )
+        if marked:
+            self._counters["dead"] += 1
+        return marked
+
+    async def release(self, message: OutboxMessage) -> bool:
+        """Return a claimed message that was not attempted (no attempt is counted)."""
+        now = time.time()
+        return await self._settle(
+            message,
+            "UPDATE outbound_messages SET status = 'pending', updated_at = ?, lease_until = NULL, "
+            "attempts = attempts - 1 WHERE id = ? AND status = 'sending' AND lease_until = ?",
+            (now, message.id, message.lease_until),
+        )
+
+    async def _settle(self, message: OutboxMessage, sql: str, params: tuple) -> bool:
+        """Run a conditional update of a claimed message; False if its claim was lost."""
+        if await self._call(self._execute, sql, params):
+            return True
+        self._counters["lease_lost"] += 1
+        logger.warning("Outbox lease lost", outbox_id=message.id, lease_until=message.lease_until)
+        return False
+
+    def requeue_dead(self, ids: Optional[List[int]] = None) -> int:
+        """Put dead messages (all, or `ids`) back in the queue with fresh attempts."""
+        now = time.time()
+        sql = (
+            "UPDATE outbound_messages SET status = 'pending', attempts = 0, next_attempt_at = ?, "
+            "updated_at = ? WHERE status = 'dead'"
+        )
+        params: List[Any] = [now, now]
+        if ids:
+            sql += f" AND id IN ({','.join('?' * len(ids))})"
+            params.extend(ids)
+        with self._lock:
+            count = self._connection().execute(sql, params).rowcount
+        if count:
+            for callback in self._listeners:
+                callback()
+        return count
+
+    async def purge(self, older_than: float) -> int:
+        """Delete sent and dead messages last updated before `older_than` (unix time)."""
+        return await self._call(
+            self._execute, "DELETE FROM outbound_messages WHERE status IN ('sent', 'dead') AND updated_at < ?",
+            (older_than,),
+        )
+
+    def _execute(self, sql: str, params: tuple) -> int:
+        with self._lock:
+            return self._connection().execute(sql, params).rowcount
+
+    # Introspection
+
+    def counts(self) -> Dict[str, int]:
+        """Number of messages per status."""
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT status, COUNT(*) FROM outbound_messages GROUP BY status"
+            ).fetchall()
+        counts = {PENDING: 0, SENDING: 0, SENT: 0, DEAD: 0}
+        counts.update(dict(rows))
+        self._last_counts = counts
+        self._counts_at = time.monotonic()
+        return counts
+
+    def messages(self, status: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Most recent messages with `status`, newest first."""
+        with self._lock:
+            cursor = self._connection().execute(
+                "SELECT id, conversation, owner_id, attempts, created_at, updated_at, sent_at, "
+                "provider_message_id, last_error FROM outbound_messages WHERE status = ? ORDER BY id DESC LIMIT ?",
+                (status, limit),
+            )
+            columns = [c[0] for c in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    def stats(self) -> Dict[str, Any]:
+        # Collected on the event loop for every scrape: report the last
+        # counts and, at most every `stats_interval` seconds, recount them
+        # on the writer thread without waiting for the result
+        if (
+            time.monotonic() - self._counts_at >= self.stats_interval
+            and self._executor is not None
+            and (self._counts_refresh is None or self._counts_refresh.done())
+        ):
+            self._counts_refresh = self._executor.submit(self.counts)
+        return {**self._last_counts, "counters": dict(self._counters)}
+
+
+def create_outbox() -> Optional[SQLiteOutbox]:
+    """Outbox configured by `OUTBOX_*`, or None when disabled."""
+    return SQLiteOutbox.from_settings() if settings.outbox.enabled else None
+
+
+async def outbox_resource(outbox: Optional[SQLiteOutbox]):
+    """
+    DI resource opening the outbox database.
+
+    Opened by `container.init_resources()` and closed by
+    `container.shutdown_resources()`.
+    """
+    if outbox is None:
+        yield None
+        return
+    outbox.open()
+    try:
+        yield outbox
+    finally:
+        await asyncio.to_thread(outbox.close)
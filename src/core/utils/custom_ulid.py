@@ -3,11 +3,17 @@ ULID utilities for Python.
 
 Provides functions for ULID generation, validation, and manipulation.
 Based on: https://github.com/ulid/spec
+
+Validation and timestamp decoding work on the raw bytes with precomputed
+256-entry translation tables (C-level `bytes.translate`, no regex and no
+ULID object), and have batch variants that check a whole list in one pass.
 """
 
-import re
-from datetime import datetime
-from typing import Optional
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
 
 from ulid import ULID
 
@@ -20,8 +26,22 @@ ULID_LENGTH = 26
 TIMESTAMP_LENGTH = 10
 RANDOMNESS_LENGTH = 16
 
-# Regex for validation
-ULID_PATTERN = re.compile(r"^[0-9A-HJKMNP-TV-Z]{26}$", re.IGNORECASE)
+TIMESTAMP_MAX = (1 << 48) - 1
+RANDOMNESS_MAX = (1 << 80) - 1
+
+# Byte -> 1 if it is a Crockford Base32 character (either case), 0 otherwise
+_VALID_BYTES = bytes(
+    1 if chr(b).upper() in ENCODING and chr(b).isalnum() else 0 for b in range(256)
+)
+# Byte -> the same digit in the alphabet `int(x, 32)` understands ("0-9a-v")
+_BASE32_DIGITS = bytes(
+    ord("0123456789abcdefghijklmnopqrstuv"[ENCODING.index(chr(b).upper())])
+    if _VALID_BYTES[b]
+    else b
+    for b in range(256)
+)
+# Bit offsets of the 26 characters within the 130-bit encoding
+_SHIFTS = tuple(range(5 * (ULID_LENGTH - 1), -1, -5))
 
 
 def is_valid_ulid(ulid: str) -> bool:
@@ -42,14 +62,36 @@ def is_valid_ulid(ulid: str) -> bool:
         >>> is_valid_ulid('01ARZ3NDEKTSV4RRFFQ69G5FAI')  # contains 'I'
         False
     """
-    if not isinstance(ulid, str):
+    if not isinstance(ulid, str) or len(ulid) != ULID_LENGTH or not ulid.isascii():
         return False
 
-    if len(ulid) != ULID_LENGTH:
-        return False
+    # Every character must map to 1 (Crockford's Base32 alphabet)
+    return 0 not in ulid.encode("ascii").translate(_VALID_BYTES)
+
+
+def validate_many(ulids: Iterable[str]) -> List[bool]:
+    """
+    Validate a batch of ULIDs.
 
-    # Check if all characters are in Crockford's Base32 alphabet
-    return ULID_PATTERN.match(ulid) is not None
+    Well-formed batches (the common case) are checked with a single
+    translation of all the values joined together.
+
+    Args:
+        ulids: ULID strings (list, tuple, array or any iterable)
+
+    Returns:
+        One boolean per value, in order
+    """
+    values = ulids if isinstance(ulids, (list, tuple)) else list(ulids)
+    try:
+        joined = "".join(values)
+    except TypeError:  # a non-string value
+        return [is_valid_ulid(value) for value in values]
+    if len(joined) == ULID_LENGTH * len(values) and joined.isascii():
+        if all(len(value) == ULID_LENGTH for value in values):
+            if 0 not in joined.encode("ascii").translate(_VALID_BYTES):
+                return [True] * len(values)
+    return [is_valid_ulid(value) for value in values]
 
 
 def validate_ulid_field(v: Optional[str]) -> Optional[str]:
@@ -84,9 +126,59 @@ def generate_ulid() -> str:
     return str(ULID())
 
 
+class MonotonicULIDGenerator:
+    """
+    ULID generator ordering the ids it issues.
+
+    Within one millisecond the randomness of the previous id is incremented
+    instead of drawn again, so ids generated by this generator sort in
+    generation order (spec "monotonicity"). Thread-safe.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = -1
+        self._last_randomness = 0
+
+    def generate(self) -> str:
+        """Return a new 26-character ULID, greater than every previous one."""
+        with self._lock:
+            now_ms = time.time_ns() // 1_000_000
+            if now_ms > self._last_ms:
+                self._last_ms = now_ms
+                self._last_randomness = int.from_bytes(os.urandom(10), "big")
+            elif self._last_randomness < RANDOMNESS_MAX:
+                # Same millisecond (or the clock went back): keep counting
+                self._last_randomness += 1
+            else:
+                # 2^80 ids in one millisecond: borrow the next one
+                self._last_ms += 1
+                self._last_randomness = int.from_bytes(os.urandom(10), "big")
+            value = (self._last_ms << 80) | self._last_randomness
+        return "".join(ENCODING[(value >> shift) & 31] for shift in _SHIFTS)
+
+
+_monotonic_generator = MonotonicULIDGenerator()
+
+
+def monotonic_ulid() -> str:
+    """
+    Generate a ULID ordered after every ULID previously returned by this function.
+
+    Returns:
+        26-character ULID string
+    """
+    return _monotonic_generator.generate()
+
+
+def _decode_timestamp(ulid: str) -> int:
+    """Unix ms of an already validated ULID."""
+    return int(ulid[:TIMESTAMP_LENGTH].encode("ascii").translate(_BASE32_DIGITS), 32)
+
+
 def ulid_to_timestamp(ulid: str) -> datetime:
     """
-    Extract timestamp from ULID using python-ulid library.
+    Extract timestamp from ULID by decoding its 48-bit timestamp prefix.
 
     Args:
         ulid: ULID string
@@ -97,14 +189,7 @@ def ulid_to_timestamp(ulid: str) -> datetime:
     Raises:
         ValueError: If ULID format is invalid
     """
-    if not is_valid_ulid(ulid):
-        raise ValueError(f"Invalid ULID format: {ulid}")
-
-    try:
-        ulid_obj = ULID.from_str(ulid)
-        return ulid_obj.datetime
-    except ValueError as e:
-        raise ValueError(f"Invalid ULID format: {ulid}") from e
+    return datetime.fromtimestamp(ulid_to_unix_ms(ulid) / 1000, timezone.utc)
 
 
 def ulid_to_unix_ms(ulid: str) -> int:
@@ -116,12 +201,44 @@ def ulid_to_unix_ms(ulid: str) -> int:
 
     Returns:
         Unix timestamp in milliseconds
+
+    Raises:
+        ValueError: If ULID format is invalid
     """
     if not is_valid_ulid(ulid):
         raise ValueError(f"Invalid ULID format: {ulid}")
 
-    try:
-        ulid_obj = ULID.from_str(ulid)
-        return int(ulid_obj.timestamp * 1000)
-    except ValueError as e:
-        raise ValueError(f"Invalid ULID format: {ulid}") from e
+    timestamp = _decode_timestamp(ulid)
+    if timestamp > TIMESTAMP_MAX:
+        # First character above "7": more than 48 bits of timestamp
+        raise ValueError(f"Invalid ULID format: {ulid}")
+    return timestamp
+
+
+def timestamps_many(ulids: Iterable[str]) -> List[int]:
+    """
+    Extract the Unix timestamps (ms) of a batch of ULIDs.
+
+    Args:
+        ulids: ULID strings (list, tuple, array or any iterable)
+
+    Returns:
+        One Unix timestamp in milliseconds per value, in order
+
+    Raises:
+        ValueError: If any value is not a valid ULID (the first one is named)
+    """
+    values = ulids if isinstance(ulids, (list, tuple)) else list(ulids)
+    for value, valid in zip(values, validate_many(values)):
+        if not valid:
+            raise ValueError(f"Invalid ULID format: {value}")
+
+    # One translation for the whole batch, then one int() per timestamp
+    digits = "".join(values).encode("ascii").translate(_BASE32_DIGITS)
+    timestamps = [
+        int(digits[start:start + TIMESTAMP_LENGTH], 32) for start in range(0, len(digits), ULID_LENGTH)
+    ]
+    for value, timestamp in zip(values, timestamps):
+        if timestamp > TIMESTAMP_MAX:
+            raise ValueError(f"Invalid ULID format: {value}")
+    return timestamps
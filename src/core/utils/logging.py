@@ -85,11 +85,6 @@ class PIIMaskingProcessor:
                 event_dict[key] = value
         return event_dict
 
-# Inicializar colorama
-# Se FORCE_COLOR=true, forçamos strip=False para manter cores mesmo em arquivos/pipes
-force_color = os.getenv("FORCE_COLOR", "false").lower() == "true"
-colorama.init(autoreset=True, strip=False if force_color else None)
-
 class ColoredConsoleRenderer:
     """
     Renderizador customizado que adiciona cores ao output do structlog em dev.
@@ -195,6 +190,10 @@ def configure_logging():
     # Escolher renderizador baseado no ambiente
     if settings.api.environment == "development" or settings.api.debug:
         # Em dev, usa renderizador colorido
+        # Inicializar colorama só quando o renderizador colorido é usado
+        # Se FORCE_COLOR=true, forçamos strip=False para manter cores mesmo em arquivos/pipes
+        force_color = os.getenv("FORCE_COLOR", "false").lower() == "true"
+        colorama.init(autoreset=True, strip=False if force_color else None)
         renderer = ColoredConsoleRenderer()
     else:
         # Em prod, usa JSON
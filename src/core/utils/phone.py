@@ -0,0 +1,57 @@
+"""
+Phone number normalization (E.164).
+
+The same number reaches us written in several ways: Meta's
+`display_phone_number` ("15550001111", "1 555-000-1111"), seeded accounts
+("+1 (555) 000-1111") and `phone_numbers` entries. Every variant is turned
+into one E.164 string ("+15550001111") so lookups, cache keys and the
+`normalized_phone_numbers` column (migrations/003) agree.
+
+Rules (mirrored by the `normalize_phone_number()` SQL function):
+
+- everything but digits is dropped
+- a leading "00" international prefix is dropped (unless the number
+  starts with "+")
+- the remaining digits must start with the country code (never 0) and be
+  7 to 15 long
+
+National numbers (trunk prefix "0", no country code) are not phone
+numbers here: stored numbers are expected to carry their country code.
+
+`normalize_phone()` is memoized: the same few numbers (the business
+numbers of the accounts) come in with every webhook.
+"""
+
+import functools
+import re
+from typing import Optional
+
+E164_MIN_DIGITS = 7
+E164_MAX_DIGITS = 15
+
+# Distinct numbers remembered
+NORMALIZE_CACHE_SIZE = 65536
+
+_NON_DIGITS = re.compile(r"[^0-9]+")
+
+
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_phone(value: Optional[str]) -> Optional[str]:
+    """
+    E.164 form of a phone number.
+
+    Args:
+        value: Phone number as written (spaces, dashes, parentheses, "+"...)
+
+    Returns:
+        "+<country code><number>", or None if `value` is not a phone number
+    """
+    if not value:
+        return None
+    text = value.strip()
+    digits = _NON_DIGITS.sub("", text)
+    if not text.startswith("+") and digits.startswith("00"):
+        digits = digits[2:]
+    if not E164_MIN_DIGITS <= len(digits) <= E164_MAX_DIGITS or digits[0] == "0":
+        return None
+    return "+" + digits
@@ -1,22 +1,26 @@
 
 
-import os
-import uvicorn
-import requests
-
-from dotenv import load_dotenv
 from fastapi.concurrency import asynccontextmanager
-from typing import Annotated
-from fastapi import Depends, FastAPI, HTTPException, Query
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from dependency_injector.wiring import Provide, inject
+from fastapi.responses import JSONResponse
 
 
-from src.modules.channels.meta.dtos.inbound import Payload
-from src.modules.channels.meta.services.meta_webhook_service import MetaWebhookService
+from src.modules.channels.meta.api.router import legacy_router as meta_webhook_alias, router as meta_router
 from src.core.config.settings import settings
 from src.core.utils.logging import get_logger
 from src.core.di.container import Container
+from src.core.observability.keep_alive import KeepAliveDiagnostics
+from src.core.observability.loop_monitor import LoopLagMonitor
+from src.core.observability.metrics import metrics
+from src.core.observability.readiness import (
+    ReadinessMonitor,
+    http_reachability_probe,
+    loop_lag_probe,
+    supabase_probe,
+    threadpool_saturation_probe,
+)
+from src.core.database.session import db
 
 
 logger = get_logger(__name__)
@@ -34,10 +38,47 @@ async def lifespan(app: FastAPI):
     logger.info("Starting Owner API application")
     logger.info(f"API running on {settings.api.host}:{settings.api.port}")
 
+    # Start container resources (HTTP pool, ...) owned by singleton providers
+    await app.container.init_resources()
+
+    loop_monitor = None
+    if settings.monitoring.loop_monitor_enabled:
+        loop_monitor = LoopLagMonitor.from_settings()
+        await loop_monitor.start()
+    app.state.loop_monitor = loop_monitor
+
+    keep_alive = KeepAliveDiagnostics.from_settings()
+    await keep_alive.start()
+    app.state.keep_alive = keep_alive
+
+    readiness_monitor = ReadinessMonitor.from_settings()
+    readiness_monitor.register("supabase", supabase_probe(db, "meta_accounts"))
+    readiness_monitor.register("graph_api", http_reachability_probe(settings.meta.graph_api_url + "/"))
+    readiness_monitor.register(
+        "threadpool",
+        threadpool_saturation_probe(settings.monitoring.readiness_max_queue_utilization),
+    )
+    if loop_monitor:
+        readiness_monitor.register(
+            "event_loop", loop_lag_probe(loop_monitor, settings.monitoring.readiness_max_loop_lag_ms)
+        )
+    if settings.api.prewarm_connections:
+        # Open the Supabase and Graph API connections now, in parallel, instead
+        # of on the first webhook; this also seeds /readiness before traffic
+        await readiness_monitor.run_probes()
+        logger.info("Connections prewarmed", degraded=readiness_monitor.degraded)
+    await readiness_monitor.start()
+    app.state.readiness = readiness_monitor
+
     yield
 
     # Shutdown
     logger.info("Shutting down Owner API application")
+    await readiness_monitor.stop()
+    await keep_alive.stop()
+    if loop_monitor:
+        await loop_monitor.stop()
+    await app.container.shutdown_resources()
 
 app = FastAPI(
     title="WhatsApp Bot",
@@ -52,7 +93,6 @@ app = FastAPI(
 
 container = Container()
 setattr(app, "container", container)
-container.wire(modules=[__name__])
 
 app.add_middleware(
     CORSMiddleware,
@@ -68,95 +108,36 @@ def health():
     return {"status": "healthy"}
 
 
-@app.get("/readiness")
-def readiness():
-    return {"status": "ready"}
+@app.get("/metrics")
+def get_metrics():
+    return metrics.snapshot()
 
 
-@app.get("/keep-alive-webhook")
-def keep_alive_webhook():
-    public_url = os.environ.get("PUBLIC_URL") or os.environ.get("NGROK_PUBLIC_URL")
-    checks = {"webhook_get": None, "ngrok_local": None}
-    if public_url:
-        try:
-            token = os.environ.get("META_VERIFICATION_TOKEN", "my_voice_is_my_password_verify_me")
-            challenge = 123456
-            r_get = requests.get(
-                public_url.rstrip("/") + "/webhook",
-                params={"hub.mode": "subscribe", "hub.challenge": challenge, "hub.verify_token": token},
-                timeout=3,
-            )
-            checks["webhook_get"] = r_get.status_code == 200 and str(r_get.text).strip() == str(challenge)
-        except Exception:
-            checks["webhook_get"] = False
-
-    ngrok_api = os.environ.get("NGROK_API_URL", "http://127.0.0.1:4040")
-    ngrok_tunnels = None
-    try:
-        r_tunnels = requests.get(ngrok_api.rstrip("/") + "/api/tunnels", timeout=2)
-        if r_tunnels.status_code == 200:
-            data = r_tunnels.json()
-            tunnels = data.get("tunnels", [])
-            ngrok_tunnels = [
-                {
-                    "name": t.get("name"),
-                    "public_url": t.get("public_url"),
-                    "proto": t.get("proto"),
-                    "addr": t.get("config", {}).get("addr"),
-                }
-                for t in tunnels
-            ]
-            checks["ngrok_local"] = True
-        else:
-            checks["ngrok_local"] = False
-    except Exception:
-        checks["ngrok_local"] = False
-
-    reachable = None if not public_url else (checks["webhook_get"] is True)
-
-    return {
-        "status": "ok",
-        "public_url": public_url,
-        "checks": checks,
-        "reachable": reachable,
-        "ngrok_tunnels": ngrok_tunnels,
-        "ngrok_api": ngrok_api,
-    }
-
-
-@app.get("/webhook")
-def verify_whatsapp(
-        hub_mode: str = Query("subscribe", description="The mode of the webhook", alias="hub.mode"),
-        hub_challenge: int = Query(..., description="The challenge to verify the webhook", alias="hub.challenge"),
-        hub_verify_token: str = Query(..., description="The verification token", alias="hub.verify_token"),
-):
-    expected_token = settings.meta.verification_token or os.environ.get(
-        "META_VERIFICATION_TOKEN", "my_voice_is_my_password_verify_me"
-    )
-    if hub_mode == "subscribe" and hub_verify_token == expected_token:
-        return hub_challenge
-
-    raise HTTPException(status_code=403, detail="Invalid verification token")
+@app.get("/readiness")
+async def readiness(request: Request):
+    ready, body = request.app.state.readiness.snapshot()
+    return JSONResponse(body, status_code=200 if ready else 503)
 
 
-@app.post("/webhook", status_code=200)
-@inject
-async def inbound(
-        payload: Payload,
-        meta_webhook_service: Annotated[MetaWebhookService, Depends(Provide[Container.meta.meta_webhook_service])],
-):
-    logger.info("Received payload", payload=payload.model_dump())
-    print("Received payload: " + payload.model_dump_json(indent=2))
+@app.get("/keep-alive-webhook")
+async def keep_alive_webhook(request: Request):
+    return request.app.state.keep_alive.snapshot()
 
-    await meta_webhook_service.handle_webhook(payload)
 
-    return {"status": "ok"}
+app.include_router(meta_router)
+app.include_router(meta_webhook_alias)
 
 if __name__ == "__main__":
-    load_dotenv()
+    import uvicorn
+
+    # Reload only works with a single process; each worker otherwise runs its
+    # own lifespan (caches, pools, monitors) and shares cache invalidations
+    # through the invalidation bus
+    reload = settings.api.debug and settings.api.workers <= 1
     uvicorn.run(
         "src.main:app",
         host=settings.api.host,
         port=settings.api.port,
-        reload=settings.api.debug,
+        reload=reload,
+        workers=None if reload else settings.api.workers,
     )
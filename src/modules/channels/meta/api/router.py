@@ -1,7 +1,13 @@
 from fastapi import APIRouter
 
-from .v1.router import router as v1_router # type: ignore
+from .v1.router import router as v1_router
+from .v1.webhook import router as webhook_router
 
 router = APIRouter(prefix="/channels/meta")
 
-router.include_router(v1_router, prefix="/v1")
\ No newline at end of file
+router.include_router(v1_router, prefix="/v1")
+
+# Unversioned alias: the callback URL registered in the Meta app settings
+legacy_router = APIRouter(include_in_schema=False)
+
+legacy_router.include_router(webhook_router)
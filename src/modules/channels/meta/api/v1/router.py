@@ -0,0 +1,7 @@
+from fastapi import APIRouter
+
+from .webhook import router as webhook_router
+
+router = APIRouter()
+
+router.include_router(webhook_router)
@@ -41,6 +41,33 @@ class Video(BaseModel):
     caption: str | None = None
 
 
+class Document(BaseModel):
+    mime_type: str
+    sha256: str
+    id: str
+    caption: str | None = None
+    filename: str | None = None
+
+
+class Location(BaseModel):
+    latitude: float
+    longitude: float
+    name: str | None = None
+    address: str | None = None
+
+
+class InteractiveReply(BaseModel):
+    id: str
+    title: str
+    description: str | None = None
+
+
+class Interactive(BaseModel):
+    type: str  # "button_reply" ou "list_reply"
+    button_reply: InteractiveReply | None = None
+    list_reply: InteractiveReply | None = None
+
+
 class Reaction(BaseModel):
     message_id: str
     emoji: str  # ex: "❤️"
@@ -56,6 +83,9 @@ class Message(BaseModel):
     image: Optional[Image] | None = None
     audio: Optional[Audio] | None = None
     video: Optional[Video] | None = None
+    document: Optional[Document] | None = None
+    location: Optional[Location] | None = None
+    interactive: Optional[Interactive] | None = None
     
 
 
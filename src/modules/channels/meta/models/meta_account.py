@@ -27,6 +27,7 @@ class MetaAccount(BaseModel):
     system_user_access_token: str = Field(..., max_length=500, description="access token using bearer")
     webhook_verification_token: str = Field(..., max_length=500, description="webhook verification token to receive events")
     owner_id: str = Field(..., description="owner id")
+    app_secret: Optional[str] = Field(default=None, max_length=255, description="meta app secret signing the webhooks")
     
     model_config = ConfigDict(from_attributes=True)
 
@@ -1,14 +1,25 @@
-from typing import List, Optional
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from src.core.database.interface import IDatabaseSession
 from src.core.database.supabase_async_repository import SupabaseAsyncRepository
 from src.core.utils.logging import get_logger
+from src.core.utils.phone import normalize_phone
 from src.modules.channels.meta.models.meta_account import MetaAccount
-from src.modules.channels.meta.repositories.meta_account_repository import MetaAccountRepository
+from src.modules.channels.meta.repositories.meta_account_repository import (
+    ROUTING_COLUMNS,
+    SIGNING_COLUMNS,
+    MetaAccountRepository,
+)
 
 logger = get_logger(__name__)
 
 
+def quote_value(value: str) -> str:
+    """A value inside a PostgREST `or=(...)` group, quoted (and escaped) as PostgREST parses it."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
 class SupabaseMetaAccountRepository(SupabaseAsyncRepository[MetaAccount], MetaAccountRepository):
     def __init__(self, client: IDatabaseSession) -> None:
         super().__init__(
@@ -42,8 +53,52 @@ class SupabaseMetaAccountRepository(SupabaseAsyncRepository[MetaAccount], MetaAc
 
 
     async def get_by_phone_number(self, phone_number: str) -> Optional[MetaAccount]:
-        results = await self.find_by({"phone_number": phone_number}, limit=1)
-        return results[0] if results else None
+        """
+        Account with `phone_number` as phone_number or in phone_numbers.
+
+        Looks the E.164 form up in `normalized_phone_numbers` (one indexed
+        query). On a miss, or while migrations/003 is not applied, falls back
+        to an exact match of the number as written and of its E.164 form,
+        which also finds stored numbers the SQL cannot normalize.
+        """
+        number = normalize_phone(phone_number)
+        if number is not None:
+            try:
+                result = (
+                    self.client.table(self.table_name)
+                    .select("*")
+                    .contains("normalized_phone_numbers", [number])
+                    .limit(1)
+                    .execute()
+                )
+                if result.data:
+                    return self.model_class(**result.data[0])
+            except Exception as e:
+                logger.warning(
+                    f"Normalized phone lookup failed in {self.table_name}, matching exactly", error=str(e)
+                )
+
+        candidates = dict.fromkeys(value for value in (phone_number.strip(), number) if value)
+        conditions = []
+        for value in candidates:
+            conditions.append(f"phone_number.eq.{quote_value(value)}")
+            conditions.append(f"phone_numbers.cs.{quote_value(json.dumps([value]))}")
+        if not conditions:
+            return None
+        try:
+            result = self.client.table(self.table_name).select("*").or_(",".join(conditions)).limit(1).execute()
+        except Exception as e:
+            logger.error(f"Error finding account by phone number in {self.table_name}", error=str(e))
+            raise
+        return self.model_class(**result.data[0]) if result.data else None
+
+
+    def iter_signing_rows(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        return self.iter_pages(SIGNING_COLUMNS, page_size=page_size)
+
+
+    def iter_routing_rows(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        return self.iter_pages(ROUTING_COLUMNS, page_size=page_size)
 
 
     async def update_meta_account(self, account_id: str, data: dict) -> Optional[MetaAccount]:
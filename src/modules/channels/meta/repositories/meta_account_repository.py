@@ -1,8 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from src.modules.channels.meta.models.meta_account import MetaAccount
 
+# Columns needed to route a webhook to its owner (no credentials)
+ROUTING_COLUMNS = ["id", "meta_business_account_id", "phone_number", "phone_numbers", "owner_id"]
+# Columns needed to tell which app secret signs an account's webhooks
+SIGNING_COLUMNS = ["id", "meta_business_account_id", "phone_number_id", "phone_number", "phone_numbers", "app_secret"]
+
 
 class MetaAccountRepository(ABC):
     @abstractmethod
@@ -28,6 +33,17 @@ class MetaAccountRepository(ABC):
 
     @abstractmethod
     async def get_by_phone_number(self, phone_number: str) -> Optional[MetaAccount]:
+        """Account owning `phone_number` (as written), as phone_number or one of phone_numbers."""
+        ...
+
+    @abstractmethod
+    def iter_signing_rows(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Pages of the columns signature verification needs (see SIGNING_COLUMNS), by id."""
+        ...
+
+    @abstractmethod
+    def iter_routing_rows(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Pages of the columns owner routing needs (see ROUTING_COLUMNS), by id."""
         ...
 
     @abstractmethod
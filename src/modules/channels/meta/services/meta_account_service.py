@@ -1,19 +1,114 @@
 
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
 
+from src.core.cache.invalidation import INVALIDATE_ALL, InvalidationBus
+from src.core.cache.ttl_cache import TTLCache
 from src.core.utils.logging import get_logger
 from src.core.config.settings import settings
 from src.modules.channels.meta.repositories.meta_account_repository import MetaAccountRepository
 from src.modules.channels.meta.models.meta_account import MetaAccount
+from src.modules.channels.meta.services.routing_snapshot import RoutingTable, canonical_phone, phone_key, route_keys
 
 
 logger = get_logger(__name__)
 
+# Invalidation bus topic for Meta account lookups
+ACCOUNT_CACHE_TOPIC = "meta_account"
+
+
+def account_cache_keys(account: MetaAccount) -> List[str]:
+    """Cache keys under which `account` may be stored (also its routing snapshot keys)."""
+    return route_keys(account.meta_business_account_id, account.phone_number, account.phone_numbers)
+
 
 class MetaAccountService:
-    def __init__(self, repo: MetaAccountRepository):
+    def __init__(
+        self,
+        repo: MetaAccountRepository,
+        invalidation_bus: Optional[InvalidationBus] = None,
+        cache: Optional[TTLCache[MetaAccount]] = None,
+        routing: Optional[RoutingTable] = None,
+    ):
         self.repo = repo
+        # Snapshot of every account's routing keys, checked before the cache
+        self.routing = routing
+        # Per-worker cache of account lookups; other workers' writes reach it
+        # through the invalidation bus, and the TTL bounds staleness otherwise
+        self.cache = cache or TTLCache(
+            "meta_accounts",
+            ttl=settings.cache.account_ttl_seconds,
+            max_entries=settings.cache.account_max_entries,
+        )
+        self.invalidation_bus = invalidation_bus
+        if invalidation_bus is not None:
+            invalidation_bus.subscribe(ACCOUNT_CACHE_TOPIC, self._on_invalidation)
+
+    def _on_invalidation(self, keys: List[str]) -> None:
+        if self.routing is not None:
+            self.routing.invalidate(keys)
+        if INVALIDATE_ALL in keys:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(*keys)
+
+    async def _cached(
+        self, key: str, load: Callable[[], Awaitable[Optional[MetaAccount]]]
+    ) -> Optional[MetaAccount]:
+        account = self.cache.get(key)
+        if account is not None:
+            return account
+        version = self.cache.version
+        account = await load()
+        # Misses are not cached so newly created accounts are seen right away
+        if account is not None:
+            self.cache.set(key, account, version=version)
+        return account
+
+    async def get_by_business_account_id(self, business_account_id: str) -> Optional[MetaAccount]:
+        return await self._cached(
+            f"waba:{business_account_id}",
+            lambda: self.repo.get_by_meta_business_account_id(business_account_id),
+        )
+
+    async def get_by_phone_number(self, phone_number: str) -> Optional[MetaAccount]:
+        """Account owning `phone_number`, written in any notation (cached under its E.164 key)."""
+        number = canonical_phone(phone_number)
+        return await self._cached(phone_key(number), lambda: self.repo.get_by_phone_number(phone_number))
+
+    def iter_signing_rows(self, page_size: int = 1000) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Identifiers and app secret of every account (not cached: the signature verifier keeps its own copy)."""
+        return self.repo.iter_signing_rows(page_size=page_size)
+
+    async def invalidate(self, *accounts: MetaAccount) -> None:
+        """Drop cached lookups of `accounts` in every worker (all lookups if none given)."""
+        keys: List[str] = []
+        for account in accounts:
+            keys.extend(account_cache_keys(account))
+        keys = keys or [INVALIDATE_ALL]
+        if self.invalidation_bus is not None:
+            await self.invalidation_bus.publish(ACCOUNT_CACHE_TOPIC, *keys)
+        else:
+            self._on_invalidation(keys)
+
+    async def create_account(self, meta_account: MetaAccount) -> MetaAccount:
+        created = await self.repo.create_meta_account(meta_account)
+        await self.invalidate(created)
+        return created
+
+    async def update_account(self, account_id: str, data: dict) -> Optional[MetaAccount]:
+        """Update an account and invalidate its old and new identifiers everywhere."""
+        previous = await self.repo.get_by_id(account_id)
+        updated = await self.repo.update_meta_account(account_id, data)
+        await self.invalidate(*(a for a in (previous, updated) if a is not None))
+        return updated
+
+    async def delete_account(self, account_id: str) -> bool:
+        previous = await self.repo.get_by_id(account_id)
+        deleted = await self.repo.delete_meta_account(account_id)
+        if previous is not None:
+            await self.invalidate(previous)
+        return deleted
 
     async def resolve_account(self, phone_number: str, business_account_id: str) -> Optional[MetaAccount]:
         """Resolve the MetaAccount based on the phone number.
@@ -34,15 +129,15 @@ class MetaAccountService:
 
         # 1. Try by Whatsapp Business Account ID
         if business_account_id:
-            account = await self.repo.get_by_meta_business_account_id(business_account_id)
+            account = await self.get_by_business_account_id(business_account_id)
 
-        # 2. Try by Phone Number
+        # 2. Try by Phone Number (more specific; keeps the first match otherwise)
         if phone_number:
-            account = await self.repo.get_by_phone_number(phone_number)
+            account = await self.get_by_phone_number(phone_number) or account
 
         # 3. Fallback to default from settings (Development only ideally)
         if not account and getattr(settings.api, "environment", "production") == "development":
-            account = await self.repo.get_by_meta_business_account_id(settings.meta.business_account_id)
+            account = await self.get_by_business_account_id(settings.meta.business_account_id)
 
         if not account:
             logger.warning("MetaAccount lookup failed", 
@@ -51,3 +146,12 @@ class MetaAccountService:
             )
 
         return account
+
+    async def resolve_owner_id(self, phone_number: str, business_account_id: str) -> Optional[str]:
+        """Owner id of a webhook, from the routing snapshot if loaded, else as `resolve_account`."""
+        if self.routing is not None:
+            route = self.routing.resolve(phone_number, business_account_id)
+            if route is not None:
+                return route.owner_id
+        account = await self.resolve_account(phone_number, business_account_id)
+        return account.owner_id if account else None
@@ -0,0 +1,242 @@
+import asyncio
+import contextlib
+import random
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from src.core.concurrency.bulkhead import BulkheadRejected
+from src.core.config.settings import settings
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.outbox.sqlite_outbox import OutboxMessage, SQLiteOutbox
+from src.core.utils.logging import get_logger
+from src.modules.channels.meta.services.meta_service import MetaSendError, MetaService, SendAborted
+
+logger = get_logger(__name__)
+
+
+class MetaOutboxSender:
+    """
+    Delivers queued outbound messages to the Graph API.
+
+    Each iteration claims a batch from the outbox and sends it with the
+    pooled HTTP client: conversations concurrently, the messages of one
+    conversation in order. With per-owner bulkheads on the Meta service,
+    those (not the batch) bound concurrency, so one owner's backlog cannot
+    hold every sending slot. Retryable failures (connection errors, 429, 5xx)
+    are rescheduled with jittered exponential backoff (or `Retry-After`);
+    other failures, and messages out of attempts, are dead-lettered. The
+    returned wamid is stored with the sent message.
+
+    A message may wait for its owner's bulkhead longer than its outbox
+    lease, so the lease is renewed right before posting; a message whose
+    lease already ran out may have been claimed by another worker and is
+    dropped instead of being sent twice.
+    """
+
+    def __init__(
+        self,
+        outbox: Optional[SQLiteOutbox],
+        meta_service: MetaService,
+        batch_size: int = 50,
+        concurrency: int = 8,
+        poll_interval: float = 1.0,
+        max_attempts: int = 8,
+        backoff: float = 1.0,
+        backoff_max: float = 300.0,
+        retention_hours: float = 168.0,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.outbox = outbox
+        self.meta_service = meta_service
+        self.batch_size = max(1, batch_size)
+        self.concurrency = max(1, concurrency)
+        self.poll_interval = poll_interval
+        self.max_attempts = max(1, max_attempts)
+        self.backoff = backoff
+        self.backoff_max = backoff_max
+        self.retention_seconds = retention_hours * 3600.0
+        self.registry = registry
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping = False
+        self._last_purge = 0.0
+
+    @classmethod
+    def from_settings(cls, outbox: Optional[SQLiteOutbox], meta_service: MetaService) -> "MetaOutboxSender":
+        config = settings.outbox
+        return cls(
+            outbox,
+            meta_service,
+            batch_size=config.batch_size,
+            concurrency=config.concurrency,
+            poll_interval=config.poll_interval_seconds,
+            max_attempts=config.max_attempts,
+            backoff=config.retry_backoff_seconds,
+            backoff_max=config.retry_backoff_max_seconds,
+            retention_hours=config.retention_hours,
+        )
+
+    async def start(self) -> None:
+        if self.outbox is None or self._task is not None:
+            return
+        self._stopping = False
+        self._wakeup = asyncio.Event()
+        self.outbox.add_listener(self._wakeup.set)
+        self._task = asyncio.create_task(self._run(), name="meta-outbox-sender")
+        logger.info("Outbox sender started", batch_size=self.batch_size, concurrency=self.concurrency)
+
+    async def stop(self, timeout: float = 15.0) -> None:
+        """Finish the batch in flight (up to `timeout` seconds) and stop."""
+        if self._task is None:
+            return
+        self._stopping = True
+        self._wakeup.set()
+        try:
+            await asyncio.wait_for(self._task, timeout)
+        except asyncio.TimeoutError:
+            # Unfinished messages are sent again once their lease expires
+            logger.warning("Outbox sender stopped with messages in flight")
+        self._task = None
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            self._wakeup.clear()
+            try:
+                handled = await self.drain_once()
+                await self._purge()
+            except Exception as e:
+                logger.error("Outbox sender iteration failed", error=str(e))
+                handled = 0
+            # Only a full batch actually handled means more may be waiting;
+            # released messages are claimable at once, so re-claiming them
+            # right away would spin until their bulkhead frees up
+            if handled >= self.batch_size:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def drain_once(self) -> int:
+        """
+        Claim and deliver one batch.
+
+        Returns:
+            Number of messages handled (sent, rescheduled or dead-lettered);
+            messages released back unattempted are not counted
+        """
+        messages = await self.outbox.claim(self.batch_size)
+        if not messages:
+            return 0
+        conversations: Dict[str, List[OutboxMessage]] = OrderedDict()
+        for message in messages:
+            conversations.setdefault(message.conversation, []).append(message)
+        # A conversation waiting for its owner's bulkhead must not hold a slot
+        # other owners could use
+        semaphore = asyncio.Semaphore(self.concurrency) if self.meta_service.bulkheads is None else None
+        released = await asyncio.gather(
+            *(self._send_conversation(batch, semaphore) for batch in conversations.values())
+        )
+        return len(messages) - sum(released)
+
+    async def _send_conversation(self, messages: List[OutboxMessage], semaphore: Optional[asyncio.Semaphore]) -> int:
+        """Deliver one conversation in order; returns the number of messages released unattempted."""
+        async with semaphore or contextlib.nullcontext():
+            for index, message in enumerate(messages):
+                delivered = await self._deliver(message)
+                if not delivered:
+                    # Keep the conversation in order: later messages wait for the retry
+                    pending = messages[index + 1:]
+                    for later in pending:
+                        await self.outbox.release(later)
+                    return len(pending) + (1 if delivered is None else 0)
+        return 0
+
+    async def _deliver(self, message: OutboxMessage) -> Optional[bool]:
+        """Send one message; returns False if it was rescheduled, None if it was released unattempted."""
+        started = time.perf_counter()
+        try:
+            response = await self.meta_service.post_message(
+                message.payload,
+                owner_id=message.owner_id,
+                before_send=lambda: self.outbox.renew_lease(message),
+            )
+        except BulkheadRejected:
+            # Not attempted: claimed again on a later iteration
+            await self.outbox.release(message)
+            self.registry.inc("outbox.deferred")
+            return None
+        except SendAborted:
+            # Lease expired while waiting for a slot: the row is claimable
+            # again (or already claimed) and is left to that claim
+            self.registry.inc("outbox.lease_lost")
+            logger.warning("Outbound message dropped, lease expired", outbox_id=message.id)
+            return None
+        except MetaSendError as e:
+            return await self._failed(message, str(e), e.retryable, e.retry_after)
+        except Exception as e:
+            return await self._failed(message, f"{type(e).__name__}: {e}", True, None)
+        finally:
+            self.registry.observe("outbox.send_ms", (time.perf_counter() - started) * 1000.0)
+
+        wamid = None
+        sent = response.get("messages") if isinstance(response, dict) else None
+        if sent:
+            wamid = sent[0].get("id")
+        if not await self.outbox.mark_sent(message, wamid):
+            # Posted under a valid lease that ran out during the request
+            self.registry.inc("outbox.lease_lost")
+        self.registry.inc("outbox.sent")
+        self.registry.observe("outbox.delivery_lag_ms", max(0.0, time.time() - message.created_at) * 1000.0)
+        logger.info("Outbound message sent", outbox_id=message.id, wamid=wamid, attempts=message.attempts)
+        return True
+
+    async def _failed(self, message: OutboxMessage, error: str, retryable: bool, retry_after: Optional[float]) -> bool:
+        if retryable and message.attempts < self.max_attempts:
+            delay = min(self.backoff_max, self.backoff * (2 ** (message.attempts - 1)))
+            delay = random.uniform(delay / 2, delay)
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            await self.outbox.mark_retry(message, error, delay)
+            self.registry.inc("outbox.retried")
+            logger.warning(
+                "Outbound message rescheduled",
+                outbox_id=message.id,
+                attempts=message.attempts,
+                retry_in_s=round(delay, 2),
+                error=error,
+            )
+            return False
+
+        await self.outbox.mark_dead(message, error)
+        self.registry.inc("outbox.dead")
+        logger.error("Outbound message dead-lettered", outbox_id=message.id, attempts=message.attempts, error=error)
+        # A dead message no longer blocks its conversation
+        return True
+
+    async def _purge(self) -> None:
+        if self.retention_seconds <= 0:
+            return
+        now = time.time()
+        if now - self._last_purge < 3600.0:
+            return
+        self._last_purge = now
+        purged = await self.outbox.purge(now - self.retention_seconds)
+        if purged:
+            logger.info("Outbox purged", messages=purged)
+
+
+async def meta_outbox_sender_resource(sender: MetaOutboxSender, *resources: Any):
+    """
+    DI resource running the outbox sender loop.
+
+    `resources` are the opened resources delivery uses (the outbox, the
+    pooled HTTP client); depending on them makes the container stop the
+    sender before closing them.
+    """
+    await sender.start()
+    try:
+        yield sender
+    finally:
+        await sender.stop()
@@ -1,10 +1,12 @@
 
+import asyncio
 import datetime
-from typing import Any, Dict, Optional
-
-import httpx
+from typing import Any, Awaitable, Callable, Dict, Optional
 
+from src.core.concurrency.bulkhead import OwnerBulkheads
 from src.core.config.settings import settings
+from src.core.http.client import get_http_client
+from src.core.outbox.sqlite_outbox import SQLiteOutbox
 from src.core.utils.logging import get_logger
 from src.modules.channels.meta.models.meta_client import MetaClient
 from src.modules.channels.meta.repositories.meta_account_repository import MetaAccountRepository
@@ -12,16 +14,55 @@ from src.modules.channels.meta.repositories.meta_account_repository import MetaA
 
 logger = get_logger(__name__)
 
+OUTBOX_CHANNEL = "meta"
+
+# Message types whose media is downloaded and saved
+MEDIA_TYPES = ("image", "audio", "video", "document")
+
+
+def _write_file(path: str, content: bytes) -> None:
+    with open(path, "wb") as file:
+        file.write(content)
+
+
+class MetaSendError(Exception):
+    """Graph API did not accept an outbound message."""
+
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        retryable: bool = False,
+        retry_after: Optional[float] = None,
+    ):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retryable = retryable
+        self.retry_after = retry_after
+
+
+class SendAborted(Exception):
+    """An outbound message was dropped right before posting (see `post_message`'s `before_send`)."""
+
 
 class MetaService:
-    def __init__(self, meta_account_repo: MetaAccountRepository):
+    def __init__(
+        self,
+        meta_account_repo: MetaAccountRepository,
+        outbox: Optional[SQLiteOutbox] = None,
+        bulkheads: Optional[OwnerBulkheads] = None,
+    ):
         """
         Initialize Meta service.
 
         Args:
             meta_account_repo: Meta account repository
+            outbox: Outbox messages are queued in (sent inline when None)
+            bulkheads: Per-owner limits on Graph API sends
         """
         self.meta_account_repo = meta_account_repo
+        self.outbox = outbox
+        self.bulkheads = bulkheads
         self._clients: Dict[str, MetaClient] = {}  
       
 
@@ -92,7 +133,7 @@ class MetaService:
         VERSION_API = settings.meta.version_api
         PHONE_NUMBER_ID = settings.meta.phone_number_id
         BEARER_TOKEN_ACCESS = settings.meta.bearer_token_access
-        url = f"https://graph.facebook.com/{VERSION_API}/{PHONE_NUMBER_ID}/messages"
+        url = f"{settings.meta.graph_api_url}/{VERSION_API}/{PHONE_NUMBER_ID}/messages"
         headers = {
             "Authorization": "Bearer " + BEARER_TOKEN_ACCESS,
             "Content-Type": "application/json"
@@ -102,23 +143,23 @@ class MetaService:
 
 
     async def download_media(self, file_id: str, file_type: str, mime_type: str) -> bytes | None:
-        url = f"https://graph.facebook.com/{settings.meta.version_api}/{file_id}"
+        url = f"{settings.meta.graph_api_url}/{settings.meta.version_api}/{file_id}"
         headers = {"Authorization": f"Bearer {settings.meta.bearer_token_access}"}
 
-        async with httpx.AsyncClient() as client:
-            response = await client.get(url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Failed to retrieve download URL. Status code: {response.status_code}")
+        client = get_http_client()
+        response = await client.get(url, headers=headers)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to retrieve download URL. Status code: {response.status_code}")
 
-            download_url = response.json().get("url")
+        download_url = response.json().get("url")
 
-            response = await client.get(download_url, headers=headers)
-            if response.status_code != 200:
-                raise ValueError(f"Failed to download file. Status code: {response.status_code}")
+        response = await client.get(download_url, headers=headers)
+        if response.status_code != 200:
+            raise ValueError(f"Failed to download file. Status code: {response.status_code}")
 
-            # suporta image, audio e video
-            if file_type in ("image", "audio", "video"):
-                return response.content
+        # suporta image, audio, video e document
+        if file_type in MEDIA_TYPES:
+            return response.content
 
         return None
 
@@ -132,10 +173,10 @@ class MetaService:
         file_extension = mime_type.split("/")[-1].split(";")[0]
         file_path = f"{file_id}.{file_extension}"
 
-        with open(file_path, "wb") as file:
-            file.write(content)
+        # Blocking file write kept off the event loop
+        await asyncio.to_thread(_write_file, file_path, content)
 
-        if file_type in ("image", "audio", "video"):
+        if file_type in MEDIA_TYPES:
             return file_path
 
         return None
@@ -172,9 +213,8 @@ class MetaService:
             }
         }
 
-        with httpx.Client() as client:
-            response = client.post(url, headers=headers, json=data)
-            logger.info(f"Meta API response: {response.status_code} {response.text}")
+        response = await get_http_client().post(url, headers=headers, json=data)
+        logger.info(f"Meta API response: {response.status_code} {response.text}")
             
         return response.json()
 
@@ -185,21 +225,48 @@ class MetaService:
             from_number: str,
             to_number: str,
             message: str,
-            media_type: Optional[str] = None) -> Any:
-        
+            media_type: Optional[str] = None,
+            dedupe_key: Optional[str] = None) -> Any:
+        """
+        Send a text message, through the outbox when one is configured.
+
+        Args:
+            owner_id: Owner ID (ULID)
+            from_number: Sender (bot) phone number
+            to_number: Recipient phone number
+            message: Message body
+            media_type: Optional media type (fake sender only)
+            dedupe_key: Idempotency key, e.g. derived from the inbound message id
+
+        Returns:
+            `{"outbox_id": ...}` when queued, otherwise the Graph API response
+        """
         # Only send via fake sender in development environment
         if settings.api.environment == "development" and settings.api.use_fake_sender:
             logger.warning("Message sent via fake sender")
             return self.__send_via_fake_sender(
                 owner_id, from_number, to_number, message, media_type
             )
-        
-        url, headers = self._build_post_request()
 
-        logger.info(f"Meta API request: {url} {headers} "
-                    f"Owner ID: {owner_id} To: {to_number} Message: {message}")
+        data = self.build_text_message(to_number, message)
 
-        data = {
+        if self.outbox is not None:
+            outbox_id = await self.outbox.enqueue(
+                OUTBOX_CHANNEL,
+                conversation=f"{from_number}:{to_number}",
+                payload=data,
+                owner_id=owner_id,
+                dedupe_key=dedupe_key,
+            )
+            logger.info(f"Meta message queued: Owner ID: {owner_id} To: {to_number} Outbox ID: {outbox_id}")
+            return {"outbox_id": outbox_id}
+
+        logger.info(f"Meta API request: Owner ID: {owner_id} To: {to_number} Message: {message}")
+        return await self.post_message(data, owner_id=owner_id)
+
+    @staticmethod
+    def build_text_message(to_number: str, message: str) -> Dict[str, Any]:
+        return {
             "messaging_product": "whatsapp",
             "preview_url": False,
             "recipient_type": "individual",
@@ -210,8 +277,54 @@ class MetaService:
             }
         }
 
-        with httpx.Client() as client:
-            response = client.post(url, headers=headers, json=data)
-            logger.info(f"Meta API response: {response.status_code} {response.text}")
+    async def post_message(
+        self,
+        data: Dict[str, Any],
+        owner_id: Optional[str] = None,
+        before_send: Optional[Callable[[], Awaitable[bool]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        POST a message to the Graph API.
+
+        Args:
+            data: Message body
+            owner_id: Owner sending it; the send waits for a slot of the
+                      owner's bulkhead when one is configured
+            before_send: Called once the send may proceed (after any wait
+                         for a bulkhead slot); returning False drops it
+
+        Raises:
+            MetaSendError: on transport errors and non-2xx responses;
+                `retryable` is set for connection errors, 429 and 5xx
+            BulkheadRejected: the owner already has too many sends queued
+            SendAborted: `before_send` returned False; nothing was posted
+        """
+
+        async def send() -> Dict[str, Any]:
+            if before_send is not None and not await before_send():
+                raise SendAborted("Send aborted before posting")
+            return await self._post_message(data)
 
+        if self.bulkheads is not None and owner_id:
+            return await self.bulkheads.run(owner_id, send)
+        return await send()
+
+    async def _post_message(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        import httpx
+
+        url, headers = self._build_post_request()
+        try:
+            response = await get_http_client().post(url, headers=headers, json=data)
+        except httpx.TransportError as e:
+            raise MetaSendError(f"{type(e).__name__}: {e}", retryable=True) from e
+
+        logger.info(f"Meta API response: {response.status_code} {response.text}")
+        if response.status_code >= 400:
+            retry_after = response.headers.get("Retry-After")
+            raise MetaSendError(
+                f"Graph API error {response.status_code}: {response.text}",
+                status_code=response.status_code,
+                retryable=response.status_code == 429 or response.status_code >= 500,
+                retry_after=float(retry_after) if retry_after and retry_after.isdigit() else None,
+            )
         return response.json()
@@ -1,5 +1,11 @@
-
-from src.modules.channels.meta.dtos.inbound import Payload, Message
+from typing import Callable, Optional
+
+from src.core.concurrency.bulkhead import BulkheadRejected, OwnerBulkheads
+from src.core.concurrency.keyed_executor import KeyedExecutor
+from src.core.journal.event_journal import EventJournal
+from src.modules.channels.meta.dtos.inbound import Payload
+from src.modules.channels.meta.services.webhook.context import WebhookContext
+from src.modules.channels.meta.services.webhook.message_router import MessageRouter
 from src.modules.channels.meta.services.webhook.owner_resolver import MetaWebhookOwnerResolver
 from src.modules.channels.meta.services.meta_service import MetaService
 from src.core.utils.logging import get_logger
@@ -10,57 +16,138 @@ logger = get_logger(__name__)
 class MetaWebhookService:
     def __init__(self, 
                  owner_resolver: MetaWebhookOwnerResolver,
-                 meta_service: MetaService):
+                 meta_service: MetaService,
+                 context_factory: Callable[..., WebhookContext] = WebhookContext.from_payload,
+                 sequencer: Optional[KeyedExecutor] = None,
+                 journal: Optional[EventJournal] = None,
+                 message_router: Optional[MessageRouter] = None,
+                 bulkheads: Optional[OwnerBulkheads] = None):
         self.owner_resolver = owner_resolver
         self.meta_service = meta_service
-
-    async def handle_webhook(self, payload: Payload):
-        logger.info(f"Meta Webhook received: {payload}")
+        self.context_factory = context_factory
+        # Orders processing per conversation (owner, wa_id) by message timestamp
+        self.sequencer = sequencer
+        # Failed events are marked in the journal so they can be replayed
+        self.journal = journal
+        # Message type -> handler (text, reaction, media, ...)
+        self.message_router = message_router or MessageRouter.default(meta_service)
+        # Per-owner concurrency budget, shared fairly across owners
+        self.bulkheads = bulkheads
+
+    async def handle_webhook(self, payload: Payload, event_id: Optional[str] = None) -> bool:
+        """
+        Process one webhook, logging failures and marking them in the journal.
+
+        Returns:
+            False if processing failed (the event is left for replay)
+
+        Raises:
+            BulkheadRejected: the owner's queue is full; the webhook is shed
+        """
+        context = self.context_factory(payload=payload)
+        context.event_id = event_id
+        message = context.message
+        # Summary only: the raw body is kept by the event journal, and rendering
+        # the whole payload cost more than the rest of the request
+        logger.info(
+            "Meta Webhook received",
+            event_id=event_id,
+            phone_number_id=context.phone_number_id,
+            message_id=message.id if message else None,
+            message_type=message.type if message else None,
+            statuses=len(context.statuses),
+        )
 
         try:
-            owner_id = await self.owner_resolver.resolve_owner_id(payload)
-            if not owner_id:
-                logger.error(f"Owner lookup failed for payload: {payload}")
-                return None
-
-            entry = payload.entry[0]
-            change = entry.changes[0]
-            value = change.value
-
-            if self._is_status_event(value):
-                self._handle_status_event(value)
-                return None
-
-            if not self._is_inbound_message_event(value):
-                logger.info(f"Unsupported webhook event: {value}")
-                return None
-
-            display_phone_number = value.metadata.display_phone_number
-            user_phone_number = value.contacts[0].wa_id
-
-            text = await self._extract_text_from_message(
-                value,
-                owner_id,
-                user_phone_number,
-                display_phone_number,
-            )
+            await self.process_webhook(payload, context=context)
+        except BulkheadRejected:
+            # Answered with 503 so Meta delivers it again later
+            logger.warning("Owner queue full, webhook shed", event_id=event_id, owner_id=context.owner_id)
+            raise
+        except Exception as e:
+            logger.error(f"Error sending message via Meta webhook: {e}", event_id=event_id)
+            if self.journal is not None and event_id:
+                self.journal.mark_failed(event_id, e)
+            return False
+        return True
 
-            if text:
-                await self.meta_service.send_message(
-                    owner_id=owner_id,
-                    from_number=display_phone_number,  # bot number
-                    to_number=user_phone_number,       # user number
-                    message=text,
-                )
-                logger.info(
-                    f"Inbound message handled: reply sent from {display_phone_number} to "
-                    f"{user_phone_number} for owner {owner_id}"
-                )
+    async def process_webhook(
+        self, payload: Payload, context: Optional[WebhookContext] = None, event_id: Optional[str] = None
+    ) -> None:
+        """
+        Process one webhook, raising on failure (used directly by replay).
+
+        Failures of background (heavy) handlers happen later and are marked
+        in the journal on `event_id` instead.
+        """
+        if context is None:
+            context = self.context_factory(payload=payload)
+            context.event_id = event_id
+        owner_id = await self.owner_resolver.resolve_owner_id(context)
+        if not owner_id:
+            raise LookupError(f"Owner lookup failed for payload: {payload}")
+        context.owner_id = owner_id
+
+        value = context.value
+
+        if self._is_status_event(value):
+            self._handle_status_event(value)
+            return None
 
-        except Exception as e:
-            logger.error(f"Error sending message via Meta webhook: {e}")
+        if not self._is_inbound_message_event(value):
+            logger.info(f"Unsupported webhook event: {value}")
             return None
 
+        await self._sequence_message(context)
+
+    async def _sequence_message(self, context: WebhookContext) -> None:
+        if self.sequencer is None:
+            await self._run_message(context)
+        else:
+            await self.sequencer.submit(
+                (context.owner_id, context.contact.wa_id),
+                self._message_order(context),
+                lambda: self._run_message(context),
+            )
+
+    async def _run_message(self, context: WebhookContext) -> None:
+        # The owner's slot is taken once the message's turn in its conversation
+        # comes: messages waiting behind earlier ones of the same conversation
+        # must not hold slots the owner's other conversations could use
+        if self.bulkheads is None:
+            await self._process_message(context)
+        else:
+            await self.bulkheads.run(context.owner_id, lambda: self._process_message(context))
+
+    async def _process_message(self, context: WebhookContext) -> None:
+        owner_id = context.owner_id
+        display_phone_number = context.display_phone_number
+        user_phone_number = context.contact.wa_id
+
+        text = await self.message_router.dispatch(context)
+
+        if text:
+            await self.meta_service.send_message(
+                owner_id=owner_id,
+                from_number=display_phone_number,  # bot number
+                to_number=user_phone_number,       # user number
+                message=text,
+                # Queued once per inbound message, even if redelivered or replayed
+                dedupe_key=f"reply:{context.message.id}",
+            )
+            logger.info(
+                f"Inbound message handled: reply sent from {display_phone_number} to "
+                f"{user_phone_number} for owner {owner_id}"
+            )
+
+    @staticmethod
+    def _message_order(context: WebhookContext) -> float:
+        """Order of the message within its conversation (Meta's unix timestamp)."""
+        try:
+            return float(context.message.timestamp)
+        except (TypeError, ValueError):
+            return context.received_at
+
     def _is_status_event(self, value):
         return (not value.messages or len(value.messages) == 0) and bool(value.statuses)
 
@@ -75,76 +162,3 @@ class MetaWebhookService:
             logger.error("Missing contacts in payload for message event")
             return False
         return True
-
-    async def _extract_text_from_message(
-        self,
-        value,
-        owner_id: str | None = None,
-        from_number: str | None = None,
-        display_phone_number: str | None = None,
-    ) -> str | None:
-        first_message: Message = value.messages[0]
-
-        if first_message.type == "text" and first_message.text:
-            return first_message.text.body
-
-        if first_message.type == "reaction" and first_message.reaction:
-            emoji = first_message.reaction.emoji
-            logger.info(
-                f"Reaction received: {emoji} on message {first_message.reaction.message_id}"
-            )
-            return f"Received reaction: {emoji}"
-
-        if first_message.type == "audio" and first_message.audio:
-            audio_id = first_message.audio.id
-            logger.info(
-                f"Audio ID: {audio_id}, MIME Type: {first_message.audio.mime_type}"
-            )
-            audio_bytes = await self.meta_service.download_media(
-                audio_id, "audio", first_message.audio.mime_type
-            )
-            if audio_bytes:
-                audio_path = await self.meta_service.save_media(
-                    audio_bytes,
-                    "audio",
-                    audio_id,
-                    first_message.audio.mime_type,
-                )
-                logger.info(f"Audio downloaded: {audio_path}")
-            return None
-
-        if first_message.type == "image" and first_message.image:
-            image_id = first_message.image.id
-            caption = first_message.image.caption
-            logger.info(f"Image ID: {image_id}, Caption: {caption}")
-            image_bytes = await self.meta_service.download_media(
-                image_id, "image", first_message.image.mime_type
-            )
-            if image_bytes:
-                image_path = await self.meta_service.save_media(
-                    image_bytes,
-                    "image",
-                    image_id,
-                    first_message.image.mime_type,
-                )
-                logger.info(f"Image downloaded: {image_path}, caption: {caption}")
-            return caption
-
-        if first_message.type == "video" and first_message.video:
-            video_id = first_message.video.id
-            caption = first_message.video.caption
-            logger.info(f"Video ID: {video_id}, Caption: {caption}")
-            video_bytes = await self.meta_service.download_media(
-                video_id, "video", first_message.video.mime_type
-            )
-            if video_bytes:
-                video_path = await self.meta_service.save_media(
-                    video_bytes,
-                    "video",
-                    video_id,
-                    first_message.video.mime_type,
-                )
-                logger.info(f"Video downloaded: {video_path}, caption: {caption}")
-            return caption
-
-        return None
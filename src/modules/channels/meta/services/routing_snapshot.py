@@ -0,0 +1,427 @@
+"""
+Routing snapshot: webhook owner resolution without a cold start.
+
+Every Meta account is routed by its business account id and its phone
+numbers (`phone_number` and the `phone_numbers` entries, in E.164 so every
+notation of a number is one key). The snapshot maps
+each of those keys to the owner id and the account id (the reference used
+to load credentials; no token is written to disk) in one compact file:
+
+    header   magic, key count, entry count, generation time (unix ms),
+             bucket bits
+    buckets  first index record of each hash prefix (2^bits + 1 of them)
+    index    (key hash, key offset, entry number) records sorted by hash
+    entries  (account id, owner id offset) records
+    strings  length-prefixed UTF-8 keys and owner ids
+
+The file is memory-mapped and searched in place (the hash prefix picks a
+bucket of one or two index records, then the key is compared), so opening
+it costs the same for ten
+accounts or a million, and every worker on the host shares the same page
+cache. One worker (holder of the lock file) rebuilds it from the database,
+streaming the accounts page by page into the file writer on a worker
+thread (the event loop keeps serving meanwhile), and replaces it
+atomically; the others reload it when it changes.
+
+The database stays the source of truth: keys missing from the snapshot, or
+changed (account invalidations, relayed by `MetaAccountService`) after it
+was built, are resolved through `MetaAccountService` as before.
+"""
+
+import asyncio
+import contextlib
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import time
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from src.core.cache.invalidation import INVALIDATE_ALL
+from src.core.config.settings import settings
+from src.core.database.supabase_async_repository import iterate_pages
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+from src.core.utils.phone import normalize_phone
+from src.modules.channels.meta.models.meta_account import parse_phone_numbers
+from src.modules.channels.meta.repositories.meta_account_repository import MetaAccountRepository
+
+logger = get_logger(__name__)
+
+MAGIC = b"MRSNAP02"
+HEADER = struct.Struct("<8sIIqB7x")  # magic, keys, entries, generated at (unix ms), bucket bits
+BUCKET = struct.Struct("<II")  # first index record of a bucket and of the next one
+INDEX = struct.Struct("<QII")  # key hash, key offset, entry number
+ENTRY = struct.Struct("<qI4x")  # account id (-1: none), owner id offset
+LENGTH = struct.Struct("<H")  # string length prefix
+
+# Longest wait between checks for a newer file, or for an overdue rebuild
+MAX_CHECK_INTERVAL = 15.0
+
+
+class Route(NamedTuple):
+    """Where a webhook key routes to."""
+
+    owner_id: str
+    account_id: Optional[int]
+
+
+def business_account_key(business_account_id: str) -> str:
+    return f"waba:{business_account_id}"
+
+
+def canonical_phone(phone_number: str) -> str:
+    """E.164 form of a phone number in any notation (as written, stripped, if it is not one)."""
+    return normalize_phone(phone_number) or phone_number.strip()
+
+
+def phone_key(phone_number: str) -> str:
+    return f"phone:{canonical_phone(phone_number)}"
+
+
+def route_keys(
+    business_account_id: Optional[str], phone_number: Optional[str], phone_numbers: Iterable[str]
+) -> List[str]:
+    """Lookup keys of one account (also its cache keys in `MetaAccountService`)."""
+    keys = [business_account_key(business_account_id)] if business_account_id else []
+    if phone_number:
+        keys.append(phone_key(phone_number))
+    keys.extend(phone_key(number) for number in phone_numbers if number)
+    # Variants of the same number share one key
+    return list(dict.fromkeys(keys))
+
+
+def _hash(key: bytes) -> int:
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+
+
+# File format
+
+def write_snapshot(path: str, rows: Iterable[Dict[str, Any]], generated_at_ms: int) -> Tuple[int, int]:
+    """
+    Write the snapshot of account `rows` (ROUTING_COLUMNS) to `path` atomically.
+
+    Rows are consumed one at a time; only the compact index, entries and
+    strings are kept until the file is written. When several accounts claim
+    a key, the first row wins.
+
+    Returns:
+        Number of keys and of accounts written
+    """
+    strings = bytearray()
+    string_offsets: Dict[bytes, int] = {}
+
+    def intern(value: str) -> int:
+        data = value.encode()
+        offset = string_offsets.get(data)
+        if offset is None:
+            offset = string_offsets[data] = len(strings)
+            strings.extend(LENGTH.pack(len(data)))
+            strings.extend(data)
+        return offset
+
+    entries = bytearray()
+    index: Dict[bytes, Tuple[int, int, int]] = {}
+    count = 0
+    for row in rows:
+        if not row.get("owner_id"):
+            continue
+        keys = route_keys(
+            row.get("meta_business_account_id"),
+            row.get("phone_number"),
+            parse_phone_numbers(row.get("phone_numbers")) or (),
+        )
+        account_id = row.get("id")
+        entries.extend(ENTRY.pack(account_id if isinstance(account_id, int) else -1, intern(row["owner_id"])))
+        for key in keys:
+            data = key.encode()
+            if data not in index:
+                index[data] = (_hash(data), intern(key), count)
+        count += 1
+
+    records = sorted(index.values())
+    # About one key per bucket
+    bits = max(1, len(records) - 1).bit_length()
+    buckets = [0] * ((1 << bits) + 1)
+    for key_hash, _, _ in records:
+        buckets[(key_hash >> (64 - bits)) + 1] += 1
+    for bucket in range(1, len(buckets)):
+        buckets[bucket] += buckets[bucket - 1]
+
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, len(records), count, generated_at_ms, bits))
+        file.write(struct.pack(f"<{len(buckets)}I", *buckets))
+        for record in records:
+            file.write(INDEX.pack(*record))
+        file.write(entries)
+        file.write(strings)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(temporary, path)
+    return len(records), count
+
+
+class RoutingSnapshot:
+    """A snapshot file mapped in memory; lookups read it in place."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as file:
+            self.mtime_ns = os.fstat(file.fileno()).st_mtime_ns
+            self._map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.keys, self.entries, self.generated_at_ms, bits = HEADER.unpack_from(self._map, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a routing snapshot: {path}")
+            self._shift = 64 - bits
+            self._index_at = HEADER.size + ((1 << bits) + 1) * 4
+            self._entries_at = self._index_at + self.keys * INDEX.size
+            self._strings_at = self._entries_at + self.entries * ENTRY.size
+            if self._strings_at > len(self._map):
+                raise ValueError(f"Truncated routing snapshot: {path}")
+        except Exception:
+            self._map.close()
+            raise
+
+    def _string(self, offset: int) -> bytes:
+        start = self._strings_at + offset
+        (length,) = LENGTH.unpack_from(self._map, start)
+        return self._map[start + LENGTH.size:start + LENGTH.size + length]
+
+    def lookup(self, key: str) -> Optional[Route]:
+        data = key.encode()
+        wanted = _hash(data)
+        start, end = BUCKET.unpack_from(self._map, HEADER.size + (wanted >> self._shift) * 4)
+        for position in range(self._index_at + start * INDEX.size, self._index_at + end * INDEX.size, INDEX.size):
+            key_hash, key_offset, entry = INDEX.unpack_from(self._map, position)
+            if key_hash == wanted and self._string(key_offset) == data:
+                account_id, owner_offset = ENTRY.unpack_from(self._map, self._entries_at + entry * ENTRY.size)
+                return Route(self._string(owner_offset).decode(), None if account_id < 0 else account_id)
+        return None
+
+    def close(self) -> None:
+        self._map.close()
+
+
+# Per-worker routing table
+
+class RoutingTable:
+    """
+    The worker's current snapshot, kept fresh in the background.
+
+    `resolve()` answers from the snapshot, or None when the database has to
+    be asked (key unknown, invalidated since the snapshot was built, or no
+    snapshot yet).
+    """
+
+    def __init__(
+        self,
+        repo: MetaAccountRepository,
+        path: str,
+        refresh_interval: float = 300.0,
+        page_size: int = 1000,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.repo = repo
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+        self.registry = registry
+        self.snapshot: Optional[RoutingSnapshot] = None
+        # Keys changed since the snapshot was built -> unix ms of the change
+        self._invalidated: Dict[str, int] = {}
+        self._invalidated_all_ms = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._counters: Dict[str, int] = {"hits": 0, "misses": 0, "bypassed": 0, "builds": 0, "reloads": 0}
+        self._last_build_ms: Optional[float] = None
+
+    @classmethod
+    def from_settings(cls, repo: MetaAccountRepository) -> "RoutingTable":
+        config = settings.cache
+        return cls(
+            repo,
+            path=config.routing_snapshot_path,
+            refresh_interval=config.routing_snapshot_refresh_seconds,
+            page_size=config.routing_snapshot_page_size,
+        )
+
+    # Lookups
+
+    def lookup(self, key: str) -> Optional[Route]:
+        snapshot = self.snapshot
+        if snapshot is None:
+            self._counters["misses"] += 1
+            return None
+        if self._invalidated_all_ms > snapshot.generated_at_ms or key in self._invalidated:
+            self._counters["bypassed"] += 1
+            return None
+        route = snapshot.lookup(key)
+        self._counters["hits" if route is not None else "misses"] += 1
+        return route
+
+    def resolve(self, phone_number: Optional[str], business_account_id: Optional[str]) -> Optional[Route]:
+        """Route of a webhook: by phone number first, then by business account."""
+        route = self.lookup(phone_key(phone_number)) if phone_number else None
+        if route is None and business_account_id:
+            route = self.lookup(business_account_key(business_account_id))
+        return route
+
+    def invalidate(self, keys: List[str]) -> None:
+        """
+        Send `keys` to the database until a snapshot built after now is loaded.
+
+        Changed keys wait for the scheduled rebuild; invalidating everything
+        (INVALIDATE_ALL) rebuilds right away.
+        """
+        now_ms = int(time.time() * 1000)
+        if INVALIDATE_ALL in keys:
+            self._invalidated_all_ms = now_ms
+            if self._wakeup is not None:
+                self._wakeup.set()
+            return
+        for key in keys:
+            self._invalidated[key] = now_ms
+
+    # Loading and building
+
+    def load(self) -> bool:
+        """Map the snapshot file if it is newer than the current one."""
+        try:
+            if self.snapshot is not None and os.stat(self.path).st_mtime_ns == self.snapshot.mtime_ns:
+                return False
+            snapshot = RoutingSnapshot(self.path)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError, struct.error) as e:
+            logger.error("Failed to load routing snapshot", path=self.path, error=str(e))
+            return False
+        previous, self.snapshot = self.snapshot, snapshot
+        if previous is not None:
+            previous.close()
+        # Changes the new snapshot already contains no longer bypass it
+        self._invalidated = {
+            key: at for key, at in self._invalidated.items() if at >= snapshot.generated_at_ms
+        }
+        self._counters["reloads"] += 1
+        logger.info(
+            "Routing snapshot loaded",
+            keys=snapshot.keys,
+            accounts=snapshot.entries,
+            age_s=round(time.time() - snapshot.generated_at_ms / 1000, 1),
+        )
+        return True
+
+    async def build(self) -> bool:
+        """
+        Rebuild the snapshot from the database, unless another worker is at it.
+
+        Returns:
+            True if this worker wrote a new snapshot
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(f"{self.path}.lock", "a") as lock:
+            try:
+                fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                return False
+            try:
+                started = time.perf_counter()
+                # Taken before reading: changes made during the build stay invalidated
+                generated_at_ms = int(time.time() * 1000)
+                rows = iterate_pages(lambda: self.repo.iter_routing_rows(self.page_size))
+                # Page requests and the file write both run on a worker thread
+                keys, accounts = await asyncio.to_thread(write_snapshot, self.path, rows, generated_at_ms)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+        self._last_build_ms = round((time.perf_counter() - started) * 1000.0, 1)
+        self._counters["builds"] += 1
+        logger.info("Routing snapshot built", accounts=accounts, keys=keys, build_ms=self._last_build_ms)
+        self.load()
+        return True
+
+    def _stale(self) -> bool:
+        snapshot = self.snapshot
+        if snapshot is None:
+            return True
+        if self._invalidated_all_ms > snapshot.generated_at_ms:
+            return True
+        return time.time() - snapshot.generated_at_ms / 1000 >= self.refresh_interval
+
+    async def refresh(self) -> None:
+        """Pick up a newer file, or rebuild an outdated snapshot; errors keep the current one."""
+        self.load()
+        if not self._stale():
+            return
+        try:
+            await self.build()
+        except Exception as e:
+            logger.error("Failed to build routing snapshot", path=self.path, error=str(e))
+
+    async def _refresh_loop(self) -> None:
+        interval = min(self.refresh_interval, MAX_CHECK_INTERVAL)
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), interval)
+            self._wakeup.clear()
+            await self.refresh()
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        """Map the existing snapshot right away; building a missing or old one runs in the background."""
+        if self._task is not None:
+            return
+        self.load()
+        self._wakeup = asyncio.Event()
+        if self._stale():
+            self._wakeup.set()
+        self._task = asyncio.create_task(self._refresh_loop(), name="routing-snapshot-refresh")
+        self.registry.register_collector("routing_snapshot", self.stats)
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        self.registry.unregister_collector("routing_snapshot")
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "loaded": snapshot is not None,
+            "keys": snapshot.keys if snapshot else 0,
+            "accounts": snapshot.entries if snapshot else 0,
+            "age_s": round(time.time() - snapshot.generated_at_ms / 1000, 1) if snapshot else None,
+            "invalidated_keys": len(self._invalidated),
+            "last_build_ms": self._last_build_ms,
+            **self._counters,
+        }
+
+
+def create_routing_table(repo: MetaAccountRepository) -> Optional[RoutingTable]:
+    """Routing table configured by `CACHE_ROUTING_SNAPSHOT_*`, or None when disabled."""
+    if not settings.cache.routing_snapshot_enabled:
+        return None
+    return RoutingTable.from_settings(repo)
+
+
+async def routing_table_resource(table: Optional[RoutingTable]):
+    """DI resource mapping the snapshot at startup and keeping it fresh."""
+    if table is None:
+        yield None
+        return
+    await table.start()
+    try:
+        yield table
+    finally:
+        await table.stop()
@@ -0,0 +1,57 @@
+
+from dataclasses import dataclass, field
+from typing import List, Optional
+import time
+
+from src.modules.channels.meta.dtos.inbound import Contact, Entry, Message, Payload, StatusUpdate, Value
+
+
+@dataclass
+class WebhookContext:
+    """Request-scoped view of an inbound webhook.
+
+    Built once per request from the payload so services don't re-walk
+    `payload.entry[0].changes[0].value` over and over.
+    """
+
+    payload: Payload
+    entry: Entry
+    value: Value
+    business_account_id: str
+    display_phone_number: str
+    phone_number_id: str
+    messages: List[Message]
+    contacts: List[Contact]
+    statuses: List[StatusUpdate]
+    received_at: float = field(default_factory=time.time)
+    owner_id: Optional[str] = None
+    # Journal record of the webhook (failures are marked on it for replay)
+    event_id: Optional[str] = None
+
+    @classmethod
+    def from_payload(cls, payload: Payload) -> "WebhookContext":
+        entry = payload.entry[0]
+        value = entry.changes[0].value
+        return cls(
+            payload=payload,
+            entry=entry,
+            value=value,
+            business_account_id=entry.id,
+            display_phone_number=value.metadata.display_phone_number,
+            phone_number_id=value.metadata.phone_number_id,
+            messages=value.messages or [],
+            contacts=value.contacts or [],
+            statuses=value.statuses or [],
+        )
+
+    @property
+    def message(self) -> Optional[Message]:
+        return self.messages[0] if self.messages else None
+
+    @property
+    def contact(self) -> Optional[Contact]:
+        return self.contacts[0] if self.contacts else None
+
+    @property
+    def is_status_event(self) -> bool:
+        return not self.messages and bool(self.statuses)
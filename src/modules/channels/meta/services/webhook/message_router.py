@@ -0,0 +1,342 @@
+
+import asyncio
+import concurrent.futures
+import enum
+import functools
+import inspect
+import time
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Set, Tuple
+
+from src.core.journal.event_journal import EventJournal
+from src.core.media.processing_pool import MediaProcessingPool, MediaResult
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+from src.modules.channels.meta.dtos.inbound import Message
+from src.modules.channels.meta.services.meta_service import MetaService
+from src.modules.channels.meta.services.webhook.context import WebhookContext
+
+
+logger = get_logger(__name__)
+
+
+class Workload(str, enum.Enum):
+    """What a synchronous handler spends its time on, i.e. where it runs."""
+
+    LIGHT = "light"  # microseconds of work: called directly on the event loop
+    IO = "io"  # blocking I/O: default thread pool
+    CPU = "cpu"  # CPU-bound: dedicated thread pool, kept apart from I/O threads
+    HEAVY = "heavy"  # long async work (downloads, processing): background task, not awaited
+
+
+class MessageHandler:
+    """
+    Handles one or more inbound message types and returns the reply text.
+
+    A handler declares how it must be scheduled: defining `handle` with
+    `async def` makes it async (awaited on the event loop, must not block);
+    a plain `def` is sync and runs according to `workload`. A HEAVY handler
+    is async and runs as a background task: the dispatch path only waits
+    for `reply()`.
+    """
+
+    message_types: Tuple[str, ...] = ()
+    workload: Workload = Workload.LIGHT
+
+    def handle(self, context: WebhookContext, message: Message) -> Optional[str]:
+        raise NotImplementedError
+
+    def reply(self, context: WebhookContext, message: Message) -> Optional[str]:
+        """Reply text of a HEAVY handler, computed before its work starts."""
+        return None
+
+
+Invoker = Callable[[WebhookContext, Message], Awaitable[Optional[str]]]
+
+
+class MessageRouter:
+    """
+    Dispatch table from message type to handler.
+
+    The invoker of each type (direct await, direct call, thread pool, CPU
+    pool or background task) is resolved once at registration, so
+    dispatching is a dict lookup. Background tasks are kept until they
+    finish and drained by `stop()`; as they fail after the webhook was
+    answered, their failures are marked in the journal (on the context's
+    `event_id`) so the event can be replayed.
+    """
+
+    def __init__(
+        self,
+        handlers: Iterable[MessageHandler] = (),
+        cpu_threads: int = 2,
+        journal: Optional[EventJournal] = None,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.cpu_threads = max(1, cpu_threads)
+        self.journal = journal
+        self.registry = registry
+        self._table: Dict[str, Tuple[MessageHandler, Invoker]] = {}
+        self._cpu_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._background: Set[asyncio.Task] = set()
+        for handler in handlers:
+            self.register(handler)
+
+    @classmethod
+    def default(
+        cls,
+        meta_service: MetaService,
+        media_pool: Optional[MediaProcessingPool] = None,
+        cpu_threads: int = 2,
+        journal: Optional[EventJournal] = None,
+    ) -> "MessageRouter":
+        """Router with the built-in handlers of every supported message type."""
+        return cls(
+            [
+                TextHandler(),
+                ReactionHandler(),
+                InteractiveHandler(),
+                LocationHandler(),
+                MediaHandler(meta_service, media_pool),
+            ],
+            cpu_threads=cpu_threads,
+            journal=journal,
+        )
+
+    def register(self, handler: MessageHandler) -> None:
+        """Route the handler's message types to it (replacing previous handlers)."""
+        is_async = inspect.iscoroutinefunction(handler.handle)
+        if handler.workload == Workload.HEAVY and not is_async:
+            raise ValueError(f"{type(handler).__name__}: heavy handlers must define `async def handle`")
+        if is_async and handler.workload not in (Workload.LIGHT, Workload.HEAVY):
+            raise ValueError(
+                f"{type(handler).__name__}: async handlers run on the event loop; "
+                f"make `handle` sync to run it as {handler.workload.value}"
+            )
+        invoker = self._invoker(handler, is_async)
+        for message_type in handler.message_types:
+            self._table[message_type] = (handler, invoker)
+
+    def handler_for(self, message_type: str) -> Optional[MessageHandler]:
+        route = self._table.get(message_type)
+        return route[0] if route else None
+
+    def _invoker(self, handler: MessageHandler, is_async: bool) -> Invoker:
+        if handler.workload == Workload.HEAVY:
+            async def invoke(context: WebhookContext, message: Message) -> Optional[str]:
+                self._spawn(handler, context, message)
+                return handler.reply(context, message)
+            return invoke
+
+        if is_async:
+            return handler.handle
+
+        if handler.workload == Workload.LIGHT:
+            async def invoke(context: WebhookContext, message: Message) -> Optional[str]:
+                return handler.handle(context, message)
+            return invoke
+
+        if handler.workload == Workload.IO:
+            async def invoke(context: WebhookContext, message: Message) -> Optional[str]:
+                return await asyncio.to_thread(handler.handle, context, message)
+            return invoke
+
+        async def invoke(context: WebhookContext, message: Message) -> Optional[str]:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._cpu_pool(), functools.partial(handler.handle, context, message)
+            )
+        return invoke
+
+    def _spawn(self, handler: MessageHandler, context: WebhookContext, message: Message) -> None:
+        task = asyncio.get_running_loop().create_task(
+            self._run_background(handler, context, message), name=f"message-{message.type}"
+        )
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _run_background(self, handler: MessageHandler, context: WebhookContext, message: Message) -> None:
+        started = time.perf_counter()
+        try:
+            await handler.handle(context, message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.registry.inc("webhook.background.failed", type=message.type)
+            logger.error(
+                "Background message handling failed",
+                event_id=context.event_id,
+                message_id=message.id,
+                type=message.type,
+                error=f"{type(e).__name__}: {e}",
+            )
+            if self.journal is not None and context.event_id:
+                self.journal.mark_failed(context.event_id, e)
+        finally:
+            self.registry.observe(
+                "webhook.background_ms", (time.perf_counter() - started) * 1000.0, type=message.type
+            )
+
+    def _cpu_pool(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._cpu_executor is None:
+            self._cpu_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=self.cpu_threads, thread_name_prefix="message-cpu"
+            )
+        return self._cpu_executor
+
+    async def dispatch(self, context: WebhookContext) -> Optional[str]:
+        """Run the handler of the context's message and return its reply text."""
+        message = context.message
+        route = self._table.get(message.type)
+        if route is None:
+            self.registry.inc("webhook.messages.unhandled", type=message.type)
+            logger.info(f"Unsupported message type: {message.type}")
+            return None
+
+        _, invoke = route
+        started = time.perf_counter()
+        try:
+            return await invoke(context, message)
+        finally:
+            self.registry.observe("webhook.handler_ms", (time.perf_counter() - started) * 1000.0, type=message.type)
+
+    async def stop(self, timeout: float = 15.0) -> None:
+        """Let background handlers finish (up to `timeout` seconds), cancel the rest, close the pool."""
+        if self._background:
+            _, pending = await asyncio.wait(set(self._background), timeout=timeout)
+            for task in pending:
+                task.cancel()
+            if pending:
+                logger.warning("Background message handlers cancelled on shutdown", tasks=len(pending))
+                await asyncio.gather(*pending, return_exceptions=True)
+        self.close()
+
+    def close(self) -> None:
+        if self._cpu_executor is not None:
+            self._cpu_executor.shutdown(wait=False, cancel_futures=True)
+            self._cpu_executor = None
+
+
+# Built-in handlers
+
+
+class TextHandler(MessageHandler):
+    message_types = ("text",)
+
+    def handle(self, context: WebhookContext, message: Message) -> Optional[str]:
+        return message.text.body if message.text else None
+
+
+class ReactionHandler(MessageHandler):
+    message_types = ("reaction",)
+
+    def handle(self, context: WebhookContext, message: Message) -> Optional[str]:
+        if not message.reaction:
+            return None
+        emoji = message.reaction.emoji
+        logger.info(f"Reaction received: {emoji} on message {message.reaction.message_id}")
+        return f"Received reaction: {emoji}"
+
+
+class InteractiveHandler(MessageHandler):
+    """Button and list replies: the chosen option is handled like typed text."""
+
+    message_types = ("interactive",)
+
+    def handle(self, context: WebhookContext, message: Message) -> Optional[str]:
+        interactive = message.interactive
+        if not interactive:
+            return None
+        reply = interactive.button_reply or interactive.list_reply
+        if not reply:
+            logger.info(f"Unsupported interactive message: {interactive.type}")
+            return None
+        logger.info(f"Interactive reply received: {reply.id} ({interactive.type})")
+        return reply.title
+
+
+class LocationHandler(MessageHandler):
+    message_types = ("location",)
+
+    def handle(self, context: WebhookContext, message: Message) -> Optional[str]:
+        location = message.location
+        if location:
+            logger.info(
+                f"Location received: {location.latitude},{location.longitude} "
+                f"{location.name or ''} {location.address or ''}".strip()
+            )
+        return None
+
+
+class MediaHandler(MessageHandler):
+    """
+    Shared handling of media messages: download, save, process.
+
+    Heavy: the reply (the caption; audio has none) is sent right away, while
+    the media is downloaded with the pooled HTTP client, written to disk off
+    the event loop and handed to the media processing pool in the background.
+    """
+
+    message_types = ("image", "audio", "video", "document")
+    workload = Workload.HEAVY
+
+    def __init__(self, meta_service: MetaService, media_pool: Optional[MediaProcessingPool] = None):
+        self.meta_service = meta_service
+        self.media_pool = media_pool
+
+    def reply(self, context: WebhookContext, message: Message) -> Optional[str]:
+        media = getattr(message, message.type, None)
+        return getattr(media, "caption", None) if media is not None else None
+
+    async def handle(self, context: WebhookContext, message: Message) -> Optional[str]:
+        kind = message.type
+        media = getattr(message, kind, None)
+        if media is None:
+            return None
+        caption = getattr(media, "caption", None)
+        logger.info(f"{kind.capitalize()} ID: {media.id}, MIME Type: {media.mime_type}, Caption: {caption}")
+
+        content = await self.meta_service.download_media(media.id, kind, media.mime_type)
+        if content:
+            path = await self.meta_service.save_media(content, kind, media.id, media.mime_type)
+            logger.info(f"{kind.capitalize()} downloaded: {path}, caption: {caption}")
+            await self.process(content, media.mime_type, media.id)
+        return None
+
+    async def process(self, content: bytes, mime_type: str, media_id: str) -> Optional[MediaResult]:
+        """Run the media processor for `mime_type`; failures are logged, not raised."""
+        if self.media_pool is None:
+            return None
+        try:
+            result = await self.media_pool.submit(content, mime_type)
+        except Exception as e:
+            logger.warning(
+                "Media processing failed",
+                media_id=media_id,
+                mime_type=mime_type,
+                error=f"{type(e).__name__}: {e}",
+            )
+            return None
+        logger.info(
+            "Media processed",
+            media_id=media_id,
+            mime_type=mime_type,
+            processor=result.processor,
+            run_ms=round(result.run_ms, 2),
+            queue_ms=round(result.queue_ms, 2),
+            **{k: v for k, v in result.data.items() if not isinstance(v, bytes)},
+        )
+        return result
+
+
+async def message_router_resource(router: MessageRouter, *resources: Any):
+    """
+    DI resource draining the router's background handlers and CPU thread pool on shutdown.
+
+    `resources` are opened resources the handlers use (the pooled HTTP
+    client, the media pool, the event journal); depending on them makes
+    the container drain the router before closing them.
+    """
+    try:
+        yield router
+    finally:
+        await router.stop()
@@ -1,8 +1,8 @@
 
 from fastapi import HTTPException
 
-from src.modules.channels.meta.dtos.inbound import Payload
 from src.modules.channels.meta.services.meta_account_service import MetaAccountService
+from src.modules.channels.meta.services.webhook.context import WebhookContext
 from src.core.utils.logging import get_logger
 
 
@@ -14,11 +14,11 @@ class MetaWebhookOwnerResolver:
         self.meta_account_service = meta_account_service
         
 
-    async def resolve_owner_id(self, payload: Payload) -> str:
-        """Resolve owner ID from webhook payload.
+    async def resolve_owner_id(self, context: WebhookContext) -> str:
+        """Resolve owner ID from webhook context.
 
         Args:
-            payload: Incoming webhook payload as a dictionary.
+            context: Request-scoped context of the incoming webhook.
 
         Returns:
             Owner ID (ULID) as a string.
@@ -26,19 +26,15 @@ class MetaWebhookOwnerResolver:
         # TODO: Implement actual owner ID resolution logic
         # For now, return a placeholder owner ID
 
-        entry = payload.entry[0]
-        change = entry.changes[0]
-        value = change.value
+        business_account_id = context.business_account_id
+        display_phone_number = context.display_phone_number
 
-        business_account_id = entry.id
-        display_phone_number = value.metadata.display_phone_number
-
-        account = await self.meta_account_service.resolve_account(
+        owner_id = await self.meta_account_service.resolve_owner_id(
             phone_number=display_phone_number,
             business_account_id=business_account_id,
         )
 
-        if not account:
+        if not owner_id:
             logger.error(
                 "Owner lookup failed",
                 business_account_id=business_account_id,
@@ -48,7 +44,7 @@ class MetaWebhookOwnerResolver:
                 status_code=403, detail="Owner not found for inbound/outbound number"
             )            
 
-        return account.owner_id
+        return owner_id
     
     async def validate_owner_access(self, owner_id: str) -> bool:
         """Validate if the owner has access to the Meta Business Account.
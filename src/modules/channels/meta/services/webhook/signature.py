@@ -0,0 +1,315 @@
+"""
+Webhook signature verification (`X-Hub-Signature-256`).
+
+Meta signs every webhook with HMAC-SHA256 of the raw request body, keyed by
+the app secret of the Meta app. The signature is checked on the raw bytes
+before any JSON decoding, so forged or junk traffic is rejected before it
+reaches the parser, the journal or the database.
+
+Keys are the `META_APP_SECRET` setting (comma-separated while rotating) and
+the `app_secret` of each Meta account. An account's secret only verifies
+webhooks addressed to that account: the business account id, display phone
+number and phone number id of the payload (what owner routing goes by) must
+all point at accounts signed by that one secret, so a tenant cannot sign
+webhooks routed to another tenant's number. Account secrets are loaded in
+the background (at startup, every `WEBHOOK_SECRETS_REFRESH_SECONDS` and
+whenever an account changes), never on the request path.
+
+Verification fails closed: with no key available, webhooks are refused
+(503, so Meta redelivers them) unless running in development.
+"""
+
+import asyncio
+import contextlib
+import hashlib
+import hmac
+import json
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.core.cache.invalidation import InvalidationBus
+from src.core.config.settings import settings
+from src.core.database.supabase_async_repository import iterate_pages
+from src.core.observability.metrics import MetricsRegistry, metrics
+from src.core.utils.logging import get_logger
+from src.modules.channels.meta.models.meta_account import parse_phone_numbers
+from src.modules.channels.meta.services.meta_account_service import ACCOUNT_CACHE_TOPIC, MetaAccountService
+from src.modules.channels.meta.services.routing_snapshot import business_account_key, phone_key, route_keys
+
+logger = get_logger(__name__)
+
+SIGNATURE_HEADER = "x-hub-signature-256"
+SIGNATURE_PREFIX = "sha256="
+# "sha256=" followed by the hex digest
+SIGNATURE_LENGTH = len(SIGNATURE_PREFIX) + 2 * hashlib.sha256().digest_size
+
+# Rejection reasons
+MISSING = "missing"
+MALFORMED = "malformed"
+MISMATCH = "mismatch"
+UNAVAILABLE = "unavailable"
+
+
+def sign(body: bytes, secret: str) -> str:
+    """`X-Hub-Signature-256` header value of `body` (as sent by Meta)."""
+    return SIGNATURE_PREFIX + hmac.digest(secret.encode(), body, "sha256").hex()
+
+
+def parse_secrets(value: Optional[str]) -> List[str]:
+    return [secret.strip() for secret in (value or "").split(",") if secret.strip()]
+
+
+def phone_number_id_key(phone_number_id: str) -> str:
+    return f"phone_id:{phone_number_id}"
+
+
+def account_signing_keys(row: Dict[str, Any]) -> List[str]:
+    """Identifiers a webhook addressed to the account (a `SIGNING_COLUMNS` row) may carry."""
+    keys = route_keys(
+        row.get("meta_business_account_id"),
+        row.get("phone_number"),
+        parse_phone_numbers(row.get("phone_numbers")) or (),
+    )
+    if row.get("phone_number_id"):
+        keys.append(phone_number_id_key(row["phone_number_id"]))
+    return keys
+
+
+def payload_signing_keys(body: bytes) -> Optional[Set[str]]:
+    """Identifiers of the accounts a raw webhook body is addressed to (None if it cannot be read)."""
+    try:
+        payload = json.loads(body)
+        keys = set()
+        for entry in payload.get("entry") or ():
+            if entry.get("id"):
+                keys.add(business_account_key(str(entry["id"])))
+            for change in entry.get("changes") or ():
+                metadata = (change.get("value") or {}).get("metadata") or {}
+                if metadata.get("display_phone_number"):
+                    keys.add(phone_key(str(metadata["display_phone_number"])))
+                if metadata.get("phone_number_id"):
+                    keys.add(phone_number_id_key(str(metadata["phone_number_id"])))
+        return keys
+    except (ValueError, AttributeError, TypeError):
+        return None
+
+
+class WebhookSignatureVerifier:
+    """
+    Checks webhook signatures against the static app secrets and the secret
+    of the account each webhook is addressed to.
+
+    With no key available at all, webhooks are rejected as `unavailable`,
+    unless `allow_unsigned` (development), where they are accepted and
+    counted as `unverified`.
+    """
+
+    def __init__(
+        self,
+        secrets: Iterable[str] = (),
+        account_service: Optional[MetaAccountService] = None,
+        invalidation_bus: Optional[InvalidationBus] = None,
+        enabled: bool = True,
+        allow_unsigned: bool = False,
+        refresh_interval: float = 300.0,
+        page_size: int = 1000,
+        registry: MetricsRegistry = metrics,
+    ):
+        self.enabled = enabled
+        self.allow_unsigned = allow_unsigned
+        self.account_service = account_service
+        self.refresh_interval = refresh_interval
+        self.page_size = page_size
+        self.registry = registry
+        self._static_keys = self._encode(secrets)
+        # account identifier -> secret of its account (None: none of its own, or ambiguous)
+        self._account_keys: Dict[str, Optional[bytes]] = {}
+        self._account_secrets = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._counters: Dict[str, int] = {
+            "verified": 0, "unverified": 0, MISSING: 0, MALFORMED: 0, MISMATCH: 0, UNAVAILABLE: 0,
+        }
+        if invalidation_bus is not None:
+            invalidation_bus.subscribe(ACCOUNT_CACHE_TOPIC, self._on_account_change)
+
+    @classmethod
+    def from_settings(
+        cls,
+        account_service: Optional[MetaAccountService] = None,
+        invalidation_bus: Optional[InvalidationBus] = None,
+    ) -> "WebhookSignatureVerifier":
+        return cls(
+            secrets=parse_secrets(settings.meta.app_secret),
+            account_service=account_service,
+            invalidation_bus=invalidation_bus,
+            enabled=settings.webhook.verify_signature,
+            allow_unsigned=settings.api.environment == "development",
+            refresh_interval=settings.webhook.secrets_refresh_seconds,
+        )
+
+    @staticmethod
+    def _encode(secrets: Iterable[str]) -> Tuple[bytes, ...]:
+        return tuple(dict.fromkeys(secret.encode() for secret in secrets if secret))
+
+    @property
+    def has_keys(self) -> bool:
+        return bool(self._static_keys) or self._account_secrets > 0
+
+    @property
+    def enforcing(self) -> bool:
+        return self.enabled and (self.has_keys or not self.allow_unsigned)
+
+    # Verification
+
+    def check_header(self, header: Optional[str]) -> Optional[str]:
+        """
+        Reject a request by its header alone (before its body is read).
+
+        Returns:
+            The rejection reason, or None if the body still has to be verified
+        """
+        if not self.enforcing:
+            return None
+        if not self.has_keys:
+            return self._reject(UNAVAILABLE)
+        if not header:
+            return self._reject(MISSING)
+        if len(header) != SIGNATURE_LENGTH or not header.startswith(SIGNATURE_PREFIX):
+            return self._reject(MALFORMED)
+        return None
+
+    def verify(self, body: bytes, header: Optional[str]) -> Optional[str]:
+        """
+        Check the signature of a raw request body.
+
+        Args:
+            body: Raw request body, exactly as received
+            header: `X-Hub-Signature-256` header value
+
+        Returns:
+            The rejection reason ("missing", "malformed", "mismatch",
+            "unavailable"), or None if the body is signed by a static secret
+            or by the secret of the account it is addressed to (or nothing
+            is enforced)
+        """
+        if not self.enforcing:
+            self._counters["unverified"] += 1
+            return None
+        reason = self.check_header(header)
+        if reason is not None:
+            return reason
+        try:
+            signature = bytes.fromhex(header[len(SIGNATURE_PREFIX):])
+        except ValueError:
+            return self._reject(MALFORMED)
+        keys = self._static_keys
+        account_key = self._account_key(body)
+        if account_key is not None:
+            keys += (account_key,)
+        for key in keys:
+            if hmac.compare_digest(hmac.digest(key, body, "sha256"), signature):
+                self._counters["verified"] += 1
+                return None
+        return self._reject(MISMATCH)
+
+    def _account_key(self, body: bytes) -> Optional[bytes]:
+        """Secret of the account(s) `body` is addressed to, if they all share one."""
+        if not self._account_secrets:
+            return None
+        identifiers = payload_signing_keys(body)
+        if not identifiers:
+            return None
+        secrets = {self._account_keys[key] for key in identifiers if key in self._account_keys}
+        return secrets.pop() if len(secrets) == 1 else None
+
+    def _reject(self, reason: str) -> str:
+        self._counters[reason] += 1
+        self.registry.inc("webhook.signature.rejected", reason=reason)
+        return reason
+
+    # Account secrets
+
+    def set_accounts(self, rows: Iterable[Dict[str, Any]]) -> None:
+        """Replace the account secrets (`SIGNING_COLUMNS` rows of every account)."""
+        account_keys: Dict[str, Optional[bytes]] = {}
+        for row in rows:
+            secret = row["app_secret"].encode() if row.get("app_secret") else None
+            for key in account_signing_keys(row):
+                # An identifier shared by accounts with different secrets proves nothing
+                account_keys[key] = secret if account_keys.get(key, secret) == secret else None
+        self._account_keys = account_keys
+        self._account_secrets = len({secret for secret in account_keys.values() if secret is not None})
+
+    async def refresh(self) -> None:
+        """Reload the account secrets; on failure the previous ones are kept."""
+        if self.account_service is None:
+            return
+        try:
+            # The page requests block: run them on a worker thread
+            rows = await asyncio.to_thread(
+                list, iterate_pages(lambda: self.account_service.iter_signing_rows(page_size=self.page_size))
+            )
+        except Exception as e:
+            logger.error("Failed to load webhook app secrets", error=str(e))
+            return
+        self.set_accounts(rows)
+
+    def _on_account_change(self, keys: List[str]) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), self.refresh_interval)
+            self._wakeup.clear()
+            await self.refresh()
+
+    # Lifecycle
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        await self.refresh()
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._refresh_loop(), name="webhook-secrets-refresh")
+        self.registry.register_collector("webhook_signature", self.stats)
+        if self.enabled and not self.has_keys:
+            if self.allow_unsigned:
+                logger.warning("No Meta app secret configured: webhook signatures are not verified")
+            else:
+                logger.error("No Meta app secret available: inbound webhooks are refused until one is")
+        else:
+            logger.info(
+                "Webhook signature verification started",
+                static_secrets=len(self._static_keys),
+                account_secrets=self._account_secrets,
+                enforcing=self.enforcing,
+            )
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        task, self._task = self._task, None
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+        self._wakeup = None
+        self.registry.unregister_collector("webhook_signature")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enforcing": self.enforcing,
+            "static_secrets": len(self._static_keys),
+            "account_secrets": self._account_secrets,
+            **self._counters,
+        }
+
+
+async def webhook_signature_verifier_resource(verifier: WebhookSignatureVerifier):
+    """DI resource loading the account secrets and keeping them fresh."""
+    await verifier.start()
+    try:
+        yield verifier
+    finally:
+        await verifier.stop()
@@ -0,0 +1,136 @@
+import pytest
+
+from src.core.concurrency.adaptive_limiter import AdaptiveConcurrencyLimiter, Priority
+from src.core.observability.metrics import MetricsRegistry
+
+
+def limiter(**kwargs):
+    kwargs.setdefault("initial_limit", 20)
+    kwargs.setdefault("min_limit", 4)
+    kwargs.setdefault("max_limit", 100)
+    return AdaptiveConcurrencyLimiter(registry=MetricsRegistry(), **kwargs)
+
+
+def saturate(gate):
+    """Admit requests until the limit sheds one; returns how many were admitted."""
+    admitted = 0
+    while gate.try_acquire(Priority.HIGH):
+        admitted += 1
+    return admitted
+
+
+def complete(gate, requests, latency, kind=""):
+    """Release `requests` in-flight requests and admit as many again (a saturated steady state)."""
+    for _ in range(requests):
+        gate.release(latency, kind=kind)
+        gate.try_acquire(Priority.HIGH)
+
+
+def test_sheds_beyond_the_limit():
+    gate = limiter(initial_limit=10)
+
+    assert saturate(gate) == 10
+    assert gate.stats()["shed_high"] == 1
+    gate.release(None)
+    assert gate.try_acquire(Priority.HIGH)
+
+
+def test_low_priority_is_shed_first():
+    gate = limiter(initial_limit=10, low_priority_share=0.5)
+
+    admitted_low = 0
+    while gate.try_acquire(Priority.LOW):
+        admitted_low += 1
+
+    assert admitted_low == 5
+    # Room is left for the high-priority requests
+    assert saturate(gate) == 5
+    assert gate.stats()["shed_low"] == 1
+
+
+def test_release_without_latency_leaves_the_limit():
+    gate = limiter()
+    saturate(gate)
+
+    for _ in range(10):
+        gate.release(None)
+        gate.try_acquire(Priority.HIGH)
+
+    assert gate.limit == 20
+
+
+def test_drops_back_off_down_to_the_minimum():
+    gate = limiter(backoff_ratio=0.5)
+    gate.try_acquire(Priority.HIGH)
+    gate.release(None, dropped=True)
+    assert gate.limit == 10
+
+    for _ in range(10):
+        gate.try_acquire(Priority.HIGH)
+        gate.release(None, dropped=True)
+    assert gate.limit == 4
+    assert gate.stats()["dropped"] == 11
+    assert gate.in_flight == 0
+
+
+def test_aimd_grows_when_saturated_and_backs_off_when_slow():
+    gate = limiter(algorithm="aimd", latency_threshold=0.5, backoff_ratio=0.5)
+    saturate(gate)
+    complete(gate, 50, latency=0.1)
+    grown = gate.limit
+    assert grown > 20
+
+    complete(gate, 1, latency=2.0)
+    assert grown // 2 <= gate.limit <= (grown + 1) // 2
+
+
+def test_aimd_does_not_grow_while_app_limited():
+    gate = limiter(algorithm="aimd", latency_threshold=0.5)
+
+    # A single request in flight at a time says nothing about the limit
+    for _ in range(50):
+        gate.try_acquire(Priority.HIGH)
+        gate.release(0.1)
+
+    assert gate.limit == 20
+
+
+def test_gradient_shrinks_when_latency_rises_above_the_baseline():
+    gate = limiter(tolerance=2.0)
+    saturate(gate)
+    complete(gate, 20, latency=0.1)
+    steady = gate.limit
+
+    # Queueing: latency well above twice the baseline
+    complete(gate, 20, latency=1.0)
+
+    assert gate.limit < steady
+
+
+def test_gradient_grows_at_the_baseline_when_saturated():
+    gate = limiter(tolerance=2.0)
+    saturate(gate)
+
+    complete(gate, 50, latency=0.1)
+
+    assert gate.limit > 20
+
+
+def test_gradient_judges_latency_against_its_own_kind():
+    gate = limiter(tolerance=2.0)
+    saturate(gate)
+    complete(gate, 20, latency=0.05, kind="text")
+    steady = gate.limit
+
+    # Slow by nature, not congestion: media handling at its own baseline
+    for _ in range(20):
+        complete(gate, 1, latency=2.0, kind="image")
+        complete(gate, 1, latency=0.05, kind="text")
+
+    assert gate.limit >= steady
+    assert set(gate.stats()["baseline_ms"]) == {"text", "image"}
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        limiter(algorithm="vegas")
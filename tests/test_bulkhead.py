@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+
+from src.core.concurrency.bulkhead import BulkheadRejected, OwnerBulkheads, parse_weights
+from src.core.observability.metrics import MetricsRegistry
+
+
+def bulkheads(**kwargs):
+    return OwnerBulkheads(registry=MetricsRegistry(), **kwargs)
+
+
+def run_jobs(gate, jobs):
+    """Submit `jobs` ((owner_id, name) pairs) at once; returns the names in start order."""
+    started = []
+
+    def job(name):
+        async def fn():
+            started.append(name)
+            await asyncio.sleep(0)
+            return name
+
+        return fn
+
+    async def scenario():
+        return await asyncio.gather(
+            *(gate.run(owner_id, job(name)) for owner_id, name in jobs), return_exceptions=True
+        )
+
+    return started, asyncio.run(scenario())
+
+
+def test_burst_of_one_owner_does_not_delay_another():
+    gate = bulkheads(capacity=1, owner_concurrency=1)
+
+    started, _ = run_jobs(gate, [("a", f"a{n}") for n in range(1, 7)] + [("b", "b1"), ("b", "b2"), ("b", "b3")])
+
+    # b queued behind all of a's burst, yet alternates with it
+    assert started == ["a1", "b1", "a2", "b2", "a3", "b3", "a4", "a5", "a6"]
+
+
+def test_weights_share_capacity_proportionally():
+    gate = bulkheads(capacity=1, owner_concurrency=1, weights={"a": 2.0})
+
+    started, _ = run_jobs(gate, [("b", f"b{n}") for n in range(6)] + [("a", f"a{n}") for n in range(6)])
+
+    first = started[:9]
+    assert sum(name.startswith("a") for name in first) == 6
+    assert sum(name.startswith("b") for name in first) == 3
+
+
+def test_owner_concurrency_caps_one_owner():
+    gate = bulkheads(capacity=8, owner_concurrency=2)
+    peak = {"now": 0, "max": 0}
+
+    async def job():
+        peak["now"] += 1
+        peak["max"] = max(peak["max"], peak["now"])
+        await asyncio.sleep(0.001)
+        peak["now"] -= 1
+
+    async def scenario():
+        await asyncio.gather(*(gate.run("a", job) for _ in range(6)))
+
+    asyncio.run(scenario())
+
+    assert peak["max"] == 2
+    # Idle owners are forgotten
+    assert gate.stats()["owners"] == 0
+
+
+def test_full_queue_rejects_new_jobs():
+    gate = bulkheads(capacity=1, owner_concurrency=1, owner_queue=2)
+
+    started, results = run_jobs(gate, [("a", f"a{n}") for n in range(5)])
+
+    assert started == ["a0", "a1", "a2"]
+    assert [type(r) for r in results[3:]] == [BulkheadRejected, BulkheadRejected]
+    assert gate.stats()["rejected"] == 2
+
+
+def test_drop_oldest_rejects_the_oldest_queued_job():
+    gate = bulkheads(capacity=1, owner_concurrency=1, owner_queue=2, overflow_policy="drop_oldest")
+
+    started, results = run_jobs(gate, [("a", f"a{n}") for n in range(5)])
+
+    assert started == ["a0", "a3", "a4"]
+    assert [type(r) for r in results[1:3]] == [BulkheadRejected, BulkheadRejected]
+
+
+def test_cancelled_waiter_gives_up_its_place():
+    gate = bulkheads(capacity=1, owner_concurrency=1)
+    started = []
+
+    async def job(name, delay=0.0):
+        started.append(name)
+        await asyncio.sleep(delay)
+
+    async def scenario():
+        first = asyncio.create_task(gate.run("a", lambda: job("first", 0.01)))
+        waiting = asyncio.create_task(gate.run("b", lambda: job("cancelled")))
+        last = asyncio.create_task(gate.run("c", lambda: job("last")))
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(first, last)
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+
+    asyncio.run(scenario())
+
+    assert started == ["first", "last"]
+    assert gate.stats()["in_flight"] == 0
+
+
+def test_parse_weights_ignores_invalid_entries():
+    assert parse_weights("a=2, b=0.5,c=0,d=x,=3,e") == {"a": 2.0, "b": 0.5}
+    assert parse_weights(None) == {}
@@ -0,0 +1,125 @@
+import asyncio
+
+from src.core.journal.event_journal import (
+    EVENT,
+    FAILED,
+    RECORD_HEADER,
+    RESOLVED,
+    SEGMENT_MAGIC,
+    EventJournal,
+    encode_record,
+    load_events,
+    read_segment,
+)
+from src.core.observability.metrics import MetricsRegistry
+
+EVENT_A = "01J00000000000000000000001"
+EVENT_B = "01J00000000000000000000002"
+EVENT_C = "01J00000000000000000000003"
+
+
+def write_segment(path, *records):
+    path.write_bytes(SEGMENT_MAGIC + b"".join(records))
+    return str(path)
+
+
+def test_read_segment_round_trip(tmp_path):
+    path = write_segment(
+        tmp_path / "0001-1-0.seg",
+        encode_record(EVENT, EVENT_A, 1000.5, b'{"a": 1}'),
+        encode_record(FAILED, EVENT_A, 1001.0, b"boom"),
+    )
+
+    records = list(read_segment(path))
+
+    assert [(r.kind, r.event_id, r.timestamp, r.data) for r in records] == [
+        (EVENT, EVENT_A, 1000.5, b'{"a": 1}'),
+        (FAILED, EVENT_A, 1001.0, b"boom"),
+    ]
+    assert records[0].offset == len(SEGMENT_MAGIC)
+
+
+def test_read_segment_skips_record_with_bad_checksum(tmp_path):
+    first = encode_record(EVENT, EVENT_A, 1.0, b"first")
+    second = bytearray(encode_record(EVENT, EVENT_B, 2.0, b"second"))
+    third = encode_record(EVENT, EVENT_C, 3.0, b"third")
+    # Flip a byte of the second record's data: its length still holds
+    second[-1] ^= 0xFF
+    path = write_segment(tmp_path / "0001-1-0.seg", first, bytes(second), third)
+
+    assert [r.event_id for r in read_segment(path)] == [EVENT_A, EVENT_C]
+
+
+def test_read_segment_stops_at_truncated_tail(tmp_path):
+    complete = encode_record(EVENT, EVENT_A, 1.0, b"complete")
+    torn = encode_record(EVENT, EVENT_B, 2.0, b"torn by a crash mid-write")
+    path = write_segment(tmp_path / "0001-1-0.seg", complete, torn[:-5])
+
+    assert [r.event_id for r in read_segment(path)] == [EVENT_A]
+
+
+def test_read_segment_stops_at_torn_header(tmp_path):
+    complete = encode_record(EVENT, EVENT_A, 1.0, b"complete")
+    path = write_segment(tmp_path / "0001-1-0.seg", complete, b"\x00" * (RECORD_HEADER.size - 1))
+
+    assert [r.event_id for r in read_segment(path)] == [EVENT_A]
+
+
+def test_read_segment_stops_at_implausible_length(tmp_path):
+    complete = encode_record(EVENT, EVENT_A, 1.0, b"complete")
+    garbage = RECORD_HEADER.pack(2**31, 0, EVENT) + b"x" * 64
+    path = write_segment(tmp_path / "0001-1-0.seg", complete, garbage)
+
+    assert [r.event_id for r in read_segment(path)] == [EVENT_A]
+
+
+def test_read_segment_ignores_foreign_files(tmp_path):
+    path = tmp_path / "0001-1-0.seg"
+    path.write_bytes(b"NOPE" + encode_record(EVENT, EVENT_A, 1.0, b"data"))
+
+    assert list(read_segment(str(path))) == []
+
+
+def test_load_events_applies_marks_from_later_segments(tmp_path):
+    write_segment(
+        tmp_path / "0001-1-0.seg",
+        encode_record(EVENT, EVENT_A, 1.0, b"a"),
+        encode_record(EVENT, EVENT_B, 2.0, b"b"),
+        encode_record(FAILED, EVENT_A, 3.0, b"first failure"),
+    )
+    write_segment(
+        tmp_path / "0002-1-0.seg",
+        encode_record(FAILED, EVENT_B, 4.0, b"failed"),
+        encode_record(RESOLVED, EVENT_B, 5.0, b""),
+        encode_record(FAILED, EVENT_A, 6.0, b"second failure"),
+    )
+
+    events = {event.event_id: event for event in load_events(str(tmp_path))}
+
+    assert events[EVENT_A].failed
+    assert events[EVENT_A].failures == 2
+    assert events[EVENT_A].last_error == "second failure"
+    assert not events[EVENT_B].failed
+    assert events[EVENT_B].data == b"b"
+
+
+def test_journal_writes_readable_segments(tmp_path):
+    journal = EventJournal(str(tmp_path), fsync=False, registry=MetricsRegistry())
+    journal.start()
+
+    async def write():
+        event_id = await journal.record(b'{"entry": []}', received_at=10.0)
+        journal.mark_failed(event_id, ValueError("bad payload"))
+        return event_id
+
+    try:
+        event_id = asyncio.run(write())
+    finally:
+        journal.close()
+
+    [event] = load_events(str(tmp_path))
+    assert event.event_id == event_id
+    assert event.received_at == 10.0
+    assert event.data == b'{"entry": []}'
+    assert event.failed
+    assert event.last_error == "ValueError: bad payload"
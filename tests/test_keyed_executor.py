@@ -0,0 +1,139 @@
+import asyncio
+
+import pytest
+
+from src.core.concurrency.keyed_executor import KeyedExecutor
+from src.core.observability.metrics import MetricsRegistry
+
+
+def executor(**kwargs):
+    return KeyedExecutor(registry=MetricsRegistry(), **kwargs)
+
+
+def recorder(log, name, delay=0.0):
+    async def job():
+        log.append(("start", name))
+        await asyncio.sleep(delay)
+        log.append(("end", name))
+        return name
+
+    return job
+
+
+def test_burst_of_one_key_runs_in_order():
+    sequencer = executor()
+    log = []
+
+    async def scenario():
+        # Delivered concurrently and out of order
+        orders = [3.0, 1.0, 4.0, 2.0, 5.0]
+        return await asyncio.gather(
+            *(sequencer.submit("conversation", order, recorder(log, order, 0.001)) for order in orders)
+        )
+
+    results = asyncio.run(scenario())
+
+    assert results == [3.0, 1.0, 4.0, 2.0, 5.0]
+    assert [name for event, name in log if event == "start"] == [1.0, 2.0, 3.0, 4.0, 5.0]
+    # Strictly sequential: each job ends before the next one starts
+    assert log == [(event, order) for order in [1.0, 2.0, 3.0, 4.0, 5.0] for event in ("start", "end")]
+
+
+def test_keys_run_concurrently():
+    sequencer = executor()
+    log = []
+
+    async def scenario():
+        await asyncio.gather(
+            sequencer.submit("a", 1.0, recorder(log, "a", 0.01)),
+            sequencer.submit("b", 1.0, recorder(log, "b", 0.01)),
+        )
+
+    asyncio.run(scenario())
+
+    assert log[:2] == [("start", "a"), ("start", "b")]
+
+
+def test_max_concurrency_caps_keys_in_flight():
+    sequencer = executor(max_concurrency=1)
+    log = []
+
+    async def scenario():
+        await asyncio.gather(
+            sequencer.submit("a", 1.0, recorder(log, "a", 0.01)),
+            sequencer.submit("b", 1.0, recorder(log, "b", 0.01)),
+        )
+
+    asyncio.run(scenario())
+
+    assert log == [("start", "a"), ("end", "a"), ("start", "b"), ("end", "b")]
+
+
+def test_late_job_runs_and_is_counted_out_of_order():
+    sequencer = executor()
+    log = []
+
+    async def scenario():
+        await sequencer.submit("conversation", 2.0, recorder(log, 2.0))
+        # Older than a job already processed for the key: cannot be put back in sequence
+        await sequencer.submit("conversation", 1.0, recorder(log, 1.0))
+
+    asyncio.run(scenario())
+
+    assert [name for event, name in log if event == "start"] == [2.0, 1.0]
+    assert sequencer.stats()["out_of_order"] == 1
+
+
+def test_failure_is_raised_to_its_caller_and_does_not_block_the_key():
+    sequencer = executor()
+    log = []
+
+    async def fail():
+        raise ValueError("handler failed")
+
+    async def scenario():
+        return await asyncio.gather(
+            sequencer.submit("conversation", 1.0, fail),
+            sequencer.submit("conversation", 2.0, recorder(log, 2.0)),
+            return_exceptions=True,
+        )
+
+    failed, result = asyncio.run(scenario())
+
+    assert isinstance(failed, ValueError)
+    assert result == 2.0
+    assert sequencer.stats()["failed"] == 1
+    assert sequencer.stats()["completed"] == 1
+
+
+def test_stop_drains_queued_jobs():
+    sequencer = executor()
+    log = []
+
+    async def scenario():
+        tasks = [
+            asyncio.create_task(sequencer.submit("conversation", order, recorder(log, order, 0.001)))
+            for order in (1.0, 2.0, 3.0)
+        ]
+        await asyncio.sleep(0)
+        await sequencer.stop(timeout=5.0)
+        return [task.done() for task in tasks]
+
+    assert asyncio.run(scenario()) == [True, True, True]
+    assert [name for event, name in log if event == "end"] == [1.0, 2.0, 3.0]
+
+
+def test_stop_cancels_jobs_left_after_the_timeout():
+    sequencer = executor()
+
+    async def scenario():
+        first = asyncio.create_task(sequencer.submit("conversation", 1.0, lambda: asyncio.sleep(10)))
+        second = asyncio.create_task(sequencer.submit("conversation", 2.0, lambda: asyncio.sleep(0)))
+        await asyncio.sleep(0.01)
+        await sequencer.stop(timeout=0.05)
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        with pytest.raises(asyncio.CancelledError):
+            await second
+
+    asyncio.run(scenario())
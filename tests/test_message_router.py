@@ -0,0 +1,72 @@
+import asyncio
+import json
+
+from src.core.journal.event_journal import EventJournal, load_events
+from src.core.observability.metrics import MetricsRegistry
+from src.modules.channels.meta.dtos.inbound import Payload
+from src.modules.channels.meta.services.webhook.context import WebhookContext
+from src.modules.channels.meta.services.webhook.message_router import MessageHandler, MessageRouter, Workload
+
+
+def image_webhook():
+    return {
+        "object": "whatsapp_business_account",
+        "entry": [{
+            "id": "waba-1",
+            "changes": [{
+                "field": "messages",
+                "value": {
+                    "messaging_product": "whatsapp",
+                    "metadata": {"display_phone_number": "5511999990000", "phone_number_id": "phone-1"},
+                    "contacts": [{"profile": {"name": "Ana"}, "wa_id": "5511988887777"}],
+                    "messages": [{
+                        "from": "5511988887777",
+                        "id": "wamid.1",
+                        "timestamp": "1700000000",
+                        "type": "image",
+                        "image": {"id": "media-1", "mime_type": "image/jpeg", "sha256": "x"},
+                    }],
+                },
+            }],
+        }],
+    }
+
+
+class FailingMediaHandler(MessageHandler):
+    message_types = ("image",)
+    workload = Workload.HEAVY
+
+    async def handle(self, context, message):
+        await asyncio.sleep(0)
+        raise ConnectionError("media download failed")
+
+    def reply(self, context, message):
+        return "Received, processing"
+
+
+def test_failed_background_handler_marks_the_event_for_replay(tmp_path):
+    body = json.dumps(image_webhook()).encode()
+    journal = EventJournal(str(tmp_path), fsync=False, registry=MetricsRegistry())
+    journal.start()
+    registry = MetricsRegistry()
+    router = MessageRouter([FailingMediaHandler()], journal=journal, registry=registry)
+
+    async def scenario():
+        context = WebhookContext.from_payload(Payload.model_validate_json(body))
+        context.event_id = await journal.record(body)
+        # Answered at once; the heavy work fails afterwards
+        reply = await router.dispatch(context)
+        await router.stop()
+        return context.event_id, reply
+
+    try:
+        event_id, reply = asyncio.run(scenario())
+    finally:
+        journal.close()
+
+    assert reply == "Received, processing"
+    [event] = load_events(str(tmp_path))
+    assert event.event_id == event_id
+    assert event.failed
+    assert event.last_error == "ConnectionError: media download failed"
+    assert registry.snapshot()["counters"]["webhook.background.failed{type=image}"] == 1
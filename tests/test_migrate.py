@@ -0,0 +1,74 @@
+import hashlib
+
+import pytest
+
+from scripts.database.migrate import (
+    RESET_MIGRATION,
+    AppliedMigration,
+    MigrationError,
+    discover,
+    plan,
+    read_migration,
+)
+
+
+@pytest.fixture
+def migrations_dir(tmp_path):
+    (tmp_path / RESET_MIGRATION).write_text("DROP TABLE IF EXISTS t;")
+    (tmp_path / "001_create_t.sql").write_text("CREATE TABLE t (id INT);")
+    (tmp_path / "002_add_name.sql").write_text("ALTER TABLE t ADD COLUMN name TEXT;")
+    return tmp_path
+
+
+def applied(migration):
+    return AppliedMigration(migration.version, migration.name, migration.checksum)
+
+
+def test_discover_orders_migrations_and_skips_reset(migrations_dir):
+    migrations = discover(migrations_dir)
+
+    assert [m.path.name for m in migrations] == ["001_create_t.sql", "002_add_name.sql"]
+    assert migrations[0].version == "001"
+    assert migrations[0].name == "create_t"
+    assert migrations[0].checksum == hashlib.sha256(b"CREATE TABLE t (id INT);").hexdigest()
+
+
+def test_discover_refuses_reset_script(migrations_dir):
+    with pytest.raises(MigrationError, match="--reset"):
+        discover(migrations_dir / RESET_MIGRATION)
+
+
+def test_discover_single_file(migrations_dir):
+    assert [m.version for m in discover(migrations_dir / "002_add_name.sql")] == ["002"]
+
+
+def test_discover_rejects_duplicate_versions(migrations_dir):
+    (migrations_dir / "002_other.sql").write_text("SELECT 1;")
+
+    with pytest.raises(MigrationError, match="Version 002"):
+        discover(migrations_dir)
+
+
+def test_read_migration_rejects_bad_names(tmp_path):
+    path = tmp_path / "create_t.sql"
+    path.write_text("SELECT 1;")
+
+    with pytest.raises(MigrationError, match="NNN_description"):
+        read_migration(path)
+
+
+def test_plan_returns_unapplied_migrations(migrations_dir):
+    first, second = discover(migrations_dir)
+
+    assert plan([first, second], {}) == [first, second]
+    assert plan([first, second], {"001": applied(first)}) == [second]
+    assert plan([first, second], {"001": applied(first), "002": applied(second)}) == []
+
+
+def test_plan_stops_on_checksum_drift(migrations_dir):
+    first, second = discover(migrations_dir)
+    ledger = {"001": applied(first)}
+    (migrations_dir / "001_create_t.sql").write_text("CREATE TABLE t (id BIGINT);")
+
+    with pytest.raises(MigrationError, match="001_create_t.sql"):
+        plan(discover(migrations_dir), ledger)
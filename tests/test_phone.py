@@ -0,0 +1,30 @@
+import pytest
+
+from src.core.utils.phone import normalize_phone
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ("+15550001111", "+15550001111"),
+        ("15550001111", "+15550001111"),
+        ("1 555-000-1111", "+15550001111"),
+        ("+1 (555) 000-1111", "+15550001111"),
+        ("  +55 11 90000-0001 ", "+5511900000001"),
+        ("005511900000001", "+5511900000001"),
+        ("0044 20 7946 0000", "+442079460000"),
+        # "+" already marks the country code: a following 00 is not a prefix
+        ("+0044 20 7946 0000", None),
+        # national numbers (trunk 0) carry no country code
+        ("011 99999-0000", None),
+        ("123456", None),
+        ("1234567", "+1234567"),
+        ("123456789012345", "+123456789012345"),
+        ("1234567890123456", None),
+        ("", None),
+        (None, None),
+        ("not a number", None),
+    ],
+)
+def test_normalize_phone(value, expected):
+    assert normalize_phone(value) == expected
@@ -0,0 +1,126 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.core.database.supabase_async_repository import SupabaseAsyncRepository
+
+
+class Table:
+    """Request builder over in-memory rows, recording the count requests."""
+
+    def __init__(self, session):
+        self.session = session
+        self.filters = {}
+        self.rows_to_insert = None
+        self.count_mode = None
+
+    def select(self, columns, count=None):
+        self.count_mode = count
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def limit(self, limit):
+        self.limit_value = limit
+        return self
+
+    def insert(self, rows):
+        self.rows_to_insert = rows if isinstance(rows, list) else [rows]
+        return self
+
+    def execute(self):
+        if self.rows_to_insert is not None:
+            self.session.rows.extend(self.rows_to_insert)
+            return SimpleNamespace(data=self.rows_to_insert, count=None)
+        self.session.requests.append((self.count_mode, dict(self.filters), self.limit_value))
+        matching = [row for row in self.session.rows if all(row.get(k) == v for k, v in self.filters.items())]
+        return SimpleNamespace(data=[], count=len(matching))
+
+
+class Session:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.requests = []
+
+    def table(self, name):
+        return Table(self)
+
+
+class Ticket(dict):
+    def __init__(self, **fields):
+        super().__init__(fields)
+
+
+@pytest.fixture
+def repository():
+    session = Session([{"id": 1, "status": "open"}, {"id": 2, "status": "open"}, {"id": 3, "status": "closed"}])
+    repository = SupabaseAsyncRepository(session, "tickets", Ticket, validates_ulid=False)
+    assert repository.count_cache is not None
+    return repository
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_count_requests_no_rows(repository):
+    assert run(repository.count({"status": "open"}, mode="planned")) == 2
+    assert repository.client.requests == [("planned", {"status": "open"}, 0)]
+
+
+def test_counts_are_cached_per_mode_and_filters(repository):
+    async def scenario():
+        return [
+            await repository.count({"status": "open"}, mode="exact"),
+            await repository.count({"status": "open"}, mode="exact"),
+            await repository.count({"status": "closed"}, mode="exact"),
+            await repository.count({"status": "open"}, mode="planned"),
+            await repository.count(None, mode="exact"),
+        ]
+
+    assert run(scenario()) == [2, 2, 1, 2, 3]
+    assert len(repository.client.requests) == 4
+
+
+def test_max_age_bounds_cached_counts(repository):
+    async def scenario():
+        await repository.count(mode="exact")
+        await repository.count(mode="exact", max_age=60.0)
+        await repository.count(mode="exact", max_age=0)
+
+    run(scenario())
+
+    assert len(repository.client.requests) == 2
+
+
+def test_writes_drop_cached_counts(repository):
+    async def scenario():
+        before = await repository.count({"status": "open"}, mode="exact")
+        await repository.create({"id": 4, "status": "open"})
+        return before, await repository.count({"status": "open"}, mode="exact")
+
+    assert run(scenario()) == (2, 3)
+    assert len(repository.client.requests) == 2
+
+
+def test_count_racing_a_write_is_not_cached(repository, monkeypatch):
+    execute = Table.execute
+
+    def execute_during_write(table):
+        result = execute(table)
+        # A write lands while the count request is in flight
+        repository._invalidate_counts()
+        return result
+
+    monkeypatch.setattr(Table, "execute", execute_during_write)
+    assert run(repository.count(mode="exact")) == 3
+
+    assert len(repository.count_cache) == 0
+
+
+def test_unknown_mode_is_rejected(repository):
+    with pytest.raises(ValueError, match="count mode"):
+        run(repository.count(mode="fuzzy"))
@@ -0,0 +1,105 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+
+from src.core.database.pool import PoolUnavailableError, SupabaseSessionPool
+from src.core.observability.metrics import MetricsRegistry
+
+
+class Query:
+    def __init__(self, client):
+        self.client = client
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        if self.client.down:
+            raise httpx.ConnectError("connection refused")
+        return "result"
+
+
+class Client:
+    def __init__(self, factory):
+        self.factory = factory
+
+    @property
+    def down(self):
+        return self.factory.down
+
+    def table(self, name):
+        return Query(self)
+
+
+class Factory:
+    """Client factory recording the threads clients are created on."""
+
+    def __init__(self):
+        self.down = False
+        self.threads = []
+
+    def __call__(self):
+        self.threads.append(threading.current_thread())
+        return Client(self)
+
+
+def pool(factory, **kwargs):
+    kwargs.setdefault("size", 2)
+    kwargs.setdefault("backoff", 0.01)
+    kwargs.setdefault("backoff_max", 0.01)
+    return SupabaseSessionPool(factory, registry=MetricsRegistry(), **kwargs)
+
+
+def test_pool_without_background_task_opens_sessions_on_demand():
+    factory = Factory()
+    sessions = pool(factory)
+
+    assert sessions.table("accounts").select("*").execute() == "result"
+    assert len(factory.threads) == 1
+
+
+def test_started_pool_opens_sessions_off_the_loop():
+    factory = Factory()
+    sessions = pool(factory)
+
+    async def scenario():
+        await sessions.start(prewarm=False)
+        try:
+            await asyncio.sleep(0.05)
+            return sessions.table("accounts").select("*").execute(), sessions.stats()["open"]
+        finally:
+            await sessions.stop()
+
+    assert asyncio.run(scenario()) == ("result", 2)
+    assert len(factory.threads) == 2
+    assert threading.main_thread() not in factory.threads
+
+
+def test_broken_sessions_are_reconnected_in_the_background():
+    factory = Factory()
+    sessions = pool(factory, max_retries=1)
+
+    async def scenario():
+        await sessions.start(prewarm=True)
+        try:
+            factory.down = True
+            with pytest.raises(httpx.ConnectError):
+                sessions.table("accounts").select("*").execute()
+            # Both sessions broken: queries fail fast instead of reconnecting inline
+            with pytest.raises(PoolUnavailableError):
+                sessions.table("accounts").select("*").execute()
+            opened = len(factory.threads)
+            factory.down = False
+            await asyncio.sleep(0.1)
+            return opened, sessions.table("accounts").select("*").execute()
+        finally:
+            await sessions.stop()
+
+    opened, result = asyncio.run(scenario())
+
+    assert result == "result"
+    assert opened == 2
+    assert threading.main_thread() not in factory.threads
+    assert sessions.stats()["reconnects"] == 2
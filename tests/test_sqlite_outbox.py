@@ -0,0 +1,229 @@
+import asyncio
+import time
+
+import pytest
+
+from src.core.observability.metrics import MetricsRegistry
+from src.core.outbox.sqlite_outbox import DEAD, PENDING, SENDING, SENT, SQLiteOutbox
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.db"), lease_seconds=30.0, registry=MetricsRegistry())
+    outbox.open()
+    yield outbox
+    outbox.close()
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_claim_leases_messages_in_order(outbox):
+    async def scenario():
+        first = await outbox.enqueue("meta", "bot:user-1", {"n": 1}, owner_id="owner-a")
+        second = await outbox.enqueue("meta", "bot:user-2", {"n": 2}, owner_id="owner-a")
+        claimed = await outbox.claim(10)
+        return first, second, claimed, await outbox.claim(10)
+
+    first, second, claimed, again = run(scenario())
+
+    assert [m.id for m in claimed] == [first, second]
+    assert [m.payload for m in claimed] == [{"n": 1}, {"n": 2}]
+    assert all(m.attempts == 1 and m.owner_id == "owner-a" for m in claimed)
+    # Leased messages are not handed out twice
+    assert again == []
+    assert outbox.counts()[SENDING] == 2
+
+
+def test_claim_respects_limit(outbox):
+    async def scenario():
+        for n in range(5):
+            await outbox.enqueue("meta", f"bot:user-{n}", {"n": n})
+        return await outbox.claim(2), await outbox.claim(10)
+
+    first, rest = run(scenario())
+
+    assert [m.payload["n"] for m in first] == [0, 1]
+    assert [m.payload["n"] for m in rest] == [2, 3, 4]
+
+
+def test_expired_lease_is_claimed_again(tmp_path):
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.db"), lease_seconds=0.05, registry=MetricsRegistry())
+    outbox.open()
+
+    async def scenario():
+        message_id = await outbox.enqueue("meta", "bot:user", {"n": 1})
+        await outbox.claim(10)
+        # A sender that died mid-delivery never settles the message
+        assert await outbox.claim(10) == []
+        await asyncio.sleep(0.1)
+        return message_id, await outbox.claim(10)
+
+    try:
+        message_id, reclaimed = run(scenario())
+    finally:
+        outbox.close()
+
+    assert [m.id for m in reclaimed] == [message_id]
+    assert reclaimed[0].attempts == 2
+
+
+def test_expired_claim_can_neither_renew_nor_settle(tmp_path):
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.db"), lease_seconds=0.05, registry=MetricsRegistry())
+    outbox.open()
+
+    async def scenario():
+        await outbox.enqueue("meta", "bot:user", {"n": 1})
+        [stale] = await outbox.claim(10)
+        await asyncio.sleep(0.1)
+        # The lease ran out while the sender waited: it must not post
+        renewed = await outbox.renew_lease(stale)
+        [current] = await outbox.claim(10)
+        sent_by_stale = await outbox.mark_sent(stale, "wamid.stale")
+        sent_by_current = await outbox.mark_sent(current, "wamid.current")
+        return renewed, sent_by_stale, sent_by_current
+
+    try:
+        renewed, sent_by_stale, sent_by_current = run(scenario())
+        [sent] = outbox.messages(SENT)
+        stats = outbox.stats()
+    finally:
+        outbox.close()
+
+    assert renewed is False
+    assert sent_by_stale is False
+    assert sent_by_current is True
+    assert sent["provider_message_id"] == "wamid.current"
+    assert stats["counters"]["lease_lost"] == 2
+
+
+def test_renewed_lease_is_not_claimed_again(tmp_path):
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.db"), lease_seconds=0.2, registry=MetricsRegistry())
+    outbox.open()
+
+    async def scenario():
+        await outbox.enqueue("meta", "bot:user", {"n": 1})
+        [message] = await outbox.claim(10)
+        await asyncio.sleep(0.15)
+        renewed = await outbox.renew_lease(message)
+        await asyncio.sleep(0.1)
+        # Past the original lease, within the renewed one
+        return renewed, await outbox.claim(10), await outbox.mark_sent(message, None)
+
+    try:
+        renewed, reclaimed, sent = run(scenario())
+    finally:
+        outbox.close()
+
+    assert renewed is True
+    assert reclaimed == []
+    assert sent is True
+
+
+def test_duplicate_dedupe_key_is_ignored(outbox):
+    wakeups = []
+    outbox.add_listener(lambda: wakeups.append(1))
+
+    async def scenario():
+        first = await outbox.enqueue("meta", "bot:user", {"n": 1}, dedupe_key="reply:wamid.1")
+        duplicate = await outbox.enqueue("meta", "bot:user", {"n": 2}, dedupe_key="reply:wamid.1")
+        other = await outbox.enqueue("meta", "bot:user", {"n": 3}, dedupe_key="reply:wamid.2")
+        return first, duplicate, other, await outbox.claim(10)
+
+    first, duplicate, other, claimed = run(scenario())
+
+    assert duplicate is None
+    assert [m.id for m in claimed] == [first, other]
+    assert [m.payload for m in claimed] == [{"n": 1}, {"n": 3}]
+    assert len(wakeups) == 2
+    assert outbox.stats()["counters"]["duplicates"] == 1
+
+
+def test_dedupe_key_outlives_delivery(outbox):
+    async def scenario():
+        first = await outbox.enqueue("meta", "bot:user", {"n": 1}, dedupe_key="reply:wamid.1")
+        [message] = await outbox.claim(10)
+        await outbox.mark_sent(message, "wamid.out")
+        # A redelivered webhook must not queue the reply again
+        return first, await outbox.enqueue("meta", "bot:user", {"n": 1}, dedupe_key="reply:wamid.1")
+
+    first, replayed = run(scenario())
+
+    assert first is not None
+    assert replayed is None
+    assert outbox.counts()[SENT] == 1
+
+
+def test_rescheduled_message_holds_back_its_conversation(outbox):
+    async def scenario():
+        await outbox.enqueue("meta", "bot:user-1", {"n": 1})
+        await outbox.enqueue("meta", "bot:user-1", {"n": 2})
+        await outbox.enqueue("meta", "bot:user-2", {"n": 3})
+        [first] = await outbox.claim(1)
+        await outbox.mark_retry(first, "HTTP 503", delay=60.0)
+        return await outbox.claim(10)
+
+    claimed = run(scenario())
+
+    # n=2 waits for n=1's retry; the other conversation is not held back
+    assert [m.payload["n"] for m in claimed] == [3]
+
+
+def test_release_does_not_count_an_attempt(outbox):
+    async def scenario():
+        await outbox.enqueue("meta", "bot:user", {"n": 1})
+        [message] = await outbox.claim(10)
+        await outbox.release(message)
+        return await outbox.claim(10)
+
+    [message] = run(scenario())
+
+    assert message.attempts == 1
+
+
+def test_dead_messages_can_be_requeued(outbox):
+    async def scenario():
+        await outbox.enqueue("meta", "bot:user", {"n": 1})
+        [message] = await outbox.claim(10)
+        await outbox.mark_dead(message, "HTTP 400")
+        return message.id
+
+    message_id = run(scenario())
+    assert outbox.counts()[DEAD] == 1
+    assert [m["id"] for m in outbox.messages(DEAD)] == [message_id]
+
+    assert outbox.requeue_dead() == 1
+    [message] = run(outbox.claim(10))
+    assert message.id == message_id
+    assert message.attempts == 1
+
+
+def test_purge_removes_settled_messages_only(outbox):
+    async def scenario():
+        await outbox.enqueue("meta", "bot:user-1", {"n": 1})
+        await outbox.enqueue("meta", "bot:user-2", {"n": 2})
+        [sent] = await outbox.claim(1)
+        await outbox.mark_sent(sent, None)
+        return await outbox.purge(time.time() + 1.0)
+
+    assert run(scenario()) == 1
+    assert outbox.counts() == {PENDING: 1, SENDING: 0, SENT: 0, DEAD: 0}
+
+
+def test_stats_recounts_at_most_every_interval(tmp_path):
+    outbox = SQLiteOutbox(str(tmp_path / "outbox.db"), stats_interval=60.0, registry=MetricsRegistry())
+    outbox.open()
+    try:
+        run(outbox.enqueue("meta", "bot:user-1", {"n": 1}))
+        outbox.stats()
+        outbox._counts_refresh.result()
+        assert outbox.stats()[PENDING] == 1
+
+        run(outbox.enqueue("meta", "bot:user-2", {"n": 2}))
+        first_refresh = outbox._counts_refresh
+        # Within the interval scrapes report the cached counts
+        assert outbox.stats()[PENDING] == 1
+        assert outbox._counts_refresh is first_refresh
+    finally:
+        outbox.close()
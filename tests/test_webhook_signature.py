@@ -0,0 +1,204 @@
+import asyncio
+import json
+import threading
+
+from src.core.observability.metrics import MetricsRegistry
+from src.modules.channels.meta.services.webhook.signature import (
+    MALFORMED,
+    MISMATCH,
+    MISSING,
+    UNAVAILABLE,
+    WebhookSignatureVerifier,
+    sign,
+)
+
+ACCOUNT_A = {
+    "id": "account-a",
+    "meta_business_account_id": "WABA_A",
+    "phone_number_id": "PHONE_ID_A",
+    "phone_number": "+15550001111",
+    "phone_numbers": ["+15550001111"],
+    "app_secret": "secret-a",
+}
+ACCOUNT_B = {
+    "id": "account-b",
+    "meta_business_account_id": "WABA_B",
+    "phone_number_id": "PHONE_ID_B",
+    "phone_number": "+15550002222",
+    "phone_numbers": json.dumps(["+15550002222", "+15550003333"]),
+    "app_secret": "secret-b",
+}
+
+
+def webhook_body(business_account_id, display_phone_number, phone_number_id):
+    payload = {
+        "object": "whatsapp_business_account",
+        "entry": [
+            {
+                "id": business_account_id,
+                "changes": [
+                    {
+                        "field": "messages",
+                        "value": {
+                            "messaging_product": "whatsapp",
+                            "metadata": {
+                                "display_phone_number": display_phone_number,
+                                "phone_number_id": phone_number_id,
+                            },
+                        },
+                    }
+                ],
+            }
+        ],
+    }
+    return json.dumps(payload).encode()
+
+
+BODY_A = webhook_body("WABA_A", "1 555-000-1111", "PHONE_ID_A")
+BODY_B = webhook_body("WABA_B", "15550003333", "PHONE_ID_B")
+
+
+def verifier(secrets=(), accounts=(), **kwargs):
+    verifier = WebhookSignatureVerifier(secrets=secrets, registry=MetricsRegistry(), **kwargs)
+    verifier.set_accounts(accounts)
+    return verifier
+
+
+def test_static_secret_verifies():
+    check = verifier(secrets=["old-secret", "app-secret"])
+
+    assert check.verify(BODY_A, sign(BODY_A, "app-secret")) is None
+    assert check.verify(BODY_A, sign(BODY_A, "old-secret")) is None
+    assert check.verify(BODY_A, sign(BODY_A, "other-secret")) == MISMATCH
+    assert check.stats()["verified"] == 2
+
+
+def test_signature_covers_the_exact_body():
+    check = verifier(secrets=["app-secret"])
+
+    assert check.verify(BODY_A + b" ", sign(BODY_A, "app-secret")) == MISMATCH
+
+
+def test_account_secret_verifies_its_own_webhooks():
+    check = verifier(accounts=[ACCOUNT_A, ACCOUNT_B])
+
+    assert check.verify(BODY_A, sign(BODY_A, "secret-a")) is None
+    # Addressed through one of phone_numbers (stored as a JSON string)
+    assert check.verify(BODY_B, sign(BODY_B, "secret-b")) is None
+
+
+def test_account_secret_cannot_sign_another_tenants_webhooks():
+    check = verifier(accounts=[ACCOUNT_A, ACCOUNT_B])
+
+    assert check.verify(BODY_A, sign(BODY_A, "secret-b")) == MISMATCH
+    assert check.verify(BODY_B, sign(BODY_B, "secret-a")) == MISMATCH
+
+
+def test_payload_addressed_to_two_accounts_needs_a_static_secret():
+    check = verifier(accounts=[ACCOUNT_A, ACCOUNT_B])
+    mixed = webhook_body("WABA_A", "15550002222", "PHONE_ID_A")
+
+    assert check.verify(mixed, sign(mixed, "secret-a")) == MISMATCH
+    assert check.verify(mixed, sign(mixed, "secret-b")) == MISMATCH
+
+
+def test_identifier_shared_by_different_secrets_proves_nothing():
+    impostor = {**ACCOUNT_B, "id": "account-c", "meta_business_account_id": "WABA_A", "app_secret": "secret-c"}
+    check = verifier(accounts=[ACCOUNT_A, impostor])
+    body = webhook_body("WABA_A", None, None)
+
+    assert check.verify(body, sign(body, "secret-a")) == MISMATCH
+    assert check.verify(body, sign(body, "secret-c")) == MISMATCH
+
+
+def test_unreadable_body_only_verifies_with_static_secret():
+    check = verifier(secrets=["app-secret"], accounts=[ACCOUNT_A])
+    body = b"not json"
+
+    assert check.verify(body, sign(body, "secret-a")) == MISMATCH
+    assert check.verify(body, sign(body, "app-secret")) is None
+
+
+def test_missing_and_malformed_headers():
+    check = verifier(secrets=["app-secret"])
+    valid = sign(BODY_A, "app-secret")
+
+    assert check.check_header(None) == MISSING
+    assert check.verify(BODY_A, "") == MISSING
+    assert check.verify(BODY_A, valid[:-2]) == MALFORMED
+    assert check.verify(BODY_A, "sha1=" + valid[5:]) == MALFORMED
+    assert check.verify(BODY_A, "sha256=" + "zz" * 32) == MALFORMED
+    assert check.check_header(valid) is None
+
+
+def test_fails_closed_without_keys():
+    check = verifier(allow_unsigned=False)
+
+    assert check.enforcing
+    assert check.check_header(None) == UNAVAILABLE
+    assert check.verify(BODY_A, sign(BODY_A, "anything")) == UNAVAILABLE
+    assert check.stats()[UNAVAILABLE] == 2
+
+
+def test_accounts_without_secrets_are_no_keys():
+    check = verifier(accounts=[{**ACCOUNT_A, "app_secret": None}])
+
+    assert not check.has_keys
+    assert check.verify(BODY_A, sign(BODY_A, "secret-a")) == UNAVAILABLE
+
+
+def test_development_accepts_unsigned_webhooks_without_keys():
+    check = verifier(allow_unsigned=True)
+
+    assert not check.enforcing
+    assert check.verify(BODY_A, None) is None
+    assert check.stats()["unverified"] == 1
+
+
+def test_development_still_enforces_configured_keys():
+    check = verifier(secrets=["app-secret"], allow_unsigned=True)
+
+    assert check.enforcing
+    assert check.verify(BODY_A, None) == MISSING
+
+
+def test_disabled_verification_accepts_everything():
+    check = verifier(enabled=False)
+
+    assert check.verify(BODY_A, None) is None
+
+
+class AccountService:
+    def __init__(self, pages):
+        self.pages = pages
+        self.threads = set()
+
+    async def iter_signing_rows(self, page_size=1000):
+        for page in self.pages:
+            self.threads.add(threading.current_thread())
+            if isinstance(page, Exception):
+                raise page
+            yield page
+
+
+def test_refresh_loads_accounts_and_keeps_them_on_failure():
+    service = AccountService([[ACCOUNT_A], [ACCOUNT_B]])
+    check = WebhookSignatureVerifier(account_service=service, registry=MetricsRegistry())
+
+    asyncio.run(check.refresh())
+    assert check.stats()["account_secrets"] == 2
+    # The blocking page requests never run on the event loop's thread
+    assert threading.main_thread() not in service.threads
+    assert check.verify(BODY_B, sign(BODY_B, "secret-b")) is None
+
+    service.pages = [[ACCOUNT_A], ConnectionError("database down")]
+    asyncio.run(check.refresh())
+    assert check.verify(BODY_B, sign(BODY_B, "secret-b")) is None
+
+
+def test_rotated_account_secret_replaces_the_old_one():
+    check = verifier(accounts=[ACCOUNT_A])
+    check.set_accounts([{**ACCOUNT_A, "app_secret": "secret-a2"}])
+
+    assert check.verify(BODY_A, sign(BODY_A, "secret-a")) == MISMATCH
+    assert check.verify(BODY_A, sign(BODY_A, "secret-a2")) is None
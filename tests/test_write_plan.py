@@ -0,0 +1,104 @@
+import datetime
+from typing import Any, Dict, List, Optional
+
+import pytest
+from pydantic import BaseModel
+
+from src.core.database.write_plan import EXCLUDED, TEMPORAL, ULID, UNTYPED, WritePlan
+from src.core.utils.custom_ulid import generate_ulid
+
+CREATED_AT = datetime.datetime(2026, 1, 2, 3, 4, 5, tzinfo=datetime.timezone.utc)
+INVALID_ULID = "!" * 26
+
+
+class Conversation(BaseModel):
+    id: Optional[str] = None
+    owner_id: str
+    title: str
+    tags: List[str] = []
+    metadata: Dict[str, Any] = {}
+    created_at: Optional[datetime.datetime] = None
+    payload: Any = None
+
+
+def plan(**kwargs):
+    return WritePlan.for_model(Conversation, **kwargs)
+
+
+def test_columns_are_classified_from_the_model():
+    conversations = plan(exclude_on_create=["id"])
+
+    assert conversations.flags("id") == ULID | EXCLUDED
+    assert conversations.flags("owner_id") == ULID
+    assert conversations.flags("title") == 0
+    assert conversations.flags("tags") == 0
+    assert conversations.flags("created_at") == TEMPORAL
+    assert conversations.flags("payload") == UNTYPED
+    assert conversations.describe() == {
+        "ulid": ["id", "owner_id"],
+        "excluded": ["id"],
+        "temporal": ["created_at"],
+        "untyped": ["payload"],
+    }
+
+
+def test_plans_are_shared_per_model_and_options():
+    assert plan() is plan()
+    assert plan(validates_ulid=False) is not plan()
+    assert plan(exclude_on_create=["id"]) is plan(exclude_on_create=("id",))
+
+
+def test_prepare_serializes_temporal_values_and_leaves_the_input_alone():
+    owner_id = generate_ulid()
+    data = {"owner_id": owner_id, "title": "hi", "created_at": CREATED_AT, "payload": datetime.date(2026, 1, 2)}
+
+    row = plan().prepare(data)
+
+    assert row == {"owner_id": owner_id, "title": "hi", "created_at": CREATED_AT.isoformat(), "payload": "2026-01-02"}
+    assert data["created_at"] is CREATED_AT
+
+
+def test_excluded_columns_are_dropped_on_create_only():
+    data = {"id": generate_ulid(), "owner_id": generate_ulid(), "title": "hi"}
+    conversations = plan(exclude_on_create=["id"])
+
+    assert "id" not in conversations.prepare(data)
+    assert conversations.prepare(data, creating=False)["id"] == data["id"]
+
+
+def test_invalid_ulid_is_rejected():
+    conversations = plan()
+
+    with pytest.raises(ValueError, match="owner_id"):
+        conversations.prepare({"owner_id": INVALID_ULID, "title": "hi"})
+    with pytest.raises(ValueError, match="owner_id"):
+        conversations.validate({"owner_id": INVALID_ULID})
+    # Only 26-character strings are checked (integer ids, short keys)
+    assert conversations.prepare({"owner_id": "legacy-7", "title": "hi"})["owner_id"] == "legacy-7"
+
+
+def test_ulid_checks_can_be_disabled():
+    assert plan(validates_ulid=False).prepare({"owner_id": INVALID_ULID})["owner_id"] == INVALID_ULID
+
+
+def test_prepare_many_validates_the_whole_batch():
+    conversations = plan()
+    rows = [{"owner_id": generate_ulid(), "created_at": CREATED_AT} for _ in range(3)]
+
+    prepared = conversations.prepare_many(rows)
+    assert [row["created_at"] for row in prepared] == [CREATED_AT.isoformat()] * 3
+
+    with pytest.raises(ValueError, match=INVALID_ULID):
+        conversations.prepare_many([*rows, {"owner_id": INVALID_ULID}])
+
+
+def test_columns_outside_the_model_are_learned():
+    conversations = WritePlan(True, frozenset(), {"title": 0})
+
+    row = conversations.prepare({"title": "hi", "closed_at": CREATED_AT})
+    assert row["closed_at"] == CREATED_AT.isoformat()
+    assert conversations.flags("closed_at") == UNTYPED
+    assert "closed_at" in conversations.describe()["untyped"]
+
+    with pytest.raises(ValueError, match="contact_id"):
+        conversations.prepare({"title": "hi", "contact_id": INVALID_ULID})